@@ -0,0 +1,106 @@
+"""Add daily keys to agent and topic metrics
+
+Revision ID: 20250328_add_metrics_daily_keys
+Revises: 20250327_add_alert_tables
+Create Date: 2025-03-28
+
+This migration lets the metrics collector write daily counters with UPSERTs:
+1. agent_metrics and topic_metrics get a metrics_date column, backfilled from
+   timestamp, and a unique constraint on the agent or topic and the day.
+   Existing rows for the same day are merged first.
+2. agent_metrics gets a messages_processed column that weights the average
+   processing time.
+3. The metrics tables get the created_at and updated_at columns of the models.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20250328_add_metrics_daily_keys'
+down_revision = '20250327_add_alert_tables'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Add timestamps of the models
+    for table in ('message_metrics', 'agent_metrics', 'topic_metrics'):
+        if table != 'message_metrics':
+            op.add_column(table, sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=False))
+        op.add_column(table, sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=False))
+    
+    # Add daily keys
+    op.add_column('agent_metrics', sa.Column('metrics_date', sa.Date(), nullable=True))
+    op.add_column('agent_metrics', sa.Column('messages_processed', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('topic_metrics', sa.Column('metrics_date', sa.Date(), nullable=True))
+    op.execute("UPDATE agent_metrics SET metrics_date = CAST(timestamp AS DATE)")
+    op.execute("UPDATE topic_metrics SET metrics_date = CAST(timestamp AS DATE)")
+    
+    # Merge rows of the same agent and day into the row with the lowest id
+    op.execute("""
+    UPDATE agent_metrics AS kept
+    SET messages_sent = totals.messages_sent,
+        messages_received = totals.messages_received,
+        timestamp = totals.timestamp
+    FROM (
+        SELECT agent_id, metrics_date, MIN(id::text) AS kept_id,
+               SUM(messages_sent) AS messages_sent,
+               SUM(messages_received) AS messages_received,
+               MAX(timestamp) AS timestamp
+        FROM agent_metrics
+        GROUP BY agent_id, metrics_date
+        HAVING COUNT(*) > 1
+    ) AS totals
+    WHERE kept.id::text = totals.kept_id
+    """)
+    op.execute("""
+    DELETE FROM agent_metrics AS duplicate
+    USING agent_metrics AS kept
+    WHERE duplicate.agent_id = kept.agent_id
+      AND duplicate.metrics_date = kept.metrics_date
+      AND duplicate.id::text > kept.id::text
+    """)
+    
+    # Merge rows of the same topic and day into the row with the lowest id
+    op.execute("""
+    UPDATE topic_metrics AS kept
+    SET message_count = totals.message_count,
+        subscriber_count = totals.subscriber_count,
+        timestamp = totals.timestamp
+    FROM (
+        SELECT topic, metrics_date, MIN(id::text) AS kept_id,
+               SUM(message_count) AS message_count,
+               MAX(subscriber_count) AS subscriber_count,
+               MAX(timestamp) AS timestamp
+        FROM topic_metrics
+        GROUP BY topic, metrics_date
+        HAVING COUNT(*) > 1
+    ) AS totals
+    WHERE kept.id::text = totals.kept_id
+    """)
+    op.execute("""
+    DELETE FROM topic_metrics AS duplicate
+    USING topic_metrics AS kept
+    WHERE duplicate.topic = kept.topic
+      AND duplicate.metrics_date = kept.metrics_date
+      AND duplicate.id::text > kept.id::text
+    """)
+    
+    op.alter_column('agent_metrics', 'metrics_date', nullable=False)
+    op.alter_column('topic_metrics', 'metrics_date', nullable=False)
+    op.create_unique_constraint('uq_agent_metrics_agent_date', 'agent_metrics', ['agent_id', 'metrics_date'])
+    op.create_unique_constraint('uq_topic_metrics_topic_date', 'topic_metrics', ['topic', 'metrics_date'])
+
+
+def downgrade():
+    op.drop_constraint('uq_topic_metrics_topic_date', 'topic_metrics', type_='unique')
+    op.drop_constraint('uq_agent_metrics_agent_date', 'agent_metrics', type_='unique')
+    op.drop_column('topic_metrics', 'metrics_date')
+    op.drop_column('agent_metrics', 'messages_processed')
+    op.drop_column('agent_metrics', 'metrics_date')
+    
+    for table in ('message_metrics', 'agent_metrics', 'topic_metrics'):
+        op.drop_column(table, 'updated_at')
+        if table != 'message_metrics':
+            op.drop_column(table, 'created_at')
@@ -0,0 +1,70 @@
+"""Add message metrics rollup tables
+
+Revision ID: 20250329_add_message_metrics_rollups
+Revises: 20250328_add_metrics_daily_keys
+Create Date: 2025-03-29
+
+This migration adds the tables the metrics collector maintains for the
+performance metrics endpoint:
+1. message_metrics_rollup - Message counters per minute and hour, by status,
+   topic and source agent
+2. message_latency_histogram - Latency histogram bins per minute and hour
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+import uuid
+
+# revision identifiers, used by Alembic.
+revision = '20250329_add_message_metrics_rollups'
+down_revision = '20250328_add_metrics_daily_keys'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Create message_metrics_rollup table
+    op.create_table(
+        'message_metrics_rollup',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True, default=uuid.uuid4),
+        sa.Column('bucket_size', sa.String(), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('dimension', sa.String(), nullable=False),
+        sa.Column('dimension_value', sa.String(), nullable=False, server_default=''),
+        sa.Column('message_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('processing_time_total_ms', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('processing_time_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('queue_time_total_ms', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('queue_time_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('total_time_total_ms', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('total_time_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.UniqueConstraint(
+            'bucket_size', 'bucket_start', 'dimension', 'dimension_value',
+            name='uq_message_metrics_rollup_bucket'
+        )
+    )
+    
+    # Create message_latency_histogram table
+    op.create_table(
+        'message_latency_histogram',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True, default=uuid.uuid4),
+        sa.Column('bucket_size', sa.String(), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('metric', sa.String(), nullable=False),
+        sa.Column('bin', sa.Integer(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.UniqueConstraint(
+            'bucket_size', 'bucket_start', 'metric', 'bin',
+            name='uq_message_latency_histogram_bin'
+        )
+    )
+
+
+def downgrade():
+    op.drop_table('message_latency_histogram')
+    op.drop_table('message_metrics_rollup')
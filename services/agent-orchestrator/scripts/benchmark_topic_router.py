@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+"""
+Benchmark of topic routing at large subscription counts.
+
+This script subscribes agents to a mix of exact, single-level wildcard and
+multi-level wildcard topics, then compares the time to resolve published
+topics by:
+1. Matching every subscription pattern (the previous routing algorithm)
+2. The subscription trie with an empty cache
+3. The subscription trie with a warm cache
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+# Add the parent directory to the Python path
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, parent_dir)
+
+# Add the project root to the Python path for shared modules
+project_root = os.path.abspath(os.path.join(parent_dir, '../..'))
+sys.path.insert(0, project_root)
+
+from src.services.communication.routing import TopicRouter
+
+SERVICES = ['agent', 'task', 'project', 'model', 'tool', 'planning']
+EVENTS = ['created', 'updated', 'completed', 'failed', 'assigned', 'status']
+
+
+def random_topic(rng: random.Random, agent_count: int) -> str:
+    """Create a published topic."""
+    return f"{rng.choice(SERVICES)}.{rng.randrange(agent_count)}.{rng.choice(EVENTS)}"
+
+
+def random_pattern(rng: random.Random, agent_count: int) -> str:
+    """Create a subscription pattern."""
+    kind = rng.random()
+    if kind < 0.6:
+        return random_topic(rng, agent_count)
+    if kind < 0.8:
+        return f"{rng.choice(SERVICES)}.*.{rng.choice(EVENTS)}"
+    if kind < 0.95:
+        return f"{rng.choice(SERVICES)}.{rng.randrange(agent_count)}.*"
+    return f"{rng.choice(SERVICES)}.#"
+
+
+def brute_force(router: TopicRouter, topic: str) -> set:
+    """Resolve a topic by matching every subscription pattern."""
+    subscribers = set()
+    for pattern, pattern_subscribers in router.subscriptions.items():
+        if pattern == topic or router._topic_matches(pattern, topic):
+            subscribers.update(pattern_subscribers)
+    return subscribers
+
+
+def measure(resolve, topics) -> float:
+    """Measure the mean time to resolve a topic in microseconds."""
+    start = time.perf_counter()
+    for topic in topics:
+        resolve(topic)
+    return (time.perf_counter() - start) / len(topics) * 1_000_000
+
+
+def run(subscription_count: int, lookups: int, seed: int) -> None:
+    """Run the benchmark for one subscription count."""
+    rng = random.Random(seed)
+    agent_count = max(subscription_count // 5, 1)
+    router = TopicRouter(cache_size=lookups)
+
+    start = time.perf_counter()
+    for i in range(subscription_count):
+        router.subscribe(random_pattern(rng, agent_count), f"agent-{i % agent_count}")
+    subscribe_us = (time.perf_counter() - start) / subscription_count * 1_000_000
+
+    topics = [random_topic(rng, agent_count) for _ in range(lookups)]
+    for topic in topics[:100]:
+        assert set(router.get_subscribers(topic)) == brute_force(router, topic)
+
+    brute_force_us = measure(lambda topic: brute_force(router, topic), topics[:max(lookups // 100, 10)])
+    router._cache.clear()
+    cold_us = measure(router.get_subscribers, topics)
+    warm_us = measure(router.get_subscribers, topics)
+
+    print(f"\n{subscription_count} subscriptions ({len(router.subscriptions)} patterns)")
+    print(f"  subscribe:        {subscribe_us:10.2f} us")
+    print(f"  match every:      {brute_force_us:10.2f} us per topic")
+    print(f"  trie (cold):      {cold_us:10.2f} us per topic")
+    print(f"  trie (cached):    {warm_us:10.2f} us per topic")
+
+
+def main():
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark topic routing")
+    parser.add_argument("--subscriptions", type=int, nargs="+", default=[10_000, 100_000],
+                        help="Subscription counts to benchmark")
+    parser.add_argument("--lookups", type=int, default=10_000, help="Topics resolved per run")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    args = parser.parse_args()
+
+    for subscription_count in args.subscriptions:
+        run(subscription_count, args.lookups, args.seed)
+
+
+if __name__ == "__main__":
+    main()
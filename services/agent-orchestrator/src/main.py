@@ -25,6 +25,7 @@ from .routers.enhanced_communication import router as enhanced_communication_rou
 from .routers.metrics_router import router as metrics_router
 from .routers.alerts_router import router as alerts_router
 from .routers.collaboration_patterns import router as collaboration_patterns_router
+from .services.communication.metrics_collector import close_metrics_collector
 from shared.utils.src.feature_flags import is_feature_enabled
 
 # Configure logging
@@ -66,6 +67,10 @@ async def lifespan(app: FastAPI):
         await close_messaging()
         logger.info("Messaging connections closed")
         
+        # Write buffered communication metrics
+        await close_metrics_collector()
+        logger.info("Metrics collector stopped")
+        
         # Close database connections
         await close_db_connection()
         logger.info("Database connections closed")
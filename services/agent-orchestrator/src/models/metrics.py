@@ -5,7 +5,7 @@ This module provides SQLAlchemy models for storing and retrieving metrics data
 for the Agent Communication Hub.
 """
 
-from sqlalchemy import Column, String, ForeignKey, JSON, DateTime, Integer, Float, Boolean, Enum
+from sqlalchemy import Column, String, ForeignKey, JSON, Date, DateTime, Integer, Float, Boolean, Enum, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from typing import List, Optional, Dict, Any
@@ -96,7 +96,7 @@ class MessageMetricsModel(StandardModel):
     
     # Additional data
     routing_path = Column(JSON, nullable=True)
-    message_metadata = Column(JSON, nullable=True)  # Renamed from 'metadata' which is reserved in SQLAlchemy
+    message_metadata = Column("metadata", JSON, nullable=True)  # Renamed from 'metadata' which is reserved in SQLAlchemy
     
     # Relationships
     source_agent = relationship("AgentModel", foreign_keys=[source_agent_id])
@@ -138,20 +138,25 @@ class AgentMetricsModel(StandardModel):
     SQLAlchemy model for agent metrics.
     """
     __tablename__ = "agent_metrics"
+    __table_args__ = (
+        UniqueConstraint("agent_id", "metrics_date", name="uq_agent_metrics_agent_date"),
+    )
     
     # Agent association
     agent_id = Column(UUID, ForeignKey("agent.id", ondelete="CASCADE"), nullable=False, index=True)
     
     # Timestamp
     timestamp = Column(DateTime(timezone=True), nullable=False, index=True)
+    metrics_date = Column(Date, nullable=False)  # Day the counters cover
     
     # Metrics
     messages_sent = Column(Integer, nullable=False, default=0)
     messages_received = Column(Integer, nullable=False, default=0)
+    messages_processed = Column(Integer, nullable=False, default=0)
     average_processing_time_ms = Column(Float, nullable=True)
     
     # Additional data
-    agent_metadata = Column(JSON, nullable=True)  # Renamed from 'metadata' which is reserved in SQLAlchemy
+    agent_metadata = Column("metadata", JSON, nullable=True)  # Renamed from 'metadata' which is reserved in SQLAlchemy
     
     # Relationships
     agent = relationship("AgentModel", foreign_keys=[agent_id])
@@ -172,6 +177,7 @@ class AgentMetricsModel(StandardModel):
             "timestamp": self.timestamp.isoformat() if self.timestamp else None,
             "messages_sent": self.messages_sent,
             "messages_received": self.messages_received,
+            "messages_processed": self.messages_processed,
             "average_processing_time_ms": self.average_processing_time_ms,
             "metadata": self.agent_metadata,  # Return as 'metadata' for API compatibility
         }
@@ -182,19 +188,23 @@ class TopicMetricsModel(StandardModel):
     SQLAlchemy model for topic metrics.
     """
     __tablename__ = "topic_metrics"
+    __table_args__ = (
+        UniqueConstraint("topic", "metrics_date", name="uq_topic_metrics_topic_date"),
+    )
     
     # Topic information
     topic = Column(String, nullable=False, index=True)
     
     # Timestamp
     timestamp = Column(DateTime(timezone=True), nullable=False, index=True)
+    metrics_date = Column(Date, nullable=False)  # Day the counters cover
     
     # Metrics
     message_count = Column(Integer, nullable=False, default=0)
     subscriber_count = Column(Integer, nullable=False, default=0)
     
     # Additional data
-    topic_metadata = Column(JSON, nullable=True)  # Renamed from 'metadata' which is reserved in SQLAlchemy
+    topic_metadata = Column("metadata", JSON, nullable=True)  # Renamed from 'metadata' which is reserved in SQLAlchemy
     
     def __repr__(self):
         return f"<TopicMetrics(id={self.id}, topic='{self.topic}', timestamp='{self.timestamp}')>"
@@ -216,6 +226,94 @@ class TopicMetricsModel(StandardModel):
         }
 
 
+class MessageMetricsRollupModel(StandardModel):
+    """
+    SQLAlchemy model for message metrics aggregated per time bucket.
+    
+    Each row holds the counters of one bucket for one dimension value: all
+    messages, a status, a topic or a source agent.
+    """
+    __tablename__ = "message_metrics_rollup"
+    __table_args__ = (
+        UniqueConstraint(
+            "bucket_size", "bucket_start", "dimension", "dimension_value",
+            name="uq_message_metrics_rollup_bucket"
+        ),
+    )
+    
+    # Time bucket
+    bucket_size = Column(String, nullable=False)  # "minute" or "hour"
+    bucket_start = Column(DateTime(timezone=True), nullable=False)
+    
+    # Dimension
+    dimension = Column(String, nullable=False)  # "all", "status", "topic" or "source_agent"
+    dimension_value = Column(String, nullable=False, default="")
+    
+    # Metrics
+    message_count = Column(Integer, nullable=False, default=0)
+    processing_time_total_ms = Column(Float, nullable=False, default=0)
+    processing_time_count = Column(Integer, nullable=False, default=0)
+    queue_time_total_ms = Column(Float, nullable=False, default=0)
+    queue_time_count = Column(Integer, nullable=False, default=0)
+    total_time_total_ms = Column(Float, nullable=False, default=0)
+    total_time_count = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return (
+            f"<MessageMetricsRollup(bucket_size='{self.bucket_size}', bucket_start='{self.bucket_start}', "
+            f"dimension='{self.dimension}', dimension_value='{self.dimension_value}')>"
+        )
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert model to dictionary.
+        
+        Returns:
+            Dict[str, Any]: Dictionary representation of the model
+        """
+        return {
+            "bucket_size": self.bucket_size,
+            "bucket_start": self.bucket_start.isoformat() if self.bucket_start else None,
+            "dimension": self.dimension,
+            "dimension_value": self.dimension_value,
+            "message_count": self.message_count,
+            "processing_time_total_ms": self.processing_time_total_ms,
+            "processing_time_count": self.processing_time_count,
+            "queue_time_total_ms": self.queue_time_total_ms,
+            "queue_time_count": self.queue_time_count,
+            "total_time_total_ms": self.total_time_total_ms,
+            "total_time_count": self.total_time_count,
+        }
+
+
+class MessageLatencyHistogramModel(StandardModel):
+    """
+    SQLAlchemy model for message latency histograms per time bucket.
+    
+    Each row holds the count of one histogram bin (see LatencyHistogram) of
+    one latency metric in one bucket.
+    """
+    __tablename__ = "message_latency_histogram"
+    __table_args__ = (
+        UniqueConstraint(
+            "bucket_size", "bucket_start", "metric", "bin",
+            name="uq_message_latency_histogram_bin"
+        ),
+    )
+    
+    # Time bucket
+    bucket_size = Column(String, nullable=False)  # "minute" or "hour"
+    bucket_start = Column(DateTime(timezone=True), nullable=False)
+    
+    # Histogram bin
+    metric = Column(String, nullable=False)  # "processing", "queue" or "total"
+    bin = Column(Integer, nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<MessageLatencyHistogram(bucket_start='{self.bucket_start}', metric='{self.metric}', bin={self.bin})>"
+
+
 class AlertConfigurationModel(StandardModel):
     """
     SQLAlchemy model for alert configurations.
@@ -1057,16 +1057,24 @@ class CollaborationPatternService:
             interaction_type: Interaction type
             communication_service: Communication service
         """
-        # Create a content-based rule for high priority messages
-        async def high_priority_condition(message: Dict[str, Any]) -> bool:
-            return (
-                message.get("source_agent_id") == str(source_agent_id) and
-                message.get("headers", {}).get("interaction_type") == interaction_type
-            )
+        # Create a content-based rule for high priority messages, declared as
+        # conditions so the router can index it by source agent
+        high_priority_conditions = [
+            {
+                "field": "source_agent_id",
+                "operator": "equals",
+                "value": str(source_agent_id),
+            },
+            {
+                "field": "headers.interaction_type",
+                "operator": "equals",
+                "value": interaction_type,
+            },
+        ]
         
         # Add the rule
         await communication_service.add_content_rule(
-            high_priority_condition,
+            high_priority_conditions,
             destination_agent_id,
         )
         
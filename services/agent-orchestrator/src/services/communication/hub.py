@@ -11,7 +11,8 @@ import asyncio
 import copy
 import time
 import uuid
-from typing import List, Dict, Any, Optional, Set, Tuple, Callable
+from contextlib import asynccontextmanager
+from typing import List, Dict, Any, Optional, Set, Tuple, Callable, Union
 from uuid import UUID
 from datetime import datetime
 
@@ -55,7 +56,13 @@ class CommunicationHub:
         self.rule_router = RuleBasedRouter()
         
         # Initialize priority components
-        self.priority_dispatcher = PriorityDispatcher(redis_client, config.get('priority', {}))
+        # Fairness and aging are applied by the queues when messages are dequeued
+        self.priority_dispatcher = PriorityDispatcher(redis_client, {
+            'starvation_threshold': config.get('fairness', {}).get('starvation_threshold'),
+            'aging_threshold': config.get('inheritance', {}).get('aging_threshold'),
+            'aging_boost': config.get('inheritance', {}).get('aging_boost', 1),
+            **config.get('priority', {}),
+        })
         self.fairness_manager = FairnessManager(redis_client, config.get('fairness', {}))
         self.priority_inheritance_manager = PriorityInheritanceManager(redis_client, config.get('inheritance', {}))
         
@@ -65,6 +72,12 @@ class CommunicationHub:
         # Initialize subscriptions
         self.agent_subscriptions = {}  # agent_id -> set of topics
         
+        # Initialize the request/reply registry
+        self.max_outstanding_requests = config.get('requests', {}).get('max_outstanding_per_agent', 100)
+        self.pending_requests: Dict[str, asyncio.Future] = {}  # correlation_id -> reply future
+        self._request_slots: Dict[str, asyncio.Semaphore] = {}  # agent_id -> outstanding request slots
+        self._request_slot_users: Dict[str, int] = {}  # agent_id -> requests holding or waiting for a slot
+        
         logger.info("Communication hub initialized")
     
     async def send_message(self, message: Dict[str, Any]) -> str:
@@ -148,6 +161,18 @@ class CommunicationHub:
                 routing_path=routing_path
             )
         
+        # Complete a request waiting in this hub directly rather than queueing the reply
+        if routed_message.get('type') == 'reply' and self._resolve_reply(routed_message):
+            if self.metrics_collector:
+                await self.metrics_collector.track_message_delivered(
+                    message_id=message_uuid,
+                    destination_agent_id=destination_agent_id
+                )
+            
+            logger.info(f"Reply {message['id']} completed request {routed_message.get('correlation_id')}")
+            
+            return message['id']
+        
         # Dispatch the message to the appropriate queue
         await self.priority_dispatcher.dispatch(routed_message)
         
@@ -155,21 +180,20 @@ class CommunicationHub:
         
         return message['id']
     
-    async def receive_message(self, agent_id: str) -> Optional[Dict[str, Any]]:
+    async def receive_message(self, agent_id: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
         """
         Receive a message for an agent.
         
         Args:
             agent_id: ID of the agent to receive a message for
+            timeout: Seconds to wait for a message (returns immediately if
+                not given)
             
         Returns:
             Message or None if no message is available
         """
-        # Check if we should process a lower-priority message for fairness
-        process_lower_priority = await self.fairness_manager.should_process_lower_priority()
-        
         # Get the next message for the agent
-        message = await self.priority_dispatcher.get_next_message(agent_id)
+        message = await self.priority_dispatcher.get_next_message(agent_id, timeout=timeout)
         
         if message:
             # Update the fairness manager
@@ -270,12 +294,17 @@ class CommunicationHub:
             return list(self.agent_subscriptions[agent_id])
         return []
     
-    async def add_content_rule(self, condition: Callable[[Dict[str, Any]], bool], destination: str) -> None:
+    async def add_content_rule(
+        self,
+        condition: Union[Callable[[Dict[str, Any]], bool], List[Dict[str, Any]]],
+        destination: str,
+    ) -> None:
         """
         Add a content-based routing rule.
         
         Args:
-            condition: Function that takes a message and returns True if the rule applies
+            condition: Function that takes a message and returns True if the
+                rule applies, or condition definitions that must all be met
             destination: Destination for messages that match the condition
         """
         self.content_router.add_rule(condition, destination)
@@ -320,29 +349,28 @@ class CommunicationHub:
             message['headers'] = {}
         message['headers']['topic'] = topic
         
+        # Identify the published message
+        if 'id' not in message:
+            message['id'] = str(uuid.uuid4())
+        
         # Get subscribers for the topic
         subscribers = self.topic_router.get_subscribers(topic)
         
-        # Send the message to each subscriber
-        for subscriber_id in subscribers:
-            # Create a copy of the message for each subscriber
-            subscriber_message = copy.deepcopy(message)
-            subscriber_message['destination'] = {
-                'type': 'agent',
-                'id': subscriber_id
-            }
-            
-            # Send the message
-            await self.send_message(subscriber_message)
+        # Send the message to all subscribers at once
+        await self._fan_out(message, subscribers)
         
-        logger.info(f"Published message {message.get('id', 'unknown')} to topic {topic} with {len(subscribers)} subscribers")
+        logger.info(f"Published message {message['id']} to topic {topic} with {len(subscribers)} subscribers")
         
-        return message.get('id', 'unknown')
+        return message['id']
     
     async def send_request(self, request: Dict[str, Any], timeout: float = 60.0) -> Optional[Dict[str, Any]]:
         """
         Send a request and wait for a reply.
         
+        The reply is matched to the request by its correlation ID. Each agent
+        has at most ``max_outstanding_per_agent`` requests waiting for a reply;
+        further requests wait for a slot within their timeout.
+        
         Args:
             request: Request to send
             timeout: Timeout in seconds
@@ -350,6 +378,93 @@ class CommunicationHub:
         Returns:
             Reply or None if the request timed out
         """
+        deadline = asyncio.get_running_loop().time() + timeout
+        return await self._request(request, deadline)
+    
+    async def send_requests(
+        self,
+        request: Dict[str, Any],
+        agent_ids: List[str],
+        timeout: float = 60.0,
+        quorum: Optional[int] = None,
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Send a request to multiple agents concurrently and collect their replies.
+        
+        Replies are collected until the timeout or until ``quorum`` agents have
+        replied. Requests still waiting for a reply then are cancelled.
+        
+        Args:
+            request: Request to send
+            agent_ids: IDs of the agents to send the request to
+            timeout: Timeout in seconds for all replies
+            quorum: Number of replies to wait for (all agents if not given)
+            
+        Returns:
+            Reply of each agent, or None for agents that did not reply
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        quorum = len(agent_ids) if quorum is None else quorum
+        
+        # Send a copy of the request to each agent
+        tasks = {}
+        reply_futures = []
+        for agent_id in agent_ids:
+            agent_request = copy.deepcopy(request)
+            agent_request['destination'] = {
+                'type': 'agent',
+                'id': agent_id
+            }
+            reply_future = loop.create_future()
+            reply_futures.append(reply_future)
+            tasks[asyncio.ensure_future(self._request(agent_request, deadline, reply_future))] = agent_id
+        
+        # Collect replies as they arrive
+        replies = dict.fromkeys(agent_ids)
+        received = 0
+        pending = set(tasks)
+        try:
+            while pending and received < quorum:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    reply = task.result()
+                    if reply is not None:
+                        replies[tasks[task]] = reply
+                        received += 1
+        finally:
+            # Stop waiting for the remaining replies. Requests being sent are
+            # sent in full rather than interrupted.
+            for reply_future in reply_futures:
+                reply_future.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        
+        logger.info(f"Received {received} replies to request sent to {len(agent_ids)} agents")
+        
+        return replies
+    
+    async def _request(
+        self,
+        request: Dict[str, Any],
+        deadline: float,
+        reply_future: Optional[asyncio.Future] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Send a request and wait for a reply until a deadline.
+        
+        Args:
+            request: Request to send
+            deadline: Event loop time by which the reply must arrive
+            reply_future: Future for the reply; cancelling it stops waiting
+                for the reply without interrupting the request being sent
+            
+        Returns:
+            Reply or None if the request timed out or was abandoned
+        """
+        loop = asyncio.get_running_loop()
+        timeout = max(deadline - loop.time(), 0)
+        reply_future = reply_future or loop.create_future()
+        
         # Generate a correlation ID
         correlation_id = str(uuid.uuid4())
         
@@ -359,25 +474,26 @@ class CommunicationHub:
         # Add the reply_to field
         request['reply_to'] = request.get('source_agent_id')
         
-        # Create a future for the reply
-        reply_future = asyncio.Future()
-        
-        # Register a handler for the reply
-        async def reply_handler(reply: Dict[str, Any]) -> None:
-            if reply.get('correlation_id') == correlation_id:
-                reply_future.set_result(reply)
-        
-        # Register the handler
-        await self.register_message_handler('reply', reply_handler)
-        
-        # Send the request
-        await self.send_message(request)
-        
-        # Wait for the reply
         try:
-            reply = await asyncio.wait_for(reply_future, timeout)
-            logger.info(f"Received reply for request {correlation_id}")
-            return reply
+            async with self._request_slot(request.get('source_agent_id'), timeout):
+                if reply_future.cancelled():
+                    return None
+                
+                # Register the future before sending, so that a fast reply
+                # cannot be missed
+                self.pending_requests[correlation_id] = reply_future
+                
+                # Send the request
+                await self.send_message(request)
+                
+                # Wait for the reply
+                await asyncio.wait({reply_future}, timeout=max(deadline - loop.time(), 0))
+                if reply_future.cancelled():
+                    return None
+                if reply_future.done():
+                    logger.info(f"Received reply for request {correlation_id}")
+                    return reply_future.result()
+                raise asyncio.TimeoutError()
         except asyncio.TimeoutError:
             logger.warning(f"Request {correlation_id} timed out")
             
@@ -391,6 +507,60 @@ class CommunicationHub:
                 )
             
             return None
+        finally:
+            # Forget the request on reply, timeout or cancellation
+            self.pending_requests.pop(correlation_id, None)
+    
+    @asynccontextmanager
+    async def _request_slot(self, agent_id: Optional[str], timeout: float):
+        """
+        Hold one of an agent's outstanding request slots.
+        
+        Args:
+            agent_id: ID of the agent sending the request
+            timeout: Seconds to wait for a free slot
+            
+        Raises:
+            asyncio.TimeoutError: If no slot was freed within the timeout
+        """
+        semaphore = self._request_slots.get(agent_id)
+        if semaphore is None:
+            semaphore = self._request_slots[agent_id] = asyncio.Semaphore(self.max_outstanding_requests)
+        self._request_slot_users[agent_id] = self._request_slot_users.get(agent_id, 0) + 1
+        
+        try:
+            if semaphore.locked():
+                await asyncio.wait_for(semaphore.acquire(), timeout)
+            else:
+                await semaphore.acquire()
+            
+            try:
+                yield
+            finally:
+                semaphore.release()
+        finally:
+            # Drop the slots of agents without outstanding requests
+            self._request_slot_users[agent_id] -= 1
+            if not self._request_slot_users[agent_id]:
+                del self._request_slot_users[agent_id]
+                del self._request_slots[agent_id]
+    
+    def _resolve_reply(self, reply: Dict[str, Any]) -> bool:
+        """
+        Complete the request a reply belongs to.
+        
+        Args:
+            reply: Reply message
+            
+        Returns:
+            True if a request of this hub was waiting for the reply
+        """
+        reply_future = self.pending_requests.get(reply.get('correlation_id'))
+        if reply_future is None or reply_future.done():
+            return False
+        
+        reply_future.set_result(reply)
+        return True
     
     async def broadcast(self, message: Dict[str, Any], agent_ids: List[str]) -> List[str]:
         """
@@ -403,22 +573,62 @@ class CommunicationHub:
         Returns:
             List of message IDs
         """
-        message_ids = []
+        # Send the message to all agents at once
+        message_ids = await self._fan_out(message, agent_ids)
         
-        # Send the message to each agent
-        for agent_id in agent_ids:
-            # Create a copy of the message for each agent
-            agent_message = copy.deepcopy(message)
-            agent_message['destination'] = {
-                'type': 'agent',
-                'id': agent_id
-            }
+        logger.info(f"Broadcast message to {len(agent_ids)} agents")
+        
+        return message_ids
+    
+    async def _fan_out(self, message: Dict[str, Any], agent_ids: List[str]) -> List[str]:
+        """
+        Send a message to many agents.
+        
+        The message is stored once and each agent's queue gets an entry with
+        its own message ID that refers to it, all written in one Redis
+        transaction. Creation and routing of the messages are tracked as one
+        metrics event.
+        
+        Args:
+            message: Message to send (not modified)
+            agent_ids: IDs of the agents to send the message to
             
-            # Send the message
-            message_id = await self.send_message(agent_message)
-            message_ids.append(message_id)
+        Returns:
+            ID of the message sent to each agent
+        """
+        # Ensure the message has required fields
+        if 'source_agent_id' not in message:
+            raise ValueError("Message must have a source_agent_id")
         
-        logger.info(f"Broadcast message to {len(agent_ids)} agents")
+        if 'type' not in message:
+            raise ValueError("Message must have a type")
+        
+        if not agent_ids:
+            return []
+        
+        message = dict(message)
+        message.setdefault('payload', {})
+        message.setdefault('headers', {})
+        message.setdefault('timestamp', datetime.utcnow().isoformat())
+        message_ids = [str(uuid.uuid4()) for _ in agent_ids]
+        
+        # Dispatch the message to all agents' queues
+        start_time = time.time()
+        await self.priority_dispatcher.dispatch_bulk(message, list(zip(message_ids, agent_ids)))
+        routing_time_ms = int((time.time() - start_time) * 1000)
+        
+        # Track message creation and routing
+        if self.metrics_collector:
+            await self.metrics_collector.track_messages_sent(
+                message_ids=[uuid.UUID(message_id) for message_id in message_ids],
+                source_agent_id=uuid.UUID(message['source_agent_id']) if message['source_agent_id'] else None,
+                destination_agent_ids=[uuid.UUID(agent_id) if agent_id else None for agent_id in agent_ids],
+                topic=message['headers'].get('topic'),
+                priority=message.get('priority', 0),
+                correlation_id=uuid.UUID(message['correlation_id']) if 'correlation_id' in message else None,
+                metadata=message['headers'],
+                queue_time_ms=routing_time_ms
+            )
         
         return message_ids
     
@@ -478,6 +688,10 @@ class CommunicationHub:
         # Get the message type
         message_type = message.get('type')
         
+        # Complete the request a queued reply belongs to
+        if message_type == 'reply':
+            self._resolve_reply(message)
+        
         # If there are handlers for this message type, call them
         if message_type in self.message_handlers:
             for handler in self.message_handlers[message_type]:
@@ -0,0 +1,140 @@
+"""
+Latency histogram for the Agent Communication Hub metrics.
+
+This module provides the LatencyHistogram class, a log-linear histogram in the
+style of HDR histograms. Values below 64 ms have a bin each, and every power of
+two above is split into 32 bins, so a percentile read from the histogram is
+within about 3% of the exact value. Histograms are merged by adding bin counts,
+which lets the metrics collector store them per time bucket and combine any
+number of buckets into percentiles for a time window.
+"""
+
+from typing import Dict, Iterable, Optional, Tuple
+
+# Values below this have a bin each
+EXACT_LIMIT = 64
+
+# Bins per power of two above EXACT_LIMIT
+SUB_BINS = 32
+
+_EXACT_BITS = EXACT_LIMIT.bit_length() - 1
+_SUB_BITS = SUB_BINS.bit_length() - 1
+
+
+class LatencyHistogram:
+    """
+    Mergeable histogram of latencies in milliseconds.
+    """
+    
+    def __init__(self, counts: Optional[Dict[int, int]] = None):
+        """
+        Initialize the histogram.
+        
+        Args:
+            counts: Initial counts by bin
+        """
+        self.counts: Dict[int, int] = dict(counts or {})
+    
+    @staticmethod
+    def bin_of(value: float) -> int:
+        """
+        Get the bin of a value.
+        
+        Args:
+            value: Latency in milliseconds
+        
+        Returns:
+            Bin index
+        """
+        value = max(int(value), 0)
+        if value < EXACT_LIMIT:
+            return value
+        
+        exponent = value.bit_length() - 1
+        sub_bin = (value >> (exponent - _SUB_BITS)) - SUB_BINS
+        return EXACT_LIMIT + (exponent - _EXACT_BITS) * SUB_BINS + sub_bin
+    
+    @staticmethod
+    def bin_range(bin: int) -> Tuple[int, int]:
+        """
+        Get the values covered by a bin.
+        
+        Args:
+            bin: Bin index
+        
+        Returns:
+            Lowest value and the value after the highest
+        """
+        if bin < EXACT_LIMIT:
+            return bin, bin + 1
+        
+        exponent, sub_bin = divmod(bin - EXACT_LIMIT, SUB_BINS)
+        exponent += _EXACT_BITS
+        width = 1 << (exponent - _SUB_BITS)
+        low = (SUB_BINS + sub_bin) * width
+        return low, low + width
+    
+    @property
+    def total(self) -> int:
+        """
+        Number of recorded values.
+        """
+        return sum(self.counts.values())
+    
+    def record(self, value: float, count: int = 1) -> None:
+        """
+        Record a value.
+        
+        Args:
+            value: Latency in milliseconds
+            count: Number of times the value occurred
+        """
+        bin = self.bin_of(value)
+        self.counts[bin] = self.counts.get(bin, 0) + count
+    
+    def merge(self, other: "LatencyHistogram") -> None:
+        """
+        Add the counts of another histogram.
+        
+        Args:
+            other: Histogram to add
+        """
+        for bin, count in other.counts.items():
+            self.counts[bin] = self.counts.get(bin, 0) + count
+    
+    def percentile(self, percentile: float) -> Optional[float]:
+        """
+        Estimate a percentile.
+        
+        Args:
+            percentile: Percentile between 0 and 100
+        
+        Returns:
+            Estimated latency in milliseconds, or None if the histogram is empty
+        """
+        total = self.total
+        if total <= 0:
+            return None
+        
+        rank = max(percentile / 100 * total, 1)
+        seen = 0
+        for bin in sorted(self.counts):
+            seen += self.counts[bin]
+            if seen >= rank:
+                low, high = self.bin_range(bin)
+                return float(low) if high - low == 1 else (low + high - 1) / 2
+        
+        low, high = self.bin_range(max(self.counts))
+        return float(high - 1)
+    
+    def percentiles(self, percentiles: Iterable[float] = (50, 95, 99)) -> Dict[str, Optional[float]]:
+        """
+        Estimate several percentiles.
+        
+        Args:
+            percentiles: Percentiles between 0 and 100
+        
+        Returns:
+            Estimated latencies in milliseconds keyed as ``p50``, ``p95``, ...
+        """
+        return {f"p{percentile:g}": self.percentile(percentile) for percentile in percentiles}
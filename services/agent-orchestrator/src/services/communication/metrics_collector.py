@@ -3,43 +3,235 @@ Metrics collector for the Agent Communication Hub.
 
 This module provides the MetricsCollector class, which is responsible for collecting
 metrics from the CommunicationHub and storing them in the database.
+
+Tracking a message event only appends it to a bounded in-memory buffer, so the
+hub never waits for the database while it handles a message. A background task
+flushes the buffer in batches: new message metrics are written with one
+multi-row INSERT, status changes with one UPDATE per set of changed columns,
+and agent and topic counters are summed per day and written as UPSERTs.
+
+The flush also maintains per-minute and per-hour rollups of message counts by
+status, topic and source agent, and latency histograms, from which performance
+metrics are read without scanning the message table.
 """
 
-import time
+import asyncio
 import uuid
 import logging
-from datetime import datetime
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, List, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import func
+from sqlalchemy import func, insert, update, bindparam, case, and_, or_
+from sqlalchemy.dialects import postgresql, sqlite
 
 from ...models.metrics import (
     MessageMetricsModel,
     AgentMetricsModel,
     TopicMetricsModel,
+    MessageMetricsRollupModel,
+    MessageLatencyHistogramModel,
     MessageStatus
 )
+from .latency_histogram import LatencyHistogram
 
 logger = logging.getLogger(__name__)
 
+# Overload policies
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+SAMPLE = "sample"
+OVERLOAD_POLICIES = (DROP_OLDEST, DROP_NEWEST, SAMPLE)
+
+# Event types
+_CREATED = "created"
+_ROUTED = "routed"
+_DELIVERED = "delivered"
+_PROCESSED = "processed"
+_FAILED = "failed"
+_SUBSCRIBERS = "subscribers"
+_SENT = "sent"
+
+# Status a message has after each event
+_EVENT_STATUSES = {
+    _ROUTED: MessageStatus.ROUTED,
+    _DELIVERED: MessageStatus.DELIVERED,
+    _PROCESSED: MessageStatus.PROCESSED,
+    _FAILED: MessageStatus.FAILED,
+}
+
+# Status a message normally has before each status, for messages that are not cached
+_PREVIOUS_STATUSES = {
+    MessageStatus.ROUTED: MessageStatus.CREATED,
+    MessageStatus.DELIVERED: MessageStatus.ROUTED,
+    MessageStatus.PROCESSED: MessageStatus.DELIVERED,
+}
+
+# Rollup bucket sizes
+BUCKET_MINUTE = "minute"
+BUCKET_HOUR = "hour"
+
+# Rollup dimensions
+DIMENSION_ALL = "all"
+DIMENSION_STATUS = "status"
+DIMENSION_TOPIC = "topic"
+DIMENSION_SOURCE_AGENT = "source_agent"
+
+# Rollup counters
+_ROLLUP_COUNTERS = (
+    "message_count",
+    "processing_time_total_ms", "processing_time_count",
+    "queue_time_total_ms", "queue_time_count",
+    "total_time_total_ms", "total_time_count",
+)
+
+# Latency metrics with a histogram
+LATENCY_METRICS = ("processing", "queue", "total")
+
+# INSERT constructs that support ON CONFLICT, by dialect
+_UPSERT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+# Columns of a new message metrics row
+_MESSAGE_COLUMNS = (
+    "id", "message_id", "correlation_id", "source_agent_id", "destination_agent_id",
+    "topic", "priority", "created_at", "routed_at", "delivered_at", "processed_at",
+    "processing_time_ms", "queue_time_ms", "total_time_ms", "status", "routing_path",
+    "metadata",
+)
+
 
 class MetricsCollector:
     """
     Collects and stores metrics for the Agent Communication Hub.
+    
+    Events are buffered and written by a background task that is started on
+    the first tracked event. When events arrive faster than they are flushed
+    and the buffer fills up, the overload policy decides which are lost:
+    - ``drop_oldest``: Evict the oldest buffered event
+    - ``drop_newest``: Discard the incoming event
+    - ``sample``: Once the buffer is half full, keep only a fraction of new
+      messages (all events of a message are kept or dropped together), and
+      evict the oldest event when it is full
     """
     
-    def __init__(self, session_factory):
+    def __init__(
+        self,
+        session_factory,
+        buffer_size: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        overload_policy: str = DROP_OLDEST,
+        sample_rate: float = 0.1,
+        cache_size: int = 10000,
+        rollups: bool = True
+    ):
         """
         Initialize the MetricsCollector.
         
         Args:
             session_factory: Factory function that returns a SQLAlchemy AsyncSession
+            buffer_size: Maximum number of buffered events
+            batch_size: Maximum number of events written per transaction
+            flush_interval: Seconds between flushes of the buffer
+            overload_policy: Policy applied when the buffer is full
+                (``drop_oldest``, ``drop_newest`` or ``sample``)
+            sample_rate: Fraction of messages kept under the ``sample`` policy
+            cache_size: Maximum number of messages whose creation time,
+                status and destination are remembered to compute timings
+            rollups: Whether to maintain the rollup tables and read
+                performance metrics from them
+        
+        Raises:
+            ValueError: If the overload policy is unknown
         """
+        if overload_policy not in OVERLOAD_POLICIES:
+            raise ValueError(f"Unknown overload policy: {overload_policy}")
+        
         self.session_factory = session_factory
-        self.message_metrics_cache = {}  # Cache for message metrics
+        self.buffer_size = buffer_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overload_policy = overload_policy
+        self.sample_rate = sample_rate
+        self.cache_size = cache_size
+        self.rollups = rollups
+        
+        self.message_metrics_cache: OrderedDict = OrderedDict()  # Bounded cache of recent messages
         self.agent_metrics_cache = {}  # Cache for agent metrics
         self.topic_metrics_cache = {}  # Cache for topic metrics
+        
+        self._buffer: deque = deque()
+        self._flush_lock = asyncio.Lock()
+        self._flush_requested = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {
+            "buffered": 0,
+            "dropped": 0,
+            "sampled_out": 0,
+            "flushed": 0,
+            "flush_errors": 0,
+        }
+    
+    def start(self) -> None:
+        """
+        Start the background flush task.
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._flush_loop())
+    
+    async def stop(self) -> None:
+        """
+        Stop the background flush task and write the buffered events.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        
+        await self.flush()
+    
+    async def flush(self) -> int:
+        """
+        Write all buffered events to the database.
+        
+        Returns:
+            Number of events taken from the buffer
+        """
+        count = 0
+        async with self._flush_lock:
+            while self._buffer:
+                batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+                count += len(batch)
+                try:
+                    await self._write_batch(batch)
+                    self.stats["flushed"] += len(batch)
+                except Exception as e:
+                    self.stats["flush_errors"] += 1
+                    self.stats["dropped"] += len(batch)
+                    logger.error(f"Failed to write {len(batch)} metrics events: {str(e)}")
+        
+        return count
+    
+    def get_buffer_stats(self) -> Dict[str, Any]:
+        """
+        Get statistics of the event buffer.
+        
+        Returns:
+            Buffer size, policy and event counters
+        """
+        return {
+            "size": len(self._buffer),
+            "capacity": self.buffer_size,
+            "overload_policy": self.overload_policy,
+            **self.stats,
+        }
     
     async def track_message_created(
         self,
@@ -62,44 +254,82 @@ class MetricsCollector:
             priority: Priority of the message
             correlation_id: ID for correlating related messages
             metadata: Additional metadata
-            
+        
         Returns:
-            UUID of the created message metrics record
+            UUID of the message metrics record
         """
         now = datetime.utcnow()
+        metrics_id = uuid.uuid4()
         
-        # Create message metrics record
-        async with self.session_factory() as session:
-            message_metrics = MessageMetricsModel(
-                message_id=message_id,
-                correlation_id=correlation_id,
-                source_agent_id=source_agent_id,
-                destination_agent_id=destination_agent_id,
-                topic=topic,
-                priority=priority,
+        self._remember(
+            message_id,
+            id=metrics_id,
+            created_at=now,
+            status=MessageStatus.CREATED,
+            destination_agent_id=destination_agent_id
+        )
+        self._record(_CREATED, message_id, now, {
+            "id": metrics_id,
+            "correlation_id": correlation_id,
+            "source_agent_id": source_agent_id,
+            "destination_agent_id": destination_agent_id,
+            "topic": topic,
+            "priority": priority,
+            "metadata": metadata or {},
+        })
+        
+        return metrics_id
+    
+    async def track_messages_sent(
+        self,
+        message_ids: List[uuid.UUID],
+        source_agent_id: Optional[uuid.UUID],
+        destination_agent_ids: List[Optional[uuid.UUID]],
+        topic: Optional[str] = None,
+        priority: Optional[int] = None,
+        correlation_id: Optional[uuid.UUID] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        queue_time_ms: Optional[int] = None
+    ) -> None:
+        """
+        Track the creation and routing of a message sent to many agents.
+        
+        The messages are buffered as one event, which is expanded into the
+        creation and routing events of each message when it is written.
+        
+        Args:
+            message_ids: ID of the message sent to each agent
+            source_agent_id: ID of the source agent
+            destination_agent_ids: ID of each destination agent
+            topic: Topic of the messages (for topic-based messages)
+            priority: Priority of the messages
+            correlation_id: ID for correlating related messages
+            metadata: Additional metadata
+            queue_time_ms: Time taken to route the messages in milliseconds
+        """
+        now = datetime.utcnow()
+        messages = []
+        
+        for message_id, destination_agent_id in zip(message_ids, destination_agent_ids):
+            metrics_id = uuid.uuid4()
+            self._remember(
+                message_id,
+                id=metrics_id,
                 created_at=now,
-                status=MessageStatus.CREATED,
-                metadata=metadata or {}
+                status=MessageStatus.ROUTED,
+                destination_agent_id=destination_agent_id
             )
-            session.add(message_metrics)
-            await session.commit()
-            await session.refresh(message_metrics)
-            
-            # Cache the message metrics for later updates
-            self.message_metrics_cache[str(message_id)] = {
-                "id": message_metrics.id,
-                "created_at": now
-            }
-            
-            # Update agent metrics
-            if source_agent_id:
-                await self._update_agent_metrics(session, source_agent_id, sent=1, received=0)
-            
-            # Update topic metrics
-            if topic:
-                await self._update_topic_metrics(session, topic, 1)
-            
-            return message_metrics.id
+            messages.append((message_id, metrics_id, destination_agent_id))
+        
+        self._record(_SENT, None, now, {
+            "messages": messages,
+            "correlation_id": correlation_id,
+            "source_agent_id": source_agent_id,
+            "topic": topic,
+            "priority": priority,
+            "metadata": metadata or {},
+            "queue_time_ms": queue_time_ms,
+        })
     
     async def track_message_routed(
         self,
@@ -114,53 +344,12 @@ class MetricsCollector:
             routing_path: Information about the routing decisions
         """
         now = datetime.utcnow()
-        message_id_str = str(message_id)
         
-        # Update message metrics record
-        async with self.session_factory() as session:
-            # Get the message metrics from cache or database
-            metrics_id = None
-            created_at = None
-            if message_id_str in self.message_metrics_cache:
-                cache_entry = self.message_metrics_cache[message_id_str]
-                metrics_id = cache_entry["id"]
-                created_at = cache_entry["created_at"]
-            
-            if not metrics_id:
-                # Look up in the database
-                stmt = select(MessageMetricsModel).where(MessageMetricsModel.message_id == message_id)
-                result = await session.execute(stmt)
-                message_metrics = result.scalars().first()
-                
-                if not message_metrics:
-                    logger.warning(f"Message metrics not found for message_id {message_id}")
-                    return
-                
-                metrics_id = message_metrics.id
-                created_at = message_metrics.created_at
-                
-                # Cache for future updates
-                self.message_metrics_cache[message_id_str] = {
-                    "id": metrics_id,
-                    "created_at": created_at
-                }
-            
-            # Calculate queue time
-            queue_time_ms = None
-            if created_at:
-                queue_time_ms = int((now - created_at).total_seconds() * 1000)
-            
-            # Update the message metrics
-            stmt = select(MessageMetricsModel).where(MessageMetricsModel.id == metrics_id)
-            result = await session.execute(stmt)
-            message_metrics = result.scalars().first()
-            
-            if message_metrics:
-                message_metrics.status = MessageStatus.ROUTED
-                message_metrics.routed_at = now
-                message_metrics.queue_time_ms = queue_time_ms
-                message_metrics.routing_path = routing_path
-                await session.commit()
+        self._record(_ROUTED, message_id, now, {
+            "queue_time_ms": self._elapsed_ms(message_id, now),
+            "routing_path": routing_path,
+            **self._transition(message_id, MessageStatus.ROUTED),
+        })
     
     async def track_message_delivered(
         self,
@@ -175,52 +364,13 @@ class MetricsCollector:
             destination_agent_id: ID of the destination agent
         """
         now = datetime.utcnow()
-        message_id_str = str(message_id)
         
-        # Update message metrics record
-        async with self.session_factory() as session:
-            # Get the message metrics from cache or database
-            metrics_id = None
-            if message_id_str in self.message_metrics_cache:
-                cache_entry = self.message_metrics_cache[message_id_str]
-                metrics_id = cache_entry["id"]
-            
-            if not metrics_id:
-                # Look up in the database
-                stmt = select(MessageMetricsModel).where(MessageMetricsModel.message_id == message_id)
-                result = await session.execute(stmt)
-                message_metrics = result.scalars().first()
-                
-                if not message_metrics:
-                    logger.warning(f"Message metrics not found for message_id {message_id}")
-                    return
-                
-                metrics_id = message_metrics.id
-                
-                # Cache for future updates
-                self.message_metrics_cache[message_id_str] = {
-                    "id": metrics_id,
-                    "created_at": message_metrics.created_at
-                }
-            
-            # Update the message metrics
-            stmt = select(MessageMetricsModel).where(MessageMetricsModel.id == metrics_id)
-            result = await session.execute(stmt)
-            message_metrics = result.scalars().first()
-            
-            if message_metrics:
-                message_metrics.status = MessageStatus.DELIVERED
-                message_metrics.delivered_at = now
-                
-                # Update destination agent if provided
-                if destination_agent_id and not message_metrics.destination_agent_id:
-                    message_metrics.destination_agent_id = destination_agent_id
-                
-                await session.commit()
-            
-            # Update agent metrics
-            if destination_agent_id:
-                await self._update_agent_metrics(session, destination_agent_id, sent=0, received=1)
+        if destination_agent_id:
+            self._remember(message_id, destination_agent_id=destination_agent_id)
+        self._record(_DELIVERED, message_id, now, {
+            "destination_agent_id": destination_agent_id,
+            **self._transition(message_id, MessageStatus.DELIVERED),
+        })
     
     async def track_message_processed(
         self,
@@ -235,57 +385,14 @@ class MetricsCollector:
             processing_time_ms: Time taken to process the message in milliseconds
         """
         now = datetime.utcnow()
-        message_id_str = str(message_id)
+        cache_entry = self.message_metrics_cache.get(str(message_id), {})
         
-        # Update message metrics record
-        async with self.session_factory() as session:
-            # Get the message metrics from cache or database
-            metrics_id = None
-            if message_id_str in self.message_metrics_cache:
-                cache_entry = self.message_metrics_cache[message_id_str]
-                metrics_id = cache_entry["id"]
-            
-            if not metrics_id:
-                # Look up in the database
-                stmt = select(MessageMetricsModel).where(MessageMetricsModel.message_id == message_id)
-                result = await session.execute(stmt)
-                message_metrics = result.scalars().first()
-                
-                if not message_metrics:
-                    logger.warning(f"Message metrics not found for message_id {message_id}")
-                    return
-                
-                metrics_id = message_metrics.id
-                
-                # Cache for future updates
-                self.message_metrics_cache[message_id_str] = {
-                    "id": metrics_id,
-                    "created_at": message_metrics.created_at
-                }
-            
-            # Update the message metrics
-            stmt = select(MessageMetricsModel).where(MessageMetricsModel.id == metrics_id)
-            result = await session.execute(stmt)
-            message_metrics = result.scalars().first()
-            
-            if message_metrics:
-                message_metrics.status = MessageStatus.PROCESSED
-                message_metrics.processed_at = now
-                message_metrics.processing_time_ms = processing_time_ms
-                
-                # Calculate total time
-                if message_metrics.created_at:
-                    message_metrics.total_time_ms = int((now - message_metrics.created_at).total_seconds() * 1000)
-                
-                await session.commit()
-                
-                # Update agent metrics with processing time
-                if message_metrics.destination_agent_id and processing_time_ms:
-                    await self._update_agent_processing_time(
-                        session, 
-                        message_metrics.destination_agent_id, 
-                        processing_time_ms
-                    )
+        self._record(_PROCESSED, message_id, now, {
+            "processing_time_ms": processing_time_ms,
+            "total_time_ms": self._elapsed_ms(message_id, now),
+            "destination_agent_id": cache_entry.get("destination_agent_id"),
+            **self._transition(message_id, MessageStatus.PROCESSED),
+        })
     
     async def track_message_failed(
         self,
@@ -299,214 +406,531 @@ class MetricsCollector:
             message_id: ID of the message
             error_message: Error message
         """
-        now = datetime.utcnow()
-        message_id_str = str(message_id)
+        self._record(_FAILED, message_id, datetime.utcnow(), {
+            "error_message": error_message,
+            **self._transition(message_id, MessageStatus.FAILED),
+        })
+    
+    async def update_topic_subscriber_count(
+        self,
+        topic: str,
+        subscriber_count: int
+    ) -> None:
+        """
+        Update the subscriber count for a topic.
         
-        # Update message metrics record
-        async with self.session_factory() as session:
-            # Get the message metrics from cache or database
-            metrics_id = None
-            if message_id_str in self.message_metrics_cache:
-                cache_entry = self.message_metrics_cache[message_id_str]
-                metrics_id = cache_entry["id"]
+        Args:
+            topic: Topic name
+            subscriber_count: Number of subscribers
+        """
+        self.topic_metrics_cache[topic] = subscriber_count
+        self._record(_SUBSCRIBERS, None, datetime.utcnow(), {"topic": topic, "subscriber_count": subscriber_count})
+    
+    def _remember(self, message_id: uuid.UUID, **fields) -> None:
+        """
+        Remember details of a message in the bounded message cache.
+        
+        Args:
+            message_id: ID of the message
+            **fields: Details to store
+        """
+        key = str(message_id)
+        entry = self.message_metrics_cache.pop(key, {})
+        entry.update(fields)
+        self.message_metrics_cache[key] = entry
+        
+        while len(self.message_metrics_cache) > self.cache_size:
+            self.message_metrics_cache.popitem(last=False)
+    
+    def _transition(self, message_id: uuid.UUID, status: MessageStatus) -> Dict[str, Any]:
+        """
+        Record a status change of a message in the message cache.
+        
+        Args:
+            message_id: ID of the message
+            status: New status
+        
+        Returns:
+            Creation time (None if not cached) and previous status of the
+            message, which place the change in the rollups
+        """
+        cache_entry = self.message_metrics_cache.get(str(message_id), {})
+        previous_status = cache_entry.get("status", _PREVIOUS_STATUSES.get(status))
+        self._remember(message_id, status=status)
+        
+        return {"created_at": cache_entry.get("created_at"), "previous_status": previous_status}
+    
+    def _elapsed_ms(self, message_id: uuid.UUID, now: datetime) -> Optional[int]:
+        """
+        Get the time since a message was created.
+        
+        Args:
+            message_id: ID of the message
+            now: Current time
+        
+        Returns:
+            Milliseconds since creation, or None if the message is not cached
+        """
+        cache_entry = self.message_metrics_cache.get(str(message_id))
+        if not cache_entry or "created_at" not in cache_entry:
+            return None
+        return int((now - cache_entry["created_at"]).total_seconds() * 1000)
+    
+    def _sampled(self, message_id: uuid.UUID) -> bool:
+        """
+        Check whether a message is kept under the sample policy.
+        
+        Args:
+            message_id: ID of the message
+        
+        Returns:
+            True if the message's events are kept
+        """
+        if not isinstance(message_id, uuid.UUID):
+            message_id = uuid.UUID(str(message_id))
+        return (message_id.int % 10000) < self.sample_rate * 10000
+    
+    def _record(self, event: str, message_id: Optional[uuid.UUID], timestamp: datetime, data: Dict[str, Any]) -> None:
+        """
+        Append an event to the buffer, applying the overload policy.
+        
+        Args:
+            event: Event type
+            message_id: ID of the message (None for topic events)
+            timestamp: Time of the event
+            data: Event data
+        """
+        if len(self._buffer) >= self.buffer_size:
+            if self.overload_policy == DROP_NEWEST:
+                self.stats["dropped"] += 1
+                return
+            self._buffer.popleft()
+            self.stats["dropped"] += 1
+        
+        if (
+            self.overload_policy == SAMPLE
+            and message_id is not None
+            and len(self._buffer) >= self.buffer_size // 2
+            and not self._sampled(message_id)
+        ):
+            self.stats["sampled_out"] += 1
+            return
+        
+        self._buffer.append((event, message_id, timestamp, data))
+        self.stats["buffered"] += 1
+        
+        if len(self._buffer) >= self.batch_size:
+            self._flush_requested.set()
+        if self._task is None:
+            try:
+                self.start()
+            except RuntimeError:
+                # No running event loop; events are written by flush()
+                pass
+    
+    async def _flush_loop(self) -> None:
+        """
+        Flush the buffer periodically, or as soon as a batch is full.
+        """
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_requested.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_requested.clear()
+            await self.flush()
+    
+    async def _write_batch(self, batch: List[Tuple[str, Optional[uuid.UUID], datetime, Dict[str, Any]]]) -> None:
+        """
+        Write a batch of events in one transaction.
+        
+        Args:
+            batch: Events to write
+        """
+        new_rows: Dict[str, Dict[str, Any]] = {}
+        changes: Dict[str, Dict[str, Any]] = {}
+        errors: Dict[str, str] = {}
+        agent_counts: Dict[Tuple[Any, Any], Dict[str, Any]] = {}
+        topic_counts: Dict[Tuple[str, Any], Dict[str, Any]] = {}
+        subscriber_counts: Dict[Tuple[str, Any], Dict[str, Any]] = {}
+        batch = _expand_sent_events(batch)
+        
+        for event, message_id, timestamp, data in batch:
+            day = timestamp.date()
+            key = str(message_id)
             
-            if not metrics_id:
-                # Look up in the database
-                stmt = select(MessageMetricsModel).where(MessageMetricsModel.message_id == message_id)
-                result = await session.execute(stmt)
-                message_metrics = result.scalars().first()
-                
-                if not message_metrics:
-                    logger.warning(f"Message metrics not found for message_id {message_id}")
-                    return
-                
-                metrics_id = message_metrics.id
-                
-                # Cache for future updates
-                self.message_metrics_cache[message_id_str] = {
-                    "id": metrics_id,
-                    "created_at": message_metrics.created_at
+            if event == _SUBSCRIBERS:
+                subscriber_counts[(data["topic"], day)] = {
+                    "topic": data["topic"],
+                    "metrics_date": day,
+                    "timestamp": timestamp,
+                    "subscriber_count": data["subscriber_count"],
                 }
+                continue
             
-            # Update the message metrics
-            stmt = select(MessageMetricsModel).where(MessageMetricsModel.id == metrics_id)
-            result = await session.execute(stmt)
-            message_metrics = result.scalars().first()
+            if event == _CREATED:
+                row = dict.fromkeys(_MESSAGE_COLUMNS)
+                row.update(
+                    id=data["id"],
+                    message_id=message_id,
+                    correlation_id=data["correlation_id"],
+                    source_agent_id=data["source_agent_id"],
+                    destination_agent_id=data["destination_agent_id"],
+                    topic=data["topic"],
+                    priority=data["priority"],
+                    created_at=timestamp,
+                    status=MessageStatus.CREATED,
+                    metadata=data["metadata"],
+                )
+                new_rows[key] = row
+                if data["source_agent_id"]:
+                    self._count(agent_counts, data["source_agent_id"], timestamp, sent=1)
+                if data["topic"]:
+                    counts = topic_counts.setdefault((data["topic"], day), {
+                        "topic": data["topic"],
+                        "metrics_date": day,
+                        "timestamp": timestamp,
+                        "message_count": 0,
+                    })
+                    counts["message_count"] += 1
+                    counts["timestamp"] = timestamp
+                continue
             
-            if message_metrics:
-                message_metrics.status = MessageStatus.FAILED
-                
-                # Add error message to metadata
-                if error_message:
-                    metadata = message_metrics.metadata or {}
-                    metadata["error_message"] = error_message
-                    message_metrics.metadata = metadata
+            if event == _ROUTED:
+                values = {
+                    "status": MessageStatus.ROUTED,
+                    "routed_at": timestamp,
+                    "queue_time_ms": data["queue_time_ms"],
+                    "routing_path": data["routing_path"],
+                }
+            elif event == _DELIVERED:
+                values = {"status": MessageStatus.DELIVERED, "delivered_at": timestamp}
+                if data["destination_agent_id"]:
+                    values["destination_agent_id"] = data["destination_agent_id"]
+                    self._count(agent_counts, data["destination_agent_id"], timestamp, received=1)
+            elif event == _PROCESSED:
+                values = {
+                    "status": MessageStatus.PROCESSED,
+                    "processed_at": timestamp,
+                    "processing_time_ms": data["processing_time_ms"],
+                    "total_time_ms": data["total_time_ms"],
+                }
+                if data["destination_agent_id"] and data["processing_time_ms"] is not None:
+                    self._count(
+                        agent_counts,
+                        data["destination_agent_id"],
+                        timestamp,
+                        processing_time_ms=data["processing_time_ms"]
+                    )
+            else:
+                values = {"status": MessageStatus.FAILED}
+                if data["error_message"]:
+                    if key in new_rows:
+                        new_rows[key]["metadata"] = {
+                            **(new_rows[key]["metadata"] or {}),
+                            "error_message": data["error_message"],
+                        }
+                    else:
+                        errors[key] = data["error_message"]
+            
+            if key in new_rows:
+                new_rows[key].update(values)
+            else:
+                changes.setdefault(key, {}).update(values)
+        
+        rollups, histograms = self._roll_up(batch) if self.rollups else ({}, {})
+        
+        async with self.session_factory() as session:
+            upsert = _UPSERT_INSERTS.get(session.get_bind().dialect.name, postgresql.insert)
+            
+            if new_rows:
+                await session.execute(insert(MessageMetricsModel.__table__), list(new_rows.values()))
+            
+            if errors:
+                await self._merge_error_messages(session, errors, changes)
+            await self._update_messages(session, changes)
+            
+            if agent_counts:
+                await self._upsert_agent_counts(session, upsert, list(agent_counts.values()))
+            if topic_counts:
+                await self._upsert_topic_counts(
+                    session,
+                    upsert,
+                    list(topic_counts.values()),
+                    counters=("message_count",)
+                )
+            if subscriber_counts:
+                await self._upsert_topic_counts(session, upsert, list(subscriber_counts.values()))
+            
+            if rollups:
+                await self._upsert_counters(
+                    session,
+                    upsert,
+                    MessageMetricsRollupModel.__table__,
+                    list(rollups.values()),
+                    ("bucket_size", "bucket_start", "dimension", "dimension_value")
+                )
+            if histograms:
+                await self._upsert_counters(
+                    session,
+                    upsert,
+                    MessageLatencyHistogramModel.__table__,
+                    [
+                        {"bucket_size": size, "bucket_start": start, "metric": metric, "bin": bin, "count": count}
+                        for (size, start, metric, bin), count in histograms.items()
+                    ],
+                    ("bucket_size", "bucket_start", "metric", "bin")
+                )
+            
+            await session.commit()
+    
+    def _roll_up(self, batch: List[Tuple[str, Optional[uuid.UUID], datetime, Dict[str, Any]]]) -> Tuple[Dict, Dict]:
+        """
+        Sum a batch of events into rollup counters and latency histogram bins.
+        
+        Events are placed in the minute and hour of the message's creation,
+        so the rollups of a time window describe the messages created in it.
+        A status change moves the message from its previous status to the
+        new one.
+        
+        Args:
+            batch: Events to sum
+        
+        Returns:
+            Rollup rows by bucket and dimension, and histogram counts by
+            bucket, metric and bin
+        """
+        rollups: Dict[Tuple[str, datetime, str, str], Dict[str, Any]] = {}
+        histograms: Dict[Tuple[str, datetime, str, int], int] = {}
+        
+        for event, message_id, timestamp, data in batch:
+            if event == _SUBSCRIBERS:
+                continue
+            
+            counters = []
+            latencies = {}
+            if event == _CREATED:
+                counters.append((DIMENSION_ALL, "", "message_count", 1))
+                counters.append((DIMENSION_STATUS, MessageStatus.CREATED.value, "message_count", 1))
+                if data["topic"]:
+                    counters.append((DIMENSION_TOPIC, data["topic"], "message_count", 1))
+                if data["source_agent_id"]:
+                    counters.append((DIMENSION_SOURCE_AGENT, str(data["source_agent_id"]), "message_count", 1))
+            else:
+                status = _EVENT_STATUSES[event]
+                counters.append((DIMENSION_STATUS, status.value, "message_count", 1))
+                if data["previous_status"]:
+                    counters.append((DIMENSION_STATUS, data["previous_status"].value, "message_count", -1))
+                if event == _ROUTED:
+                    latencies["queue"] = data["queue_time_ms"]
+                elif event == _PROCESSED:
+                    latencies["processing"] = data["processing_time_ms"]
+                    latencies["total"] = data["total_time_ms"]
+            
+            for metric, value in latencies.items():
+                if value is not None:
+                    counters.append((DIMENSION_ALL, "", f"{metric}_time_total_ms", value))
+                    counters.append((DIMENSION_ALL, "", f"{metric}_time_count", 1))
+            
+            bucket_time = data.get("created_at") or timestamp
+            for size in (BUCKET_MINUTE, BUCKET_HOUR):
+                start = _truncate(bucket_time, size)
+                for dimension, value, column, amount in counters:
+                    row = rollups.get((size, start, dimension, value))
+                    if row is None:
+                        row = dict.fromkeys(_ROLLUP_COUNTERS, 0)
+                        row.update(bucket_size=size, bucket_start=start, dimension=dimension, dimension_value=value)
+                        rollups[(size, start, dimension, value)] = row
+                    row[column] += amount
                 
-                await session.commit()
+                for metric, value in latencies.items():
+                    if value is not None:
+                        bin_key = (size, start, metric, LatencyHistogram.bin_of(value))
+                        histograms[bin_key] = histograms.get(bin_key, 0) + 1
+        
+        return rollups, histograms
     
-    async def _update_agent_metrics(
+    def _count(
         self,
-        session: AsyncSession,
+        agent_counts: Dict[Tuple[Any, Any], Dict[str, Any]],
         agent_id: uuid.UUID,
+        timestamp: datetime,
         sent: int = 0,
-        received: int = 0
+        received: int = 0,
+        processing_time_ms: Optional[int] = None
     ) -> None:
         """
-        Update agent metrics.
+        Add message counts to an agent's daily counters.
         
         Args:
-            session: SQLAlchemy session
+            agent_counts: Counters of the batch by agent and day
             agent_id: ID of the agent
+            timestamp: Time of the event
             sent: Number of messages sent
             received: Number of messages received
+            processing_time_ms: Processing time of a processed message
         """
-        now = datetime.utcnow()
-        today = now.date()
-        
-        # Get the agent metrics for today
-        stmt = select(AgentMetricsModel).where(
-            AgentMetricsModel.agent_id == agent_id,
-            func.date(AgentMetricsModel.timestamp) == today
-        )
-        result = await session.execute(stmt)
-        agent_metrics = result.scalars().first()
-        
-        if agent_metrics:
-            # Update existing metrics
-            agent_metrics.messages_sent += sent
-            agent_metrics.messages_received += received
-            agent_metrics.timestamp = now
-        else:
-            # Create new metrics
-            agent_metrics = AgentMetricsModel(
-                agent_id=agent_id,
-                timestamp=now,
-                messages_sent=sent,
-                messages_received=received
-            )
-            session.add(agent_metrics)
+        counts = agent_counts.setdefault((str(agent_id), timestamp.date()), {
+            "agent_id": agent_id,
+            "metrics_date": timestamp.date(),
+            "timestamp": timestamp,
+            "messages_sent": 0,
+            "messages_received": 0,
+            "messages_processed": 0,
+            "average_processing_time_ms": None,
+        })
+        counts["timestamp"] = timestamp
+        counts["messages_sent"] += sent
+        counts["messages_received"] += received
         
-        await session.commit()
+        if processing_time_ms is not None:
+            processed = counts["messages_processed"]
+            average = counts["average_processing_time_ms"] or 0
+            counts["average_processing_time_ms"] = (average * processed + processing_time_ms) / (processed + 1)
+            counts["messages_processed"] = processed + 1
     
-    async def _update_agent_processing_time(
+    async def _merge_error_messages(
         self,
         session: AsyncSession,
-        agent_id: uuid.UUID,
-        processing_time_ms: int
+        errors: Dict[str, str],
+        changes: Dict[str, Dict[str, Any]]
     ) -> None:
         """
-        Update agent processing time metrics.
+        Add error messages to the metadata of previously written messages.
         
         Args:
             session: SQLAlchemy session
-            agent_id: ID of the agent
-            processing_time_ms: Processing time in milliseconds
+            errors: Error messages by message ID
+            changes: Column changes by message ID, updated in place
         """
-        now = datetime.utcnow()
-        today = now.date()
-        
-        # Get the agent metrics for today
-        stmt = select(AgentMetricsModel).where(
-            AgentMetricsModel.agent_id == agent_id,
-            func.date(AgentMetricsModel.timestamp) == today
+        table = MessageMetricsModel.__table__
+        stmt = select(table.c.message_id, table.c["metadata"]).where(
+            table.c.message_id.in_([uuid.UUID(key) for key in errors])
         )
         result = await session.execute(stmt)
-        agent_metrics = result.scalars().first()
         
-        if agent_metrics:
-            # Update average processing time
-            if agent_metrics.average_processing_time_ms is None:
-                agent_metrics.average_processing_time_ms = processing_time_ms
-            else:
-                # Calculate new average
-                total_messages = agent_metrics.messages_received
-                if total_messages > 0:
-                    current_total = agent_metrics.average_processing_time_ms * (total_messages - 1)
-                    new_average = (current_total + processing_time_ms) / total_messages
-                    agent_metrics.average_processing_time_ms = new_average
-            
-            await session.commit()
+        for message_id, metadata in result.all():
+            key = str(message_id)
+            changes[key]["metadata"] = {**(metadata or {}), "error_message": errors[key]}
     
-    async def _update_topic_metrics(
-        self,
-        session: AsyncSession,
-        topic: str,
-        message_count: int = 1
-    ) -> None:
+    async def _update_messages(self, session: AsyncSession, changes: Dict[str, Dict[str, Any]]) -> None:
         """
-        Update topic metrics.
+        Update previously written messages, with one statement per set of
+        changed columns.
         
         Args:
             session: SQLAlchemy session
-            topic: Topic name
-            message_count: Number of messages
+            changes: Column changes by message ID
         """
-        now = datetime.utcnow()
-        today = now.date()
+        table = MessageMetricsModel.__table__
+        groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
         
-        # Get the topic metrics for today
-        stmt = select(TopicMetricsModel).where(
-            TopicMetricsModel.topic == topic,
-            func.date(TopicMetricsModel.timestamp) == today
-        )
-        result = await session.execute(stmt)
-        topic_metrics = result.scalars().first()
-        
-        if topic_metrics:
-            # Update existing metrics
-            topic_metrics.message_count += message_count
-            topic_metrics.timestamp = now
-        else:
-            # Create new metrics
-            topic_metrics = TopicMetricsModel(
-                topic=topic,
-                timestamp=now,
-                message_count=message_count,
-                subscriber_count=0  # Will be updated separately
+        for key, values in changes.items():
+            columns = tuple(sorted(values))
+            params = {f"b_{column}": values[column] for column in columns}
+            params["b_message_id"] = uuid.UUID(key)
+            groups.setdefault(columns, []).append(params)
+        
+        for columns, params in groups.items():
+            stmt = update(table).where(table.c.message_id == bindparam("b_message_id")).values(
+                {column: bindparam(f"b_{column}") for column in columns}
             )
-            session.add(topic_metrics)
+            await session.execute(stmt, params)
+    
+    async def _upsert_agent_counts(self, session: AsyncSession, upsert, rows: List[Dict[str, Any]]) -> None:
+        """
+        Add counters to the daily agent metrics.
+        
+        Args:
+            session: SQLAlchemy session
+            upsert: INSERT construct of the session's dialect
+            rows: Counters by agent and day
+        """
+        table = AgentMetricsModel.__table__
+        stmt = upsert(table)
+        excluded = stmt.excluded
+        processed = table.c.messages_processed + excluded.messages_processed
         
-        await session.commit()
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.agent_id, table.c.metrics_date],
+            set_={
+                "timestamp": excluded.timestamp,
+                "messages_sent": table.c.messages_sent + excluded.messages_sent,
+                "messages_received": table.c.messages_received + excluded.messages_received,
+                "messages_processed": processed,
+                "average_processing_time_ms": case(
+                    (excluded.messages_processed == 0, table.c.average_processing_time_ms),
+                    else_=(
+                        func.coalesce(table.c.average_processing_time_ms, 0) * table.c.messages_processed
+                        + excluded.average_processing_time_ms * excluded.messages_processed
+                    ) / processed,
+                ),
+            }
+        )
+        await session.execute(stmt, rows)
     
-    async def update_topic_subscriber_count(
+    async def _upsert_topic_counts(
         self,
-        topic: str,
-        subscriber_count: int
+        session: AsyncSession,
+        upsert,
+        rows: List[Dict[str, Any]],
+        counters: Tuple[str, ...] = ()
     ) -> None:
         """
-        Update the subscriber count for a topic.
+        Write daily topic metrics.
         
         Args:
-            topic: Topic name
-            subscriber_count: Number of subscribers
+            session: SQLAlchemy session
+            upsert: INSERT construct of the session's dialect
+            rows: Values by topic and day
+            counters: Columns that are added to rather than replaced
         """
-        now = datetime.utcnow()
-        today = now.date()
+        table = TopicMetricsModel.__table__
+        stmt = upsert(table)
         
-        async with self.session_factory() as session:
-            # Get the topic metrics for today
-            stmt = select(TopicMetricsModel).where(
-                TopicMetricsModel.topic == topic,
-                func.date(TopicMetricsModel.timestamp) == today
-            )
-            result = await session.execute(stmt)
-            topic_metrics = result.scalars().first()
-            
-            if topic_metrics:
-                # Update existing metrics
-                topic_metrics.subscriber_count = subscriber_count
-                topic_metrics.timestamp = now
+        set_ = {"timestamp": stmt.excluded.timestamp}
+        for column in rows[0]:
+            if column in ("topic", "metrics_date", "timestamp"):
+                continue
+            if column in counters:
+                set_[column] = table.c[column] + stmt.excluded[column]
             else:
-                # Create new metrics
-                topic_metrics = TopicMetricsModel(
-                    topic=topic,
-                    timestamp=now,
-                    message_count=0,  # Will be updated when messages are sent
-                    subscriber_count=subscriber_count
-                )
-                session.add(topic_metrics)
-            
-            await session.commit()
+                set_[column] = stmt.excluded[column]
+        
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.topic, table.c.metrics_date],
+            set_=set_
+        )
+        await session.execute(stmt, rows)
+    
+    async def _upsert_counters(
+        self,
+        session: AsyncSession,
+        upsert,
+        table,
+        rows: List[Dict[str, Any]],
+        keys: Tuple[str, ...]
+    ) -> None:
+        """
+        Add counters to rows identified by a unique key.
+        
+        Args:
+            session: SQLAlchemy session
+            upsert: INSERT construct of the session's dialect
+            table: Table of the counters
+            rows: Key and counter values
+            keys: Columns of the unique key
+        """
+        stmt = upsert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c[key] for key in keys],
+            set_={
+                column: table.c[column] + stmt.excluded[column]
+                for column in rows[0]
+                if column not in keys
+            }
+        )
+        await session.execute(stmt, rows)
     
     async def get_message_metrics(
         self,
@@ -650,112 +1074,409 @@ class MetricsCollector:
     async def get_performance_metrics(
         self,
         start_time: Optional[datetime] = None,
-        end_time: Optional[datetime] = None
+        end_time: Optional[datetime] = None,
+        use_rollups: Optional[bool] = None
     ) -> Dict[str, Any]:
         """
         Get performance metrics.
         
+        Metrics describe the messages created in the time range. They are read
+        from the rollup tables, which cost the same whatever the message
+        volume, or from one grouped scan of the message table when rollups
+        are disabled. Latency percentiles come from the latency histograms
+        (the rollup tables) or, on PostgreSQL, from the message table.
+        
         Args:
             start_time: Filter by start time
             end_time: Filter by end time
+            use_rollups: Whether to read the rollup tables (the collector's
+                setting if not given)
             
         Returns:
             Performance metrics
         """
+        # Define time range
+        if not start_time:
+            start_time = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        if not end_time:
+            end_time = datetime.utcnow()
+        if use_rollups is None:
+            use_rollups = self.rollups
+        
         async with self.session_factory() as session:
-            # Define time range
-            if not start_time:
-                start_time = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-            if not end_time:
-                end_time = datetime.utcnow()
-            
-            # Get message count
-            query = select(func.count(MessageMetricsModel.id)).where(
-                MessageMetricsModel.created_at >= start_time,
-                MessageMetricsModel.created_at <= end_time
-            )
-            result = await session.execute(query)
-            message_count = result.scalar() or 0
-            
-            # Get average processing time
-            query = select(func.avg(MessageMetricsModel.processing_time_ms)).where(
-                MessageMetricsModel.created_at >= start_time,
-                MessageMetricsModel.created_at <= end_time,
-                MessageMetricsModel.processing_time_ms.isnot(None)
-            )
-            result = await session.execute(query)
-            avg_processing_time = result.scalar() or 0
-            
-            # Get average queue time
-            query = select(func.avg(MessageMetricsModel.queue_time_ms)).where(
-                MessageMetricsModel.created_at >= start_time,
-                MessageMetricsModel.created_at <= end_time,
-                MessageMetricsModel.queue_time_ms.isnot(None)
-            )
-            result = await session.execute(query)
-            avg_queue_time = result.scalar() or 0
-            
-            # Get average total time
-            query = select(func.avg(MessageMetricsModel.total_time_ms)).where(
-                MessageMetricsModel.created_at >= start_time,
-                MessageMetricsModel.created_at <= end_time,
-                MessageMetricsModel.total_time_ms.isnot(None)
-            )
-            result = await session.execute(query)
-            avg_total_time = result.scalar() or 0
-            
-            # Get message count by status
-            status_counts = {}
-            for status in MessageStatus:
-                query = select(func.count(MessageMetricsModel.id)).where(
-                    MessageMetricsModel.created_at >= start_time,
-                    MessageMetricsModel.created_at <= end_time,
-                    MessageMetricsModel.status == status
-                )
-                result = await session.execute(query)
-                status_counts[status.value] = result.scalar() or 0
-            
-            # Get top topics by message count
-            query = select(
-                MessageMetricsModel.topic,
-                func.count(MessageMetricsModel.id).label("count")
-            ).where(
-                MessageMetricsModel.created_at >= start_time,
-                MessageMetricsModel.created_at <= end_time,
-                MessageMetricsModel.topic.isnot(None)
-            ).group_by(
-                MessageMetricsModel.topic
-            ).order_by(
-                func.count(MessageMetricsModel.id).desc()
-            ).limit(10)
-            result = await session.execute(query)
-            top_topics = [{"topic": row[0], "count": row[1]} for row in result]
+            if use_rollups:
+                metrics = await self._get_rollup_performance_metrics(session, start_time, end_time)
+            else:
+                metrics = await self._get_scanned_performance_metrics(session, start_time, end_time)
+        
+        # Return performance metrics
+        metrics["start_time"] = start_time.isoformat()
+        metrics["end_time"] = end_time.isoformat()
+        return metrics
+    
+    async def _get_rollup_performance_metrics(
+        self,
+        session: AsyncSession,
+        start_time: datetime,
+        end_time: datetime
+    ) -> Dict[str, Any]:
+        """
+        Get performance metrics from the rollup tables.
+        
+        Whole hours of the time range are read from the hourly buckets and
+        the rest from the minute buckets.
+        
+        Args:
+            session: SQLAlchemy session
+            start_time: Start of the time range
+            end_time: End of the time range
             
-            # Get top agents by message count
-            query = select(
-                MessageMetricsModel.source_agent_id,
-                func.count(MessageMetricsModel.id).label("count")
-            ).where(
-                MessageMetricsModel.created_at >= start_time,
-                MessageMetricsModel.created_at <= end_time,
-                MessageMetricsModel.source_agent_id.isnot(None)
-            ).group_by(
-                MessageMetricsModel.source_agent_id
-            ).order_by(
-                func.count(MessageMetricsModel.id).desc()
-            ).limit(10)
-            result = await session.execute(query)
-            top_source_agents = [{"agent_id": str(row[0]), "count": row[1]} for row in result]
+        Returns:
+            Performance metrics
+        """
+        ranges = _bucket_ranges(start_time, end_time)
+        
+        # Sum the counters of every dimension value in one query
+        table = MessageMetricsRollupModel.__table__
+        query = select(
+            table.c.dimension,
+            table.c.dimension_value,
+            *[func.sum(table.c[column]) for column in _ROLLUP_COUNTERS]
+        ).where(
+            _bucket_condition(table, ranges)
+        ).group_by(
+            table.c.dimension,
+            table.c.dimension_value
+        )
+        result = await session.execute(query)
+        
+        totals: Dict[str, Dict[str, Dict[str, float]]] = {}
+        for row in result:
+            totals.setdefault(row[0], {})[row[1]] = dict(zip(_ROLLUP_COUNTERS, (value or 0 for value in row[2:])))
+        
+        overall = totals.get(DIMENSION_ALL, {}).get("", dict.fromkeys(_ROLLUP_COUNTERS, 0))
+        statuses = totals.get(DIMENSION_STATUS, {})
+        
+        # Sum the latency histograms
+        table = MessageLatencyHistogramModel.__table__
+        query = select(
+            table.c.metric,
+            table.c.bin,
+            func.sum(table.c.count)
+        ).where(
+            _bucket_condition(table, ranges)
+        ).group_by(
+            table.c.metric,
+            table.c.bin
+        )
+        result = await session.execute(query)
+        
+        histograms = {metric: LatencyHistogram() for metric in LATENCY_METRICS}
+        for metric, bin, count in result:
+            if metric in histograms:
+                histograms[metric].record(LatencyHistogram.bin_range(bin)[0], int(count))
+        
+        return {
+            "message_count": int(overall["message_count"]),
+            "avg_processing_time_ms": _average(overall, "processing"),
+            "avg_queue_time_ms": _average(overall, "queue"),
+            "avg_total_time_ms": _average(overall, "total"),
+            "latency_percentiles_ms": {
+                metric: histogram.percentiles() for metric, histogram in histograms.items()
+            },
+            "status_counts": {
+                status.value: max(int(statuses.get(status.value, {}).get("message_count", 0)), 0)
+                for status in MessageStatus
+            },
+            "top_topics": _top(totals.get(DIMENSION_TOPIC, {}), "topic"),
+            "top_source_agents": _top(totals.get(DIMENSION_SOURCE_AGENT, {}), "agent_id"),
+        }
+    
+    async def _get_scanned_performance_metrics(
+        self,
+        session: AsyncSession,
+        start_time: datetime,
+        end_time: datetime
+    ) -> Dict[str, Any]:
+        """
+        Get performance metrics by scanning the message table.
+        
+        Args:
+            session: SQLAlchemy session
+            start_time: Start of the time range
+            end_time: End of the time range
             
-            # Return performance metrics
-            return {
-                "message_count": message_count,
-                "avg_processing_time_ms": float(avg_processing_time),
-                "avg_queue_time_ms": float(avg_queue_time),
-                "avg_total_time_ms": float(avg_total_time),
-                "status_counts": status_counts,
-                "top_topics": top_topics,
-                "top_source_agents": top_source_agents,
-                "start_time": start_time.isoformat(),
-                "end_time": end_time.isoformat()
+        Returns:
+            Performance metrics
+        """
+        window = (
+            MessageMetricsModel.created_at >= start_time,
+            MessageMetricsModel.created_at <= end_time,
+        )
+        
+        # Get counts and latency sums by status in one pass
+        query = select(
+            MessageMetricsModel.status,
+            func.count(MessageMetricsModel.id),
+            func.sum(MessageMetricsModel.processing_time_ms),
+            func.count(MessageMetricsModel.processing_time_ms),
+            func.sum(MessageMetricsModel.queue_time_ms),
+            func.count(MessageMetricsModel.queue_time_ms),
+            func.sum(MessageMetricsModel.total_time_ms),
+            func.count(MessageMetricsModel.total_time_ms)
+        ).where(
+            *window
+        ).group_by(
+            MessageMetricsModel.status
+        )
+        result = await session.execute(query)
+        
+        overall = dict.fromkeys(_ROLLUP_COUNTERS, 0)
+        status_counts = {status.value: 0 for status in MessageStatus}
+        for status, count, *latencies in result:
+            status_counts[MessageStatus(status).value] = count
+            overall["message_count"] += count
+            for column, value in zip(_ROLLUP_COUNTERS[1:], latencies):
+                overall[column] += value or 0
+        
+        # Get latency percentiles where the database computes them
+        percentiles = {metric: {"p50": None, "p95": None, "p99": None} for metric in LATENCY_METRICS}
+        if session.get_bind().dialect.name == "postgresql":
+            columns = {
+                "processing": MessageMetricsModel.processing_time_ms,
+                "queue": MessageMetricsModel.queue_time_ms,
+                "total": MessageMetricsModel.total_time_ms,
             }
+            keys = [
+                (metric, name, fraction)
+                for metric in LATENCY_METRICS
+                for name, fraction in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))
+            ]
+            query = select(*[
+                func.percentile_cont(fraction).within_group(columns[metric]) for metric, name, fraction in keys
+            ]).where(*window)
+            result = await session.execute(query)
+            for (metric, name, fraction), value in zip(keys, result.one()):
+                percentiles[metric][name] = float(value) if value is not None else None
+        
+        # Get top topics by message count
+        query = select(
+            MessageMetricsModel.topic,
+            func.count(MessageMetricsModel.id).label("count")
+        ).where(
+            *window,
+            MessageMetricsModel.topic.isnot(None)
+        ).group_by(
+            MessageMetricsModel.topic
+        ).order_by(
+            func.count(MessageMetricsModel.id).desc()
+        ).limit(10)
+        result = await session.execute(query)
+        top_topics = [{"topic": row[0], "count": row[1]} for row in result]
+        
+        # Get top agents by message count
+        query = select(
+            MessageMetricsModel.source_agent_id,
+            func.count(MessageMetricsModel.id).label("count")
+        ).where(
+            *window,
+            MessageMetricsModel.source_agent_id.isnot(None)
+        ).group_by(
+            MessageMetricsModel.source_agent_id
+        ).order_by(
+            func.count(MessageMetricsModel.id).desc()
+        ).limit(10)
+        result = await session.execute(query)
+        top_source_agents = [{"agent_id": str(row[0]), "count": row[1]} for row in result]
+        
+        return {
+            "message_count": overall["message_count"],
+            "avg_processing_time_ms": _average(overall, "processing"),
+            "avg_queue_time_ms": _average(overall, "queue"),
+            "avg_total_time_ms": _average(overall, "total"),
+            "latency_percentiles_ms": percentiles,
+            "status_counts": status_counts,
+            "top_topics": top_topics,
+            "top_source_agents": top_source_agents,
+        }
+
+
+def _expand_sent_events(
+    batch: List[Tuple[str, Optional[uuid.UUID], datetime, Dict[str, Any]]]
+) -> List[Tuple[str, Optional[uuid.UUID], datetime, Dict[str, Any]]]:
+    """
+    Expand the events of messages sent to many agents into the creation and
+    routing events of each message.
+    
+    Args:
+        batch: Events to expand
+    
+    Returns:
+        Events with every sent event expanded
+    """
+    if not any(event == _SENT for event, _, _, _ in batch):
+        return batch
+    
+    expanded = []
+    for event, message_id, timestamp, data in batch:
+        if event != _SENT:
+            expanded.append((event, message_id, timestamp, data))
+            continue
+        
+        for message_id, metrics_id, destination_agent_id in data["messages"]:
+            expanded.append((_CREATED, message_id, timestamp, {
+                "id": metrics_id,
+                "correlation_id": data["correlation_id"],
+                "source_agent_id": data["source_agent_id"],
+                "destination_agent_id": destination_agent_id,
+                "topic": data["topic"],
+                "priority": data["priority"],
+                "metadata": data["metadata"],
+            }))
+            expanded.append((_ROUTED, message_id, timestamp, {
+                "queue_time_ms": data["queue_time_ms"],
+                "routing_path": (
+                    {"destination_type": "agent", "destination_id": str(destination_agent_id)}
+                    if destination_agent_id else None
+                ),
+                "created_at": timestamp,
+                "previous_status": MessageStatus.CREATED,
+            }))
+    
+    return expanded
+
+
+def _truncate(timestamp: datetime, bucket_size: str) -> datetime:
+    """
+    Get the start of the bucket that contains a time.
+    
+    Args:
+        timestamp: Time
+        bucket_size: Bucket size (``minute`` or ``hour``)
+    
+    Returns:
+        Start of the bucket
+    """
+    if bucket_size == BUCKET_HOUR:
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    return timestamp.replace(second=0, microsecond=0)
+
+
+def _bucket_ranges(start_time: datetime, end_time: datetime) -> List[Tuple[str, datetime, datetime]]:
+    """
+    Split a time range into the rollup buckets that cover it.
+    
+    Args:
+        start_time: Start of the time range
+        end_time: End of the time range (inclusive)
+    
+    Returns:
+        Bucket size, first bucket start and end of the last bucket of each
+        part of the range
+    """
+    first_minute = _truncate(start_time, BUCKET_MINUTE)
+    end_minute = _truncate(end_time, BUCKET_MINUTE) + timedelta(minutes=1)
+    first_hour = _truncate(first_minute + timedelta(minutes=59), BUCKET_HOUR)
+    end_hour = _truncate(end_minute, BUCKET_HOUR)
+    
+    if first_hour >= end_hour:
+        return [(BUCKET_MINUTE, first_minute, end_minute)]
+    
+    return [
+        (BUCKET_MINUTE, first_minute, first_hour),
+        (BUCKET_HOUR, first_hour, end_hour),
+        (BUCKET_MINUTE, end_hour, end_minute),
+    ]
+
+
+def _bucket_condition(table, ranges: List[Tuple[str, datetime, datetime]]):
+    """
+    Build the condition that selects the buckets of a time range.
+    
+    Args:
+        table: Rollup table
+        ranges: Bucket ranges from _bucket_ranges
+    
+    Returns:
+        SQL condition
+    """
+    return or_(*[
+        and_(
+            table.c.bucket_size == bucket_size,
+            table.c.bucket_start >= first_start,
+            table.c.bucket_start < end
+        )
+        for bucket_size, first_start, end in ranges
+    ])
+
+
+def _average(counters: Dict[str, float], metric: str) -> float:
+    """
+    Get the average of a latency metric from its total and count.
+    
+    Args:
+        counters: Rollup counters
+        metric: Latency metric
+    
+    Returns:
+        Average in milliseconds (0 if nothing was measured)
+    """
+    count = counters[f"{metric}_time_count"]
+    return float(counters[f"{metric}_time_total_ms"]) / count if count else 0.0
+
+
+def _top(values: Dict[str, Dict[str, float]], name: str, limit: int = 10) -> List[Dict[str, Any]]:
+    """
+    Get the dimension values with the most messages.
+    
+    Args:
+        values: Rollup counters by dimension value
+        name: Key of the dimension value in the result
+        limit: Maximum number of results
+    
+    Returns:
+        Dimension values and message counts, most messages first
+    """
+    counts = sorted(
+        ((value, int(counters["message_count"])) for value, counters in values.items()),
+        key=lambda item: item[1],
+        reverse=True
+    )
+    return [{name: value, "count": count} for value, count in counts[:limit] if count > 0]
+
+
+# Global metrics collector
+_metrics_collector: Optional[MetricsCollector] = None
+
+
+def get_metrics_collector(session_factory, **kwargs) -> MetricsCollector:
+    """
+    Get the metrics collector shared by the service.
+    
+    The collector outlives requests, so it must be given a session factory
+    that opens new sessions rather than one that returns a request's session.
+    
+    Args:
+        session_factory: Factory function that returns a SQLAlchemy AsyncSession
+        **kwargs: Collector settings, used when the collector is created
+    
+    Returns:
+        MetricsCollector: Metrics collector instance
+    """
+    global _metrics_collector
+    
+    if _metrics_collector is None:
+        _metrics_collector = MetricsCollector(session_factory, **kwargs)
+    
+    return _metrics_collector
+
+
+async def close_metrics_collector() -> None:
+    """
+    Stop the shared metrics collector and write its buffered events.
+    """
+    global _metrics_collector
+    
+    if _metrics_collector is not None:
+        await _metrics_collector.stop()
+        _metrics_collector = None
@@ -2,72 +2,341 @@
 Priority module for agent communication hub.
 
 This module implements a priority queue system for agent messages:
-- PriorityQueue: A priority queue implementation using Redis Sorted Sets
+- PriorityQueue: A FIFO-stable priority queue using Redis Sorted Sets and server-side scripts
 - PriorityDeterminer: Determines message priorities based on message attributes
 - PriorityDispatcher: Dispatches messages to appropriate queues based on priority
 - FairnessManager: Ensures fairness in message processing
 - PriorityInheritanceManager: Implements priority inheritance for related messages
 """
 
-import json
 import logging
+import math
 import time
 import asyncio
-from datetime import datetime
 from typing import List, Dict, Any, Optional, Tuple, Set
-from uuid import UUID
+from uuid import UUID, uuid4
+
+from shared.utils.src.serialization import Serializer
 
 logger = logging.getLogger(__name__)
 
 
+# Scores combine the priority with the arrival sequence, so messages of the
+# same priority are dequeued first in, first out:
+# score = priority * SEQUENCE_SPAN - sequence
+SEQUENCE_SPAN = 2 ** 40
+
+# Highest priority whose scores are still exact in a double
+MAX_PRIORITY = 2 ** 53 // SEQUENCE_SPAN - 1
+
+# Maximum messages boosted by one aging pass inside a dequeue
+AGING_BATCH = 100
+
+# Queue entries of a message sent to many agents refer to the shared payload
+# of the message with this field
+SHARED_PAYLOAD_FIELD = '_shared_payload'
+
+# Seconds a shared payload is kept if not all of its entries are dequeued
+SHARED_PAYLOAD_TTL = 7 * 24 * 3600
+
+# Maximum queue entries written by one bulk enqueue script call
+BULK_ENQUEUE_CHUNK = 1000
+
+# Boosts the priority of messages that waited longer than the aging threshold
+# since they were enqueued or last boosted. KEYS: queue, payloads, enqueued,
+# aged. ARGV: now (ms), aging threshold (ms), boost, max priority, span, limit.
+_AGING_LUA = """
+local function age(now, threshold, boost, max_priority, span, limit)
+    local aged = redis.call('ZRANGEBYSCORE', KEYS[4], '-inf', now - threshold, 'LIMIT', 0, limit)
+    for _, id in ipairs(aged) do
+        local score = redis.call('ZSCORE', KEYS[1], id)
+        if score then
+            local priority = math.floor(tonumber(score) / span) + 1
+            local boosted = math.min(priority + boost, max_priority)
+            if boosted > priority then
+                redis.call('ZINCRBY', KEYS[1], string.format('%.0f', (boosted - priority) * span), id)
+            end
+            redis.call('ZADD', KEYS[4], now, id)
+        else
+            redis.call('ZREM', KEYS[4], id)
+        end
+    end
+    return #aged
+end
+"""
+
+_ENQUEUE_SCRIPT = """
+local sequence = redis.call('INCR', KEYS[5])
+local score = tonumber(ARGV[3]) * tonumber(ARGV[5]) - sequence
+redis.call('HSET', KEYS[2], ARGV[1], ARGV[2])
+redis.call('ZADD', KEYS[1], string.format('%.0f', score), ARGV[1])
+redis.call('ZADD', KEYS[3], ARGV[4], ARGV[1])
+redis.call('ZADD', KEYS[4], ARGV[4], ARGV[1])
+return sequence
+"""
+
+# Pops the next message: the oldest one if it waited longer than the
+# starvation threshold, otherwise the highest-scored one. ARGV: now (ms),
+# starvation threshold (ms, negative to disable), aging threshold (ms,
+# negative to disable), boost, max priority, span, aging limit.
+_DEQUEUE_SCRIPT = _AGING_LUA + """
+local now = tonumber(ARGV[1])
+local starvation = tonumber(ARGV[2])
+local span = tonumber(ARGV[6])
+
+if tonumber(ARGV[3]) >= 0 then
+    age(now, tonumber(ARGV[3]), tonumber(ARGV[4]), tonumber(ARGV[5]), span, tonumber(ARGV[7]))
+end
+
+while true do
+    local id = nil
+    local score = nil
+    
+    if starvation >= 0 then
+        local oldest = redis.call('ZRANGE', KEYS[3], 0, 0, 'WITHSCORES')
+        if oldest[1] and now - tonumber(oldest[2]) >= starvation then
+            score = redis.call('ZSCORE', KEYS[1], oldest[1])
+            if score then
+                id = oldest[1]
+                redis.call('ZREM', KEYS[1], id)
+            else
+                redis.call('ZREM', KEYS[3], oldest[1])
+            end
+        end
+    end
+    
+    if not id then
+        local top = redis.call('ZPOPMAX', KEYS[1])
+        if not top[1] then
+            return nil
+        end
+        id = top[1]
+        score = top[2]
+    end
+    
+    local payload = redis.call('HGET', KEYS[2], id)
+    redis.call('HDEL', KEYS[2], id)
+    redis.call('ZREM', KEYS[3], id)
+    redis.call('ZREM', KEYS[4], id)
+    if payload then
+        return {payload, score}
+    end
+end
+"""
+
+_AGE_SCRIPT = _AGING_LUA + """
+return age(tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3]), tonumber(ARGV[4]), tonumber(ARGV[5]), tonumber(ARGV[6]))
+"""
+
+# Takes the payload of a message popped with BZPOPMAX. ARGV: message ID.
+_CLAIM_SCRIPT = """
+local payload = redis.call('HGET', KEYS[2], ARGV[1])
+redis.call('HDEL', KEYS[2], ARGV[1])
+redis.call('ZREM', KEYS[3], ARGV[1])
+redis.call('ZREM', KEYS[4], ARGV[1])
+return payload
+"""
+
+_REMOVE_SCRIPT = """
+redis.call('HDEL', KEYS[2], ARGV[1])
+redis.call('ZREM', KEYS[3], ARGV[1])
+redis.call('ZREM', KEYS[4], ARGV[1])
+return redis.call('ZREM', KEYS[1], ARGV[1])
+"""
+
+# Moves a message to a new priority, keeping its arrival sequence. ARGV:
+# message ID, payload, priority, span.
+_UPDATE_PRIORITY_SCRIPT = """
+local score = redis.call('ZSCORE', KEYS[1], ARGV[1])
+if not score then
+    return 0
+end
+local span = tonumber(ARGV[4])
+local priority = math.floor(tonumber(score) / span) + 1
+local sequence = priority * span - tonumber(score)
+redis.call('ZADD', KEYS[1], string.format('%.0f', tonumber(ARGV[3]) * span - sequence), ARGV[1])
+redis.call('HSET', KEYS[2], ARGV[1], ARGV[2])
+return 1
+"""
+
+# Stores the shared payload of a message sent to many agents and adds an entry
+# for each agent to its queue. KEYS: shared payload, then the queue, payloads,
+# enqueued, aged and sequence keys of each agent. ARGV: shared payload (empty
+# if stored by an earlier call), number of entries sharing it, TTL (ms),
+# priority, now (ms), span, then the message ID and entry of each agent.
+_BULK_ENQUEUE_SCRIPT = """
+if ARGV[1] ~= '' then
+    redis.call('HSET', KEYS[1], 'payload', ARGV[1], 'remaining', ARGV[2])
+    redis.call('PEXPIRE', KEYS[1], ARGV[3])
+end
+local priority = tonumber(ARGV[4])
+local span = tonumber(ARGV[6])
+local count = (#KEYS - 1) / 5
+for i = 0, count - 1 do
+    local key = 2 + i * 5
+    local arg = 7 + i * 2
+    local sequence = redis.call('INCR', KEYS[key + 4])
+    redis.call('HSET', KEYS[key + 1], ARGV[arg], ARGV[arg + 1])
+    redis.call('ZADD', KEYS[key], string.format('%.0f', priority * span - sequence), ARGV[arg])
+    redis.call('ZADD', KEYS[key + 2], ARGV[5], ARGV[arg])
+    redis.call('ZADD', KEYS[key + 3], ARGV[5], ARGV[arg])
+end
+return count
+"""
+
+# Takes a shared payload for a dequeued entry, deleting it once every entry
+# sharing it was dequeued. KEYS: shared payload.
+_TAKE_SHARED_SCRIPT = """
+local payload = redis.call('HGET', KEYS[1], 'payload')
+if payload and redis.call('HINCRBY', KEYS[1], 'remaining', -1) <= 0 then
+    redis.call('DEL', KEYS[1])
+end
+return payload
+"""
+
+
+def _score_priority(score: float) -> int:
+    """
+    Get the priority encoded in a queue score.
+    
+    Args:
+        score: Sorted set score
+        
+    Returns:
+        Priority of the message
+    """
+    return math.floor(float(score) / SEQUENCE_SPAN) + 1
+
+
 class PriorityQueue:
-    """Priority queue for messages using Redis Sorted Sets."""
+    """
+    Priority queue for messages using Redis Sorted Sets.
+    
+    The sorted set holds message IDs scored by priority and arrival sequence,
+    so messages of the same priority are dequeued in arrival order, and the
+    payloads are stored in a hash keyed by message ID. Messages are
+    identified by their ``id`` field; enqueueing a message with the ID of a
+    queued message replaces it.
+    
+    Dequeuing runs as a server-side script that first boosts the priority of
+    aging messages and serves the oldest message ahead of higher priorities
+    once it has waited longer than the starvation threshold.
     
-    def __init__(self, redis_client, queue_name: str):
+    An entry written by PriorityDispatcher.dispatch_bulk holds only the
+    message ID, destination and priority, and refers to a payload shared by
+    all recipients, which is merged in when the entry is read.
+    """
+    
+    def __init__(
+        self,
+        redis_client,
+        queue_name: str,
+        serializer: Optional[Serializer] = None,
+        starvation_threshold: Optional[float] = None,
+        aging_threshold: Optional[float] = None,
+        aging_boost: int = 1,
+        max_priority: Optional[int] = None,
+    ):
         """
         Initialize the priority queue.
         
         Args:
             redis_client: Redis client
             queue_name: Name of the queue
+            serializer: Serializer of queued messages (JSON if not given;
+                binary serializers need a client created with
+                decode_responses=False)
+            starvation_threshold: Seconds after which the oldest message is
+                served regardless of priority (disabled if not given)
+            aging_threshold: Seconds a message waits before its priority is
+                boosted, and between boosts (disabled if not given)
+            aging_boost: Priority levels added per boost
+            max_priority: Highest priority aging can boost a message to
+                (MAX_PRIORITY if not given)
         """
         self.redis_client = redis_client
         self.queue_name = queue_name
+        self.serializer = serializer or Serializer()
+        self.starvation_threshold = starvation_threshold
+        self.aging_threshold = aging_threshold
+        self.aging_boost = aging_boost
+        self.max_priority = max_priority if max_priority is not None else MAX_PRIORITY
+        
+        self.payloads_key = f"{queue_name}:payloads"
+        self.enqueued_key = f"{queue_name}:enqueued"
+        self.aged_key = f"{queue_name}:aged"
+        self.sequence_key = f"{queue_name}:sequence"
+        self._keys = [self.queue_name, self.payloads_key, self.enqueued_key, self.aged_key]
+        
+        self._enqueue = redis_client.register_script(_ENQUEUE_SCRIPT)
+        self._dequeue = redis_client.register_script(_DEQUEUE_SCRIPT)
+        self._age = redis_client.register_script(_AGE_SCRIPT)
+        self._claim = redis_client.register_script(_CLAIM_SCRIPT)
+        self._remove = redis_client.register_script(_REMOVE_SCRIPT)
+        self._update_priority = redis_client.register_script(_UPDATE_PRIORITY_SCRIPT)
+        self._take_shared = redis_client.register_script(_TAKE_SHARED_SCRIPT)
     
     async def enqueue(self, message: Dict[str, Any], priority: int = 0) -> None:
         """
         Enqueue a message with a priority.
         
         Args:
-            message: Message to enqueue
+            message: Message to enqueue (an ``id`` is added if missing)
             priority: Priority of the message (higher values = higher priority)
         """
-        # Serialize the message
-        message_json = json.dumps(message)
+        message_id = message.setdefault('id', str(uuid4()))
         
-        # Add the message to the sorted set with the priority as the score
-        await self.redis_client.zadd(self.queue_name, {message_json: priority})
+        # Store the payload and add the message ID to the sorted set
+        await self._enqueue(
+            keys=self._keys + [self.sequence_key],
+            args=[message_id, self.serializer.dumps(message), priority, _now_ms(), SEQUENCE_SPAN],
+        )
         logger.debug(f"Enqueued message in {self.queue_name} with priority {priority}")
     
-    async def dequeue(self) -> Optional[Dict[str, Any]]:
+    async def dequeue(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
         """
-        Dequeue the highest-priority message.
+        Dequeue the next message.
         
-        Returns:
-            Highest-priority message or None if the queue is empty
-        """
-        # Get the highest-priority message from the sorted set
-        result = await self.redis_client.zpopmax(self.queue_name)
+        Args:
+            timeout: Seconds to wait for a message when the queue is empty
+                (returns immediately if not given)
         
-        if not result:
-            return None
+        Returns:
+            Next message or None if the queue is empty
+        """
+        deadline = time.monotonic() + timeout if timeout else None
+        
+        while True:
+            result = await self._dequeue(
+                keys=self._keys,
+                args=[
+                    _now_ms(),
+                    _threshold_ms(self.starvation_threshold),
+                    _threshold_ms(self.aging_threshold),
+                    self.aging_boost,
+                    self.max_priority,
+                    SEQUENCE_SPAN,
+                    AGING_BATCH,
+                ],
+            )
+            if result:
+                payload, _ = result
+                break
+            
+            remaining = deadline - time.monotonic() if deadline else 0
+            if remaining <= 0:
+                return None
+            
+            # Block until a message arrives instead of polling
+            popped = await self.redis_client.bzpopmax(self.queue_name, timeout=remaining)
+            if not popped:
+                return None
+            payload = await self._claim(keys=self._keys, args=[popped[1]])
+            if payload is not None:
+                break
         
-        # Deserialize the message
-        message_json, _ = result[0]
-        message = json.loads(message_json)
         logger.debug(f"Dequeued message from {self.queue_name}")
-        
-        return message
+        return await self._load(payload, take=True)
     
     async def peek(self) -> Optional[Dict[str, Any]]:
         """
@@ -76,15 +345,13 @@ class PriorityQueue:
         Returns:
             Highest-priority message or None if the queue is empty
         """
-        # Get the highest-priority message from the sorted set
-        result = await self.redis_client.zrange(self.queue_name, -1, -1, withscores=True)
+        result = await self.redis_client.zrevrange(self.queue_name, 0, 0)
         
         if not result:
             return None
         
-        # Deserialize the message
-        message_json, _ = result[0]
-        return json.loads(message_json)
+        payload = await self.redis_client.hget(self.payloads_key, result[0])
+        return await self._load(payload) if payload is not None else None
     
     async def remove(self, message: Dict[str, Any]) -> None:
         """
@@ -93,49 +360,127 @@ class PriorityQueue:
         Args:
             message: Message to remove
         """
-        # Serialize the message
-        message_json = json.dumps(message)
-        
-        # Remove the message from the sorted set
-        await self.redis_client.zrem(self.queue_name, message_json)
+        await self._remove(keys=self._keys, args=[message['id']])
         logger.debug(f"Removed message from {self.queue_name}")
     
     async def update_priority(self, message: Dict[str, Any], priority: int) -> None:
         """
-        Update the priority of a message.
+        Update the priority of a message, keeping its place among messages
+        of the new priority.
         
         Args:
             message: Message to update
             priority: New priority
         """
-        # Serialize the message
-        message_json = json.dumps(message)
-        
-        # Update the priority of the message in the sorted set
-        await self.redis_client.zadd(self.queue_name, {message_json: priority})
+        await self._update_priority(
+            keys=self._keys,
+            args=[message['id'], self.serializer.dumps(message), priority, SEQUENCE_SPAN],
+        )
         logger.debug(f"Updated message priority in {self.queue_name} to {priority}")
     
-    async def get_length(self) -> int:
+    async def boost_aging(
+        self,
+        aging_threshold: float,
+        aging_boost: int = 1,
+        max_priority: Optional[int] = None,
+    ) -> int:
+        """
+        Boost the priority of messages that waited longer than a threshold.
+        
+        Args:
+            aging_threshold: Seconds since a message was enqueued or last
+                boosted
+            aging_boost: Priority levels added
+            max_priority: Highest priority a message is boosted to
+            
+        Returns:
+            Number of aging messages
+        """
+        return await self._age(
+            keys=self._keys,
+            args=[
+                _now_ms(),
+                _threshold_ms(aging_threshold),
+                aging_boost,
+                max_priority if max_priority is not None else self.max_priority,
+                SEQUENCE_SPAN,
+                -1,
+            ],
+        )
+    
+    async def get_length(self, priority: Optional[int] = None) -> int:
         """
         Get the number of messages in the queue.
         
+        Args:
+            priority: Count only messages of this priority
+        
         Returns:
             Number of messages
         """
-        return await self.redis_client.zcard(self.queue_name)
+        if priority is None:
+            return await self.redis_client.zcard(self.queue_name)
+        return await self.redis_client.zcount(
+            self.queue_name,
+            f"({(priority - 1) * SEQUENCE_SPAN}",
+            f"({priority * SEQUENCE_SPAN}",
+        )
     
     async def get_all(self) -> List[Tuple[Dict[str, Any], int]]:
         """
         Get all messages in the queue with their priorities.
         
         Returns:
-            List of (message, priority) tuples
+            List of (message, priority) tuples in dequeue order
+        """
+        result = await self.redis_client.zrevrange(self.queue_name, 0, -1, withscores=True)
+        if not result:
+            return []
+        
+        payloads = await self.redis_client.hmget(self.payloads_key, [message_id for message_id, _ in result])
+        return [
+            (await self._load(payload), _score_priority(score))
+            for (_, score), payload in zip(result, payloads)
+            if payload is not None
+        ]
+    
+    async def _load(self, payload: Any, take: bool = False) -> Dict[str, Any]:
         """
-        # Get all messages from the sorted set
-        result = await self.redis_client.zrange(self.queue_name, 0, -1, withscores=True)
+        Deserialize a queue entry, merging in its shared payload.
         
-        # Deserialize the messages
-        return [(json.loads(message_json), int(priority)) for message_json, priority in result]
+        Args:
+            payload: Serialized entry
+            take: Whether the entry was dequeued, which releases its share
+                of the shared payload
+            
+        Returns:
+            The message
+        """
+        message = self.serializer.loads(payload)
+        shared_key = message.pop(SHARED_PAYLOAD_FIELD, None)
+        if shared_key is None:
+            return message
+        
+        if take:
+            shared_payload = await self._take_shared(keys=[shared_key])
+        else:
+            shared_payload = await self.redis_client.hget(shared_key, 'payload')
+        
+        if shared_payload is None:
+            logger.warning(f"Shared payload {shared_key} of message {message.get('id')} has expired")
+            return message
+        
+        return {**self.serializer.loads(shared_payload), **message}
+
+
+def _now_ms() -> int:
+    """Get the current time in milliseconds."""
+    return int(time.time() * 1000)
+
+
+def _threshold_ms(seconds: Optional[float]) -> int:
+    """Convert a threshold to milliseconds (-1 if disabled)."""
+    return int(seconds * 1000) if seconds is not None else -1
 
 
 class PriorityDeterminer:
@@ -185,25 +530,32 @@ class PriorityDeterminer:
 
 
 class PriorityDispatcher:
-    """Dispatcher for priority-based message processing."""
+    """
+    Dispatcher for priority-based message processing.
     
-    def __init__(self, redis_client, config: Dict[str, Any]):
+    Messages addressed to an agent are queued in that agent's queue, and
+    other messages in the shared priority queue, so each message is queued
+    once.
+    """
+    
+    def __init__(self, redis_client, config: Dict[str, Any], serializer: Optional[Serializer] = None):
         """
         Initialize the priority dispatcher.
         
         Args:
             redis_client: Redis client
-            config: Dispatcher configuration
+            config: Dispatcher configuration (priority_levels, and optionally
+                starvation_threshold, aging_threshold and aging_boost)
+            serializer: Serializer of queued messages (JSON if not given)
         """
         self.redis_client = redis_client
         self.config = config
-        self.queues = {}  # priority -> PriorityQueue
-        
-        # Create queues for each priority level
-        for priority in range(self.config.get('priority_levels', 6)):
-            self.queues[priority] = PriorityQueue(redis_client, f"messages:priority:{priority}")
+        self.serializer = serializer
+        self.queue = self._create_queue("messages:priority")
+        self.shared_payload_ttl = config.get('shared_payload_ttl', SHARED_PAYLOAD_TTL)
+        self._bulk_enqueue = redis_client.register_script(_BULK_ENQUEUE_SCRIPT)
         
-        # Create a queue for each agent
+        # Queues are created on first use, so any instance can read any agent's queue
         self.agent_queues = {}  # agent_id -> PriorityQueue
     
     async def dispatch(self, message: Dict[str, Any]) -> None:
@@ -223,46 +575,94 @@ class PriorityDispatcher:
         # Add the priority to the message
         message['priority'] = priority
         
-        # Add the message to the appropriate queue
-        await self.queues[priority].enqueue(message, priority)
-        logger.debug(f"Dispatched message to priority queue {priority}")
-        
         # If the message has a destination agent, add it to the agent's queue
         if 'destination' in message and message['destination'].get('type') == 'agent':
             agent_id = message['destination'].get('id')
             if agent_id:
-                if agent_id not in self.agent_queues:
-                    self.agent_queues[agent_id] = PriorityQueue(self.redis_client, f"messages:agent:{agent_id}")
-                await self.agent_queues[agent_id].enqueue(message, priority)
+                await self._get_agent_queue(agent_id).enqueue(message, priority)
                 logger.debug(f"Dispatched message to agent queue {agent_id}")
+                return
+        
+        # Otherwise add the message to the shared priority queue
+        await self.queue.enqueue(message, priority)
+        logger.debug(f"Dispatched message to priority queue {priority}")
     
-    async def get_next_message(self, agent_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    async def dispatch_bulk(self, message: Dict[str, Any], recipients: List[Tuple[str, str]]) -> None:
+        """
+        Dispatch a message to many agents' queues.
+        
+        The message is serialized and stored once. Each agent's queue gets an
+        entry with its own message ID and destination that refers to the
+        stored message, and all entries are written in one transaction of
+        server-side script calls.
+        
+        Args:
+            message: Message to dispatch
+            recipients: Message ID and agent ID of each entry
+        """
+        if not recipients:
+            return
+        
+        # Determine the priority of the message once for all recipients
+        priority_determiner = PriorityDeterminer(self.config)
+        priority = priority_determiner.determine_priority(message)
+        priority = max(0, min(priority, self.config.get('priority_levels', 6) - 1))
+        message['priority'] = priority
+        
+        serializer = self.queue.serializer
+        shared_key = f"messages:shared:{uuid4()}"
+        shared_payload = serializer.dumps(message)
+        now = _now_ms()
+        
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            for start in range(0, len(recipients), BULK_ENQUEUE_CHUNK):
+                keys = [shared_key]
+                args = [
+                    shared_payload if start == 0 else '',
+                    len(recipients),
+                    int(self.shared_payload_ttl * 1000),
+                    priority,
+                    now,
+                    SEQUENCE_SPAN,
+                ]
+                for message_id, agent_id in recipients[start:start + BULK_ENQUEUE_CHUNK]:
+                    queue = self._get_agent_queue(agent_id)
+                    keys.extend(queue._keys)
+                    keys.append(queue.sequence_key)
+                    args.append(message_id)
+                    args.append(serializer.dumps({
+                        'id': message_id,
+                        'destination': {
+                            'type': 'agent',
+                            'id': agent_id,
+                        },
+                        'priority': priority,
+                        SHARED_PAYLOAD_FIELD: shared_key,
+                    }))
+                await self._bulk_enqueue(keys=keys, args=args, client=pipe)
+            await pipe.execute()
+        
+        logger.debug(f"Dispatched message to {len(recipients)} agent queues")
+    
+    async def get_next_message(self, agent_id: Optional[str] = None, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
         """
         Get the next message to process.
         
         Args:
             agent_id: ID of the agent to get a message for (optional)
+            timeout: Seconds to wait for a message (returns immediately if
+                not given)
             
         Returns:
             Next message to process or None if there are no messages
         """
-        # If an agent ID is provided, get the next message for that agent
-        if agent_id:
-            if agent_id in self.agent_queues:
-                message = await self.agent_queues[agent_id].dequeue()
-                if message:
-                    logger.debug(f"Got next message for agent {agent_id}")
-                return message
-            return None
+        queue = self._get_agent_queue(agent_id) if agent_id else self.queue
+        message = await queue.dequeue(timeout=timeout)
         
-        # Otherwise, get the next message from the highest-priority non-empty queue
-        for priority in range(self.config.get('priority_levels', 6) - 1, -1, -1):
-            message = await self.queues[priority].dequeue()
-            if message:
-                logger.debug(f"Got next message from priority queue {priority}")
-                return message
+        if message:
+            logger.debug(f"Got next message from {queue.queue_name}")
         
-        return None
+        return message
     
     async def get_agent_queue_length(self, agent_id: str) -> int:
         """
@@ -274,13 +674,11 @@ class PriorityDispatcher:
         Returns:
             Number of messages
         """
-        if agent_id in self.agent_queues:
-            return await self.agent_queues[agent_id].get_length()
-        return 0
+        return await self._get_agent_queue(agent_id).get_length()
     
     async def get_priority_queue_length(self, priority: int) -> int:
         """
-        Get the number of messages in a priority queue.
+        Get the number of messages of a priority in the shared queue.
         
         Args:
             priority: Priority level
@@ -288,9 +686,41 @@ class PriorityDispatcher:
         Returns:
             Number of messages
         """
-        if priority in self.queues:
-            return await self.queues[priority].get_length()
-        return 0
+        return await self.queue.get_length(priority)
+    
+    def _get_agent_queue(self, agent_id: str) -> PriorityQueue:
+        """
+        Get an agent's queue, creating it if needed.
+        
+        Args:
+            agent_id: ID of the agent
+            
+        Returns:
+            The agent's queue
+        """
+        if agent_id not in self.agent_queues:
+            self.agent_queues[agent_id] = self._create_queue(f"messages:agent:{agent_id}")
+        return self.agent_queues[agent_id]
+    
+    def _create_queue(self, queue_name: str) -> PriorityQueue:
+        """
+        Create a queue with the dispatcher's fairness and aging settings.
+        
+        Args:
+            queue_name: Name of the queue
+            
+        Returns:
+            The queue
+        """
+        return PriorityQueue(
+            self.redis_client,
+            queue_name,
+            self.serializer,
+            starvation_threshold=self.config.get('starvation_threshold'),
+            aging_threshold=self.config.get('aging_threshold'),
+            aging_boost=self.config.get('aging_boost', 1),
+            max_priority=self.config.get('priority_levels', 6) - 1,
+        )
 
 
 class FairnessManager:
@@ -406,34 +836,10 @@ class PriorityInheritanceManager:
         Args:
             queue: Queue to boost messages in
         """
-        # Get all messages in the queue
-        messages = await queue.get_all()
-        
-        # Get the current time
-        now = time.time()
-        
-        # Boost the priority of aging messages
-        for message, priority in messages:
-            # Check if the message has a timestamp
-            timestamp = message.get('timestamp')
-            if timestamp:
-                # Convert the timestamp to a Unix timestamp
-                try:
-                    dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                    message_time = dt.timestamp()
-                    
-                    # Check if the message is aging
-                    age = now - message_time
-                    aging_threshold = self.config.get('aging_threshold', 300)  # 5 minutes
-                    
-                    if age > aging_threshold:
-                        # Boost the priority
-                        boost_amount = self.config.get('aging_boost', 1)
-                        new_priority = min(priority + boost_amount, self.config.get('priority_levels', 6) - 1)
-                        
-                        # Update the priority
-                        await queue.update_priority(message, new_priority)
-                        logger.debug(f"Boosted message priority from {priority} to {new_priority} due to age")
-                except (ValueError, TypeError):
-                    # If the timestamp is invalid, skip this message
-                    continue
+        # Aging runs server-side, in one round trip for the whole queue
+        boosted = await queue.boost_aging(
+            self.config.get('aging_threshold', 300),  # 5 minutes
+            self.config.get('aging_boost', 1),
+            self.config.get('priority_levels', 6) - 1,
+        )
+        logger.debug(f"Boosted priority of {boosted} aging messages in {queue.queue_name}")
@@ -5,22 +5,60 @@ This module implements various routing algorithms for agent communication:
 - Topic-based routing: Routes messages based on topics with wildcard support
 - Content-based routing: Routes messages based on message content
 - Rule-based routing: Routes messages based on configurable rules
+
+Routing rules are compiled into predicates and indexed by the fields that
+discriminate between them, so a message is only checked against the rules
+that can match it.
 """
 
+import asyncio
+import heapq
 import logging
+import operator
 import re
-from typing import List, Dict, Any, Callable, Optional, Set, Tuple
+import time
+from collections import OrderedDict
+from typing import List, Dict, Any, Callable, Optional, Set, Tuple, Union
 from uuid import UUID
 
 logger = logging.getLogger(__name__)
 
 
-class TopicRouter:
-    """Router for topic-based message routing."""
+class _TopicNode:
+    """Node of the topic subscription trie."""
+    
+    __slots__ = ('children', 'patterns', 'rest_patterns')
     
     def __init__(self):
-        """Initialize the topic router."""
+        """Initialize the node."""
+        self.children = {}  # segment -> _TopicNode
+        self.patterns = set()  # patterns ending at this node
+        self.rest_patterns = {}  # multi-level patterns -> minimum topic length
+
+
+class TopicRouter:
+    """
+    Router for topic-based message routing.
+    
+    Subscription patterns are indexed in a trie of topic segments, so
+    resolving a topic visits only the branches its segments can match
+    instead of every subscription. A ``*`` segment matches one segment, and
+    a ``#`` segment or a trailing ``*`` matches the rest of the topic.
+    Resolved topics are kept in an LRU cache that is cleared whenever the
+    subscriptions change.
+    """
+    
+    def __init__(self, cache_size: int = 1024):
+        """
+        Initialize the topic router.
+        
+        Args:
+            cache_size: Maximum number of resolved topics cached
+        """
         self.subscriptions = {}  # topic -> set of subscriber_ids
+        self.cache_size = cache_size
+        self._root = _TopicNode()
+        self._cache = OrderedDict()  # topic -> tuple of subscriber_ids
     
     def subscribe(self, topic: str, subscriber_id: str) -> None:
         """
@@ -32,7 +70,10 @@ class TopicRouter:
         """
         if topic not in self.subscriptions:
             self.subscriptions[topic] = set()
-        self.subscriptions[topic].add(subscriber_id)
+            self._index(topic)
+        if subscriber_id not in self.subscriptions[topic]:
+            self.subscriptions[topic].add(subscriber_id)
+            self._cache.clear()
         logger.debug(f"Subscriber {subscriber_id} subscribed to topic {topic}")
     
     def unsubscribe(self, topic: str, subscriber_id: str) -> None:
@@ -44,9 +85,12 @@ class TopicRouter:
             subscriber_id: ID of the subscriber
         """
         if topic in self.subscriptions:
-            self.subscriptions[topic].discard(subscriber_id)
+            if subscriber_id in self.subscriptions[topic]:
+                self.subscriptions[topic].discard(subscriber_id)
+                self._cache.clear()
             if not self.subscriptions[topic]:
                 del self.subscriptions[topic]
+                self._unindex(topic)
             logger.debug(f"Subscriber {subscriber_id} unsubscribed from topic {topic}")
     
     def get_subscribers(self, topic: str) -> List[str]:
@@ -59,6 +103,11 @@ class TopicRouter:
         Returns:
             List of subscriber IDs
         """
+        cached = self._cache.get(topic)
+        if cached is not None:
+            self._cache.move_to_end(topic)
+            return list(cached)
+        
         subscribers = set()
         
         # Exact match
@@ -66,12 +115,96 @@ class TopicRouter:
             subscribers.update(self.subscriptions[topic])
         
         # Wildcard matches
-        for subscription_topic, subscription_subscribers in self.subscriptions.items():
-            if self._topic_matches(subscription_topic, topic):
-                subscribers.update(subscription_subscribers)
+        for pattern in self._match(topic.split('.')):
+            subscribers.update(self.subscriptions[pattern])
+        
+        self._cache[topic] = tuple(subscribers)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
         
         return list(subscribers)
     
+    def _index(self, pattern: str) -> None:
+        """
+        Add a pattern to the trie.
+        
+        Args:
+            pattern: Subscription pattern
+        """
+        segments = pattern.split('.')
+        node = self._root
+        for i, segment in enumerate(segments):
+            # Segments after a multi-level wildcard are not matched, but the
+            # topic must be at least as long as the pattern
+            if segment == '#' or (segment == '*' and i == len(segments) - 1):
+                node = node.children.setdefault('#', _TopicNode())
+                node.rest_patterns[pattern] = len(segments)
+                return
+            node = node.children.setdefault(segment, _TopicNode())
+        node.patterns.add(pattern)
+    
+    def _unindex(self, pattern: str) -> None:
+        """
+        Remove a pattern from the trie and prune empty nodes.
+        
+        Args:
+            pattern: Subscription pattern
+        """
+        segments = pattern.split('.')
+        path = []
+        node = self._root
+        for i, segment in enumerate(segments):
+            key = '#' if segment == '#' or (segment == '*' and i == len(segments) - 1) else segment
+            child = node.children.get(key)
+            if child is None:
+                return
+            path.append((node, key))
+            node = child
+            if key == '#':
+                node.rest_patterns.pop(pattern, None)
+                break
+        else:
+            node.patterns.discard(pattern)
+        
+        for parent, key in reversed(path):
+            child = parent.children[key]
+            if child.children or child.patterns or child.rest_patterns:
+                break
+            del parent.children[key]
+    
+    def _match(self, segments: List[str]) -> Set[str]:
+        """
+        Find the patterns that match a topic.
+        
+        Args:
+            segments: Topic segments
+            
+        Returns:
+            Matching subscription patterns
+        """
+        matches = set()
+        length = len(segments)
+        nodes = [self._root]
+        for segment in segments:
+            next_nodes = []
+            for node in nodes:
+                rest = node.children.get('#')
+                if rest is not None:
+                    matches.update(pattern for pattern, min_length in rest.rest_patterns.items() if min_length <= length)
+                child = node.children.get(segment)
+                if child is not None:
+                    next_nodes.append(child)
+                child = node.children.get('*')
+                if child is not None:
+                    next_nodes.append(child)
+            nodes = next_nodes
+            if not nodes:
+                return matches
+        
+        for node in nodes:
+            matches.update(node.patterns)
+        return matches
+    
     def _topic_matches(self, pattern: str, topic: str) -> bool:
         """
         Check if a topic matches a pattern.
@@ -113,21 +246,416 @@ class TopicRouter:
         return len(pattern_segments) == len(topic_segments)
 
 
+# Message fields rules are indexed by, most selective first
+_INDEX_FIELDS = (
+    ('source_agent_id',),
+    ('headers', 'topic'),
+    ('type',),
+)
+
+# Operators of conditions that rules can be indexed by
+_EQUALITY_OPERATORS = ('eq', 'equals')
+
+# Comparison operators of conditions, applied as operator(value, target value)
+_OPERATORS = {
+    'eq': operator.eq,
+    'equals': operator.eq,
+    'neq': operator.ne,
+    'not_equals': operator.ne,
+    'gt': operator.gt,
+    'lt': operator.lt,
+    'gte': operator.ge,
+    'lte': operator.le,
+    'in': lambda value, target_value: value in target_value,
+    'contains': operator.contains,
+}
+
+
+def _never(message: Dict[str, Any]) -> bool:
+    """Predicate of conditions that never match."""
+    return False
+
+
+def _path_getter(path: Tuple[str, ...]) -> Callable[[Dict[str, Any]], Any]:
+    """
+    Compile a getter of a field of a message.
+    
+    Args:
+        path: Keys of the field in nested dictionaries
+    
+    Returns:
+        Function that returns the field of a message, or None if it is missing
+    """
+    if len(path) == 1:
+        key = path[0]
+        return lambda message: message.get(key)
+    
+    if len(path) == 2:
+        outer, inner = path
+        
+        def get(message: Dict[str, Any]) -> Any:
+            value = message.get(outer)
+            return value.get(inner) if isinstance(value, dict) else None
+        
+        return get
+    
+    def get(message: Dict[str, Any]) -> Any:
+        value = message
+        for key in path:
+            if not isinstance(value, dict):
+                return None
+            value = value.get(key)
+        return value
+    
+    return get
+
+
+def _destination_id(message: Dict[str, Any]) -> Optional[str]:
+    """Get the ID of a message's destination agent."""
+    destination = message.get('destination') or {}
+    return destination.get('id') if destination.get('type') == 'agent' else None
+
+
+# Getters of the indexed fields
+_INDEX_GETTERS = tuple(_path_getter(path) for path in _INDEX_FIELDS)
+
+
+def _compile_comparison(
+    get: Callable[[Dict[str, Any]], Any],
+    operator_name: str,
+    target_value: Any,
+) -> Callable[[Dict[str, Any]], bool]:
+    """
+    Compile a comparison of a field of a message into a predicate.
+    
+    Args:
+        get: Getter of the field
+        operator_name: Operator to use
+        target_value: Value to compare against
+    
+    Returns:
+        Predicate that is False when the field is missing
+    """
+    if operator_name in _EQUALITY_OPERATORS:
+        def predicate(message: Dict[str, Any]) -> bool:
+            value = get(message)
+            return value is not None and value == target_value
+        
+        return predicate
+    
+    if operator_name == 'matches':
+        pattern = re.compile(target_value)
+        compare = lambda value: bool(pattern.match(value))
+    elif operator_name in _OPERATORS:
+        operator_function = _OPERATORS[operator_name]
+        compare = lambda value: operator_function(value, target_value)
+    else:
+        return _never
+    
+    def predicate(message: Dict[str, Any]) -> bool:
+        value = get(message)
+        return value is not None and compare(value)
+    
+    return predicate
+
+
+def _compile_all(predicates: List[Callable[[Dict[str, Any]], bool]]) -> Callable[[Dict[str, Any]], bool]:
+    """
+    Compile predicates into one that short-circuits on the first failure.
+    
+    Args:
+        predicates: Predicates that must all hold
+    
+    Returns:
+        Combined predicate
+    """
+    if not predicates:
+        return lambda message: True
+    if len(predicates) == 1:
+        return predicates[0]
+    
+    predicates = tuple(predicates)
+    
+    def predicate(message: Dict[str, Any]) -> bool:
+        for condition in predicates:
+            if not condition(message):
+                return False
+        return True
+    
+    return predicate
+
+
+class _CompiledRule:
+    """Rule compiled into a predicate, with its evaluation counters."""
+    
+    __slots__ = (
+        'position', 'name', 'target', 'predicate', 'index_key', 'keyed', 'is_terminal',
+        'hits', 'evaluations', 'evaluation_time_ns',
+    )
+    
+    def __init__(self, position: int, name: str, target: Any, predicate: Callable, is_terminal: bool):
+        """Initialize the compiled rule."""
+        self.position = position
+        self.name = name
+        self.target = target  # what the router does when the rule matches
+        self.predicate = predicate  # conditions not implied by the index
+        self.index_key = None  # (field path, value) the rule is indexed by
+        self.keyed = False  # whether the predicate only reads indexed fields
+        self.is_terminal = is_terminal
+        self.hits = 0
+        self.evaluations = 0
+        self.evaluation_time_ns = 0
+
+
+class _RuleIndex:
+    """
+    Rules compiled into predicates and indexed by discriminating fields.
+    
+    A rule with an equality condition on the source agent, header topic or
+    message type is indexed by the required value, and the condition is
+    dropped from its predicate. The rules that can match a message are those
+    indexed by its values and the unindexed ones, in the order they were
+    added.
+    
+    Candidate rules are cached by the message's values of the indexed
+    fields. When none of the candidates reads other fields, the cache holds
+    the decision itself: the rules that match, up to the first terminal one.
+    The cache is cleared whenever a rule is added.
+    """
+    
+    def __init__(self, cache_size: int = 1024):
+        """
+        Initialize the rule index.
+        
+        Args:
+            cache_size: Maximum number of routing decisions cached
+        """
+        self.rules: List[_CompiledRule] = []
+        self.cache_size = cache_size
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._index = {}  # (field path, value) -> positions of rules
+        self._unindexed = []  # positions of rules that are not indexed
+        self._cache = OrderedDict()  # values of the indexed fields -> (rules, decided)
+    
+    def add(
+        self,
+        name: str,
+        target: Any,
+        conditions: Optional[List['Condition']] = None,
+        predicate: Optional[Callable[[Dict[str, Any]], bool]] = None,
+        is_terminal: bool = False,
+    ) -> _CompiledRule:
+        """
+        Compile and index a rule.
+        
+        Args:
+            name: Rule name
+            target: What the router does when the rule matches
+            conditions: Conditions that must all be met
+            predicate: Opaque predicate, used if no conditions are given
+            is_terminal: Whether matching the rule stops rule processing
+        
+        Returns:
+            The compiled rule
+        """
+        position = len(self.rules)
+        
+        if conditions is None:
+            compiled = _CompiledRule(position, name, target, predicate, is_terminal)
+            self._unindexed.append(position)
+        else:
+            index_condition = self._index_condition(conditions)
+            residual = [condition for condition in conditions if condition is not index_condition]
+            compiled = _CompiledRule(
+                position,
+                name,
+                target,
+                _compile_all([condition.predicate for condition in residual]),
+                is_terminal,
+            )
+            compiled.keyed = all(
+                condition.path in _INDEX_FIELDS or condition.predicate is _never
+                for condition in residual
+            )
+            
+            if index_condition is None:
+                self._unindexed.append(position)
+            else:
+                compiled.index_key = (index_condition.path, index_condition.value)
+                self._index.setdefault(compiled.index_key, []).append(position)
+        
+        self.rules.append(compiled)
+        self._cache.clear()
+        return compiled
+    
+    def candidates(self, message: Dict[str, Any]) -> Tuple[Tuple[_CompiledRule, ...], bool]:
+        """
+        Get the rules that can match a message.
+        
+        Args:
+            message: Message to route
+        
+        Returns:
+            Tuple of (rules, decided). If decided, the rules are known to
+            match and end at the first terminal one; otherwise their
+            predicates still have to be evaluated.
+        """
+        key = tuple(get(message) for get in _INDEX_GETTERS)
+        try:
+            entry = self._cache.get(key)
+        except TypeError:
+            # Unhashable field values cannot be indexed or cached
+            return tuple(self.rules[position] for position in self._unindexed), False
+        
+        if entry is not None:
+            self._cache.move_to_end(key)
+            self.cache_hits += 1
+            return entry
+        
+        self.cache_misses += 1
+        buckets = [self._unindexed]
+        for path, value in zip(_INDEX_FIELDS, key):
+            bucket = self._index.get((path, value))
+            if bucket:
+                buckets.append(bucket)
+        positions = buckets[0] if len(buckets) == 1 else heapq.merge(*buckets)
+        rules = tuple(self.rules[position] for position in positions)
+        
+        if all(rule.keyed for rule in rules):
+            # The outcome of every candidate depends only on the key
+            matched = []
+            for rule in rules:
+                if self.evaluate(rule, message):
+                    matched.append(rule)
+                    if rule.is_terminal:
+                        break
+            entry = (tuple(matched), True)
+        else:
+            entry = (rules, False)
+        
+        self._cache[key] = entry
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        
+        return entry
+    
+    def evaluate(self, rule: _CompiledRule, message: Dict[str, Any]) -> bool:
+        """
+        Evaluate a rule's predicate, counting the evaluation and its time.
+        
+        Args:
+            rule: Rule to evaluate
+            message: Message to evaluate the rule on
+        
+        Returns:
+            True if the rule matches, False otherwise
+        """
+        start = time.perf_counter_ns()
+        matched = bool(rule.predicate(message))
+        rule.evaluation_time_ns += time.perf_counter_ns() - start
+        rule.evaluations += 1
+        return matched
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get the counters of the rules and the decision cache.
+        
+        Returns:
+            Hits, evaluations and evaluation time of each rule, and cache
+            counters
+        """
+        return {
+            'rules': [
+                {
+                    'name': rule.name,
+                    'indexed': rule.index_key is not None,
+                    'hits': rule.hits,
+                    'evaluations': rule.evaluations,
+                    'evaluation_time_ms': rule.evaluation_time_ns / 1_000_000,
+                }
+                for rule in self.rules
+            ],
+            'cache': {
+                'size': len(self._cache),
+                'hits': self.cache_hits,
+                'misses': self.cache_misses,
+            },
+        }
+    
+    @staticmethod
+    def _index_condition(conditions: List['Condition']) -> Optional['Condition']:
+        """
+        Choose the condition a rule is indexed by.
+        
+        Args:
+            conditions: Conditions of the rule
+        
+        Returns:
+            Equality condition on the most selective indexed field, or None
+        """
+        for path in _INDEX_FIELDS:
+            for condition in conditions:
+                if (
+                    condition.path == path
+                    and condition.operator in _EQUALITY_OPERATORS
+                    and condition.value is not None
+                ):
+                    try:
+                        hash(condition.value)
+                    except TypeError:
+                        continue
+                    return condition
+        return None
+
+
 class ContentRouter:
-    """Router for content-based message routing."""
+    """
+    Router for content-based message routing.
     
-    def __init__(self):
-        """Initialize the content router."""
+    A rule's condition is either a function of the message, which is called
+    for every message, or a list of condition definitions as used by
+    rule-based routing, which are compiled and indexed so that only rules
+    that can match a message are evaluated.
+    """
+    
+    def __init__(self, cache_size: int = 1024):
+        """
+        Initialize the content router.
+        
+        Args:
+            cache_size: Maximum number of routing decisions cached
+        """
         self.rules = []  # list of (condition, destination) tuples
+        self._rules = _RuleIndex(cache_size)
     
-    def add_rule(self, condition: Callable[[Dict[str, Any]], bool], destination: str) -> None:
+    def add_rule(
+        self,
+        condition: Union[Callable[[Dict[str, Any]], bool], List[Dict[str, Any]]],
+        destination: str,
+    ) -> None:
         """
         Add a routing rule.
         
         Args:
-            condition: Function that takes a message and returns True if the rule applies
+            condition: Function that takes a message and returns True if the
+                rule applies, or condition definitions that must all be met
             destination: Destination for messages that match the condition
-        """
+        
+        Raises:
+            TypeError: If the condition is a coroutine function
+        """
+        if callable(condition):
+            if asyncio.iscoroutinefunction(condition):
+                raise TypeError("Content-based routing conditions must be synchronous")
+            self._rules.add(str(destination), destination, predicate=condition)
+        else:
+            conditions = [
+                c if isinstance(c, Condition) else Condition.from_dict(c)
+                for c in condition
+            ]
+            self._rules.add(str(destination), destination, conditions=conditions)
+        
         self.rules.append((condition, destination))
         logger.debug(f"Added content-based routing rule to destination {destination}")
     
@@ -142,24 +670,42 @@ class ContentRouter:
             List of destination IDs
         """
         destinations = []
+        rules, decided = self._rules.candidates(message)
         
-        for condition, destination in self.rules:
-            if condition(message):
-                destinations.append(destination)
-                logger.debug(f"Message matched content-based rule for destination {destination}")
+        for rule in rules:
+            if decided or self._rules.evaluate(rule, message):
+                rule.hits += 1
+                destinations.append(rule.target)
+                logger.debug(f"Message matched content-based rule for destination {rule.target}")
         
         return destinations
 
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get the counters of the rules and the decision cache.
+        
+        Returns:
+            Rule and cache counters
+        """
+        return self._rules.get_stats()
+
 
 class Condition:
-    """Condition for rule-based routing."""
+    """
+    Condition for rule-based routing.
     
-    def __init__(self, condition_type: str, field: str, operator: str, value: Any):
+    The condition is compiled into a predicate when it is created. A
+    condition without a type reads the field at a dotted path of the message,
+    such as ``type`` or ``headers.interaction_type``.
+    """
+    
+    def __init__(self, condition_type: Optional[str], field: str, operator: str, value: Any):
         """
         Initialize the condition.
         
         Args:
-            condition_type: Type of condition (field, header, source, destination)
+            condition_type: Type of condition (field, header, source,
+                destination, or None for a dotted path of the message)
             field: Field to check
             operator: Operator to use
             value: Value to compare against
@@ -168,6 +714,7 @@ class Condition:
         self.field = field
         self.operator = operator
         self.value = value
+        self.path, self.predicate = self._compile()
     
     @classmethod
     def from_dict(cls, condition_dict: Dict[str, Any]) -> 'Condition':
@@ -197,117 +744,30 @@ class Condition:
         Returns:
             True if the condition matches, False otherwise
         """
-        if self.condition_type == 'field':
-            return self._evaluate_field_condition(message)
-        elif self.condition_type == 'header':
-            return self._evaluate_header_condition(message)
-        elif self.condition_type == 'source':
-            return self._evaluate_source_condition(message)
-        elif self.condition_type == 'destination':
-            return self._evaluate_destination_condition(message)
-        
-        return False
-    
-    def _evaluate_field_condition(self, message: Dict[str, Any]) -> bool:
-        """
-        Evaluate a field condition.
-        
-        Args:
-            message: Message to evaluate
-            
-        Returns:
-            True if the condition is met, False otherwise
-        """
-        # Get the field value from the message
-        field_value = message.get('payload', {}).get(self.field)
-        
-        # Evaluate the condition
-        return self._evaluate_condition(field_value, self.operator, self.value)
-    
-    def _evaluate_header_condition(self, message: Dict[str, Any]) -> bool:
-        """
-        Evaluate a header condition.
-        
-        Args:
-            message: Message to evaluate
-            
-        Returns:
-            True if the condition is met, False otherwise
-        """
-        # Get the header value from the message
-        header_value = message.get('headers', {}).get(self.field)
-        
-        # Evaluate the condition
-        return self._evaluate_condition(header_value, self.operator, self.value)
-    
-    def _evaluate_source_condition(self, message: Dict[str, Any]) -> bool:
-        """
-        Evaluate a source condition.
-        
-        Args:
-            message: Message to evaluate
-            
-        Returns:
-            True if the condition is met, False otherwise
-        """
-        # Get the source agent ID from the message
-        source_agent_id = message.get('source_agent_id')
-        
-        # Evaluate the condition
-        return self._evaluate_condition(source_agent_id, self.operator, self.value)
-    
-    def _evaluate_destination_condition(self, message: Dict[str, Any]) -> bool:
-        """
-        Evaluate a destination condition.
+        return self.predicate(message)
         
-        Args:
-            message: Message to evaluate
-            
-        Returns:
-            True if the condition is met, False otherwise
-        """
-        # Get the destination agent ID from the message
-        destination = message.get('destination', {})
-        destination_id = destination.get('id') if destination.get('type') == 'agent' else None
-        
-        # Evaluate the condition
-        return self._evaluate_condition(destination_id, self.operator, self.value)
-    
-    def _evaluate_condition(self, value: Any, operator: str, target_value: Any) -> bool:
+    def _compile(self) -> Tuple[Optional[Tuple[str, ...]], Callable[[Dict[str, Any]], bool]]:
         """
-        Evaluate a condition.
-        
-        Args:
-            value: Value to evaluate
-            operator: Operator to use
-            target_value: Value to compare against
+        Compile the condition into a predicate.
             
         Returns:
-            True if the condition is met, False otherwise
+            Tuple of (path of the field read, or None if it is not a plain
+            field, predicate)
         """
-        if value is None:
-            return False
+        if self.condition_type == 'field':
+            path = ('payload', self.field)
+        elif self.condition_type == 'header':
+            path = ('headers', self.field)
+        elif self.condition_type == 'source':
+            path = ('source_agent_id',)
+        elif self.condition_type == 'destination':
+            return None, _compile_comparison(_destination_id, self.operator, self.value)
+        elif self.condition_type is None and self.field:
+            path = tuple(self.field.split('.'))
+        else:
+            return None, _never
         
-        if operator == 'eq':
-            return value == target_value
-        elif operator == 'neq':
-            return value != target_value
-        elif operator == 'gt':
-            return value > target_value
-        elif operator == 'lt':
-            return value < target_value
-        elif operator == 'gte':
-            return value >= target_value
-        elif operator == 'lte':
-            return value <= target_value
-        elif operator == 'in':
-            return value in target_value
-        elif operator == 'contains':
-            return target_value in value
-        elif operator == 'matches':
-            return bool(re.match(target_value, value))
-        
-        return False
+        return path, _compile_comparison(_path_getter(path), self.operator, self.value)
 
 
 class Action:
@@ -318,11 +778,18 @@ class Action:
         Initialize the action.
         
         Args:
-            action_type: Type of action (route, transform, log, drop)
+            action_type: Type of action (route, set_priority, transform, log, drop)
             **kwargs: Additional action parameters
         """
         self.action_type = action_type
         self.params = kwargs
+        self._execute = {
+            'route': self._execute_route_action,
+            'set_priority': self._execute_set_priority_action,
+            'transform': self._execute_transform_action,
+            'log': self._execute_log_action,
+            'drop': self._execute_drop_action,
+        }.get(action_type)
     
     @classmethod
     def from_dict(cls, action_dict: Dict[str, Any]) -> 'Action':
@@ -348,16 +815,10 @@ class Action:
         Returns:
             Modified message
         """
-        if self.action_type == 'route':
-            return self._execute_route_action(message)
-        elif self.action_type == 'transform':
-            return self._execute_transform_action(message)
-        elif self.action_type == 'log':
-            return self._execute_log_action(message)
-        elif self.action_type == 'drop':
-            return self._execute_drop_action(message)
+        if self._execute is None:
+            return message
         
-        return message
+        return self._execute(message)
     
     def _execute_route_action(self, message: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -370,7 +831,9 @@ class Action:
             Modified message
         """
         destination = self.params.get('destination')
-        if destination:
+        if isinstance(destination, dict):
+            message['destination'] = dict(destination)
+        elif destination:
             message['destination'] = {
                 'type': 'agent',
                 'id': destination
@@ -378,6 +841,22 @@ class Action:
         
         return message
     
+    def _execute_set_priority_action(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Execute a set priority action.
+        
+        Args:
+            message: Message to prioritize
+        
+        Returns:
+            Modified message
+        """
+        priority = self.params.get('priority')
+        if priority is not None:
+            message['priority'] = priority
+        
+        return message
+    
     def _execute_transform_action(self, message: Dict[str, Any]) -> Dict[str, Any]:
         """
         Execute a transform action.
@@ -475,6 +954,7 @@ class Rule:
         self.conditions = conditions
         self.actions = actions
         self.is_terminal = is_terminal
+        self.predicate = _compile_all([condition.predicate for condition in conditions])
     
     @classmethod
     def from_dict(cls, rule_dict: Dict[str, Any]) -> 'Rule':
@@ -504,7 +984,7 @@ class Rule:
         Returns:
             True if the rule matches, False otherwise
         """
-        return all(condition.matches(message) for condition in self.conditions)
+        return self.predicate(message)
     
     def get_destinations(self, message: Dict[str, Any]) -> List[str]:
         """
@@ -537,23 +1017,53 @@ class Rule:
         if not self.matches(message):
             return message, False
         
+        modified_message = self.execute(message)
+        if modified_message is None:
+            return None, True
+        
+        return modified_message, self.is_terminal
+    
+    def execute(self, message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Execute the rule's actions on a message.
+        
+        Args:
+            message: Message to act on
+        
+        Returns:
+            Modified message or None if the message was dropped
+        """
         modified_message = message
         for action in self.actions:
             result = action.execute(modified_message)
             if result is None:
                 # Message was dropped
-                return None, True
+                return None
             modified_message = result
         
-        return modified_message, self.is_terminal
+        return modified_message
 
 
 class RuleBasedRouter:
-    """Router for rule-based message routing."""
+    """
+    Router for rule-based message routing.
     
-    def __init__(self):
-        """Initialize the rule-based router."""
+    Rules are compiled when they are added and indexed by the source agent,
+    header topic and message type they require, so routing a message
+    evaluates only the rules that can match it, in the order they were
+    added. Per-rule hit and evaluation counters are available from
+    get_stats().
+    """
+    
+    def __init__(self, cache_size: int = 1024):
+        """
+        Initialize the rule-based router.
+        
+        Args:
+            cache_size: Maximum number of routing decisions cached
+        """
         self.rules = []  # list of Rule objects
+        self._rules = _RuleIndex(cache_size)
     
     def add_rule(self, rule: Rule) -> None:
         """
@@ -563,6 +1073,7 @@ class RuleBasedRouter:
             rule: Rule to add
         """
         self.rules.append(rule)
+        self._rules.add(rule.name, rule, conditions=rule.conditions, is_terminal=rule.is_terminal)
         logger.debug(f"Added rule-based routing rule: {rule.name}")
     
     def add_rule_from_dict(self, rule_dict: Dict[str, Any]) -> None:
@@ -586,13 +1097,15 @@ class RuleBasedRouter:
             List of destination IDs
         """
         destinations = []
+        rules, decided = self._rules.candidates(message)
         
-        for rule in self.rules:
-            if rule.matches(message):
-                destinations.extend(rule.get_destinations(message))
+        for compiled in rules:
+            if decided or self._rules.evaluate(compiled, message):
+                compiled.hits += 1
+                destinations.extend(compiled.target.get_destinations(message))
                 
                 # If the rule is marked as terminal, stop processing rules
-                if rule.is_terminal:
+                if compiled.is_terminal:
                     break
         
         return destinations
@@ -608,16 +1121,28 @@ class RuleBasedRouter:
             Modified message or None if the message was dropped
         """
         modified_message = message
+        rules, decided = self._rules.candidates(message)
         
-        for rule in self.rules:
-            result, stop = rule.apply(modified_message)
-            if result is None:
+        for compiled in rules:
+            if not decided and not self._rules.evaluate(compiled, modified_message):
+                continue
+            
+            compiled.hits += 1
+            modified_message = compiled.target.execute(modified_message)
+            if modified_message is None:
                 # Message was dropped
                 return None
             
-            modified_message = result
-            
-            if stop:
+            if compiled.is_terminal:
                 break
         
         return modified_message
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get the counters of the rules and the decision cache.
+        
+        Returns:
+            Rule and cache counters
+        """
+        return self._rules.get_stats()
@@ -11,7 +11,7 @@ import json
 import asyncio
 from sqlalchemy import select, func, or_, and_
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional, Tuple, Dict, Any, Callable
+from typing import List, Optional, Tuple, Dict, Any, Callable, Union
 from uuid import UUID
 from datetime import datetime
 
@@ -19,6 +19,7 @@ from shared.utils.src.messaging import EventBus, CommandBus
 from shared.utils.src.redis import get_redis_client
 
 from ..config import AgentOrchestratorConfig
+from ..database import async_session
 from ..exceptions import (
     AgentNotFoundError,
     AgentCommunicationError,
@@ -34,7 +35,7 @@ from ..models.internal import (
 )
 
 from .communication.hub import CommunicationHub
-from .communication.metrics_collector import MetricsCollector
+from .communication.metrics_collector import get_metrics_collector
 from .communication.alerting_service import AlertingService
 
 logger = logging.getLogger(__name__)
@@ -72,8 +73,9 @@ class EnhancedCommunicationService:
         # Initialize Redis client
         self.redis_client = get_redis_client(settings.redis_url)
         
-        # Initialize metrics collector
-        self.metrics_collector = MetricsCollector(lambda: db)
+        # Get the shared metrics collector, which writes in the background
+        # with its own sessions rather than this request's session
+        self.metrics_collector = get_metrics_collector(async_session)
         
         # Initialize alerting service
         self.alerting_service = AlertingService(lambda: db, self.metrics_collector)
@@ -449,12 +451,15 @@ class EnhancedCommunicationService:
     async def receive_message(
         self,
         agent_id: UUID,
+        timeout: Optional[float] = None,
     ) -> Optional[Dict[str, Any]]:
         """
         Receive a message for an agent.
         
         Args:
             agent_id: Agent ID
+            timeout: Seconds to wait for a message (returns immediately if
+                not given)
             
         Returns:
             Optional[Dict[str, Any]]: Message or None if no message is available
@@ -472,7 +477,7 @@ class EnhancedCommunicationService:
                 raise AgentNotFoundError(agent_id)
             
             # Receive a message from the hub
-            message = await self.hub.receive_message(str(agent_id))
+            message = await self.hub.receive_message(str(agent_id), timeout=timeout)
             
             if message:
                 # Mark the communication as delivered
@@ -727,6 +732,74 @@ class EnhancedCommunicationService:
             
             return None
     
+    async def send_requests(
+        self,
+        from_agent_id: UUID,
+        to_agent_ids: List[UUID],
+        content: Dict[str, Any],
+        timeout: float = 60.0,
+        quorum: Optional[int] = None,
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Send a request to multiple agents and collect their replies.
+        
+        Args:
+            from_agent_id: Sender agent ID
+            to_agent_ids: Recipient agent IDs
+            content: Request content
+            timeout: Timeout in seconds for all replies
+            quorum: Number of replies to wait for (all agents if not given)
+            
+        Returns:
+            Dict[str, Optional[Dict[str, Any]]]: Reply of each agent, or None
+            for agents that did not reply
+            
+        Raises:
+            AgentNotFoundError: If agent not found
+        """
+        try:
+            # Check if sender agent exists
+            query = select(AgentModel).where(AgentModel.id == from_agent_id)
+            result = await self.db.execute(query)
+            from_agent = result.scalars().first()
+            
+            if not from_agent:
+                raise AgentNotFoundError(from_agent_id)
+            
+            # Create request
+            request = {
+                'source_agent_id': str(from_agent_id),
+                'type': 'request',
+                'payload': content,
+                'headers': {
+                    'project_id': str(from_agent.project_id),
+                },
+            }
+            
+            # Send the request to all agents and wait for the replies
+            replies = await self.hub.send_requests(
+                request,
+                [str(agent_id) for agent_id in to_agent_ids],
+                timeout,
+                quorum,
+            )
+            
+            received = sum(1 for reply in replies.values() if reply is not None)
+            logger.info(f"Received {received} of {len(to_agent_ids)} replies for request from {from_agent_id}")
+            
+            return replies
+        except Exception as e:
+            logger.error(f"Error sending request from {from_agent_id} to {len(to_agent_ids)} agents: {str(e)}")
+            
+            if isinstance(e, AgentNotFoundError):
+                raise
+            
+            raise AgentCommunicationError(
+                from_agent_id=from_agent_id,
+                to_agent_id=UUID('00000000-0000-0000-0000-000000000000'),
+                message=f"Failed to send request: {str(e)}",
+            )
+    
     async def broadcast(
         self,
         from_agent_id: UUID,
@@ -791,14 +864,15 @@ class EnhancedCommunicationService:
     
     async def add_content_rule(
         self,
-        condition: Callable[[Dict[str, Any]], bool],
+        condition: Union[Callable[[Dict[str, Any]], bool], List[Dict[str, Any]]],
         destination_agent_id: UUID,
     ) -> None:
         """
         Add a content-based routing rule.
         
         Args:
-            condition: Function that takes a message and returns True if the rule applies
+            condition: Function that takes a message and returns True if the
+                rule applies, or condition definitions that must all be met
             destination_agent_id: Destination agent ID
         """
         await self.hub.add_content_rule(condition, str(destination_agent_id))
@@ -364,6 +364,103 @@ async def test_priority_dispatcher(redis_client):
     assert message['payload']['message'] == 'Low priority message'
 
 
+@pytest.mark.asyncio
+async def test_priority_queue_is_fifo_within_priority(redis_client):
+    """
+    Test that messages of the same priority are dequeued in arrival order,
+    and that messages with identical content are kept apart.
+    """
+    # Create priority queue
+    queue = PriorityQueue(redis_client, 'test_queue')
+    
+    # Enqueue messages whose content would sort in reverse order
+    for text in ['c', 'b', 'a', 'a']:
+        await queue.enqueue({'id': str(uuid.uuid4()), 'payload': {'message': text}}, 2)
+    await queue.enqueue({'id': str(uuid.uuid4()), 'payload': {'message': 'urgent'}}, 5)
+    
+    # Check that the urgent message comes first, then arrival order
+    received = []
+    while (message := await queue.dequeue()) is not None:
+        received.append(message['payload']['message'])
+    assert received == ['urgent', 'c', 'b', 'a', 'a']
+
+
+@pytest.mark.asyncio
+async def test_priority_queue_blocking_dequeue(redis_client):
+    """
+    Test that a blocking dequeue waits for a message instead of polling.
+    """
+    # Create priority queue
+    queue = PriorityQueue(redis_client, 'test_queue')
+    
+    # Start waiting before the message is enqueued
+    waiter = asyncio.create_task(queue.dequeue(timeout=5.0))
+    await asyncio.sleep(0.1)
+    await queue.enqueue({'id': str(uuid.uuid4()), 'payload': {'message': 'late'}}, 1)
+    
+    # Check that the waiting consumer received the message
+    message = await asyncio.wait_for(waiter, 5.0)
+    assert message['payload']['message'] == 'late'
+    assert await queue.get_length() == 0
+    assert await redis_client.hlen(queue.payloads_key) == 0
+    
+    # Check that an empty queue times out
+    assert await queue.dequeue(timeout=0.1) is None
+
+
+@pytest.mark.asyncio
+async def test_priority_queue_fairness_and_aging(redis_client):
+    """
+    Test that starved messages are served first and aging boosts priority.
+    """
+    # Create a queue that serves messages waiting more than 100 ms first
+    queue = PriorityQueue(redis_client, 'test_queue', starvation_threshold=0.1)
+    await queue.enqueue({'id': str(uuid.uuid4()), 'payload': {'message': 'old'}}, 0)
+    await asyncio.sleep(0.2)
+    await queue.enqueue({'id': str(uuid.uuid4()), 'payload': {'message': 'new'}}, 5)
+    
+    # Check that the starved message is served first
+    message = await queue.dequeue()
+    assert message['payload']['message'] == 'old'
+    await queue.dequeue()
+    
+    # Check that aging boosts waiting messages up to the maximum priority
+    await queue.enqueue({'id': str(uuid.uuid4()), 'payload': {'message': 'low'}}, 1)
+    await queue.enqueue({'id': str(uuid.uuid4()), 'payload': {'message': 'high'}}, 4)
+    await asyncio.sleep(0.2)
+    assert await queue.boost_aging(0.1, aging_boost=2, max_priority=5) == 2
+    
+    messages = await queue.get_all()
+    assert [(message['payload']['message'], priority) for message, priority in messages] == [('high', 5), ('low', 3)]
+
+
+@pytest.mark.asyncio
+async def test_priority_dispatcher_queues_messages_once(redis_client):
+    """
+    Test that agent messages are only queued for their agent.
+    """
+    # Create priority dispatcher
+    dispatcher = PriorityDispatcher(redis_client, {'priority_levels': 6, 'default_priority': 2})
+    agent_id = str(uuid.uuid4())
+    
+    # Dispatch an agent message and an unaddressed message
+    await dispatcher.dispatch({
+        'id': str(uuid.uuid4()),
+        'destination': {'type': 'agent', 'id': agent_id},
+        'type': 'test_message',
+    })
+    await dispatcher.dispatch({'id': str(uuid.uuid4()), 'type': 'test_message'})
+    
+    # Check that each message is queued once
+    assert await dispatcher.get_agent_queue_length(agent_id) == 1
+    assert await dispatcher.get_priority_queue_length(2) == 1
+    
+    # Check that another dispatcher instance can read the agent's queue
+    other = PriorityDispatcher(redis_client, {'priority_levels': 6})
+    message = await other.get_next_message(agent_id)
+    assert message['destination']['id'] == agent_id
+
+
 @pytest.mark.asyncio
 async def test_request_reply(communication_hub):
     """
@@ -410,13 +507,149 @@ async def test_request_reply(communication_hub):
     # Register reply handler
     await communication_hub.register_message_handler('request', reply_handler)
     
+    # Let the responder receive the request
+    responder = asyncio.create_task(communication_hub.receive_message(responder_id, timeout=1.0))
+    
     # Send request and wait for reply
     reply = await communication_hub.send_request(request, timeout=1.0)
+    await responder
     
     # Check that the reply was received
     assert reply is not None
     assert reply['type'] == 'reply'
     assert reply['payload']['message'] == 'Test reply'
+    
+    # Check that the request was forgotten and no reply handler was left behind
+    assert communication_hub.pending_requests == {}
+    assert 'reply' not in communication_hub.message_handlers
+
+
+async def serve_requests(hub, agent_id, delay=0.0):
+    """
+    Receive one request for an agent and reply to it after a delay.
+    """
+    request = await hub.receive_message(agent_id, timeout=1.0)
+    await asyncio.sleep(delay)
+    await hub.send_message({
+        'source_agent_id': agent_id,
+        'destination': {
+            'type': 'agent',
+            'id': request['reply_to'],
+        },
+        'type': 'reply',
+        'correlation_id': request['correlation_id'],
+        'payload': {
+            'agent_id': agent_id,
+        },
+    })
+
+
+@pytest.mark.asyncio
+async def test_request_timeout_cleans_up(communication_hub):
+    """
+    Test that timed out and cancelled requests are removed from the registry.
+    """
+    requester_id = str(uuid.uuid4())
+    request = {
+        'source_agent_id': requester_id,
+        'destination': {
+            'type': 'agent',
+            'id': str(uuid.uuid4()),
+        },
+        'type': 'request',
+    }
+    
+    # Time out a request that nobody answers
+    assert await communication_hub.send_request(dict(request), timeout=0.05) is None
+    
+    # Cancel a request while it waits for a reply
+    task = asyncio.create_task(communication_hub.send_request(dict(request), timeout=1.0))
+    await asyncio.sleep(0.05)
+    assert len(communication_hub.pending_requests) == 1
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    
+    assert communication_hub.pending_requests == {}
+    assert communication_hub._request_slots == {}
+
+
+@pytest.mark.asyncio
+async def test_outstanding_requests_are_bounded(communication_hub):
+    """
+    Test that an agent waits for a slot when it has too many outstanding requests.
+    """
+    communication_hub.max_outstanding_requests = 2
+    requester_id = str(uuid.uuid4())
+    responder_ids = [str(uuid.uuid4()) for _ in range(3)]
+    
+    tasks = [
+        asyncio.create_task(communication_hub.send_request({
+            'source_agent_id': requester_id,
+            'destination': {
+                'type': 'agent',
+                'id': responder_id,
+            },
+            'type': 'request',
+        }, timeout=1.0))
+        for responder_id in responder_ids
+    ]
+    await asyncio.sleep(0.05)
+    
+    # Only two requests were sent
+    assert len(communication_hub.pending_requests) == 2
+    
+    # Replying to the sent requests frees a slot for the third
+    for responder_id in responder_ids:
+        await serve_requests(communication_hub, responder_id)
+    replies = await asyncio.gather(*tasks)
+    
+    assert [reply['payload']['agent_id'] for reply in replies] == responder_ids
+    assert communication_hub._request_slots == {}
+
+
+@pytest.mark.asyncio
+async def test_send_requests(communication_hub):
+    """
+    Test scatter-gather requests with and without a quorum.
+    """
+    requester_id = str(uuid.uuid4())
+    responder_ids = [str(uuid.uuid4()) for _ in range(3)]
+    request = {
+        'source_agent_id': requester_id,
+        'type': 'request',
+        'payload': {
+            'message': 'Test request',
+        },
+    }
+    
+    # Two agents reply, one does not
+    responders = [
+        asyncio.create_task(serve_requests(communication_hub, responder_id))
+        for responder_id in responder_ids[:2]
+    ]
+    replies = await communication_hub.send_requests(request, responder_ids, timeout=0.5)
+    await asyncio.gather(*responders)
+    
+    assert list(replies) == responder_ids
+    assert [reply['payload']['agent_id'] for reply in replies.values() if reply] == responder_ids[:2]
+    assert replies[responder_ids[2]] is None
+    assert communication_hub.pending_requests == {}
+    
+    # With a quorum, slow agents are not waited for
+    responder_ids = [str(uuid.uuid4()) for _ in range(3)]
+    responders = [
+        asyncio.create_task(serve_requests(communication_hub, responder_id, delay=0.5 if i else 0.0))
+        for i, responder_id in enumerate(responder_ids)
+    ]
+    start_time = asyncio.get_running_loop().time()
+    replies = await communication_hub.send_requests(request, responder_ids, timeout=5.0, quorum=1)
+    
+    assert asyncio.get_running_loop().time() - start_time < 0.5
+    assert replies[responder_ids[0]]['payload']['agent_id'] == responder_ids[0]
+    assert replies[responder_ids[1]] is None and replies[responder_ids[2]] is None
+    assert communication_hub.pending_requests == {}
+    await asyncio.gather(*responders)
 
 
 @pytest.mark.asyncio
@@ -451,3 +684,71 @@ async def test_broadcast(communication_hub):
         assert received_message is not None
         assert received_message['type'] == 'broadcast'
         assert received_message['payload']['message'] == 'Test broadcast'
+
+
+@pytest.mark.asyncio
+async def test_broadcast_stores_payload_once(communication_hub, redis_client):
+    """
+    Test that a broadcast stores its payload once and releases it when every
+    receiver has received the message.
+    """
+    sender_id = str(uuid.uuid4())
+    receiver_ids = [str(uuid.uuid4()) for _ in range(50)]
+    message = {
+        'source_agent_id': sender_id,
+        'type': 'broadcast',
+        'payload': {
+            'message': 'x' * 1000,
+        },
+    }
+    
+    message_ids = await communication_hub.broadcast(message, receiver_ids)
+    
+    # The caller's message is not modified and each receiver has its own message ID
+    assert 'id' not in message and 'destination' not in message
+    assert len(set(message_ids)) == len(receiver_ids)
+    
+    # The payload is stored once
+    shared_keys = await redis_client.keys('messages:shared:*')
+    assert len(shared_keys) == 1
+    
+    # Each receiver gets the full message
+    queue = communication_hub.priority_dispatcher._get_agent_queue(receiver_ids[0])
+    [(peeked, _)] = await queue.get_all()
+    assert peeked['payload'] == message['payload']
+    
+    for receiver_id, message_id in zip(receiver_ids, message_ids):
+        received_message = await communication_hub.receive_message(receiver_id)
+        assert received_message['id'] == message_id
+        assert received_message['destination']['id'] == receiver_id
+        assert received_message['source_agent_id'] == sender_id
+        assert received_message['payload'] == message['payload']
+    
+    # The payload is deleted with the last entry
+    assert await redis_client.keys('messages:shared:*') == []
+
+
+@pytest.mark.asyncio
+async def test_publish_to_many_subscribers(communication_hub):
+    """
+    Test publishing a message to many subscribers.
+    """
+    topic = "test.topic"
+    subscriber_ids = [str(uuid.uuid4()) for _ in range(20)]
+    for subscriber_id in subscriber_ids:
+        await communication_hub.subscribe(subscriber_id, topic)
+    
+    message = {
+        'source_agent_id': str(uuid.uuid4()),
+        'type': 'test_message',
+        'payload': {
+            'message': 'Test message',
+        },
+    }
+    message_id = await communication_hub.publish_to_topic(topic, message)
+    
+    assert message_id == message['id']
+    for subscriber_id in subscriber_ids:
+        received_message = await communication_hub.receive_message(subscriber_id)
+        assert received_message['headers']['topic'] == topic
+        assert received_message['payload']['message'] == 'Test message'
@@ -0,0 +1,42 @@
+"""
+Tests for the latency histogram.
+"""
+
+import random
+
+from ....src.services.communication.latency_histogram import LatencyHistogram
+
+
+def test_bins_cover_values_without_gaps():
+    """
+    Test that consecutive bins cover consecutive ranges of values.
+    """
+    end = 0
+    for bin in range(LatencyHistogram.bin_of(10 ** 7) + 1):
+        low, high = LatencyHistogram.bin_range(bin)
+        
+        assert low == end
+        assert LatencyHistogram.bin_of(low) == LatencyHistogram.bin_of(high - 1) == bin
+        end = high
+
+
+def test_percentiles_are_within_the_bin_error():
+    """
+    Test that percentiles of merged histograms are close to the exact values.
+    """
+    rng = random.Random(3)
+    values = [rng.lognormvariate(4, 1.5) for _ in range(20000)]
+    merged = LatencyHistogram()
+    for start in range(0, len(values), 5000):
+        histogram = LatencyHistogram()
+        for value in values[start:start + 5000]:
+            histogram.record(value)
+        merged.merge(histogram)
+    
+    exact = sorted(int(value) for value in values)
+    for percentile in (50, 95, 99):
+        expected = exact[int(percentile / 100 * len(exact)) - 1]
+        
+        assert abs(merged.percentile(percentile) - expected) <= max(expected * 0.035, 1)
+    assert merged.total == len(values)
+    assert LatencyHistogram().percentiles() == {"p50": None, "p95": None, "p99": None}
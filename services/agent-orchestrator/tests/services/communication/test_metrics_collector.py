@@ -0,0 +1,245 @@
+"""
+Tests for the buffered metrics collector.
+"""
+
+import math
+import uuid
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from ....src.models.internal import AgentModel
+from ....src.models.metrics import (
+    AgentMetricsModel,
+    MessageLatencyHistogramModel,
+    MessageMetricsModel,
+    MessageMetricsRollupModel,
+    MessageStatus,
+    TopicMetricsModel,
+)
+from ....src.services.communication.metrics_collector import MetricsCollector
+
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    """
+    Create a session factory for a SQLite database with the metrics tables.
+    """
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'metrics.db'}")
+    tables = [
+        model.__table__
+        for model in (
+            AgentModel,
+            MessageMetricsModel,
+            AgentMetricsModel,
+            TopicMetricsModel,
+            MessageMetricsRollupModel,
+            MessageLatencyHistogramModel,
+        )
+    ]
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: MessageMetricsModel.metadata.create_all(sync_conn, tables=tables))
+    
+    yield sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    
+    await engine.dispose()
+
+
+async def fetch_all(session_factory, model):
+    """
+    Fetch all rows of a metrics model.
+    """
+    async with session_factory() as session:
+        result = await session.execute(select(model))
+        return result.scalars().all()
+
+
+@pytest.mark.asyncio
+async def test_message_lifecycle_is_written_as_one_row(session_factory):
+    """
+    Test that the events of a message buffered together are written as one row.
+    """
+    collector = MetricsCollector(session_factory)
+    message_id = uuid.uuid4()
+    source_id = uuid.uuid4()
+    destination_id = uuid.uuid4()
+    
+    await collector.track_message_created(
+        message_id, source_id, None, topic="agent.status", priority=3, metadata={"type": "event"}
+    )
+    await collector.track_message_routed(message_id, {"destination_type": "agent"})
+    await collector.track_message_delivered(message_id, destination_id)
+    await collector.track_message_processed(message_id, processing_time_ms=40)
+    await collector.track_message_created(uuid.uuid4(), source_id, None, topic="agent.status")
+    await collector.stop()
+    
+    messages = await fetch_all(session_factory, MessageMetricsModel)
+    assert len(messages) == 2
+    message = next(m for m in messages if str(m.message_id) == str(message_id))
+    assert message.status == MessageStatus.PROCESSED
+    assert str(message.destination_agent_id) == str(destination_id)
+    assert message.processing_time_ms == 40
+    assert message.message_metadata == {"type": "event"}
+    assert message.queue_time_ms is not None and message.total_time_ms is not None
+    
+    agents = {str(a.agent_id): a for a in await fetch_all(session_factory, AgentMetricsModel)}
+    assert agents[str(source_id)].messages_sent == 2
+    assert agents[str(destination_id)].messages_received == 1
+    assert agents[str(destination_id)].average_processing_time_ms == 40
+    
+    topics = await fetch_all(session_factory, TopicMetricsModel)
+    assert [(t.topic, t.message_count) for t in topics] == [("agent.status", 2)]
+
+
+@pytest.mark.asyncio
+async def test_later_batches_update_rows_and_counters(session_factory):
+    """
+    Test that events flushed after a message was written update its row and
+    add to the daily counters.
+    """
+    collector = MetricsCollector(session_factory)
+    first_id = uuid.uuid4()
+    second_id = uuid.uuid4()
+    destination_id = uuid.uuid4()
+    
+    await collector.track_message_created(first_id, None, None, metadata={"type": "request"})
+    await collector.track_message_created(second_id, None, None)
+    await collector.update_topic_subscriber_count("agent.status", 2)
+    await collector.flush()
+    
+    await collector.track_message_failed(first_id, "Message was dropped during routing")
+    await collector.track_message_delivered(second_id, destination_id)
+    await collector.track_message_processed(second_id, processing_time_ms=10)
+    await collector.flush()
+    
+    await collector.track_message_processed(uuid.uuid4(), processing_time_ms=30)
+    await collector.track_message_processed(second_id, processing_time_ms=30)
+    await collector.stop()
+    
+    messages = {str(m.message_id): m for m in await fetch_all(session_factory, MessageMetricsModel)}
+    assert messages[str(first_id)].status == MessageStatus.FAILED
+    assert messages[str(first_id)].message_metadata == {
+        "type": "request",
+        "error_message": "Message was dropped during routing",
+    }
+    assert messages[str(second_id)].status == MessageStatus.PROCESSED
+    
+    agents = await fetch_all(session_factory, AgentMetricsModel)
+    assert len(agents) == 1
+    assert agents[0].messages_received == 1
+    assert agents[0].messages_processed == 2
+    assert agents[0].average_processing_time_ms == 20
+    
+    topics = await fetch_all(session_factory, TopicMetricsModel)
+    assert [(t.topic, t.subscriber_count, t.message_count) for t in topics] == [("agent.status", 2, 0)]
+
+
+@pytest.mark.asyncio
+async def test_messages_sent_to_many_agents_are_one_event(session_factory):
+    """
+    Test that messages sent to many agents are buffered as one event and
+    written as a row per message.
+    """
+    collector = MetricsCollector(session_factory)
+    source_id = uuid.uuid4()
+    message_ids = [uuid.uuid4() for _ in range(5)]
+    destination_ids = [uuid.uuid4() for _ in range(5)]
+    
+    await collector.track_messages_sent(
+        message_ids, source_id, destination_ids, topic="agent.status", priority=2, queue_time_ms=3
+    )
+    assert len(collector._buffer) == 1
+    
+    await collector.track_message_delivered(message_ids[0], destination_ids[0])
+    await collector.track_message_processed(message_ids[0], processing_time_ms=20)
+    await collector.stop()
+    
+    messages = {str(m.message_id): m for m in await fetch_all(session_factory, MessageMetricsModel)}
+    assert len(messages) == 5
+    assert messages[str(message_ids[0])].status == MessageStatus.PROCESSED
+    assert messages[str(message_ids[1])].status == MessageStatus.ROUTED
+    assert messages[str(message_ids[1])].queue_time_ms == 3
+    assert str(messages[str(message_ids[1])].destination_agent_id) == str(destination_ids[1])
+    
+    topics = await fetch_all(session_factory, TopicMetricsModel)
+    assert [(t.topic, t.message_count) for t in topics] == [("agent.status", 5)]
+    
+    metrics = await collector.get_performance_metrics(use_rollups=True)
+    assert metrics["message_count"] == 5
+    assert metrics["status_counts"]["ROUTED"] == 4
+    assert metrics["status_counts"]["PROCESSED"] == 1
+
+
+@pytest.mark.asyncio
+async def test_overload_policies_bound_the_buffer():
+    """
+    Test that a full buffer drops events according to the overload policy.
+    """
+    newest = MetricsCollector(None, buffer_size=10, batch_size=100, overload_policy="drop_newest")
+    oldest = MetricsCollector(None, buffer_size=10, batch_size=100, overload_policy="drop_oldest")
+    sampled = MetricsCollector(None, buffer_size=1000, batch_size=10000, overload_policy="sample", sample_rate=0.1)
+    message_ids = [uuid.uuid4() for _ in range(2000)]
+    
+    for message_id in message_ids[:15]:
+        await newest.track_message_failed(message_id)
+        await oldest.track_message_failed(message_id)
+    for message_id in message_ids:
+        await sampled.track_message_created(message_id, None, None)
+        await sampled.track_message_routed(message_id)
+    
+    assert [event[1] for event in newest._buffer] == message_ids[:10]
+    assert [event[1] for event in oldest._buffer] == message_ids[5:15]
+    assert newest.stats["dropped"] == oldest.stats["dropped"] == 5
+    assert len(sampled._buffer) <= 1000
+    assert sampled.stats["sampled_out"] > 0
+    kept = [event[1] for event in list(sampled._buffer)[500:]]
+    assert all(kept.count(message_id) == 2 for message_id in kept[1:-1])
+    
+    with pytest.raises(ValueError):
+        MetricsCollector(None, overload_policy="block")
+
+
+@pytest.mark.asyncio
+async def test_rollups_match_a_scan_of_the_message_table(session_factory):
+    """
+    Test that performance metrics read from the rollups match those computed
+    from the message table.
+    """
+    collector = MetricsCollector(session_factory, batch_size=7)
+    agents = [uuid.uuid4() for _ in range(3)]
+    processing_times = []
+    
+    for i in range(60):
+        message_id = uuid.uuid4()
+        await collector.track_message_created(message_id, agents[i % 3], None, topic=f"topic.{i % 4}")
+        if i % 5 == 0:
+            await collector.track_message_failed(message_id, "Message was dropped during routing")
+            continue
+        await collector.track_message_routed(message_id)
+        if i % 5 == 1:
+            continue
+        await collector.track_message_delivered(message_id, agents[(i + 1) % 3])
+        if i % 5 == 2:
+            continue
+        processing_times.append(i * 10)
+        await collector.track_message_processed(message_id, processing_time_ms=i * 10)
+    await collector.stop()
+    
+    rollup = await collector.get_performance_metrics(use_rollups=True)
+    scanned = await collector.get_performance_metrics(use_rollups=False)
+    
+    assert rollup["message_count"] == scanned["message_count"] == 60
+    assert rollup["status_counts"] == scanned["status_counts"] == {
+        "CREATED": 0, "ROUTED": 12, "DELIVERED": 12, "PROCESSED": 24, "FAILED": 12,
+    }
+    assert rollup["avg_processing_time_ms"] == pytest.approx(scanned["avg_processing_time_ms"])
+    assert rollup["avg_queue_time_ms"] == pytest.approx(scanned["avg_queue_time_ms"])
+    assert sorted(rollup["top_topics"], key=str) == sorted(scanned["top_topics"], key=str)
+    assert sorted(rollup["top_source_agents"], key=str) == sorted(scanned["top_source_agents"], key=str)
+    
+    processing_times.sort()
+    p95 = rollup["latency_percentiles_ms"]["processing"]["p95"]
+    assert p95 == pytest.approx(processing_times[math.ceil(0.95 * len(processing_times)) - 1], rel=0.03)
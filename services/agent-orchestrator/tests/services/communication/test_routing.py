@@ -0,0 +1,222 @@
+"""
+Tests for the communication hub routers.
+"""
+
+import random
+
+import pytest
+
+from ....src.services.communication.routing import ContentRouter, Rule, RuleBasedRouter, TopicRouter
+
+
+def brute_force_subscribers(router, topic):
+    """
+    Resolve a topic by matching it against every subscription pattern.
+    """
+    subscribers = set()
+    for pattern, pattern_subscribers in router.subscriptions.items():
+        if pattern == topic or router._topic_matches(pattern, topic):
+            subscribers.update(pattern_subscribers)
+    return subscribers
+
+
+def test_topic_router_wildcards():
+    """
+    Test single-level and multi-level wildcard subscriptions.
+    """
+    router = TopicRouter()
+    router.subscribe('agent.status', 'exact')
+    router.subscribe('agent.*.created', 'single')
+    router.subscribe('agent.*', 'trailing')
+    router.subscribe('agent.#', 'rest')
+    router.subscribe('task.#.done', 'long-rest')
+    
+    assert set(router.get_subscribers('agent.status')) == {'exact', 'trailing', 'rest'}
+    assert set(router.get_subscribers('agent.task.created')) == {'single', 'trailing', 'rest'}
+    assert set(router.get_subscribers('agent')) == set()
+    assert set(router.get_subscribers('task.a')) == set()
+    assert set(router.get_subscribers('task.a.b')) == {'long-rest'}
+
+
+def test_topic_router_matches_brute_force():
+    """
+    Test that the subscription index resolves the same subscribers as
+    matching every pattern.
+    """
+    rng = random.Random(7)
+    segments = ['agent', 'task', 'status', 'created', '*', '#']
+    router = TopicRouter(cache_size=16)
+    patterns = [
+        '.'.join(rng.choice(segments) for _ in range(rng.randint(1, 4)))
+        for _ in range(200)
+    ]
+    for i, pattern in enumerate(patterns):
+        router.subscribe(pattern, f'agent-{i % 50}')
+    for pattern in patterns[::3]:
+        router.unsubscribe(pattern, f'agent-{patterns.index(pattern) % 50}')
+    
+    for _ in range(500):
+        topic = '.'.join(rng.choice(segments[:4]) for _ in range(rng.randint(1, 5)))
+        
+        assert set(router.get_subscribers(topic)) == brute_force_subscribers(router, topic)
+
+
+def test_topic_router_cache_is_invalidated():
+    """
+    Test that cached topics reflect later subscription changes.
+    """
+    router = TopicRouter()
+    router.subscribe('agent.*', 'first')
+    assert router.get_subscribers('agent.status') == ['first']
+    
+    router.subscribe('agent.#', 'second')
+    assert set(router.get_subscribers('agent.status')) == {'first', 'second'}
+    
+    router.unsubscribe('agent.*', 'first')
+    router.unsubscribe('agent.#', 'second')
+    assert router.get_subscribers('agent.status') == []
+    assert router._root.children == {}
+
+
+def interpreted_route(rules, message):
+    """
+    Route a message by applying every rule in order.
+    """
+    for rule in rules:
+        message, stop = rule.apply(message)
+        if message is None or stop:
+            break
+    return message
+
+
+def random_rule(rng, i):
+    """
+    Create a rule definition with random conditions.
+    """
+    conditions = []
+    if rng.random() < 0.6:
+        conditions.append({'type': 'source', 'operator': 'eq', 'value': f'agent-{rng.randrange(10)}'})
+    if rng.random() < 0.5:
+        conditions.append({'field': 'type', 'operator': rng.choice(['eq', 'neq']), 'value': rng.choice(['task', 'event'])})
+    if rng.random() < 0.4:
+        conditions.append({'type': 'header', 'field': 'topic', 'operator': 'eq', 'value': f'topic.{rng.randrange(3)}'})
+    if rng.random() < 0.3:
+        conditions.append({'type': 'field', 'field': 'size', 'operator': rng.choice(['gt', 'lte']), 'value': rng.randrange(10)})
+    if rng.random() < 0.1:
+        conditions.append({'type': 'destination', 'field': 'id', 'operator': 'eq', 'value': 'agent-1'})
+    
+    actions = [{'type': 'route', 'destination': f'rule-{i}'}]
+    if rng.random() < 0.05:
+        actions = [{'type': 'drop'}]
+    
+    return {
+        'name': f'rule-{i}',
+        'conditions': conditions,
+        'actions': actions,
+        'is_terminal': rng.random() < 0.2,
+    }
+
+
+def random_message(rng):
+    """
+    Create a message with random routing fields.
+    """
+    return {
+        'source_agent_id': f'agent-{rng.randrange(12)}',
+        'type': rng.choice(['task', 'event', 'request']),
+        'headers': {'topic': f'topic.{rng.randrange(4)}'},
+        'payload': {'size': rng.randrange(10)},
+    }
+
+
+def test_rule_router_matches_interpreted_rules():
+    """
+    Test that indexed and cached rule evaluation routes messages like
+    applying every rule in order.
+    """
+    rng = random.Random(11)
+    router = RuleBasedRouter(cache_size=32)
+    for i in range(300):
+        router.add_rule_from_dict(random_rule(rng, i))
+    
+    for _ in range(2000):
+        message = random_message(rng)
+        expected = interpreted_route(router.rules, dict(message))
+        
+        assert router.route_message(dict(message)) == expected
+
+
+def test_rule_router_evaluates_only_candidate_rules():
+    """
+    Test that rules indexed by source agent are not evaluated for other
+    agents' messages, and that decisions are served from the cache.
+    """
+    router = RuleBasedRouter()
+    for i in range(100):
+        router.add_rule(Rule.from_dict({
+            'name': f'rule-{i}',
+            'conditions': [
+                {'type': 'source', 'operator': 'eq', 'value': f'agent-{i}'},
+                {'field': 'type', 'operator': 'equals', 'value': 'task'},
+            ],
+            'actions': [{'type': 'route', 'destination': f'worker-{i}'}],
+            'is_terminal': True,
+        }))
+    
+    message = {'source_agent_id': 'agent-7', 'type': 'task'}
+    assert router.route_message(dict(message))['destination'] == {'type': 'agent', 'id': 'worker-7'}
+    assert router.route_message(dict(message))['destination'] == {'type': 'agent', 'id': 'worker-7'}
+    assert 'destination' not in router.route_message({'source_agent_id': 'agent-7', 'type': 'event'})
+    
+    stats = router.get_stats()
+    assert sum(rule['evaluations'] for rule in stats['rules']) == 2
+    assert stats['rules'][7]['hits'] == 2
+    assert stats['rules'][7]['indexed']
+    assert stats['cache'] == {'size': 2, 'hits': 1, 'misses': 2}
+
+
+def test_rule_router_supports_message_paths():
+    """
+    Test rules whose conditions name dotted message paths, as created for
+    collaboration patterns.
+    """
+    router = RuleBasedRouter()
+    router.add_rule_from_dict({
+        'name': 'review',
+        'conditions': [
+            {'field': 'source_agent_id', 'operator': 'equals', 'value': 'agent-1'},
+            {'field': 'headers.interaction_type', 'operator': 'equals', 'value': 'REVIEW'},
+        ],
+        'actions': [
+            {'type': 'route', 'destination': {'type': 'agent', 'id': 'agent-2'}},
+            {'type': 'set_priority', 'priority': 3},
+        ],
+    })
+    
+    routed = router.route_message({'source_agent_id': 'agent-1', 'headers': {'interaction_type': 'REVIEW'}})
+    
+    assert routed['destination'] == {'type': 'agent', 'id': 'agent-2'}
+    assert routed['priority'] == 3
+    assert 'destination' not in router.route_message({'source_agent_id': 'agent-1', 'headers': {}})
+
+
+def test_content_router_compiles_condition_definitions():
+    """
+    Test content-based rules given as functions and as condition definitions.
+    """
+    router = ContentRouter()
+    router.add_rule(lambda message: message.get('payload', {}).get('urgent'), 'urgent-handler')
+    router.add_rule([{'field': 'headers.topic', 'operator': 'eq', 'value': 'alerts'}], 'alert-handler')
+    
+    assert router.get_destinations({'headers': {'topic': 'alerts'}, 'payload': {'urgent': True}}) == [
+        'urgent-handler',
+        'alert-handler',
+    ]
+    assert router.get_destinations({'headers': {'topic': 'news'}}) == []
+    assert [rule['hits'] for rule in router.get_stats()['rules']] == [1, 1]
+    
+    async def condition(message):
+        return True
+    
+    with pytest.raises(TypeError):
+        router.add_rule(condition, 'async-handler')
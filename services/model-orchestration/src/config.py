@@ -31,9 +31,19 @@ class ModelOrchestrationConfig(BaseServiceConfig):
     
     # Ollama
     ollama_url: str = Field("http://ollama:11434", description="Ollama API URL")
+    ollama_timeout: float = Field(300.0, description="Ollama request timeout in seconds (local generation is slow)")
+    ollama_max_connections: int = Field(20, description="Maximum pooled connections to the Ollama server")
+    ollama_keepalive_expiry: float = Field(60.0, description="Seconds an idle pooled Ollama connection is kept open")
+    ollama_model_concurrency: int = Field(1, description="Maximum concurrent requests per Ollama model")
+    ollama_keep_alive: str = Field("5m", description="How long Ollama keeps a model loaded after a request")
     
     # Service URLs
     agent_orchestrator_url: Optional[str] = Field(None, description="Agent Orchestrator service URL")
+    agent_orchestrator_timeout: float = Field(5.0, description="Agent Orchestrator request timeout in seconds")
+    
+    # Agent specialization cache
+    specialization_cache_ttl: float = Field(300.0, description="Seconds a cached agent specialization stays valid")
+    specialization_cache_max_entries: int = Field(256, description="Maximum number of cached agent specializations")
     
     # Model configuration
     default_model: str = Field("gpt-3.5-turbo", description="Default model to use")
@@ -42,10 +52,36 @@ class ModelOrchestrationConfig(BaseServiceConfig):
     max_retries: int = Field(3, description="Maximum number of retries")
     retry_delay: float = Field(1.0, description="Delay between retries in seconds")
     
+    # Model registry cache
+    model_registry_ttl: float = Field(300.0, description="Seconds a cached model registry lookup stays valid")
+    model_registry_max_entries: int = Field(1024, description="Maximum number of cached model registry lookups")
+    
+    # Performance tracking
+    performance_flush_interval: float = Field(5.0, description="Seconds between write-behind flushes of model performance results")
+    
+    # Embedding batching
+    embedding_batch_window_ms: float = Field(5.0, description="Milliseconds an embedding batch waits for more inputs")
+    embedding_cache_max_entries: int = Field(2048, description="Maximum number of cached embeddings (0 disables the cache)")
+    
+    # Response cache
+    enable_response_cache: bool = Field(False, description="Serve repeated deterministic (temperature=0) requests from the response cache")
+    response_cache_ttl: float = Field(3600.0, description="Seconds a cached response stays valid")
+    response_cache_max_entries_per_tenant: int = Field(256, description="Maximum cached responses per tenant (project or user)")
+    response_cache_use_redis: bool = Field(True, description="Share cached responses across instances through Redis")
+    response_cache_similarity_threshold: Optional[float] = Field(None, description="Minimum prompt embedding similarity for serving a near-duplicate prompt (off if not set)")
+    response_cache_embedding_model: str = Field("text-embedding-3-small", description="Embedding model for response cache similarity lookups")
+    
+    # Admission scheduling
+    enable_admission_scheduler: bool = Field(True, description="Admit provider requests within per-model rate budgets")
+    provider_rate_limits: Dict[str, Dict[str, int]] = Field(default_factory=dict, description="requests_per_minute and tokens_per_minute by provider or provider/model (unlimited if not set)")
+    admission_timeout: float = Field(60.0, description="Seconds a request waits for rate budget before failing")
+    rate_limit_cooldown: float = Field(5.0, description="Seconds dispatch to a model pauses after a provider rate-limit error without retry-after")
+    
     # Token limits
     max_input_tokens: int = Field(8000, description="Maximum input tokens")
     max_output_tokens: int = Field(2000, description="Maximum output tokens")
     token_buffer_percentage: float = Field(0.1, description="Token buffer percentage")
+    token_count_cache_size: int = Field(4096, description="Maximum number of memoized token counts")
     
     # Cost tracking
     enable_cost_tracking: bool = Field(True, description="Enable cost tracking")
@@ -12,6 +12,12 @@ from .exceptions import AuthenticationError
 from shared.models.src.enums import ModelProvider
 from .services.model_service import ModelService
 from .services.performance_tracker import PerformanceTracker
+from .services.performance_aggregator import get_performance_aggregator
+from .services.model_registry import get_model_registry
+from .services.specialization_client import get_specialization_client
+from .services.embedding_batcher import get_embedding_batcher
+from .services.response_cache import get_response_cache
+from .services.admission_scheduler import get_admission_scheduler
 from .providers.provider_factory import get_provider_factory
 
 # OAuth2 scheme for token authentication
@@ -165,6 +171,9 @@ async def get_performance_tracker(
         db=db,
         event_bus=event_bus,
         settings=settings,
+        aggregator=get_performance_aggregator(settings),
+        response_cache=get_response_cache(settings) if settings.enable_response_cache else None,
+        admission_scheduler=get_admission_scheduler(settings) if settings.enable_admission_scheduler else None,
     )
 
 
@@ -196,4 +205,9 @@ async def get_model_service(
         settings=settings,
         provider_factory=provider_factory,
         performance_tracker=performance_tracker,
+        model_registry=get_model_registry(settings),
+        specialization_client=get_specialization_client(settings),
+        embedding_batcher=get_embedding_batcher(settings),
+        response_cache=get_response_cache(settings) if settings.enable_response_cache else None,
+        admission_scheduler=get_admission_scheduler(settings) if settings.enable_admission_scheduler else None,
     )
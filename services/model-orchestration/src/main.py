@@ -10,12 +10,16 @@ from datetime import datetime
 
 # Import shared modules
 from .database import init_db, close_db_connection, check_db_connection
-from shared.utils.src.messaging import init_messaging, close_messaging
+from shared.utils.src.messaging import init_messaging, close_messaging, get_event_bus
 
 # Import local modules
 from .config import ModelOrchestrationConfig, config, get_settings
 from .dependencies import get_model_service
 from .exceptions import ModelServiceError, ProviderError
+from .providers import get_provider_factory
+from .services.model_registry import get_model_registry
+from .services.performance_aggregator import get_performance_aggregator
+from .services.specialization_client import get_specialization_client
 from .routers import models, performance
 
 # Setup logging
@@ -48,10 +52,17 @@ async def lifespan(app: FastAPI):
         await init_db()
         logger.info("Database initialized")
         
+        # Start write-behind performance aggregation
+        await get_performance_aggregator(config).start()
+        
         # Initialize messaging
         await init_messaging(service_name="model-orchestration")
         logger.info("Messaging initialized")
         
+        # Keep the model registry cache in sync across instances
+        await get_model_registry(config).subscribe(get_event_bus())
+        await get_specialization_client(config).subscribe(get_event_bus())
+        
     except Exception as e:
         logger.error(f"Error during startup: {str(e)}")
         raise
@@ -62,6 +73,15 @@ async def lifespan(app: FastAPI):
     logger.info("Shutting down Model Orchestration Service")
     
     try:
+        # Close provider connection pools
+        await get_provider_factory(config).close()
+        await get_specialization_client(config).close()
+        logger.info("Provider connections closed")
+        
+        # Flush buffered performance results
+        await get_performance_aggregator(config).stop()
+        logger.info("Performance results flushed")
+        
         # Close messaging connections
         await close_messaging()
         logger.info("Messaging connections closed")
@@ -53,6 +53,7 @@ class ChatRequest(RequestBase):
     """
     request_type: RequestType = RequestType.CHAT
     messages: List[ChatMessage]
+    stream: bool = False  # Stream the response as server-sent events
     
     model_config = {
         "schema_extra": {
@@ -82,6 +83,7 @@ class CompletionRequest(RequestBase):
     """
     request_type: RequestType = RequestType.COMPLETION
     prompt: str
+    stream: bool = False  # Stream the response as server-sent events
     
     model_config = {
         "schema_extra": {
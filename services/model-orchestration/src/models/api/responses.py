@@ -26,6 +26,7 @@ __all__ = [
     "AudioTranscriptionResponse",
     "AudioTranslationResponse",
     "ModelResponseWrapper",
+    "StreamChunk",
 ]
 
 
@@ -145,3 +146,26 @@ class ModelResponseWrapper(BaseModel):
     provider: str
     latency_ms: float
     cost: Optional[float] = None
+
+
+class StreamChunk(BaseModel):
+    """
+    Incremental piece of a streamed chat or completion response.
+    
+    Providers fill the delta fields; the final chunk of a stream carries
+    the token usage, and the model service adds request accounting to it.
+    """
+    id: str
+    object: str = "chat.completion.chunk"
+    created: int
+    model: str
+    index: int = 0
+    delta: str = ""
+    finish_reason: Optional[str] = None
+    usage: Optional[TokenUsage] = None
+    request_id: Optional[str] = None
+    provider: Optional[str] = None
+    cost: Optional[float] = None
+    latency_ms: Optional[float] = None
+    time_to_first_token_ms: Optional[float] = None
+    inter_token_latency_ms: Optional[float] = None
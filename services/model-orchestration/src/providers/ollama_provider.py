@@ -0,0 +1,797 @@
+import asyncio
+import json
+import logging
+import math
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Dict, Any, AsyncIterator, List, Optional, Union
+
+import httpx
+
+from ..config import ModelOrchestrationConfig
+from ..exceptions import (
+    ModelNotFoundError,
+    ModelServiceError,
+    ProviderNotAvailableError,
+    RequestTimeoutError,
+    InvalidRequestError,
+)
+from ..models.api import (
+    ChatRequest,
+    CompletionRequest,
+    EmbeddingRequest,
+    ImageGenerationRequest,
+    AudioTranscriptionRequest,
+    AudioTranslationRequest,
+    ChatResponse,
+    CompletionResponse,
+    EmbeddingResponse,
+    ImageGenerationResponse,
+    AudioTranscriptionResponse,
+    AudioTranslationResponse,
+    ChatResponseChoice,
+    CompletionResponseChoice,
+    EmbeddingResponseData,
+    TokenUsage,
+    StreamChunk,
+)
+from ..models import ChatMessage, MessageRole
+from .provider_interface import ModelProvider as ModelProviderInterface
+
+logger = logging.getLogger(__name__)
+
+# Prefix that routes any model ID to Ollama (e.g. "ollama/llama3:8b")
+MODEL_PREFIX = "ollama/"
+
+# Model families served locally by Ollama
+LOCAL_MODEL_FAMILIES = (
+    "llama",
+    "codellama",
+    "mistral",
+    "mixtral",
+    "gemma",
+    "phi",
+    "qwen",
+    "deepseek",
+    "starcoder",
+    "nomic-embed",
+    "mxbai-embed",
+)
+
+# Rough characters per token for models without a local tokenizer
+CHARS_PER_TOKEN = 4
+
+
+class ModelQueue:
+    """
+    Per-model request queue.
+    
+    A semaphore bounds the number of concurrent requests a model serves;
+    waiters are admitted in FIFO order. Wait times are accumulated so the
+    queueing delay can be reported separately from inference time.
+    """
+    
+    def __init__(self, concurrency: int):
+        """
+        Initialize the queue.
+        
+        Args:
+            concurrency: Maximum concurrent requests for the model
+        """
+        self.concurrency = concurrency
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.waiting = 0
+        self.active = 0
+        self.completed = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get queue metrics.
+        
+        Returns:
+            Dict[str, Any]: Queue depth, active requests and wait times
+        """
+        return {
+            "concurrency": self.concurrency,
+            "waiting": self.waiting,
+            "active": self.active,
+            "completed": self.completed,
+            "avg_wait_ms": self.wait_ms_total / self.completed if self.completed else 0.0,
+            "max_wait_ms": self.wait_ms_max,
+        }
+
+
+class OllamaProvider(ModelProviderInterface):
+    """
+    Ollama provider implementation for locally served models.
+    
+    Requests share one keep-alive HTTP connection pool. Each model has its
+    own queue, since a local GPU serves a model's requests largely serially
+    and queueing in the service is cheaper than queueing in Ollama.
+    """
+    
+    def __init__(
+        self,
+        settings: ModelOrchestrationConfig,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        """
+        Initialize the Ollama provider.
+        
+        Args:
+            settings: Application settings
+            transport: Optional HTTP transport (e.g. a stub server in tests)
+        """
+        self.settings = settings
+        self.client: Optional[httpx.AsyncClient] = None
+        self._transport = transport
+        self._available_models: Dict[str, Dict[str, Any]] = {}
+        self._queues: Dict[str, ModelQueue] = {}
+    
+    @property
+    def provider_name(self) -> str:
+        """
+        Get the provider name.
+        
+        Returns:
+            str: Provider name
+        """
+        return "ollama"
+    
+    @property
+    def max_embedding_batch_size(self) -> int:
+        """
+        Get the maximum number of inputs per embedding call.
+        
+        Larger batches are accepted, but hold the model's queue slot longer.
+        
+        Returns:
+            int: Maximum batch size
+        """
+        return 256
+    
+    @property
+    def available_models(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the available models for this provider.
+        
+        Returns:
+            Dict[str, Dict[str, Any]]: Dictionary of model ID to model info
+        """
+        return self._available_models
+    
+    async def initialize(self) -> None:
+        """
+        Initialize the provider.
+        """
+        # Initialize pooled HTTP client
+        self.client = httpx.AsyncClient(
+            base_url=self.settings.ollama_url,
+            timeout=httpx.Timeout(self.settings.ollama_timeout, connect=5.0),
+            limits=httpx.Limits(
+                max_connections=self.settings.ollama_max_connections,
+                max_keepalive_connections=self.settings.ollama_max_connections,
+                keepalive_expiry=self.settings.ollama_keepalive_expiry,
+            ),
+            transport=self._transport,
+        )
+        
+        # Initialize available models
+        await self._initialize_models()
+    
+    async def close(self) -> None:
+        """
+        Close the HTTP connection pool.
+        """
+        if self.client:
+            await self.client.aclose()
+            self.client = None
+    
+    async def validate_api_key(self) -> bool:
+        """
+        Check that the Ollama server is reachable.
+        
+        Ollama does not use API keys.
+        
+        Returns:
+            bool: True if the server responds, False otherwise
+        """
+        try:
+            response = await self.client.get("/api/tags")
+            response.raise_for_status()
+            return True
+        except Exception as e:
+            logger.error(f"Ollama server not reachable at {self.settings.ollama_url}: {str(e)}")
+            return False
+    
+    async def chat_completion(
+        self,
+        request: ChatRequest,
+    ) -> ChatResponse:
+        """
+        Send a chat completion request.
+        
+        Args:
+            request: Chat request
+        
+        Returns:
+            ChatResponse: Chat response
+        
+        Raises:
+            ModelNotFoundError: If the model is not pulled
+            ProviderNotAvailableError: If provider is not available
+            RequestTimeoutError: If request times out
+            InvalidRequestError: If request is invalid
+        """
+        model = self._model_name(request.model_id)
+        payload = {
+            "model": model,
+            "messages": self._messages(request.messages),
+            "stream": False,
+            "options": self._options(request),
+            "keep_alive": self.settings.ollama_keep_alive,
+        }
+        
+        async with self._model_slot(model):
+            data = await self._post("/api/chat", payload, model)
+        
+        message = data.get("message") or {}
+        return ChatResponse(
+            id=f"ollama-{data.get('created_at', '')}",
+            object="chat.completion",
+            created=int(datetime.now().timestamp()),
+            model=data.get("model", model),
+            choices=[
+                ChatResponseChoice(
+                    index=0,
+                    message=ChatMessage(
+                        role=MessageRole(message.get("role", "assistant").upper()),
+                        content=message.get("content", ""),
+                    ),
+                    finish_reason=data.get("done_reason", "stop"),
+                )
+            ],
+            usage=self._usage(data),
+        )
+    
+    async def text_completion(
+        self,
+        request: CompletionRequest,
+    ) -> CompletionResponse:
+        """
+        Send a text completion request.
+        
+        Args:
+            request: Completion request
+        
+        Returns:
+            CompletionResponse: Completion response
+        
+        Raises:
+            ModelNotFoundError: If the model is not pulled
+            ProviderNotAvailableError: If provider is not available
+            RequestTimeoutError: If request times out
+            InvalidRequestError: If request is invalid
+        """
+        model = self._model_name(request.model_id)
+        payload = {
+            "model": model,
+            "prompt": request.prompt,
+            "stream": False,
+            "options": self._options(request),
+            "keep_alive": self.settings.ollama_keep_alive,
+        }
+        
+        async with self._model_slot(model):
+            data = await self._post("/api/generate", payload, model)
+        
+        return CompletionResponse(
+            id=f"ollama-{data.get('created_at', '')}",
+            object="text_completion",
+            created=int(datetime.now().timestamp()),
+            model=data.get("model", model),
+            choices=[
+                CompletionResponseChoice(
+                    index=0,
+                    text=data.get("response", ""),
+                    finish_reason=data.get("done_reason", "stop"),
+                )
+            ],
+            usage=self._usage(data),
+        )
+    
+    async def stream_chat_completion(
+        self,
+        request: ChatRequest,
+    ) -> AsyncIterator[StreamChunk]:
+        """
+        Send a chat completion request and stream the response.
+        
+        Args:
+            request: Chat request
+        
+        Yields:
+            StreamChunk: Content deltas; the last one carries the usage
+        
+        Raises:
+            ModelNotFoundError: If the model is not pulled
+            ProviderNotAvailableError: If provider is not available
+            RequestTimeoutError: If request times out
+            InvalidRequestError: If request is invalid
+        """
+        model = self._model_name(request.model_id)
+        payload = {
+            "model": model,
+            "messages": self._messages(request.messages),
+            "stream": True,
+            "options": self._options(request),
+            "keep_alive": self.settings.ollama_keep_alive,
+        }
+        
+        async for data in self._stream("/api/chat", payload, model):
+            yield self._stream_chunk(data, model, (data.get("message") or {}).get("content", ""))
+    
+    async def stream_text_completion(
+        self,
+        request: CompletionRequest,
+    ) -> AsyncIterator[StreamChunk]:
+        """
+        Send a text completion request and stream the response.
+        
+        Args:
+            request: Completion request
+        
+        Yields:
+            StreamChunk: Text deltas; the last one carries the usage
+        
+        Raises:
+            ModelNotFoundError: If the model is not pulled
+            ProviderNotAvailableError: If provider is not available
+            RequestTimeoutError: If request times out
+            InvalidRequestError: If request is invalid
+        """
+        model = self._model_name(request.model_id)
+        payload = {
+            "model": model,
+            "prompt": request.prompt,
+            "stream": True,
+            "options": self._options(request),
+            "keep_alive": self.settings.ollama_keep_alive,
+        }
+        
+        async for data in self._stream("/api/generate", payload, model):
+            chunk = self._stream_chunk(data, model, data.get("response", ""))
+            yield chunk.model_copy(update={"object": "text_completion.chunk"})
+    
+    async def embedding(
+        self,
+        request: EmbeddingRequest,
+    ) -> EmbeddingResponse:
+        """
+        Send an embedding request.
+        
+        Args:
+            request: Embedding request
+        
+        Returns:
+            EmbeddingResponse: Embedding response
+        
+        Raises:
+            ModelNotFoundError: If the model is not pulled
+            ProviderNotAvailableError: If provider is not available
+            RequestTimeoutError: If request times out
+            InvalidRequestError: If request is invalid
+        """
+        model = self._model_name(request.model_id)
+        inputs = [request.input] if isinstance(request.input, str) else request.input
+        payload = {
+            "model": model,
+            "input": inputs,
+            "keep_alive": self.settings.ollama_keep_alive,
+        }
+        
+        async with self._model_slot(model):
+            data = await self._post("/api/embed", payload, model)
+        
+        prompt_tokens = data.get("prompt_eval_count", 0)
+        return EmbeddingResponse(
+            object="embedding",
+            model=data.get("model", model),
+            data=[
+                EmbeddingResponseData(index=i, embedding=embedding)
+                for i, embedding in enumerate(data.get("embeddings", []))
+            ],
+            usage=TokenUsage(
+                prompt_tokens=prompt_tokens,
+                completion_tokens=0,
+                total_tokens=prompt_tokens,
+            ),
+        )
+    
+    async def image_generation(
+        self,
+        request: ImageGenerationRequest,
+    ) -> ImageGenerationResponse:
+        """
+        Image generation is not supported by Ollama.
+        
+        Raises:
+            InvalidRequestError: Always
+        """
+        raise InvalidRequestError("Image generation is not supported by the Ollama provider")
+    
+    async def audio_transcription(
+        self,
+        request: AudioTranscriptionRequest,
+    ) -> AudioTranscriptionResponse:
+        """
+        Audio transcription is not supported by Ollama.
+        
+        Raises:
+            InvalidRequestError: Always
+        """
+        raise InvalidRequestError("Audio transcription is not supported by the Ollama provider")
+    
+    async def audio_translation(
+        self,
+        request: AudioTranslationRequest,
+    ) -> AudioTranslationResponse:
+        """
+        Audio translation is not supported by Ollama.
+        
+        Raises:
+            InvalidRequestError: Always
+        """
+        raise InvalidRequestError("Audio translation is not supported by the Ollama provider")
+    
+    async def count_tokens(
+        self,
+        text: Union[str, List[Dict[str, str]]],
+        model_id: str,
+    ) -> int:
+        """
+        Estimate the number of tokens in a text.
+        
+        Local models use many different tokenizers, so the count is a
+        character-based estimate; exact counts come back in the response usage.
+        
+        Args:
+            text: Text to count tokens for
+            model_id: Model ID
+        
+        Returns:
+            int: Estimated number of tokens
+        """
+        if isinstance(text, str):
+            return math.ceil(len(text) / CHARS_PER_TOKEN)
+        elif isinstance(text, list):
+            # For chat messages, add a few tokens per message for the template
+            return sum(
+                4 + math.ceil(len(message.get("content") or "") / CHARS_PER_TOKEN)
+                for message in text
+            ) + 2
+        else:
+            raise ValueError(f"Unsupported text type: {type(text)}")
+    
+    def get_model_info(
+        self,
+        model_id: str,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get information about a model.
+        
+        Args:
+            model_id: Model ID
+        
+        Returns:
+            Optional[Dict[str, Any]]: Model information or None if not found
+        """
+        return self._available_models.get(self._model_name(model_id))
+    
+    def supports_model(
+        self,
+        model_id: str,
+    ) -> bool:
+        """
+        Check if the provider supports a model.
+        
+        Args:
+            model_id: Model ID
+        
+        Returns:
+            bool: True if supported, False otherwise
+        """
+        if model_id.startswith(MODEL_PREFIX):
+            return True
+        
+        # Check if model is pulled on the server
+        if self._model_name(model_id) in self._available_models:
+            return True
+        
+        # Check if model ID belongs to a known local model family
+        return model_id.startswith(LOCAL_MODEL_FAMILIES)
+    
+    def calculate_cost(
+        self,
+        model_id: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+    ) -> float:
+        """
+        Calculate the cost of a request.
+        
+        Local inference has no per-token price.
+        
+        Args:
+            model_id: Model ID
+            prompt_tokens: Number of prompt tokens
+            completion_tokens: Number of completion tokens
+        
+        Returns:
+            float: Cost in USD
+        """
+        return 0.0
+    
+    def get_queue_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get per-model queue metrics.
+        
+        Returns:
+            Dict[str, Dict[str, Any]]: Model name to queue metrics
+        """
+        return {model: queue.get_metrics() for model, queue in self._queues.items()}
+    
+    async def _initialize_models(self) -> None:
+        """
+        Initialize available models from the models pulled on the server.
+        """
+        try:
+            response = await self.client.get("/api/tags")
+            response.raise_for_status()
+            
+            for model in response.json().get("models", []):
+                name = model.get("name") or model.get("model")
+                if not name:
+                    continue
+                details = model.get("details") or {}
+                self._available_models[name] = {
+                    "id": name,
+                    "provider": self.provider_name,
+                    "family": details.get("family"),
+                    "parameter_size": details.get("parameter_size"),
+                    "quantization_level": details.get("quantization_level"),
+                    "size": model.get("size"),
+                    "pricing": {"prompt": 0.0, "completion": 0.0},
+                }
+            
+            logger.info(f"Initialized {len(self._available_models)} Ollama models")
+        except Exception as e:
+            logger.warning(f"Could not list Ollama models: {str(e)}")
+    
+    def _model_name(self, model_id: Optional[str]) -> str:
+        """
+        Strip the routing prefix from a model ID.
+        
+        Args:
+            model_id: Model ID
+        
+        Returns:
+            str: Model name as known to Ollama
+        
+        Raises:
+            InvalidRequestError: If no model ID is given
+        """
+        if not model_id:
+            raise InvalidRequestError("Model ID is required for the Ollama provider")
+        if model_id.startswith(MODEL_PREFIX):
+            return model_id[len(MODEL_PREFIX):]
+        return model_id
+    
+    def _messages(self, messages: List[ChatMessage]) -> List[Dict[str, Any]]:
+        """
+        Convert chat messages to Ollama format.
+        
+        Args:
+            messages: Chat messages
+        
+        Returns:
+            List[Dict[str, Any]]: Ollama messages
+        """
+        return [
+            {"role": message.role.value.lower(), "content": message.content or ""}
+            for message in messages
+        ]
+    
+    def _options(self, request: Union[ChatRequest, CompletionRequest]) -> Dict[str, Any]:
+        """
+        Build Ollama sampling options for a request.
+        
+        Args:
+            request: Chat or completion request
+        
+        Returns:
+            Dict[str, Any]: Ollama options
+        """
+        options = {
+            "temperature": request.temperature,
+            "top_p": request.top_p,
+            "frequency_penalty": request.frequency_penalty,
+            "presence_penalty": request.presence_penalty,
+        }
+        
+        if request.max_tokens:
+            options["num_predict"] = request.max_tokens
+        
+        if request.stop:
+            options["stop"] = request.stop
+        
+        return {key: value for key, value in options.items() if value is not None}
+    
+    def _usage(self, data: Dict[str, Any]) -> TokenUsage:
+        """
+        Build token usage from an Ollama response.
+        
+        Args:
+            data: Ollama response
+        
+        Returns:
+            TokenUsage: Token usage
+        """
+        prompt_tokens = data.get("prompt_eval_count", 0)
+        completion_tokens = data.get("eval_count", 0)
+        return TokenUsage(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            total_tokens=prompt_tokens + completion_tokens,
+        )
+    
+    def _stream_chunk(self, data: Dict[str, Any], model: str, delta: str) -> StreamChunk:
+        """
+        Convert one line of an Ollama stream to a chunk.
+        
+        Args:
+            data: Ollama stream line
+            model: Model name
+            delta: Content delta
+        
+        Returns:
+            StreamChunk: Stream chunk; the final line carries the usage
+        """
+        done = data.get("done", False)
+        return StreamChunk(
+            id=f"ollama-{data.get('created_at', '')}",
+            created=int(datetime.now().timestamp()),
+            model=data.get("model", model),
+            delta=delta,
+            finish_reason=data.get("done_reason", "stop") if done else None,
+            usage=self._usage(data) if done else None,
+        )
+    
+    @asynccontextmanager
+    async def _model_slot(self, model: str) -> AsyncIterator[None]:
+        """
+        Wait for a free slot in the model's queue.
+        
+        Args:
+            model: Model name
+        """
+        queue = self._queues.get(model)
+        if queue is None:
+            queue = ModelQueue(self.settings.ollama_model_concurrency)
+            self._queues[model] = queue
+        
+        start_time = time.perf_counter()
+        queue.waiting += 1
+        try:
+            await queue.semaphore.acquire()
+        finally:
+            queue.waiting -= 1
+        
+        wait_ms = (time.perf_counter() - start_time) * 1000
+        queue.wait_ms_total += wait_ms
+        queue.wait_ms_max = max(queue.wait_ms_max, wait_ms)
+        queue.active += 1
+        if wait_ms >= 1000:
+            logger.debug(f"Request for Ollama model {model} queued for {wait_ms:.0f} ms")
+        
+        try:
+            yield
+        finally:
+            queue.active -= 1
+            queue.completed += 1
+            queue.semaphore.release()
+    
+    async def _post(self, path: str, payload: Dict[str, Any], model: str) -> Dict[str, Any]:
+        """
+        Send a non-streaming request.
+        
+        Args:
+            path: API path
+            payload: Request body
+            model: Model name
+        
+        Returns:
+            Dict[str, Any]: Response body
+        """
+        try:
+            response = await self.client.post(path, json=payload)
+            self._raise_for_status(response, model)
+            return response.json()
+        except Exception as e:
+            raise self._translate_error(e, path)
+    
+    async def _stream(self, path: str, payload: Dict[str, Any], model: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Send a streaming request and yield the decoded NDJSON lines.
+        
+        The model slot is held until the stream is exhausted or closed.
+        
+        Args:
+            path: API path
+            payload: Request body
+            model: Model name
+        
+        Yields:
+            Dict[str, Any]: Stream lines
+        """
+        async with self._model_slot(model):
+            try:
+                async with self.client.stream("POST", path, json=payload) as response:
+                    if response.status_code >= 400:
+                        await response.aread()
+                    self._raise_for_status(response, model)
+                    
+                    async for line in response.aiter_lines():
+                        if not line:
+                            continue
+                        data = json.loads(line)
+                        if "error" in data:
+                            raise InvalidRequestError(data["error"])
+                        yield data
+            except Exception as e:
+                raise self._translate_error(e, path)
+    
+    def _raise_for_status(self, response: httpx.Response, model: str) -> None:
+        """
+        Raise a model service error for an error response.
+        
+        Args:
+            response: HTTP response
+            model: Model name
+        """
+        if response.status_code < 400:
+            return
+        
+        try:
+            message = response.json().get("error", response.text)
+        except ValueError:
+            message = response.text
+        
+        if response.status_code == 404:
+            raise ModelNotFoundError(model, f"Model '{model}' is not available on the Ollama server: {message}")
+        if response.status_code < 500:
+            raise InvalidRequestError(message)
+        raise ProviderNotAvailableError(self.provider_name, message)
+    
+    def _translate_error(self, error: Exception, operation: str) -> Exception:
+        """
+        Map an HTTP client error to a model service error.
+        
+        Args:
+            error: Raised error
+            operation: Operation name for logging
+        
+        Returns:
+            Exception: Error to raise
+        """
+        if isinstance(error, ModelServiceError):
+            return error
+        if isinstance(error, httpx.TimeoutException):
+            return RequestTimeoutError(self.provider_name, str(error))
+        if isinstance(error, httpx.TransportError):
+            return ProviderNotAvailableError(self.provider_name, str(error))
+        logger.error(f"Error in Ollama request {operation}: {str(error)}")
+        return ProviderNotAvailableError(self.provider_name, f"Unexpected error: {str(error)}")
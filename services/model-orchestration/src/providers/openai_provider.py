@@ -1,7 +1,7 @@
 import logging
 import time
 import json
-from typing import Dict, Any, List, Optional, Union, Tuple
+from typing import Dict, Any, AsyncIterator, List, Optional, Union, Tuple
 import asyncio
 from datetime import datetime
 
@@ -12,6 +12,7 @@ from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_excep
 
 from ..config import Settings
 from ..exceptions import (
+    ModelServiceError,
     ProviderAuthenticationError,
     ProviderNotAvailableError,
     RateLimitError,
@@ -40,12 +41,37 @@ from ..models.api import (
     EmbeddingResponseData,
     ImageResponseData,
     TokenUsage,
+    StreamChunk,
 )
 from .provider_interface import ModelProvider as ModelProviderInterface
+from .token_counter import TokenCounter, estimate_max_tokens
 
 logger = logging.getLogger(__name__)
 
 
+def _rate_limit_error(provider_name: str, error: openai.RateLimitError) -> RateLimitError:
+    """
+    Map an OpenAI rate-limit error, keeping the retry-after it reports.
+    
+    Args:
+        provider_name: Provider name
+        error: Raised error
+    
+    Returns:
+        RateLimitError: Error with ``retry_after`` seconds in its details
+    """
+    details: Dict[str, Any] = {"provider": provider_name}
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            details["retry_after"] = float(headers["retry-after-ms"]) / 1000
+        elif headers.get("retry-after"):
+            details["retry_after"] = float(headers["retry-after"])
+    except ValueError:
+        pass
+    return RateLimitError(provider_name, str(error), details=details)
+
+
 class OpenAIProvider(ModelProviderInterface):
     """
     OpenAI provider implementation.
@@ -62,6 +88,7 @@ class OpenAIProvider(ModelProviderInterface):
         self.client = None
         self._available_models = {}
         self._encoders = {}
+        self._token_counter = TokenCounter(max_entries=settings.token_count_cache_size)
     
     @property
     def provider_name(self) -> str:
@@ -73,6 +100,16 @@ class OpenAIProvider(ModelProviderInterface):
         """
         return "openai"
     
+    @property
+    def max_embedding_batch_size(self) -> int:
+        """
+        Get the maximum number of inputs per embedding call.
+        
+        Returns:
+            int: Maximum batch size
+        """
+        return 2048
+    
     @property
     def available_models(self) -> Dict[str, Dict[str, Any]]:
         """
@@ -148,43 +185,7 @@ class OpenAIProvider(ModelProviderInterface):
             InvalidRequestError: If request is invalid
         """
         try:
-            # Convert messages to OpenAI format
-            messages = []
-            for message in request.messages:
-                openai_message = {
-                    "role": message.role.value,
-                    "content": message.content,
-                }
-                
-                if message.name:
-                    openai_message["name"] = message.name
-                
-                if message.tool_calls:
-                    openai_message["tool_calls"] = message.tool_calls
-                
-                if message.tool_call_id:
-                    openai_message["tool_call_id"] = message.tool_call_id
-                
-                messages.append(openai_message)
-            
-            # Prepare request parameters
-            params = {
-                "model": request.model_id,
-                "messages": messages,
-                "temperature": request.temperature,
-                "top_p": request.top_p,
-                "frequency_penalty": request.frequency_penalty,
-                "presence_penalty": request.presence_penalty,
-            }
-            
-            if request.max_tokens:
-                params["max_tokens"] = request.max_tokens
-            
-            if request.stop:
-                params["stop"] = request.stop
-            
-            if request.user_id:
-                params["user"] = request.user_id
+            params = self._chat_params(request)
             
             # Send request
             response = await self.client.chat.completions.create(**params)
@@ -226,7 +227,7 @@ class OpenAIProvider(ModelProviderInterface):
         except openai.AuthenticationError as e:
             raise ProviderAuthenticationError(self.provider_name, str(e))
         except openai.RateLimitError as e:
-            raise RateLimitError(self.provider_name, str(e))
+            raise _rate_limit_error(self.provider_name, e)
         except openai.APITimeoutError as e:
             raise RequestTimeoutError(self.provider_name, str(e))
         except openai.BadRequestError as e:
@@ -271,22 +272,7 @@ class OpenAIProvider(ModelProviderInterface):
             # For newer models, use chat completion API with a single user message
             if request.model_id.startswith("gpt-"):
                 # Convert to chat request
-                chat_request = ChatRequest(
-                    model_id=request.model_id,
-                    messages=[
-                        ChatMessage(
-                            role=MessageRole.USER,
-                            content=request.prompt,
-                        )
-                    ],
-                    max_tokens=request.max_tokens,
-                    temperature=request.temperature,
-                    top_p=request.top_p,
-                    frequency_penalty=request.frequency_penalty,
-                    presence_penalty=request.presence_penalty,
-                    stop=request.stop,
-                    user_id=request.user_id,
-                )
+                chat_request = self._to_chat_request(request)
                 
                 # Send chat request
                 chat_response = await self.chat_completion(chat_request)
@@ -315,24 +301,7 @@ class OpenAIProvider(ModelProviderInterface):
                 return completion_response
             
             # For legacy models, use completions API
-            # Prepare request parameters
-            params = {
-                "model": request.model_id,
-                "prompt": request.prompt,
-                "temperature": request.temperature,
-                "top_p": request.top_p,
-                "frequency_penalty": request.frequency_penalty,
-                "presence_penalty": request.presence_penalty,
-            }
-            
-            if request.max_tokens:
-                params["max_tokens"] = request.max_tokens
-            
-            if request.stop:
-                params["stop"] = request.stop
-            
-            if request.user_id:
-                params["user"] = request.user_id
+            params = self._completion_params(request)
             
             # Send request
             response = await self.client.completions.create(**params)
@@ -369,7 +338,7 @@ class OpenAIProvider(ModelProviderInterface):
         except openai.AuthenticationError as e:
             raise ProviderAuthenticationError(self.provider_name, str(e))
         except openai.RateLimitError as e:
-            raise RateLimitError(self.provider_name, str(e))
+            raise _rate_limit_error(self.provider_name, e)
         except openai.APITimeoutError as e:
             raise RequestTimeoutError(self.provider_name, str(e))
         except openai.BadRequestError as e:
@@ -382,6 +351,119 @@ class OpenAIProvider(ModelProviderInterface):
             logger.error(f"Error in OpenAI text completion: {str(e)}")
             raise ProviderNotAvailableError(self.provider_name, f"Unexpected error: {str(e)}")
     
+    async def stream_chat_completion(
+        self,
+        request: ChatRequest,
+    ) -> AsyncIterator[StreamChunk]:
+        """
+        Send a chat completion request and stream the response.
+        
+        Args:
+            request: Chat request
+            
+        Yields:
+            StreamChunk: Content deltas, followed by a usage chunk
+            
+        Raises:
+            ProviderAuthenticationError: If authentication fails
+            ProviderNotAvailableError: If provider is not available
+            RateLimitError: If rate limit is exceeded
+            RequestTimeoutError: If request times out
+            ContentFilterError: If content is filtered
+            InvalidRequestError: If request is invalid
+        """
+        params = self._chat_params(request)
+        params["stream"] = True
+        params["stream_options"] = {"include_usage": True}
+        
+        try:
+            stream = await self.client.chat.completions.create(**params)
+            async for chunk in stream:
+                for choice in chunk.choices:
+                    yield StreamChunk(
+                        id=chunk.id,
+                        created=chunk.created,
+                        model=chunk.model,
+                        index=choice.index,
+                        delta=choice.delta.content or "",
+                        finish_reason=choice.finish_reason,
+                    )
+                
+                # With include_usage the last chunk has no choices and carries the usage
+                if chunk.usage:
+                    yield StreamChunk(
+                        id=chunk.id,
+                        created=chunk.created,
+                        model=chunk.model,
+                        usage=TokenUsage(
+                            prompt_tokens=chunk.usage.prompt_tokens,
+                            completion_tokens=chunk.usage.completion_tokens,
+                            total_tokens=chunk.usage.total_tokens,
+                        ),
+                    )
+        except Exception as e:
+            raise self._translate_error(e, "chat completion stream")
+    
+    async def stream_text_completion(
+        self,
+        request: CompletionRequest,
+    ) -> AsyncIterator[StreamChunk]:
+        """
+        Send a text completion request and stream the response.
+        
+        Args:
+            request: Completion request
+            
+        Yields:
+            StreamChunk: Text deltas, followed by a usage chunk
+            
+        Raises:
+            ProviderAuthenticationError: If authentication fails
+            ProviderNotAvailableError: If provider is not available
+            RateLimitError: If rate limit is exceeded
+            RequestTimeoutError: If request times out
+            ContentFilterError: If content is filtered
+            InvalidRequestError: If request is invalid
+        """
+        # For newer models, stream from the chat completion API
+        if request.model_id.startswith("gpt-"):
+            async for chunk in self.stream_chat_completion(self._to_chat_request(request)):
+                yield chunk.model_copy(update={"object": "text_completion.chunk"})
+            return
+        
+        params = self._completion_params(request)
+        params["stream"] = True
+        params["stream_options"] = {"include_usage": True}
+        
+        try:
+            stream = await self.client.completions.create(**params)
+            async for chunk in stream:
+                for choice in chunk.choices:
+                    yield StreamChunk(
+                        id=chunk.id,
+                        object="text_completion.chunk",
+                        created=chunk.created,
+                        model=chunk.model,
+                        index=choice.index,
+                        delta=choice.text or "",
+                        finish_reason=choice.finish_reason,
+                    )
+                
+                if chunk.usage:
+                    yield StreamChunk(
+                        id=chunk.id,
+                        object="text_completion.chunk",
+                        created=chunk.created,
+                        model=chunk.model,
+                        usage=TokenUsage(
+                            prompt_tokens=chunk.usage.prompt_tokens,
+                            completion_tokens=chunk.usage.completion_tokens,
+                            total_tokens=chunk.usage.total_tokens,
+                        ),
+                    )
+        except Exception as e:
+            raise self._translate_error(e, "text completion stream")
+    
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=1, max=10),
@@ -451,7 +533,7 @@ class OpenAIProvider(ModelProviderInterface):
         except openai.AuthenticationError as e:
             raise ProviderAuthenticationError(self.provider_name, str(e))
         except openai.RateLimitError as e:
-            raise RateLimitError(self.provider_name, str(e))
+            raise _rate_limit_error(self.provider_name, e)
         except openai.APITimeoutError as e:
             raise RequestTimeoutError(self.provider_name, str(e))
         except openai.BadRequestError as e:
@@ -529,7 +611,7 @@ class OpenAIProvider(ModelProviderInterface):
         except openai.AuthenticationError as e:
             raise ProviderAuthenticationError(self.provider_name, str(e))
         except openai.RateLimitError as e:
-            raise RateLimitError(self.provider_name, str(e))
+            raise _rate_limit_error(self.provider_name, e)
         except openai.APITimeoutError as e:
             raise RequestTimeoutError(self.provider_name, str(e))
         except openai.BadRequestError as e:
@@ -593,7 +675,7 @@ class OpenAIProvider(ModelProviderInterface):
         except openai.AuthenticationError as e:
             raise ProviderAuthenticationError(self.provider_name, str(e))
         except openai.RateLimitError as e:
-            raise RateLimitError(self.provider_name, str(e))
+            raise _rate_limit_error(self.provider_name, e)
         except openai.APITimeoutError as e:
             raise RequestTimeoutError(self.provider_name, str(e))
         except openai.BadRequestError as e:
@@ -652,7 +734,7 @@ class OpenAIProvider(ModelProviderInterface):
         except openai.AuthenticationError as e:
             raise ProviderAuthenticationError(self.provider_name, str(e))
         except openai.RateLimitError as e:
-            raise RateLimitError(self.provider_name, str(e))
+            raise _rate_limit_error(self.provider_name, e)
         except openai.APITimeoutError as e:
             raise RequestTimeoutError(self.provider_name, str(e))
         except openai.BadRequestError as e:
@@ -681,32 +763,42 @@ class OpenAIProvider(ModelProviderInterface):
         # Get encoding for model
         encoding = self._get_encoding(model_id)
         
-        # Count tokens
+        # Count tokens off the event loop, reusing counts of repeated content
         if isinstance(text, str):
-            return len(encoding.encode(text))
+            return (await self._token_counter.count(encoding, [text]))[0]
         elif isinstance(text, list):
             # For chat messages
-            token_count = 0
-            
-            for message in text:
-                # Add tokens for role
-                token_count += 4  # Every message follows <im_start>{role/name}\n{content}<im_end>\n
-                
-                # Add tokens for name if present
-                if "name" in message:
-                    token_count += len(encoding.encode(message["name"]))
-                
-                # Add tokens for content
-                if "content" in message and message["content"]:
-                    token_count += len(encoding.encode(message["content"]))
-            
-            # Add tokens for assistant reply
-            token_count += 2  # Every reply is <im_start>assistant
-            
-            return token_count
+            return await self._token_counter.count_messages(encoding, text)
         else:
             raise ValueError(f"Unsupported text type: {type(text)}")
     
+    def estimate_max_tokens(
+        self,
+        text: Union[str, List[Dict[str, str]]],
+        model_id: str,
+    ) -> Optional[int]:
+        """
+        Get a cheap upper bound for the number of tokens in a text.
+        
+        Args:
+            text: Text to estimate tokens for
+            model_id: Model ID
+            
+        Returns:
+            Optional[int]: Upper bound of the number of tokens
+        """
+        if isinstance(text, str):
+            return estimate_max_tokens([text])
+        elif isinstance(text, list):
+            texts = [
+                value
+                for message in text
+                for value in (message.get("name"), message.get("content"))
+                if value
+            ]
+            return estimate_max_tokens(texts, messages=len(text))
+        return None
+    
     def get_model_info(
         self,
         model_id: str,
@@ -793,6 +885,142 @@ class OpenAIProvider(ModelProviderInterface):
         
         return prompt_cost + completion_cost
     
+    def _chat_params(self, request: ChatRequest) -> Dict[str, Any]:
+        """
+        Build the OpenAI chat completion parameters for a request.
+        
+        Args:
+            request: Chat request
+            
+        Returns:
+            Dict[str, Any]: Request parameters
+        """
+        # Convert messages to OpenAI format
+        messages = []
+        for message in request.messages:
+            openai_message = {
+                "role": message.role.value,
+                "content": message.content,
+            }
+            
+            if message.name:
+                openai_message["name"] = message.name
+            
+            if message.tool_calls:
+                openai_message["tool_calls"] = message.tool_calls
+            
+            if message.tool_call_id:
+                openai_message["tool_call_id"] = message.tool_call_id
+            
+            messages.append(openai_message)
+        
+        # Prepare request parameters
+        params = {
+            "model": request.model_id,
+            "messages": messages,
+            "temperature": request.temperature,
+            "top_p": request.top_p,
+            "frequency_penalty": request.frequency_penalty,
+            "presence_penalty": request.presence_penalty,
+        }
+        
+        if request.max_tokens:
+            params["max_tokens"] = request.max_tokens
+        
+        if request.stop:
+            params["stop"] = request.stop
+        
+        if request.user_id:
+            params["user"] = request.user_id
+        
+        return params
+    
+    def _completion_params(self, request: CompletionRequest) -> Dict[str, Any]:
+        """
+        Build the OpenAI legacy completion parameters for a request.
+        
+        Args:
+            request: Completion request
+            
+        Returns:
+            Dict[str, Any]: Request parameters
+        """
+        params = {
+            "model": request.model_id,
+            "prompt": request.prompt,
+            "temperature": request.temperature,
+            "top_p": request.top_p,
+            "frequency_penalty": request.frequency_penalty,
+            "presence_penalty": request.presence_penalty,
+        }
+        
+        if request.max_tokens:
+            params["max_tokens"] = request.max_tokens
+        
+        if request.stop:
+            params["stop"] = request.stop
+        
+        if request.user_id:
+            params["user"] = request.user_id
+        
+        return params
+    
+    def _to_chat_request(self, request: CompletionRequest) -> ChatRequest:
+        """
+        Convert a completion request to a chat request with a single user message.
+        
+        Args:
+            request: Completion request
+            
+        Returns:
+            ChatRequest: Equivalent chat request
+        """
+        return ChatRequest(
+            model_id=request.model_id,
+            messages=[
+                ChatMessage(
+                    role=MessageRole.USER,
+                    content=request.prompt,
+                )
+            ],
+            max_tokens=request.max_tokens,
+            temperature=request.temperature,
+            top_p=request.top_p,
+            frequency_penalty=request.frequency_penalty,
+            presence_penalty=request.presence_penalty,
+            stop=request.stop,
+            user_id=request.user_id,
+        )
+        
+
+    def _translate_error(self, error: Exception, operation: str) -> Exception:
+        """
+        Map an OpenAI client error to a model service error.
+        
+        Args:
+            error: Raised error
+            operation: Operation name for logging
+            
+        Returns:
+            Exception: Error to raise
+        """
+        if isinstance(error, ModelServiceError):
+            return error
+        if isinstance(error, openai.AuthenticationError):
+            return ProviderAuthenticationError(self.provider_name, str(error))
+        if isinstance(error, openai.RateLimitError):
+            return _rate_limit_error(self.provider_name, error)
+        if isinstance(error, openai.APITimeoutError):
+            return RequestTimeoutError(self.provider_name, str(error))
+        if isinstance(error, openai.BadRequestError):
+            if "content filter" in str(error).lower():
+                return ContentFilterError(str(error))
+            return InvalidRequestError(str(error))
+        if isinstance(error, openai.APIError):
+            return ProviderNotAvailableError(self.provider_name, str(error))
+        logger.error(f"Error in OpenAI {operation}: {str(error)}")
+        return ProviderNotAvailableError(self.provider_name, f"Unexpected error: {str(error)}")
+    
     async def _initialize_models(self) -> None:
         """
         Initialize available models.
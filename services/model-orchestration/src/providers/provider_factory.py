@@ -34,7 +34,7 @@ class ProviderFactory:
             provider_name: Provider name
             provider_class: Provider class
         """
-        self.provider_classes[provider_name] = provider_class
+        self.provider_classes[provider_name.lower()] = provider_class
         logger.info(f"Registered provider class: {provider_name}")
     
     async def get_provider(self, provider_name: str) -> ModelProvider:
@@ -116,13 +116,43 @@ class ProviderFactory:
             if provider.supports_model(model_id):
                 return provider_name
         
+        from .ollama_provider import MODEL_PREFIX, LOCAL_MODEL_FAMILIES
+        
         # Check model ID prefix
         if model_id.startswith("gpt-") or model_id.startswith("text-") or model_id.startswith("dall-e"):
             return ModelProviderEnum.OPENAI.value
         elif model_id.startswith("claude-"):
             return ModelProviderEnum.ANTHROPIC.value
+        elif model_id.startswith(MODEL_PREFIX) or model_id.startswith(LOCAL_MODEL_FAMILIES):
+            return ModelProviderEnum.OLLAMA.value
         
         return None
+    
+    def infer_provider_from_model_id(self, model_id: str) -> Optional[str]:
+        """
+        Infer the provider for a model that is not registered.
+        
+        Args:
+            model_id: Model ID
+            
+        Returns:
+            Optional[str]: Provider name or None if unknown
+        """
+        return self.get_provider_for_model(model_id)
+    
+    async def close(self) -> None:
+        """
+        Close provider connections.
+        """
+        for provider_name, provider in self.providers.items():
+            close = getattr(provider, "close", None)
+            if close is None:
+                continue
+            try:
+                await close()
+            except Exception as e:
+                logger.error(f"Failed to close provider '{provider_name}': {str(e)}")
+        self.providers.clear()
 
 
 # Singleton instance
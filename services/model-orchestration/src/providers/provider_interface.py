@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional, Union
+from typing import Dict, Any, AsyncIterator, List, Optional, Union
 
 from ..models.api import (
     ChatRequest,
@@ -14,6 +14,7 @@ from ..models.api import (
     ImageGenerationResponse,
     AudioTranscriptionResponse,
     AudioTranslationResponse,
+    StreamChunk,
 )
 
 
@@ -33,6 +34,16 @@ class ModelProvider(ABC):
         """
         pass
     
+    @property
+    def max_embedding_batch_size(self) -> int:
+        """
+        Get the maximum number of inputs per embedding call.
+        
+        Returns:
+            int: Maximum batch size (1 if the provider embeds one input per call)
+        """
+        return 1
+    
     @property
     @abstractmethod
     def available_models(self) -> Dict[str, Dict[str, Any]]:
@@ -93,6 +104,61 @@ class ModelProvider(ABC):
         """
         pass
     
+    async def stream_chat_completion(
+        self,
+        request: ChatRequest,
+    ) -> AsyncIterator[StreamChunk]:
+        """
+        Send a chat completion request and stream the response.
+        
+        Providers without native streaming yield the full response as a
+        single chunk.
+        
+        Args:
+            request: Chat request
+            
+        Yields:
+            StreamChunk: Response chunks; the last one carries the usage
+        """
+        response = await self.chat_completion(request)
+        choice = response.choices[0] if response.choices else None
+        yield StreamChunk(
+            id=response.id,
+            created=response.created,
+            model=response.model,
+            delta=(choice.message.content or "") if choice else "",
+            finish_reason=choice.finish_reason if choice else None,
+            usage=response.usage,
+        )
+    
+    async def stream_text_completion(
+        self,
+        request: CompletionRequest,
+    ) -> AsyncIterator[StreamChunk]:
+        """
+        Send a text completion request and stream the response.
+        
+        Providers without native streaming yield the full response as a
+        single chunk.
+        
+        Args:
+            request: Completion request
+            
+        Yields:
+            StreamChunk: Response chunks; the last one carries the usage
+        """
+        response = await self.text_completion(request)
+        choice = response.choices[0] if response.choices else None
+        yield StreamChunk(
+            id=response.id,
+            object="text_completion.chunk",
+            created=response.created,
+            model=response.model,
+            delta=choice.text if choice else "",
+            finish_reason=choice.finish_reason if choice else None,
+            usage=response.usage,
+        )
+    
     @abstractmethod
     async def embedding(
         self,
@@ -175,6 +241,27 @@ class ModelProvider(ABC):
         """
         pass
     
+    def estimate_max_tokens(
+        self,
+        text: Union[str, List[Dict[str, str]]],
+        model_id: str,
+    ) -> Optional[int]:
+        """
+        Get a cheap upper bound for the number of tokens in a text.
+        
+        Callers use the bound to skip exact counting when a request is
+        clearly under its token limit. Providers without a safe bound
+        return None.
+        
+        Args:
+            text: Text to estimate tokens for
+            model_id: Model ID
+            
+        Returns:
+            Optional[int]: Upper bound of the number of tokens, or None
+        """
+        return None
+    
     @abstractmethod
     def get_model_info(
         self,
@@ -0,0 +1,177 @@
+"""
+Token counting off the event loop.
+
+Exact token counts need a full tokenizer pass, which is pure CPU work and
+blocks every other in-flight request when run on the event loop. The
+token counter memoizes counts by content hash, since system prompts and
+specialization blocks repeat across requests, and encodes the remaining
+texts of a request in one batch on a shared thread pool (the tokenizer
+releases the GIL while encoding).
+"""
+
+import asyncio
+import hashlib
+from collections import OrderedDict
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+# Tokens added per chat message for its role and delimiters, and once per
+# request for the assistant reply (<im_start>{role/name}\n{content}<im_end>\n)
+TOKENS_PER_MESSAGE = 4
+TOKENS_PER_REPLY = 2
+
+# Batches with fewer uncached characters than this are encoded inline,
+# since handing them to a thread costs more than encoding them
+INLINE_ENCODE_CHARS = 2048
+
+
+def estimate_max_tokens(texts: List[str], messages: int = 0) -> int:
+    """
+    Get an upper bound for the token count of texts without encoding them.
+    
+    Byte-level BPE tokens cover at least one byte each, so the UTF-8 length
+    of a text bounds its token count.
+    
+    Args:
+        texts: Texts to estimate
+        messages: Number of chat messages the texts belong to (0 for a
+            plain prompt)
+    
+    Returns:
+        int: Upper bound of the token count
+    """
+    byte_count = sum(len(text.encode("utf-8")) for text in texts)
+    if messages:
+        return byte_count + messages * TOKENS_PER_MESSAGE + TOKENS_PER_REPLY
+    return byte_count
+
+
+class TokenCounter:
+    """
+    Memoizing token counter that encodes off the event loop.
+    """
+    
+    def __init__(
+        self,
+        max_entries: int = 4096,
+        executor: Optional[Executor] = None,
+        inline_chars: int = INLINE_ENCODE_CHARS,
+    ):
+        """
+        Initialize the token counter.
+        
+        Args:
+            max_entries: Maximum number of memoized counts
+            executor: Executor to encode on (the shared pool if not given)
+            inline_chars: Uncached characters below which a batch is
+                encoded on the event loop
+        """
+        self.max_entries = max_entries
+        self.inline_chars = inline_chars
+        self.hits = 0
+        self.misses = 0
+        
+        self._executor = executor
+        self._counts: "OrderedDict[Tuple[str, bytes], int]" = OrderedDict()
+    
+    async def count(self, encoding: Any, texts: List[str]) -> List[int]:
+        """
+        Count the tokens of texts.
+        
+        Args:
+            encoding: Tokenizer encoding with ``name`` and ``encode``
+            texts: Texts to count
+        
+        Returns:
+            List[int]: Token count of each text
+        """
+        keys = [
+            (encoding.name, hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest())
+            for text in texts
+        ]
+        known: Dict[Tuple[str, bytes], int] = {}
+        missing: Dict[Tuple[str, bytes], str] = {}
+        
+        for key, text in zip(keys, texts):
+            count = self._counts.get(key)
+            if count is None:
+                missing[key] = text
+            else:
+                self._counts.move_to_end(key)
+                known[key] = count
+                self.hits += 1
+        
+        if missing:
+            self.misses += len(missing)
+            batch = list(missing.values())
+            if sum(len(text) for text in batch) < self.inline_chars:
+                encoded = _encode_batch(encoding, batch)
+            else:
+                loop = asyncio.get_running_loop()
+                encoded = await loop.run_in_executor(
+                    self._executor or _get_executor(), _encode_batch, encoding, batch
+                )
+            
+            for key, count in zip(missing, encoded):
+                known[key] = count
+                self._put(key, count)
+        
+        return [known[key] for key in keys]
+    
+    async def count_messages(self, encoding: Any, messages: List[Dict[str, str]]) -> int:
+        """
+        Count the tokens of chat messages.
+        
+        Args:
+            encoding: Tokenizer encoding
+            messages: Chat messages with ``content`` and optional ``name``
+        
+        Returns:
+            int: Number of tokens, including per-message overhead
+        """
+        texts = []
+        for message in messages:
+            if message.get("name"):
+                texts.append(message["name"])
+            if message.get("content"):
+                texts.append(message["content"])
+        
+        counts = await self.count(encoding, texts)
+        return sum(counts) + len(messages) * TOKENS_PER_MESSAGE + TOKENS_PER_REPLY
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get memoization statistics.
+        
+        Returns:
+            Dict[str, Any]: Entry count, hits and misses
+        """
+        return {
+            "entries": len(self._counts),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+    
+    def _put(self, key: Tuple[str, bytes], count: int) -> None:
+        self._counts[key] = count
+        self._counts.move_to_end(key)
+        while len(self._counts) > self.max_entries:
+            self._counts.popitem(last=False)
+
+
+def _encode_batch(encoding: Any, texts: List[str]) -> List[int]:
+    """Encode texts and return their token counts."""
+    return [len(encoding.encode(text)) for text in texts]
+
+
+# Shared encoding pool
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="token-counter")
+    
+    return _executor
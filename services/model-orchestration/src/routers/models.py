@@ -1,9 +1,12 @@
+import json
+
 from fastapi import APIRouter, Depends, HTTPException, Query, Path, status, BackgroundTasks
-from typing import List, Optional, Dict, Any
+from fastapi.responses import StreamingResponse
+from typing import List, Optional, Dict, Any, AsyncIterator, Union
 from uuid import UUID
 
 from ..dependencies import get_model_service, get_current_user, get_optional_user, get_admin_user, UserInfo
-from ..exceptions import ModelNotFoundError, InvalidRequestError
+from ..exceptions import ModelNotFoundError, InvalidRequestError, ModelServiceError
 from ..models.api import (
     Model,
     ModelCreate,
@@ -16,13 +19,86 @@ from ..models.api import (
     AudioTranscriptionRequest,
     AudioTranslationRequest,
 )
-from ..models.api.responses import ModelResponseWrapper as ModelResponse
+from ..models.api.responses import ModelResponseWrapper as ModelResponse, StreamChunk
 from shared.models.src.enums import ModelProvider, ModelCapability, ModelStatus
 from ..services.model_service import ModelService
 
 router = APIRouter()
 
 
+async def _event_stream(
+    chunks: AsyncIterator[StreamChunk],
+    request: Union[ChatRequest, CompletionRequest],
+    request_type: str,
+    background_tasks: BackgroundTasks,
+    model_service: ModelService,
+) -> StreamingResponse:
+    """
+    Wrap a stream of response chunks as a server-sent events response.
+    
+    Each chunk is sent as a `data:` event and the stream ends with
+    `data: [DONE]`. The first chunk is awaited before the response starts,
+    so request errors still map to HTTP status codes; an empty stream is
+    sent as `data: [DONE]` alone. The request is logged once the summary
+    chunk arrives; background tasks run after the response body has been
+    sent.
+    
+    Args:
+        chunks: Response chunks from the model service
+        request: Chat or completion request
+        request_type: Request type
+        background_tasks: Background tasks
+        model_service: Model service
+        
+    Returns:
+        StreamingResponse: Event stream response
+    """
+    try:
+        first_chunk: Optional[StreamChunk] = await chunks.__anext__()
+    except StopAsyncIteration:
+        first_chunk = None
+    
+    async def events() -> AsyncIterator[str]:
+        content = []
+        chunk = first_chunk
+        try:
+            while chunk is not None:
+                if chunk.latency_ms is None:
+                    content.append(chunk.delta)
+                else:
+                    background_tasks.add_task(
+                        model_service.log_request,
+                        request_id=chunk.request_id,
+                        request_type=request_type,
+                        model_id=chunk.model,
+                        provider=chunk.provider,
+                        user_id=request.user_id,
+                        project_id=request.project_id,
+                        task_id=request.task_id,
+                        request_data=request.dict(),
+                        response_data={"content": "".join(content), "finish_reason": chunk.finish_reason},
+                        prompt_tokens=chunk.usage.prompt_tokens if chunk.usage else None,
+                        completion_tokens=chunk.usage.completion_tokens if chunk.usage else None,
+                        total_tokens=chunk.usage.total_tokens if chunk.usage else None,
+                        latency_ms=chunk.latency_ms,
+                        cost=chunk.cost,
+                    )
+                yield f"data: {chunk.model_dump_json(exclude_none=True)}\n\n"
+                chunk = await chunks.__anext__()
+        except StopAsyncIteration:
+            pass
+        except ModelServiceError as e:
+            # Headers are already sent, so errors are reported in the stream
+            yield f"data: {json.dumps({'error': {'message': e.message, 'code': e.code}})}\n\n"
+        yield "data: [DONE]\n\n"
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.post(
     "",
     response_model=Model,
@@ -216,7 +292,7 @@ async def delete_model(
     "/chat",
     response_model=ModelResponse,
     summary="Chat completion",
-    description="Send a chat completion request to a model.",
+    description="Send a chat completion request to a model. Set `stream` to receive server-sent events.",
 )
 async def chat_completion(
     request: ChatRequest,
@@ -243,6 +319,16 @@ async def chat_completion(
     if current_user and not request.user_id:
         request.user_id = current_user.id
     
+    # Stream response as server-sent events
+    if request.stream:
+        return await _event_stream(
+            model_service.stream_chat_request(request),
+            request,
+            "chat",
+            background_tasks,
+            model_service,
+        )
+    
     # Process request
     response = await model_service.process_chat_request(request)
     
@@ -269,7 +355,7 @@ async def chat_completion(
     "/completion",
     response_model=ModelResponse,
     summary="Text completion",
-    description="Send a text completion request to a model.",
+    description="Send a text completion request to a model. Set `stream` to receive server-sent events.",
 )
 async def text_completion(
     request: CompletionRequest,
@@ -296,6 +382,16 @@ async def text_completion(
     if current_user and not request.user_id:
         request.user_id = current_user.id
     
+    # Stream response as server-sent events
+    if request.stream:
+        return await _event_stream(
+            model_service.stream_completion_request(request),
+            request,
+            "completion",
+            background_tasks,
+            model_service,
+        )
+    
     # Process request
     response = await model_service.process_completion_request(request)
     
@@ -155,6 +155,50 @@ async def get_model_performance(
     }
 
 
+@router.get(
+    "/cache",
+    summary="Get response cache metrics",
+    description="Get hit, miss and saved-cost metrics of the response cache.",
+)
+async def get_response_cache_metrics(
+    current_user: Optional[UserInfo] = Depends(get_optional_user),
+    performance_tracker: PerformanceTracker = Depends(get_performance_tracker),
+) -> Dict[str, Any]:
+    """
+    Get response cache metrics.
+    
+    Args:
+        current_user: Current authenticated user (optional)
+        performance_tracker: Performance tracker service
+        
+    Returns:
+        Dict[str, Any]: Response cache metrics
+    """
+    return performance_tracker.get_response_cache_metrics()
+
+
+@router.get(
+    "/admission",
+    summary="Get admission metrics",
+    description="Get rate budgets, queue depth and wait times of the admission scheduler.",
+)
+async def get_admission_metrics(
+    current_user: Optional[UserInfo] = Depends(get_optional_user),
+    performance_tracker: PerformanceTracker = Depends(get_performance_tracker),
+) -> Dict[str, Any]:
+    """
+    Get admission scheduler metrics.
+    
+    Args:
+        current_user: Current authenticated user (optional)
+        performance_tracker: Performance tracker service
+        
+    Returns:
+        Dict[str, Any]: Admission metrics per provider model
+    """
+    return performance_tracker.get_admission_metrics()
+
+
 @router.post(
     "/reset",
     status_code=status.HTTP_200_OK,
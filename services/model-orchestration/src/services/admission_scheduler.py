@@ -0,0 +1,585 @@
+"""
+Provider-aware admission scheduling.
+
+Providers enforce requests-per-minute and tokens-per-minute budgets per
+model. Sending every request as soon as it arrives makes bursts fail with
+rate-limit errors all at once, and the retries back off blindly. The
+admission scheduler keeps the budgets of each provider and model on the
+service side instead: requests reserve their estimated tokens before they
+are sent, wait in priority order (interactive before background) while the
+budget is exhausted, and are dispatched as the budget refills. A
+rate-limit error from the provider pauses dispatch for the model until the
+provider's retry-after has passed.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Tuple
+
+from ..config import ModelOrchestrationConfig
+from ..exceptions import RateLimitError
+
+logger = logging.getLogger(__name__)
+
+# Priority classes in dispatch order
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_BACKGROUND = "background"
+PRIORITIES = (PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND)
+
+# Rough characters per token for estimating a request before it is counted
+CHARS_PER_TOKEN = 4
+
+# (provider name, model ID)
+QueueKey = Tuple[str, str]
+
+
+@dataclass(frozen=True)
+class RateLimits:
+    """
+    Per-minute budgets of a provider model (unlimited if not set).
+    """
+    requests_per_minute: Optional[int] = None
+    tokens_per_minute: Optional[int] = None
+    
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["RateLimits"]:
+        """
+        Read the budgets from a settings or model configuration dict.
+        
+        Args:
+            data: Dict with ``requests_per_minute`` and ``tokens_per_minute``
+        
+        Returns:
+            Optional[RateLimits]: Budgets, or None if the dict sets neither
+        """
+        if not data:
+            return None
+        
+        limits = cls(
+            requests_per_minute=data.get("requests_per_minute"),
+            tokens_per_minute=data.get("tokens_per_minute"),
+        )
+        if limits.requests_per_minute is None and limits.tokens_per_minute is None:
+            return None
+        return limits
+
+
+class RateBudget:
+    """
+    Per-minute budget that refills continuously.
+    """
+    
+    def __init__(self, per_minute: int):
+        """
+        Initialize a full budget.
+        
+        Args:
+            per_minute: Units available per minute
+        """
+        self.capacity = float(per_minute)
+        self.available = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated_at = time.monotonic()
+    
+    def refill(self, now: float) -> None:
+        """Add the units that accrued since the last refill."""
+        self.available = min(self.capacity, self.available + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+    
+    def wait_time(self, amount: float) -> float:
+        """
+        Get the seconds until an amount is available.
+        
+        Amounts larger than the whole budget wait for a full budget, so a
+        single oversized request cannot block its queue forever.
+        """
+        missing = min(amount, self.capacity) - self.available
+        return missing / self.rate if missing > 0 else 0.0
+    
+    def take(self, amount: float) -> None:
+        """Take an amount; the budget goes negative when over-used."""
+        self.available -= amount
+    
+    def give(self, amount: float) -> None:
+        """Return an amount that was reserved but not used."""
+        self.available = min(self.capacity, self.available + amount)
+
+
+@dataclass
+class Admission:
+    """
+    Budget reserved for an admitted request.
+    """
+    key: QueueKey
+    priority: str
+    tokens: int
+    wait_ms: float = 0.0
+    scheduler: Optional["AdmissionScheduler"] = field(default=None, repr=False)
+    
+    def settle(self, tokens: Optional[int]) -> None:
+        """
+        Replace the reserved token estimate with the tokens used.
+        
+        Args:
+            tokens: Tokens the provider reported (the estimate is kept if
+                not reported)
+        """
+        if tokens is None or self.scheduler is None:
+            return
+        
+        self.scheduler._settle(self, tokens)
+        self.tokens = tokens
+
+
+@dataclass
+class _Waiter:
+    tokens: int
+    enqueued_at: float
+    future: asyncio.Future
+
+
+class ModelAdmissionQueue:
+    """
+    Budgets and waiting requests of one provider model.
+    """
+    
+    def __init__(self, limits: Optional[RateLimits]):
+        """
+        Initialize the queue.
+        
+        Args:
+            limits: Per-minute budgets (unlimited if not given)
+        """
+        self.limits: Optional[RateLimits] = None
+        self.requests: Optional[RateBudget] = None
+        self.tokens: Optional[RateBudget] = None
+        self.waiters: Dict[str, Deque[_Waiter]] = {priority: deque() for priority in PRIORITIES}
+        self.paused_until = 0.0
+        self.timer: Optional[asyncio.TimerHandle] = None
+        
+        self.admitted = {priority: 0 for priority in PRIORITIES}
+        self.wait_ms_total = {priority: 0.0 for priority in PRIORITIES}
+        self.wait_ms_max = {priority: 0.0 for priority in PRIORITIES}
+        self.timeouts = 0
+        self.rate_limited = 0
+        
+        self.configure(limits)
+    
+    def configure(self, limits: Optional[RateLimits]) -> None:
+        """
+        Set the budgets, keeping the current budgets if they are unchanged.
+        
+        Args:
+            limits: Per-minute budgets (unlimited if not given)
+        """
+        if limits == self.limits:
+            return
+        
+        self.limits = limits
+        self.requests = RateBudget(limits.requests_per_minute) if limits and limits.requests_per_minute else None
+        self.tokens = RateBudget(limits.tokens_per_minute) if limits and limits.tokens_per_minute else None
+    
+    def wait_time(self, tokens: int, now: float) -> float:
+        """
+        Get the seconds until a request fits the budgets.
+        
+        Args:
+            tokens: Estimated tokens of the request
+            now: Current monotonic time
+        
+        Returns:
+            float: Seconds to wait (0 if the request fits now)
+        """
+        wait = max(0.0, self.paused_until - now)
+        for budget, amount in ((self.requests, 1), (self.tokens, tokens)):
+            if budget is not None:
+                budget.refill(now)
+                wait = max(wait, budget.wait_time(amount))
+        return wait
+    
+    def reserve(self, tokens: int) -> None:
+        """Take a request's share of the budgets."""
+        if self.requests is not None:
+            self.requests.take(1)
+        if self.tokens is not None:
+            self.tokens.take(tokens)
+    
+    def has_waiters(self, priority: str) -> bool:
+        """Whether requests of the priority class or a higher one are waiting."""
+        for waiting_priority in PRIORITIES:
+            if self.waiters[waiting_priority]:
+                return True
+            if waiting_priority == priority:
+                return False
+        return False
+    
+    def record_wait(self, priority: str, wait_ms: float) -> None:
+        """Count an admitted request and its wait time."""
+        self.admitted[priority] += 1
+        self.wait_ms_total[priority] += wait_ms
+        self.wait_ms_max[priority] = max(self.wait_ms_max[priority], wait_ms)
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get queue metrics.
+        
+        Returns:
+            Dict[str, Any]: Budgets, queue depth and wait times per priority
+        """
+        now = time.monotonic()
+        for budget in (self.requests, self.tokens):
+            if budget is not None:
+                budget.refill(now)
+        
+        return {
+            "requests_per_minute": self.limits.requests_per_minute if self.limits else None,
+            "tokens_per_minute": self.limits.tokens_per_minute if self.limits else None,
+            "available_requests": self.requests.available if self.requests else None,
+            "available_tokens": self.tokens.available if self.tokens else None,
+            "paused_for_ms": max(0.0, self.paused_until - now) * 1000,
+            "timeouts": self.timeouts,
+            "rate_limited": self.rate_limited,
+            "priorities": {
+                priority: {
+                    "waiting": len(self.waiters[priority]),
+                    "admitted": self.admitted[priority],
+                    "avg_wait_ms": (
+                        self.wait_ms_total[priority] / self.admitted[priority]
+                        if self.admitted[priority]
+                        else 0.0
+                    ),
+                    "max_wait_ms": self.wait_ms_max[priority],
+                }
+                for priority in PRIORITIES
+            },
+        }
+
+
+class AdmissionScheduler:
+    """
+    Admits model requests within per-provider, per-model rate budgets.
+    """
+    
+    def __init__(
+        self,
+        limits: Optional[Dict[str, Dict[str, Any]]] = None,
+        admission_timeout: float = 60.0,
+        rate_limit_cooldown: float = 5.0,
+    ):
+        """
+        Initialize the scheduler.
+        
+        Args:
+            limits: Budgets by provider name or ``provider/model`` (the more
+                specific entry wins)
+            admission_timeout: Seconds a request waits for budget before it
+                fails with a rate-limit error
+            rate_limit_cooldown: Seconds dispatch pauses after a provider
+                rate-limit error without a retry-after
+        """
+        self.limits = {name: RateLimits.from_dict(value) for name, value in (limits or {}).items()}
+        self.admission_timeout = admission_timeout
+        self.rate_limit_cooldown = rate_limit_cooldown
+        
+        self._queues: Dict[QueueKey, ModelAdmissionQueue] = {}
+    
+    def limits_for(
+        self,
+        provider_name: str,
+        model_id: str,
+        model_configuration: Optional[Dict[str, Any]] = None,
+    ) -> Optional[RateLimits]:
+        """
+        Get the budgets of a provider model.
+        
+        Args:
+            provider_name: Provider name
+            model_id: Model ID
+            model_configuration: Registered model configuration, whose
+                budgets take precedence over the settings
+        
+        Returns:
+            Optional[RateLimits]: Budgets, or None if unlimited
+        """
+        return (
+            RateLimits.from_dict(model_configuration)
+            or self.limits.get(f"{provider_name}/{model_id}")
+            or self.limits.get(provider_name)
+        )
+    
+    @asynccontextmanager
+    async def admit(
+        self,
+        provider_name: str,
+        model_id: str,
+        tokens: int,
+        priority: str = PRIORITY_INTERACTIVE,
+        limits: Optional[RateLimits] = None,
+    ) -> AsyncIterator[Admission]:
+        """
+        Wait for budget and hold it while the request runs.
+        
+        A rate-limit error raised in the block pauses the model's dispatch.
+        
+        Args:
+            provider_name: Provider name
+            model_id: Model ID
+            tokens: Estimated tokens of the request
+            priority: Priority class
+            limits: Budgets of the model (see ``limits_for``)
+        
+        Yields:
+            Admission: Reserved budget; settle it with the tokens used
+        
+        Raises:
+            RateLimitError: If no budget frees up within the admission timeout
+        """
+        admission = await self.acquire(provider_name, model_id, tokens, priority, limits)
+        try:
+            yield admission
+        except RateLimitError as e:
+            self.report_rate_limited(provider_name, model_id, e.details.get("retry_after"))
+            raise
+    
+    async def acquire(
+        self,
+        provider_name: str,
+        model_id: str,
+        tokens: int,
+        priority: str = PRIORITY_INTERACTIVE,
+        limits: Optional[RateLimits] = None,
+    ) -> Admission:
+        """
+        Wait for budget for a request.
+        
+        Args:
+            provider_name: Provider name
+            model_id: Model ID
+            tokens: Estimated tokens of the request
+            priority: Priority class
+            limits: Budgets of the model (see ``limits_for``)
+        
+        Returns:
+            Admission: Reserved budget
+        
+        Raises:
+            RateLimitError: If no budget frees up within the admission timeout
+        """
+        if priority not in PRIORITIES:
+            priority = PRIORITY_INTERACTIVE
+        
+        key = (provider_name, model_id)
+        queue = self._get_queue(key, limits)
+        
+        # Admit right away unless requests of the same or a higher priority
+        # are already waiting
+        now = time.monotonic()
+        if not queue.has_waiters(priority) and queue.wait_time(tokens, now) == 0:
+            queue.reserve(tokens)
+            queue.record_wait(priority, 0.0)
+            return Admission(key=key, priority=priority, tokens=tokens, scheduler=self)
+        
+        waiter = _Waiter(tokens=tokens, enqueued_at=now, future=asyncio.get_running_loop().create_future())
+        queue.waiters[priority].append(waiter)
+        self._dispatch(key)
+        
+        try:
+            wait_ms = await asyncio.wait_for(asyncio.shield(waiter.future), self.admission_timeout)
+        except asyncio.TimeoutError:
+            self._abandon(key, priority, waiter)
+            queue.timeouts += 1
+            raise RateLimitError(
+                provider_name,
+                f"No rate budget for model '{model_id}' within {self.admission_timeout:.0f}s",
+                details={"provider": provider_name, "model_id": model_id, "priority": priority},
+            )
+        except asyncio.CancelledError:
+            self._abandon(key, priority, waiter)
+            raise
+        
+        if wait_ms >= 1000:
+            logger.debug(f"{priority.capitalize()} request for {provider_name}/{model_id} waited {wait_ms:.0f} ms for rate budget")
+        return Admission(key=key, priority=priority, tokens=tokens, wait_ms=wait_ms, scheduler=self)
+    
+    def report_rate_limited(
+        self,
+        provider_name: str,
+        model_id: str,
+        retry_after: Optional[float] = None,
+    ) -> None:
+        """
+        Pause dispatch for a model the provider rate-limited.
+        
+        Args:
+            provider_name: Provider name
+            model_id: Model ID
+            retry_after: Seconds the provider asked to wait (the cooldown is
+                used if not given)
+        """
+        key = (provider_name, model_id)
+        queue = self._get_queue(key, None)
+        pause = retry_after if retry_after else self.rate_limit_cooldown
+        queue.paused_until = max(queue.paused_until, time.monotonic() + pause)
+        queue.rate_limited += 1
+        
+        # The provider's budget is spent even if ours is not
+        for budget in (queue.requests, queue.tokens):
+            if budget is not None:
+                budget.available = min(budget.available, 0.0)
+        
+        logger.warning(f"Provider rate-limited {provider_name}/{model_id}; pausing dispatch for {pause:.1f}s")
+    
+    def get_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get per-model queue metrics.
+        
+        Returns:
+            Dict[str, Dict[str, Any]]: ``provider/model`` to queue metrics
+        """
+        return {
+            f"{provider_name}/{model_id}": queue.get_metrics()
+            for (provider_name, model_id), queue in self._queues.items()
+        }
+    
+    def _get_queue(self, key: QueueKey, limits: Optional[RateLimits]) -> ModelAdmissionQueue:
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = ModelAdmissionQueue(limits or self.limits_for(*key))
+            self._queues[key] = queue
+        elif limits is not None:
+            queue.configure(limits)
+        return queue
+    
+    def _dispatch(self, key: QueueKey) -> None:
+        """
+        Admit waiting requests in priority order while the budgets allow.
+        
+        When the head request does not fit, a timer retries once enough of
+        the budget has refilled.
+        """
+        queue = self._queues[key]
+        if queue.timer is not None:
+            queue.timer.cancel()
+            queue.timer = None
+        
+        now = time.monotonic()
+        for priority in PRIORITIES:
+            waiters = queue.waiters[priority]
+            while waiters:
+                waiter = waiters[0]
+                if waiter.future.done():
+                    waiters.popleft()
+                    continue
+                
+                wait = queue.wait_time(waiter.tokens, now)
+                if wait > 0:
+                    queue.timer = asyncio.get_running_loop().call_later(wait, self._dispatch, key)
+                    return
+                
+                waiters.popleft()
+                queue.reserve(waiter.tokens)
+                wait_ms = (now - waiter.enqueued_at) * 1000
+                queue.record_wait(priority, wait_ms)
+                waiter.future.set_result(wait_ms)
+    
+    def _abandon(self, key: QueueKey, priority: str, waiter: _Waiter) -> None:
+        """Remove a waiter that gave up, returning its budget if it was admitted meanwhile."""
+        queue = self._queues[key]
+        if waiter.future.done() and not waiter.future.cancelled():
+            self._release(queue, 1, waiter.tokens)
+        else:
+            waiter.future.cancel()
+            try:
+                queue.waiters[priority].remove(waiter)
+            except ValueError:
+                pass
+        self._dispatch(key)
+    
+    def _settle(self, admission: Admission, tokens: int) -> None:
+        """Correct a token reservation to the tokens used."""
+        queue = self._queues.get(admission.key)
+        if queue is None or queue.tokens is None:
+            return
+        
+        if tokens < admission.tokens:
+            self._release(queue, 0, admission.tokens - tokens)
+            self._dispatch(admission.key)
+        else:
+            queue.tokens.take(tokens - admission.tokens)
+    
+    @staticmethod
+    def _release(queue: ModelAdmissionQueue, requests: int, tokens: int) -> None:
+        if queue.requests is not None and requests:
+            queue.requests.give(requests)
+        if queue.tokens is not None and tokens:
+            queue.tokens.give(tokens)
+
+
+def estimate_tokens(content: Any) -> int:
+    """
+    Estimate the tokens of a prompt, chat messages or embedding input.
+    
+    Args:
+        content: Prompt, chat messages or list of inputs
+    
+    Returns:
+        int: Estimated token count
+    """
+    if isinstance(content, str):
+        chars = len(content)
+    elif isinstance(content, list):
+        chars = sum(
+            len(item) if isinstance(item, str) else len(getattr(item, "content", None) or "")
+            for item in content
+        )
+    else:
+        chars = 0
+    return math.ceil(chars / CHARS_PER_TOKEN)
+
+
+def request_priority(request: Any) -> str:
+    """
+    Get the priority class of a request.
+    
+    Requests are interactive unless their metadata sets
+    ``priority="background"``.
+    
+    Args:
+        request: Model request
+    
+    Returns:
+        str: Priority class
+    """
+    priority = (getattr(request, "metadata", None) or {}).get("priority")
+    return priority if priority in PRIORITIES else PRIORITY_INTERACTIVE
+
+
+# Singleton instance
+_admission_scheduler: Optional[AdmissionScheduler] = None
+
+
+def get_admission_scheduler(settings: ModelOrchestrationConfig) -> AdmissionScheduler:
+    """
+    Get the admission scheduler singleton instance.
+    
+    Args:
+        settings: Application settings
+    
+    Returns:
+        AdmissionScheduler: Admission scheduler instance
+    """
+    global _admission_scheduler
+    
+    if _admission_scheduler is None:
+        _admission_scheduler = AdmissionScheduler(
+            limits=settings.provider_rate_limits,
+            admission_timeout=settings.admission_timeout,
+            rate_limit_cooldown=settings.rate_limit_cooldown,
+        )
+    
+    return _admission_scheduler
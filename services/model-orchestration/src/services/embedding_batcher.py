@@ -0,0 +1,321 @@
+"""
+Micro-batching embedding gateway.
+
+Agents embed many small snippets, and one provider call per request floods
+providers with tiny HTTP calls and trips their rate limits. The embedding
+batcher coalesces the inputs of concurrent requests for the same model
+within a short window into one provider call, up to the provider's maximum
+batch size, and scatters the embeddings back to the callers. Identical
+inputs share one slot in a batch, and embeddings are cached by content hash
+so repeated inputs skip the provider entirely. Each provider call is admitted
+against the model's rate budget once, for the tokens of the whole batch.
+"""
+
+import asyncio
+import hashlib
+import logging
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, AsyncContextManager, Callable, Dict, List, Optional, Set, Tuple
+
+from ..config import ModelOrchestrationConfig
+from ..models.api import EmbeddingRequest, EmbeddingResponse, EmbeddingResponseData, TokenUsage
+
+logger = logging.getLogger(__name__)
+
+# (provider name, model ID)
+BatchKey = Tuple[str, str]
+
+# (provider name, model ID, content hash)
+CacheKey = Tuple[str, str, bytes]
+
+# Admits a provider call for a batch's inputs; yields an admission to settle
+# with the prompt tokens used
+Admit = Callable[[List[str]], AsyncContextManager[Any]]
+
+
+@dataclass
+class EmbeddingResult:
+    """
+    Embedding of one input with its share of the batch's prompt tokens.
+    """
+    embedding: List[float]
+    prompt_tokens: int = 0
+
+
+@dataclass
+class PendingBatch:
+    """
+    Inputs waiting to be sent to a provider in one call.
+    """
+    provider: Any
+    request: EmbeddingRequest
+    admit: Optional[Admit] = None
+    inputs: Dict[str, asyncio.Future] = field(default_factory=dict)
+    timer: Optional[asyncio.TimerHandle] = None
+
+
+class EmbeddingBatcher:
+    """
+    Coalesces concurrent embedding requests into batched provider calls.
+    """
+    
+    def __init__(
+        self,
+        window_ms: float = 5.0,
+        cache_max_entries: int = 2048,
+    ):
+        """
+        Initialize the batcher.
+        
+        Args:
+            window_ms: Milliseconds a batch waits for more inputs
+            cache_max_entries: Maximum number of cached embeddings (0
+                disables the cache)
+        """
+        self.window_ms = window_ms
+        self.cache_max_entries = cache_max_entries
+        self.batches_sent = 0
+        self.inputs_sent = 0
+        self.cache_hits = 0
+        
+        self._pending: Dict[BatchKey, PendingBatch] = {}
+        self._cache: "OrderedDict[CacheKey, array]" = OrderedDict()
+        self._tasks: Set[asyncio.Task] = set()
+    
+    async def embed(
+        self,
+        provider: Any,
+        model_id: str,
+        request: EmbeddingRequest,
+        admit: Optional[Admit] = None,
+    ) -> EmbeddingResponse:
+        """
+        Embed the inputs of a request.
+        
+        Args:
+            provider: Provider to embed with
+            model_id: Resolved model ID
+            request: Embedding request
+            admit: Admits provider calls; a batch uses the one of the
+                request that opened it
+        
+        Returns:
+            EmbeddingResponse: Embeddings in input order; usage counts only
+                the inputs that were sent to the provider, apportioned by
+                length across the batch
+        """
+        inputs = [request.input] if isinstance(request.input, str) else list(request.input)
+        batch_key = (provider.provider_name, model_id)
+        
+        results: List[Optional[EmbeddingResult]] = []
+        waiting: List[Tuple[int, asyncio.Future]] = []
+        
+        for i, text in enumerate(inputs):
+            cached = self._get_cached(batch_key, text)
+            if cached is not None:
+                results.append(cached)
+                continue
+            
+            results.append(None)
+            waiting.append((i, self._enqueue(provider, model_id, request, text, admit)))
+        
+        # Futures are shared with other callers, so one caller's cancellation
+        # must not cancel them
+        for i, future in waiting:
+            results[i] = await asyncio.shield(future)
+        
+        prompt_tokens = sum(result.prompt_tokens for result in results)
+        return EmbeddingResponse(
+            object="embedding",
+            model=model_id,
+            data=[
+                EmbeddingResponseData(index=i, embedding=result.embedding)
+                for i, result in enumerate(results)
+            ],
+            usage=TokenUsage(
+                prompt_tokens=prompt_tokens,
+                completion_tokens=0,
+                total_tokens=prompt_tokens,
+            ),
+        )
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get batching statistics.
+        
+        Returns:
+            Dict[str, Any]: Batches and inputs sent, cache hits and entries
+        """
+        return {
+            "batches_sent": self.batches_sent,
+            "inputs_sent": self.inputs_sent,
+            "cache_hits": self.cache_hits,
+            "cache_entries": len(self._cache),
+            "pending_batches": len(self._pending),
+        }
+    
+    def _enqueue(
+        self,
+        provider: Any,
+        model_id: str,
+        request: EmbeddingRequest,
+        text: str,
+        admit: Optional[Admit] = None,
+    ) -> asyncio.Future:
+        """
+        Add an input to the pending batch of its model.
+        
+        Args:
+            provider: Provider to embed with
+            model_id: Resolved model ID
+            request: Request the input belongs to
+            text: Input text
+            admit: Admits the provider call if the input opens a batch
+        
+        Returns:
+            asyncio.Future: Resolves to the input's EmbeddingResult
+        """
+        batch_key = (provider.provider_name, model_id)
+        batch = self._pending.get(batch_key)
+        if batch is None:
+            loop = asyncio.get_running_loop()
+            batch = PendingBatch(
+                provider=provider,
+                request=request.model_copy(update={"model_id": model_id}),
+                admit=admit,
+            )
+            batch.timer = loop.call_later(self.window_ms / 1000, self._send, batch_key)
+            self._pending[batch_key] = batch
+        
+        # Identical inputs share one slot
+        future = batch.inputs.get(text)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            batch.inputs[text] = future
+        
+        if len(batch.inputs) >= max(1, provider.max_embedding_batch_size):
+            self._send(batch_key)
+        
+        return future
+    
+    def _send(self, batch_key: BatchKey) -> None:
+        """Send the pending batch of a model."""
+        batch = self._pending.pop(batch_key, None)
+        if batch is None:
+            return
+        if batch.timer is not None:
+            batch.timer.cancel()
+        task = asyncio.get_running_loop().create_task(self._embed_batch(batch_key, batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+    
+    async def _embed_batch(self, batch_key: BatchKey, batch: PendingBatch) -> None:
+        """
+        Embed a batch and resolve the futures of its inputs.
+        
+        Args:
+            batch_key: Provider name and model ID
+            batch: Batch to embed
+        """
+        texts = list(batch.inputs)
+        self.batches_sent += 1
+        self.inputs_sent += len(texts)
+        
+        try:
+            if batch.admit is None:
+                response = await self._call_provider(batch, texts)
+            else:
+                async with batch.admit(texts) as admission:
+                    response = await self._call_provider(batch, texts)
+                    admission.settle(response.usage.prompt_tokens if response.usage else None)
+            embeddings = {item.index: item.embedding for item in response.data}
+            if len(embeddings) != len(texts):
+                raise ValueError(f"Expected {len(texts)} embeddings, got {len(embeddings)}")
+        except Exception as e:
+            logger.error(f"Error embedding batch of {len(texts)} inputs for {batch_key[1]}: {str(e)}")
+            for future in batch.inputs.values():
+                if not future.done():
+                    future.set_exception(e)
+                    # Mark the exception retrieved when every caller went away
+                    future.exception()
+            return
+        
+        prompt_tokens = self._apportion_tokens(texts, response.usage.prompt_tokens if response.usage else 0)
+        for i, text in enumerate(texts):
+            result = EmbeddingResult(embedding=embeddings[i], prompt_tokens=prompt_tokens[i])
+            self._put_cached(batch_key, text, result.embedding)
+            future = batch.inputs[text]
+            if not future.done():
+                future.set_result(result)
+    
+    @staticmethod
+    async def _call_provider(batch: PendingBatch, texts: List[str]) -> EmbeddingResponse:
+        """Send the inputs of a batch to its provider."""
+        return await batch.provider.embedding(batch.request.model_copy(update={"input": texts}))
+    
+    def _get_cached(self, batch_key: BatchKey, text: str) -> Optional[EmbeddingResult]:
+        """Get a cached embedding."""
+        if not self.cache_max_entries:
+            return None
+        
+        key = (*batch_key, _content_hash(text))
+        embedding = self._cache.get(key)
+        if embedding is None:
+            return None
+        
+        self._cache.move_to_end(key)
+        self.cache_hits += 1
+        return EmbeddingResult(embedding=embedding.tolist())
+    
+    def _put_cached(self, batch_key: BatchKey, text: str, embedding: List[float]) -> None:
+        """Cache an embedding, evicting the least recently used ones."""
+        if not self.cache_max_entries:
+            return
+        
+        key = (*batch_key, _content_hash(text))
+        # Packed doubles take a fraction of the memory of a list of floats
+        self._cache[key] = array("d", embedding)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_max_entries:
+            self._cache.popitem(last=False)
+    
+    @staticmethod
+    def _apportion_tokens(texts: List[str], prompt_tokens: int) -> List[int]:
+        """Split a batch's prompt tokens across its inputs by length."""
+        total_chars = sum(len(text) for text in texts) or 1
+        shares = [prompt_tokens * len(text) // total_chars for text in texts]
+        # Give the rounding remainder to the longest input
+        if shares:
+            shares[max(range(len(texts)), key=lambda i: len(texts[i]))] += prompt_tokens - sum(shares)
+        return shares
+
+
+def _content_hash(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+# Singleton instance
+_embedding_batcher: Optional[EmbeddingBatcher] = None
+
+
+def get_embedding_batcher(settings: ModelOrchestrationConfig) -> EmbeddingBatcher:
+    """
+    Get the embedding batcher singleton instance.
+    
+    Args:
+        settings: Application settings
+    
+    Returns:
+        EmbeddingBatcher: Embedding batcher instance
+    """
+    global _embedding_batcher
+    
+    if _embedding_batcher is None:
+        _embedding_batcher = EmbeddingBatcher(
+            window_ms=settings.embedding_batch_window_ms,
+            cache_max_entries=settings.embedding_cache_max_entries,
+        )
+    
+    return _embedding_batcher
@@ -0,0 +1,85 @@
+"""
+In-process model registry cache.
+
+The model registry changes rarely, but every model request looks up its
+model. This module keeps recently used models (and misses) in memory for
+a TTL so the request path does not query the database on every call.
+Changes made by this process invalidate entries directly; the
+``model.registered``, ``model.updated`` and ``model.deleted`` events
+invalidate them in every other process.
+"""
+
+import logging
+from typing import Any, Dict, Optional
+
+from shared.utils.src.messaging import EventBus
+
+from ..config import ModelOrchestrationConfig
+from ..models.api import Model
+from .ttl_cache import AsyncTTLCache
+
+logger = logging.getLogger(__name__)
+
+# Events that change the model registry
+MODEL_EVENTS = ("model.registered", "model.updated", "model.deleted")
+
+
+class ModelRegistry(AsyncTTLCache[Model]):
+    """
+    Read-through TTL cache of registered models.
+    
+    Missing models are cached too, since requests for unregistered model
+    IDs fall back to provider inference on every call.
+    """
+    
+    def __init__(self, ttl_seconds: float = 300.0, max_entries: int = 1024):
+        """
+        Initialize the registry.
+        
+        Args:
+            ttl_seconds: Seconds a cached lookup stays valid
+            max_entries: Maximum number of cached lookups
+        """
+        super().__init__(ttl_seconds, max_entries)
+    
+    async def subscribe(self, event_bus: EventBus) -> None:
+        """
+        Keep the registry in sync with model events from all processes.
+        
+        Args:
+            event_bus: Event bus
+        """
+        for event_type in MODEL_EVENTS:
+            await event_bus.subscribe_to_event(event_type, self._handle_model_event)
+        logger.info("Model registry subscribed to model events")
+    
+    async def _handle_model_event(self, data: Dict[str, Any]) -> None:
+        """Invalidate the model referenced by a model event."""
+        model_id = data.get("model_id")
+        logger.debug(f"Invalidating model registry entry: {model_id or 'all'}")
+        self.invalidate(model_id)
+
+
+# Singleton instance
+_model_registry: Optional[ModelRegistry] = None
+
+
+def get_model_registry(settings: ModelOrchestrationConfig) -> ModelRegistry:
+    """
+    Get the model registry singleton instance.
+    
+    Args:
+        settings: Application settings
+    
+    Returns:
+        ModelRegistry: Model registry instance
+    """
+    global _model_registry
+    
+    if _model_registry is None:
+        _model_registry = ModelRegistry(
+            ttl_seconds=settings.model_registry_ttl,
+            max_entries=settings.model_registry_max_entries,
+        )
+    
+    return _model_registry
@@ -82,6 +82,7 @@ class ModelManagementMixin:
             self.db.add(model_model)
             await self.db.commit()
             await self.db.refresh(model_model)
+            self._invalidate_model(model_model.model_id)
             
             # Convert to API model
             model = Model(
@@ -125,6 +126,10 @@ class ModelManagementMixin:
         """
         Get a model by ID.
         
+        Lookups are served from the model registry cache when one is
+        configured, so the request path does not query the database on
+        every call.
+        
         Args:
             model_id: Model ID
             
@@ -132,38 +137,64 @@ class ModelManagementMixin:
             Optional[Model]: Model if found, None otherwise
         """
         try:
-            # Query model
-            query = select(ModelModel).where(ModelModel.model_id == model_id)
-            result = await self.db.execute(query)
-            model_model = result.scalars().first()
-            
-            # Return None if not found
-            if not model_model:
-                return None
-            
-            # Convert to API model
-            model = Model(
-                id=model_model.id,
-                model_id=model_model.model_id,
-                provider=model_model.provider,
-                display_name=model_model.display_name,
-                description=model_model.description,
-                capabilities=[ModelCapability(cap) for cap in model_model.capabilities],
-                status=model_model.status,
-                max_tokens=model_model.max_tokens,
-                token_limit=model_model.token_limit,
-                cost_per_token=model_model.cost_per_token,
-                configuration=model_model.configuration or {},
-                metadata=model_model.metadata or {},
-                created_at=model_model.created_at,
-                updated_at=model_model.updated_at,
-            )
-            
-            return model
+            if self.model_registry is not None:
+                return await self.model_registry.get(model_id, self._load_model)
+            return await self._load_model(model_id)
         except Exception as e:
             logger.error(f"Error getting model {model_id}: {str(e)}")
             return None
     
+    async def _load_model(self, model_id: str) -> Optional[Model]:
+        """
+        Load a model from the database.
+        
+        Args:
+            model_id: Model ID
+            
+        Returns:
+            Optional[Model]: Model if found, None otherwise
+        """
+        # Query model
+        query = select(ModelModel).where(ModelModel.model_id == model_id)
+        result = await self.db.execute(query)
+        model_model = result.scalars().first()
+        
+        # Return None if not found
+        if not model_model:
+            return None
+        
+        # Convert to API model
+        model = Model(
+            id=model_model.id,
+            model_id=model_model.model_id,
+            provider=model_model.provider,
+            display_name=model_model.display_name,
+            description=model_model.description,
+            capabilities=[ModelCapability(cap) for cap in model_model.capabilities],
+            status=model_model.status,
+            max_tokens=model_model.max_tokens,
+            token_limit=model_model.token_limit,
+            cost_per_token=model_model.cost_per_token,
+            configuration=model_model.configuration or {},
+            metadata=model_model.metadata or {},
+            created_at=model_model.created_at,
+            updated_at=model_model.updated_at,
+        )
+        
+        return model
+    
+    def _invalidate_model(self, model_id: str) -> None:
+        """
+        Drop a changed model from the model registry cache.
+        
+        Other processes are invalidated by the published model event.
+        
+        Args:
+            model_id: Model ID
+        """
+        if self.model_registry is not None:
+            self.model_registry.invalidate(model_id)
+    
     async def list_models(
         self,
         page: int = 1,
@@ -307,6 +338,7 @@ class ModelManagementMixin:
             # Commit changes
             await self.db.commit()
             await self.db.refresh(model_model)
+            self._invalidate_model(model_model.model_id)
             
             # Convert to API model
             model = Model(
@@ -375,6 +407,7 @@ class ModelManagementMixin:
             # Delete model
             await self.db.delete(model_model)
             await self.db.commit()
+            self._invalidate_model(model_id)
             
             # Publish event
             await self.event_bus.publish_event(
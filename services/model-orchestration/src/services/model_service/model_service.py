@@ -13,6 +13,11 @@ from shared.utils.src.messaging import EventBus, CommandBus
 from ...config import ModelOrchestrationConfig, config
 from ...providers.provider_factory import ProviderFactory
 from ..performance_tracker import PerformanceTracker
+from ..model_registry import ModelRegistry
+from ..admission_scheduler import AdmissionScheduler
+from ..embedding_batcher import EmbeddingBatcher
+from ..response_cache import ResponseCache
+from ..specialization_client import SpecializationClient
 from .model_management import ModelManagementMixin
 from .request_processing import RequestProcessingMixin
 from .logging import LoggingMixin
@@ -38,6 +43,11 @@ class ModelService(ModelManagementMixin, RequestProcessingMixin, LoggingMixin):
         settings: ModelOrchestrationConfig,
         provider_factory: ProviderFactory,
         performance_tracker: Optional[PerformanceTracker] = None,
+        model_registry: Optional[ModelRegistry] = None,
+        specialization_client: Optional[SpecializationClient] = None,
+        embedding_batcher: Optional[EmbeddingBatcher] = None,
+        response_cache: Optional[ResponseCache] = None,
+        admission_scheduler: Optional[AdmissionScheduler] = None,
     ):
         """
         Initialize the model service.
@@ -49,6 +59,16 @@ class ModelService(ModelManagementMixin, RequestProcessingMixin, LoggingMixin):
             settings: Application settings
             provider_factory: Provider factory
             performance_tracker: Performance tracker
+            model_registry: Model registry cache (models are loaded from the
+                database on every lookup if not given)
+            specialization_client: Agent specialization client (the shared
+                client is used if not given)
+            embedding_batcher: Embedding batcher (each embedding request is
+                sent to the provider on its own if not given)
+            response_cache: Response cache for deterministic requests
+                (responses are not cached if not given)
+            admission_scheduler: Rate budget scheduler (requests are sent
+                to providers right away if not given)
         """
         self.db = db
         self.event_bus = event_bus
@@ -56,3 +76,8 @@ class ModelService(ModelManagementMixin, RequestProcessingMixin, LoggingMixin):
         self.settings = config
         self.provider_factory = provider_factory
         self.performance_tracker = performance_tracker
+        self.model_registry = model_registry
+        self.specialization_client = specialization_client
+        self.embedding_batcher = embedding_batcher
+        self.response_cache = response_cache
+        self.admission_scheduler = admission_scheduler
@@ -8,12 +8,14 @@ different types of model requests.
 import logging
 import time
 import uuid
-import httpx
-from typing import Optional, Tuple, Dict, Any, List
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Optional, Tuple, Dict, Any, List, AsyncIterator, Union
 
 from ...exceptions import (
     InvalidRequestError,
     ProviderNotAvailableError,
+    RateLimitError,
     TokenLimitError,
     RequestTimeoutError,
 )
@@ -23,15 +25,40 @@ from ...models.api import (
     ChatRequest,
     CompletionRequest,
     EmbeddingRequest,
+    ChatResponse,
+    CompletionResponse,
     ImageGenerationRequest,
     AudioTranscriptionRequest,
     AudioTranslationRequest,
+    Model,
     ModelResponseWrapper as ModelResponse,  # Renamed to match usage in this file
+    StreamChunk,
+    TokenUsage,
 )
+from ...models import ChatMessage, MessageRole
+from ..admission_scheduler import Admission, estimate_tokens, request_priority
+from ..response_cache import CachedResponse, Embedder, ResponseCacheKey, build_cache_key
+from ..specialization_client import SpecializationPrompt, get_specialization_client
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class RequestContext:
+    """
+    Model, provider and limits resolved once per request.
+    """
+    model_id: str
+    provider_name: str
+    provider: Any
+    model: Optional[Model] = None
+    
+    @property
+    def token_limit(self) -> Optional[int]:
+        """Token limit of the registered model, if any."""
+        return self.model.token_limit if self.model else None
+
+
 class RequestProcessingMixin:
     """
     Mixin for request processing operations.
@@ -45,7 +72,35 @@ class RequestProcessingMixin:
     - Audio translation
     """
     
-    async def _resolve_model_and_provider(self, model_id: Optional[str], provider: Optional[str]) -> Tuple[str, str]:
+    async def _resolve_request_context(self, request: Any) -> RequestContext:
+        """
+        Resolve the model, provider and token limit for a request.
+        
+        Args:
+            request: Model request
+            
+        Returns:
+            RequestContext: Resolved request context
+            
+        Raises:
+            InvalidRequestError: If model ID or provider cannot be resolved
+            ProviderNotAvailableError: If provider is not available
+        """
+        model_id, provider_name, model = await self._resolve_model_and_provider(request.model_id, request.provider)
+        provider = await self.provider_factory.get_provider(provider_name)
+        
+        return RequestContext(
+            model_id=model_id,
+            provider_name=provider_name,
+            provider=provider,
+            model=model,
+        )
+    
+    async def _resolve_model_and_provider(
+        self,
+        model_id: Optional[str],
+        provider: Optional[str],
+    ) -> Tuple[str, str, Optional[Model]]:
         """
         Resolve model ID and provider.
         
@@ -54,7 +109,8 @@ class RequestProcessingMixin:
             provider: Provider name
             
         Returns:
-            Tuple[str, str]: Model ID and provider name
+            Tuple[str, str, Optional[Model]]: Model ID, provider name and the
+                registered model (None if the model is not registered)
             
         Raises:
             InvalidRequestError: If model ID or provider cannot be resolved
@@ -63,16 +119,16 @@ class RequestProcessingMixin:
         if model_id:
             model = await self.get_model(model_id)
             if model:
-                return model_id, model.provider.value
+                return model_id, model.provider.value, model
             
             # If provider is also provided, use it
             if provider:
-                return model_id, provider
+                return model_id, provider, None
             
             # Otherwise, try to infer provider from model ID
             inferred_provider = self.provider_factory.infer_provider_from_model_id(model_id)
             if inferred_provider:
-                return model_id, inferred_provider
+                return model_id, inferred_provider, None
             
             raise InvalidRequestError(f"Model '{model_id}' not found and provider not specified")
         
@@ -80,82 +136,126 @@ class RequestProcessingMixin:
         if provider:
             default_model = self.provider_factory.get_default_model_for_provider(provider)
             if default_model:
-                return default_model, provider
+                return default_model, provider, await self.get_model(default_model)
             
             raise InvalidRequestError(f"Provider '{provider}' has no default model")
         
         # If neither model ID nor provider is provided, use system default
         if self.settings.default_model_id and self.settings.default_provider:
-            return self.settings.default_model_id, self.settings.default_provider
+            default_model = await self.get_model(self.settings.default_model_id)
+            return self.settings.default_model_id, self.settings.default_provider, default_model
         
         raise InvalidRequestError("Model ID or provider must be specified")
     
-    async def _check_token_limits(self, content: Any, model_id: str, provider: Any) -> None:
+    async def _check_token_limits(self, content: Any, context: RequestContext) -> Optional[int]:
         """
         Check token limits for a request.
         
         Args:
             content: Request content
-            model_id: Model ID
-            provider: Provider
+            context: Resolved request context
+            
+        Returns:
+            Optional[int]: Prompt token count, or None if it was not counted
             
         Raises:
-            TokenLimitError: If token limit is exceeded
+            TokenLimitError: If token limit is exceeded, or tokens cannot be
+                counted and their upper bound exceeds it
         """
-        # Get model token limit
-        model = await self.get_model(model_id)
-        token_limit = model.token_limit if model else None
-        
         # If no token limit is set, skip check
+        token_limit = context.token_limit
         if not token_limit:
-            return
+            return None
         
-        # Count tokens
-        token_count = await provider.count_tokens(content)
+        # Skip exact counting when the request is clearly under the limit
+        upper_bound = context.provider.estimate_max_tokens(self._prompt_for_counting(content), context.model_id)
+        if upper_bound is not None and upper_bound <= token_limit:
+            return None
+        
+        # Count tokens. A failed count must not let an oversized prompt
+        # through, so fall back to the upper bound, or fail if there is none.
+        try:
+            token_count = await context.provider.count_tokens(self._prompt_for_counting(content), context.model_id)
+        except Exception as e:
+            if upper_bound is None:
+                raise
+            logger.warning(f"Could not count prompt tokens for {context.model_id}, using upper bound {upper_bound}: {str(e)}")
+            token_count = upper_bound
         
         # Check if token count exceeds limit
         if token_count > token_limit:
             raise TokenLimitError(
-                f"Token count {token_count} exceeds limit {token_limit} for model {model_id}"
+                token_count,
+                token_limit,
+                f"Token count {token_count} exceeds limit {token_limit} for model {context.model_id}",
             )
+        
+        return token_count
+    
+    @asynccontextmanager
+    async def _admission(
+        self,
+        request: Any,
+        context: RequestContext,
+        content: Any,
+        prompt_tokens: Optional[int] = None,
+    ) -> AsyncIterator[Admission]:
+        """
+        Wait until the model's rate budget admits a request.
+        
+        The request reserves its prompt tokens (the counted ones if
+        available, an estimate otherwise) plus its completion allowance.
+        
+        Args:
+            request: Model request
+            context: Resolved request context
+            content: Prompt, chat messages or embedding input
+            prompt_tokens: Counted prompt tokens
+            
+        Yields:
+            Admission: Reserved budget; settle it with the tokens used
+            
+        Raises:
+            RateLimitError: If the model has no budget within the admission timeout
+        """
+        scheduler = getattr(self, "admission_scheduler", None)
+        if scheduler is None:
+            yield Admission(key=(context.provider_name, context.model_id), priority=request_priority(request), tokens=0)
+            return
+        
+        tokens = prompt_tokens if prompt_tokens is not None else estimate_tokens(content)
+        if not isinstance(request, EmbeddingRequest):
+            tokens += request.max_tokens or self.settings.max_output_tokens
+        
+        limits = scheduler.limits_for(
+            context.provider_name,
+            context.model_id,
+            context.model.configuration if context.model else None,
+        )
+        async with scheduler.admit(
+            context.provider_name,
+            context.model_id,
+            tokens,
+            request_priority(request),
+            limits,
+        ) as admission:
+            yield admission
     
-    async def _get_agent_specialization(self, agent_specialization_id: str) -> Optional[Dict[str, Any]]:
+    async def _get_agent_specialization(self, agent_specialization_id: str) -> Optional[SpecializationPrompt]:
         """
         Get agent specialization information from the Agent Orchestrator service.
         
+        Lookups go through the shared specialization client, which pools
+        connections and caches specializations with their prompt fragments.
+        
         Args:
             agent_specialization_id: Agent specialization ID
             
         Returns:
-            Optional[Dict[str, Any]]: Agent specialization information or None if not found
+            Optional[SpecializationPrompt]: Agent specialization or None if not found
         """
-        if not agent_specialization_id:
-            return None
-            
-        try:
-            # Get agent specialization from Agent Orchestrator
-            agent_orchestrator_url = self.settings.agent_orchestrator_url
-            if not agent_orchestrator_url:
-                logger.warning("Agent Orchestrator URL not configured, skipping specialization lookup")
-                return None
-                
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{agent_orchestrator_url}/api/specializations/{agent_specialization_id}",
-                    timeout=5.0,
-                )
-                
-                if response.status_code == 200:
-                    return response.json().get("data")
-                elif response.status_code == 404:
-                    logger.warning(f"Agent specialization {agent_specialization_id} not found")
-                    return None
-                else:
-                    logger.error(f"Error getting agent specialization: {response.text}")
-                    return None
-        except Exception as e:
-            logger.error(f"Error getting agent specialization: {str(e)}")
-            return None
+        client = getattr(self, "specialization_client", None) or get_specialization_client(self.settings)
+        return await client.get(agent_specialization_id)
     
     async def _enhance_request_with_specialization(self, request: Any) -> None:
         """
@@ -175,60 +275,20 @@ class RequestProcessingMixin:
         # Enhance request based on specialization
         if isinstance(request, ChatRequest):
             # Add specialization information to system message
-            system_message_found = False
             for message in request.messages:
                 if message.role.value == "SYSTEM":
-                    system_message_found = True
-                    # Enhance system message with specialization information
-                    skills = specialization.get("required_skills", [])
-                    responsibilities = specialization.get("responsibilities", [])
-                    knowledge_domains = specialization.get("knowledge_domains", [])
-                    
-                    specialization_info = (
-                        f"\n\nYou are specialized as a {specialization.get('agent_type', 'GENERAL')} agent with the following:\n"
-                        f"Skills: {', '.join(skills)}\n"
-                        f"Responsibilities: {', '.join(responsibilities)}\n"
-                        f"Knowledge Domains: {', '.join(knowledge_domains)}"
-                    )
-                    
-                    message.content += specialization_info
+                    message.content += specialization.system_suffix
                     break
-                    
-            # If no system message found, add one
-            if not system_message_found and request.messages:
-                from ...models.api import ChatMessage, MessageRole
-                
-                # Create specialization information
-                skills = specialization.get("required_skills", [])
-                responsibilities = specialization.get("responsibilities", [])
-                knowledge_domains = specialization.get("knowledge_domains", [])
-                
-                specialization_info = (
-                    f"You are specialized as a {specialization.get('agent_type', 'GENERAL')} agent with the following:\n"
-                    f"Skills: {', '.join(skills)}\n"
-                    f"Responsibilities: {', '.join(responsibilities)}\n"
-                    f"Knowledge Domains: {', '.join(knowledge_domains)}"
-                )
-                
-                # Add system message at the beginning
-                request.messages.insert(0, ChatMessage(
-                    role=MessageRole.SYSTEM,
-                    content=specialization_info,
-                ))
+            else:
+                # If no system message found, add one at the beginning
+                if request.messages:
+                    request.messages.insert(0, ChatMessage(
+                        role=MessageRole.SYSTEM,
+                        content=specialization.system_message,
+                    ))
         elif isinstance(request, CompletionRequest):
             # Add specialization information to prompt
-            skills = specialization.get("required_skills", [])
-            responsibilities = specialization.get("responsibilities", [])
-            knowledge_domains = specialization.get("knowledge_domains", [])
-            
-            specialization_info = (
-                f"[You are specialized as a {specialization.get('agent_type', 'GENERAL')} agent with the following:\n"
-                f"Skills: {', '.join(skills)}\n"
-                f"Responsibilities: {', '.join(responsibilities)}\n"
-                f"Knowledge Domains: {', '.join(knowledge_domains)}]\n\n"
-            )
-            
-            request.prompt = specialization_info + request.prompt
+            request.prompt = specialization.prompt_prefix + request.prompt
     
     async def process_chat_request(self, request: ChatRequest) -> ModelResponse:
         """
@@ -253,18 +313,26 @@ class RequestProcessingMixin:
             # Enhance request with specialization information
             await self._enhance_request_with_specialization(request)
             
-            # Get model and provider
-            model_id, provider_name = await self._resolve_model_and_provider(request.model_id, request.provider)
-            
-            # Get provider
-            provider = await self.provider_factory.get_provider(provider_name)
+            # Resolve model, provider and token limit once for the request
+            context = await self._resolve_request_context(request)
+            model_id, provider_name, provider = context.model_id, context.provider_name, context.provider
             
             # Check token limits
+            prompt_tokens = None
             if self.settings.enable_token_counting:
-                await self._check_token_limits(request.messages, model_id, provider)
+                prompt_tokens = await self._check_token_limits(request.messages, context)
             
-            # Process request
-            response = await provider.chat_completion(request)
+            # Serve repeated deterministic requests from the response cache
+            cache_key = self._response_cache_key(request, model_id)
+            if cache_key is not None:
+                cached = await self.response_cache.get(cache_key, model_id, self._response_cache_embedder())
+                if cached is not None:
+                    return self._cached_model_response(cached, ChatResponse, request_id, model_id, start_time)
+            
+            # Process request once the model's rate budget allows
+            async with self._admission(request, context, request.messages, prompt_tokens) as admission:
+                response = await provider.chat_completion(request)
+                admission.settle(response.usage.total_tokens if response.usage else None)
             
             # Calculate metrics
             latency_ms = (time.time() - start_time) * 1000
@@ -277,6 +345,9 @@ class RequestProcessingMixin:
                     response.usage.completion_tokens,
                 )
             
+            if cache_key is not None:
+                await self._cache_response(cache_key, response, provider_name, cost)
+            
             # Estimate quality score and confidence
             # This is a simple heuristic and could be improved with more sophisticated methods
             quality_score = None
@@ -336,7 +407,7 @@ class RequestProcessingMixin:
             )
             
             # Re-raise specific exceptions
-            if isinstance(e, (InvalidRequestError, ProviderNotAvailableError, TokenLimitError, RequestTimeoutError)):
+            if isinstance(e, (InvalidRequestError, ProviderNotAvailableError, RateLimitError, TokenLimitError, RequestTimeoutError)):
                 raise
             
             # Wrap other exceptions
@@ -365,18 +436,26 @@ class RequestProcessingMixin:
             # Enhance request with specialization information
             await self._enhance_request_with_specialization(request)
             
-            # Get model and provider
-            model_id, provider_name = await self._resolve_model_and_provider(request.model_id, request.provider)
-            
-            # Get provider
-            provider = await self.provider_factory.get_provider(provider_name)
+            # Resolve model, provider and token limit once for the request
+            context = await self._resolve_request_context(request)
+            model_id, provider_name, provider = context.model_id, context.provider_name, context.provider
             
             # Check token limits
+            prompt_tokens = None
             if self.settings.enable_token_counting:
-                await self._check_token_limits(request.prompt, model_id, provider)
+                prompt_tokens = await self._check_token_limits(request.prompt, context)
             
-            # Process request
-            response = await provider.text_completion(request)
+            # Serve repeated deterministic requests from the response cache
+            cache_key = self._response_cache_key(request, model_id)
+            if cache_key is not None:
+                cached = await self.response_cache.get(cache_key, model_id, self._response_cache_embedder())
+                if cached is not None:
+                    return self._cached_model_response(cached, CompletionResponse, request_id, model_id, start_time)
+            
+            # Process request once the model's rate budget allows
+            async with self._admission(request, context, request.prompt, prompt_tokens) as admission:
+                response = await provider.text_completion(request)
+                admission.settle(response.usage.total_tokens if response.usage else None)
             
             # Calculate metrics
             latency_ms = (time.time() - start_time) * 1000
@@ -389,6 +468,9 @@ class RequestProcessingMixin:
                     response.usage.completion_tokens,
                 )
             
+            if cache_key is not None:
+                await self._cache_response(cache_key, response, provider_name, cost)
+            
             # Create response
             model_response = ModelResponse(
                 response=response,
@@ -417,12 +499,335 @@ class RequestProcessingMixin:
             )
             
             # Re-raise specific exceptions
-            if isinstance(e, (InvalidRequestError, ProviderNotAvailableError, TokenLimitError, RequestTimeoutError)):
+            if isinstance(e, (InvalidRequestError, ProviderNotAvailableError, RateLimitError, TokenLimitError, RequestTimeoutError)):
                 raise
             
             # Wrap other exceptions
             raise InvalidRequestError(f"Failed to process completion request: {str(e)}")
     
+    def _response_cache_key(self, request: Any, model_id: str) -> Optional[ResponseCacheKey]:
+        """
+        Get the response cache key of a request.
+        
+        Args:
+            request: Chat or completion request
+            model_id: Resolved model ID
+            
+        Returns:
+            Optional[ResponseCacheKey]: Cache key, or None if the response
+                cache is disabled or the request is not cacheable
+        """
+        if self.response_cache is None or not self.settings.enable_response_cache:
+            return None
+        return build_cache_key(request, model_id)
+    
+    def _response_cache_embedder(self) -> Optional[Embedder]:
+        """
+        Get the prompt embedder for response cache similarity lookups.
+        
+        Returns:
+            Optional[Embedder]: Embedder, or None if similarity lookups are off
+        """
+        if self.response_cache.similarity_threshold is None:
+            return None
+        
+        async def embed(text: str) -> List[float]:
+            model_id = self.settings.response_cache_embedding_model
+            provider_name = self.provider_factory.get_provider_for_model(model_id) or self.settings.default_provider
+            provider = await self.provider_factory.get_provider(provider_name)
+            request = EmbeddingRequest(model_id=model_id, input=text)
+            
+            if self.embedding_batcher is not None:
+                response = await self.embedding_batcher.embed(provider, model_id, request)
+            else:
+                response = await provider.embedding(request)
+            return response.data[0].embedding
+        
+        return embed
+    
+    async def _cache_response(
+        self,
+        cache_key: ResponseCacheKey,
+        response: Union[ChatResponse, CompletionResponse],
+        provider_name: str,
+        cost: Optional[float],
+    ) -> None:
+        """
+        Cache a provider response.
+        
+        Args:
+            cache_key: Response cache key
+            response: Provider response
+            provider_name: Provider name
+            cost: Cost of the response
+        """
+        await self.response_cache.put(cache_key, CachedResponse(
+            response=response.model_dump_json(),
+            provider=provider_name,
+            cost=cost,
+            tokens=response.usage.total_tokens if response.usage else None,
+        ))
+    
+    def _cached_model_response(
+        self,
+        cached: CachedResponse,
+        response_class: Any,
+        request_id: str,
+        model_id: str,
+        start_time: float,
+    ) -> ModelResponse:
+        """
+        Build the model response of a response cache hit.
+        
+        Args:
+            cached: Cached response
+            response_class: ChatResponse or CompletionResponse
+            request_id: Request ID
+            model_id: Model ID
+            start_time: Request start time
+            
+        Returns:
+            ModelResponse: Model response; a hit costs nothing
+        """
+        return ModelResponse(
+            response=response_class.model_validate_json(cached.response),
+            request_id=request_id,
+            model_id=model_id,
+            provider=cached.provider,
+            latency_ms=(time.time() - start_time) * 1000,
+            cost=0.0 if cached.cost is not None else None,
+        )
+    
+    async def stream_chat_request(self, request: ChatRequest) -> AsyncIterator[StreamChunk]:
+        """
+        Process a chat request and stream the response.
+        
+        Args:
+            request: Chat request
+            
+        Yields:
+            StreamChunk: Content chunks, followed by a summary chunk with usage,
+                cost and latency
+            
+        Raises:
+            InvalidRequestError: If request is invalid
+            ProviderNotAvailableError: If provider is not available
+            TokenLimitError: If token limit is exceeded
+            RequestTimeoutError: If request times out
+        """
+        async for chunk in self._stream_request(request, "chat"):
+            yield chunk
+    
+    async def stream_completion_request(self, request: CompletionRequest) -> AsyncIterator[StreamChunk]:
+        """
+        Process a completion request and stream the response.
+        
+        Args:
+            request: Completion request
+            
+        Yields:
+            StreamChunk: Text chunks, followed by a summary chunk with usage,
+                cost and latency
+            
+        Raises:
+            InvalidRequestError: If request is invalid
+            ProviderNotAvailableError: If provider is not available
+            TokenLimitError: If token limit is exceeded
+            RequestTimeoutError: If request times out
+        """
+        async for chunk in self._stream_request(request, "completion"):
+            yield chunk
+    
+    async def _stream_request(
+        self,
+        request: Union[ChatRequest, CompletionRequest],
+        request_type: str,
+    ) -> AsyncIterator[StreamChunk]:
+        """
+        Stream a chat or completion request with incremental accounting.
+        
+        Time to first token and the mean gap between tokens are measured
+        separately from the total latency. Completion tokens are counted as
+        chunks arrive and replaced by the provider's usage when it reports one.
+        
+        Args:
+            request: Chat or completion request
+            request_type: Request type ("chat" or "completion")
+            
+        Yields:
+            StreamChunk: Provider chunks tagged with the request ID, followed by
+                a summary chunk
+        """
+        start_time = time.perf_counter()
+        request_id = str(uuid.uuid4())
+        stream = None
+        
+        try:
+            # Enhance request with specialization information
+            await self._enhance_request_with_specialization(request)
+            
+            # Resolve model, provider and token limit once for the request
+            context = await self._resolve_request_context(request)
+            model_id, provider_name, provider = context.model_id, context.provider_name, context.provider
+            
+            # Check token limits
+            content = request.messages if request_type == "chat" else request.prompt
+            prompt_tokens = None
+            if self.settings.enable_token_counting:
+                prompt_tokens = await self._check_token_limits(content, context)
+            
+            # Open the stream once the model's rate budget allows
+            async with self._admission(request, context, content, prompt_tokens) as admission:
+                # Open stream
+                if request_type == "chat":
+                    stream = provider.stream_chat_completion(request)
+                else:
+                    stream = provider.stream_text_completion(request)
+                
+                first_token_time = None
+                last_token_time = None
+                token_gap_total = 0.0
+                completion_tokens = 0
+                usage = None
+                finish_reason = None
+                last_chunk = None
+                
+                async for chunk in stream:
+                    last_chunk = chunk
+                    if chunk.usage:
+                        usage = chunk.usage
+                    if chunk.finish_reason:
+                        finish_reason = chunk.finish_reason
+                    if not chunk.delta:
+                        continue
+                    
+                    now = time.perf_counter()
+                    if first_token_time is None:
+                        first_token_time = now
+                    else:
+                        token_gap_total += now - last_token_time
+                    last_token_time = now
+                    completion_tokens += 1  # Providers stream roughly one token per chunk
+                    
+                    yield chunk.model_copy(update={"request_id": request_id})
+                
+                admission.settle(usage.total_tokens if usage else None)
+            
+            # Calculate metrics
+            latency_ms = (time.perf_counter() - start_time) * 1000
+            ttft_ms = (first_token_time - start_time) * 1000 if first_token_time is not None else None
+            inter_token_latency_ms = (
+                token_gap_total * 1000 / (completion_tokens - 1) if completion_tokens > 1 else None
+            )
+            
+            if usage is None:
+                prompt_tokens = await self._count_prompt_tokens(provider, content, model_id)
+                usage = TokenUsage(
+                    prompt_tokens=prompt_tokens,
+                    completion_tokens=completion_tokens,
+                    total_tokens=prompt_tokens + completion_tokens,
+                )
+            
+            cost = None
+            if self.settings.enable_cost_tracking:
+                cost = provider.calculate_cost(
+                    model_id,
+                    usage.prompt_tokens,
+                    usage.completion_tokens or 0,
+                )
+            
+            # Record performance metrics if performance tracker is available
+            if self.performance_tracker and request.task_type:
+                await self.performance_tracker.record_request_result(
+                    request_id=request_id,
+                    model_id=model_id,
+                    task_type=request.task_type,
+                    success=True,
+                    confidence={"stop": 0.9, "length": 0.7}.get(finish_reason, 0.5),
+                    metadata={
+                        "latency_ms": latency_ms,
+                        "time_to_first_token_ms": ttft_ms,
+                        "inter_token_latency_ms": inter_token_latency_ms,
+                        "tokens": usage.total_tokens,
+                    },
+                )
+            
+            # Summary chunk
+            yield StreamChunk(
+                id=last_chunk.id if last_chunk else request_id,
+                object=last_chunk.object if last_chunk else (
+                    "chat.completion.chunk" if request_type == "chat" else "text_completion.chunk"
+                ),
+                created=last_chunk.created if last_chunk else int(time.time()),
+                model=last_chunk.model if last_chunk else model_id,
+                finish_reason=finish_reason,
+                usage=usage,
+                request_id=request_id,
+                provider=provider_name,
+                cost=cost,
+                latency_ms=latency_ms,
+                time_to_first_token_ms=ttft_ms,
+                inter_token_latency_ms=inter_token_latency_ms,
+            )
+        except Exception as e:
+            logger.error(f"Error processing streamed {request_type} request: {str(e)}")
+            
+            # Publish error event
+            await self.event_bus.publish_event(
+                "model.request.failed",
+                {
+                    "request_id": request_id,
+                    "model_id": request.model_id,
+                    "error": {
+                        "message": str(e),
+                        "type": type(e).__name__,
+                    },
+                }
+            )
+            
+            # Re-raise specific exceptions
+            if isinstance(e, (InvalidRequestError, ProviderNotAvailableError, RateLimitError, TokenLimitError, RequestTimeoutError)):
+                raise
+            
+            # Wrap other exceptions
+            raise InvalidRequestError(f"Failed to process {request_type} request: {str(e)}")
+        finally:
+            # Stop the provider stream if the client disconnected early
+            if stream is not None:
+                await stream.aclose()
+    
+    async def _count_prompt_tokens(self, provider: Any, content: Any, model_id: str) -> int:
+        """
+        Count prompt tokens for providers that do not report streaming usage.
+        
+        Args:
+            provider: Provider
+            content: Prompt or chat messages
+            model_id: Model ID
+            
+        Returns:
+            int: Number of prompt tokens, or 0 if they cannot be counted
+        """
+        try:
+            return await provider.count_tokens(self._prompt_for_counting(content), model_id)
+        except Exception as e:
+            logger.warning(f"Could not count prompt tokens for {model_id}: {str(e)}")
+            return 0
+    
+    def _prompt_for_counting(self, content: Any) -> Union[str, List[Dict[str, str]]]:
+        """
+        Convert chat messages to the dicts providers count tokens for.
+        
+        Args:
+            content: Prompt or chat messages
+            
+        Returns:
+            Union[str, List[Dict[str, str]]]: Prompt or message dicts
+        """
+        if isinstance(content, list):
+            return [{"role": message.role.value, "content": message.content or ""} for message in content]
+        return content
+    
     async def process_embedding_request(self, request: EmbeddingRequest) -> ModelResponse:
         """
         Process an embedding request.
@@ -443,14 +848,24 @@ class RequestProcessingMixin:
         request_id = str(uuid.uuid4())
         
         try:
-            # Get model and provider
-            model_id, provider_name = await self._resolve_model_and_provider(request.model_id, request.provider)
-            
-            # Get provider
-            provider = await self.provider_factory.get_provider(provider_name)
-            
-            # Process request
-            response = await provider.embedding(request)
+            # Resolve model, provider and token limit once for the request
+            context = await self._resolve_request_context(request)
+            model_id, provider_name, provider = context.model_id, context.provider_name, context.provider
+            
+            if self.embedding_batcher is not None:
+                # Coalesce the request with concurrent requests for the model;
+                # each batched provider call is admitted once
+                response = await self.embedding_batcher.embed(
+                    provider,
+                    model_id,
+                    request,
+                    admit=lambda texts: self._admission(request, context, texts),
+                )
+            else:
+                # Process request once the model's rate budget allows
+                async with self._admission(request, context, request.input) as admission:
+                    response = await provider.embedding(request)
+                    admission.settle(response.usage.prompt_tokens if response.usage else None)
             
             # Calculate metrics
             latency_ms = (time.time() - start_time) * 1000
@@ -491,7 +906,7 @@ class RequestProcessingMixin:
             )
             
             # Re-raise specific exceptions
-            if isinstance(e, (InvalidRequestError, ProviderNotAvailableError, TokenLimitError, RequestTimeoutError)):
+            if isinstance(e, (InvalidRequestError, ProviderNotAvailableError, RateLimitError, TokenLimitError, RequestTimeoutError)):
                 raise
             
             # Wrap other exceptions
@@ -516,11 +931,9 @@ class RequestProcessingMixin:
         request_id = str(uuid.uuid4())
         
         try:
-            # Get model and provider
-            model_id, provider_name = await self._resolve_model_and_provider(request.model_id, request.provider)
-            
-            # Get provider
-            provider = await self.provider_factory.get_provider(provider_name)
+            # Resolve model, provider and token limit once for the request
+            context = await self._resolve_request_context(request)
+            model_id, provider_name, provider = context.model_id, context.provider_name, context.provider
             
             # Process request
             response = await provider.image_generation(request)
@@ -581,11 +994,9 @@ class RequestProcessingMixin:
         request_id = str(uuid.uuid4())
         
         try:
-            # Get model and provider
-            model_id, provider_name = await self._resolve_model_and_provider(request.model_id, request.provider)
-            
-            # Get provider
-            provider = await self.provider_factory.get_provider(provider_name)
+            # Resolve model, provider and token limit once for the request
+            context = await self._resolve_request_context(request)
+            model_id, provider_name, provider = context.model_id, context.provider_name, context.provider
             
             # Process request
             response = await provider.audio_transcription(request)
@@ -646,11 +1057,9 @@ class RequestProcessingMixin:
         request_id = str(uuid.uuid4())
         
         try:
-            # Get model and provider
-            model_id, provider_name = await self._resolve_model_and_provider(request.model_id, request.provider)
-            
-            # Get provider
-            provider = await self.provider_factory.get_provider(provider_name)
+            # Resolve model, provider and token limit once for the request
+            context = await self._resolve_request_context(request)
+            model_id, provider_name, provider = context.model_id, context.provider_name, context.provider
             
             # Process request
             response = await provider.audio_translation(request)
@@ -0,0 +1,537 @@
+"""
+Write-behind aggregation of model performance.
+
+Every model request records its result for routing, so recording must not
+cost a database round-trip. Results are accumulated in memory per
+``(model_id, task_type)`` and flushed periodically with atomic upserts that
+derive the new averages from the stored row, so concurrent instances never
+overwrite each other's samples. Routing decisions are served from an
+in-memory snapshot of the ``model_performance`` table, refreshed after each
+flush and merged with the samples that are not flushed yet.
+"""
+
+import asyncio
+import json
+import logging
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import ModelOrchestrationConfig
+from ..models.performance import ModelPerformanceModel
+
+logger = logging.getLogger(__name__)
+
+# Request metadata timings accumulated per model and task type. Streaming
+# requests report time to first token and inter-token latency separately
+# from the total latency.
+LATENCY_METRICS = ("latency_ms", "time_to_first_token_ms", "inter_token_latency_ms")
+
+# Upper bounds (ms) of the latency histogram buckets
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+# Quality score of a record before any sample reported one
+DEFAULT_QUALITY_SCORE = 0.5
+
+# Number of samples a piece of user feedback counts as
+FEEDBACK_WEIGHT = 2
+
+PerformanceKey = Tuple[str, str]
+
+# Adds a flushed delta to the stored row. All SET expressions read the row
+# as it was before the update, so the averages are recomputed atomically.
+# Samples without a quality score leave the average quality unchanged.
+UPSERT_PERFORMANCE = text("""
+    INSERT INTO model_performance (id, model_id, task_type, quality_score, success_rate, sample_count, metrics)
+    VALUES (:id, :model_id, :task_type, :quality_score, :success_rate, :sample_count, CAST(:metrics AS json))
+    ON CONFLICT (model_id, task_type) DO UPDATE SET
+        quality_score = (
+            model_performance.quality_score * (model_performance.sample_count + :sample_count - :quality_count)
+            + :quality_sum
+        ) / (model_performance.sample_count + :sample_count),
+        success_rate = (
+            model_performance.success_rate * model_performance.sample_count + :success_count
+        ) / (model_performance.sample_count + :sample_count),
+        sample_count = model_performance.sample_count + :sample_count,
+        metrics = (
+            COALESCE(model_performance.metrics::jsonb, '{}'::jsonb)
+            || COALESCE((
+                SELECT jsonb_object_agg(
+                    delta.key,
+                    COALESCE((model_performance.metrics::jsonb ->> delta.key)::float8, 0) + delta.value::text::float8
+                )
+                FROM jsonb_each(CAST(:metrics AS jsonb)) AS delta
+            ), '{}'::jsonb)
+        )::json,
+        updated_at = now()
+""")
+
+
+@dataclass
+class PerformanceDelta:
+    """
+    Request results recorded since the last flush.
+    """
+    sample_count: int = 0
+    success_count: int = 0
+    quality_count: int = 0
+    quality_sum: float = 0.0
+    metrics: Dict[str, float] = field(default_factory=dict)
+    
+    def add_result(
+        self,
+        success: bool,
+        quality_score: Optional[float] = None,
+        confidence: Optional[float] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        Add a request result.
+        
+        Args:
+            success: Whether the request was successful
+            quality_score: Estimated quality score (0.0-1.0)
+            confidence: Model's confidence in the response (0.0-1.0)
+            metadata: Request metadata with timings
+        """
+        self.sample_count += 1
+        self.success_count += 1 if success else 0
+        
+        if quality_score is not None:
+            self.quality_count += 1
+            self.quality_sum += quality_score
+            self._add_metric("quality_sum", quality_score)
+        
+        if confidence is not None:
+            self._add_metric("confidence_sum", confidence)
+        
+        # Each timing keeps its own sample count, since only streamed
+        # requests report time to first token and inter-token latency
+        for name in LATENCY_METRICS:
+            value = (metadata or {}).get(name)
+            if value is None:
+                continue
+            self._add_metric(f"{name}_sum", value)
+            self._add_metric(f"{name}_count", 1)
+            self._add_metric(f"{name}_bucket_{latency_bucket(value)}", 1)
+    
+    def add_feedback(self, success: bool, quality_rating: Optional[float] = None) -> None:
+        """
+        Add user feedback, which is weighted more heavily than request results.
+        
+        Args:
+            success: Whether the response was successful
+            quality_rating: User-provided quality rating (0.0-1.0)
+        """
+        self.sample_count += FEEDBACK_WEIGHT
+        self.success_count += FEEDBACK_WEIGHT if success else 0
+        
+        if quality_rating is not None:
+            self.quality_count += FEEDBACK_WEIGHT
+            self.quality_sum += quality_rating * FEEDBACK_WEIGHT
+            self._add_metric("quality_sum", quality_rating * FEEDBACK_WEIGHT)
+    
+    def merge(self, other: "PerformanceDelta") -> None:
+        """
+        Add another delta to this one.
+        
+        Args:
+            other: Delta to add
+        """
+        self.sample_count += other.sample_count
+        self.success_count += other.success_count
+        self.quality_count += other.quality_count
+        self.quality_sum += other.quality_sum
+        for name, value in other.metrics.items():
+            self._add_metric(name, value)
+    
+    def _add_metric(self, name: str, value: float) -> None:
+        self.metrics[name] = self.metrics.get(name, 0) + value
+
+
+@dataclass
+class PerformanceStats:
+    """
+    Aggregated performance of a model on a task type.
+    """
+    model_id: str
+    task_type: str
+    quality_score: float
+    success_rate: float
+    sample_count: float
+    metrics: Dict[str, float] = field(default_factory=dict)
+    
+    @classmethod
+    def from_delta(cls, key: PerformanceKey, delta: PerformanceDelta) -> "PerformanceStats":
+        """
+        Create the stats of a model and task type without stored samples.
+        
+        Args:
+            key: Model ID and task type
+            delta: Recorded results
+        
+        Returns:
+            PerformanceStats: Aggregated performance
+        """
+        return cls(
+            model_id=key[0],
+            task_type=key[1],
+            quality_score=(
+                delta.quality_sum / delta.quality_count
+                if delta.quality_count
+                else DEFAULT_QUALITY_SCORE
+            ),
+            success_rate=delta.success_count / delta.sample_count if delta.sample_count else 0.0,
+            sample_count=delta.sample_count,
+            metrics=dict(delta.metrics),
+        )
+    
+    def merged(self, delta: PerformanceDelta) -> "PerformanceStats":
+        """
+        Apply a delta the way the flush upsert does.
+        
+        Args:
+            delta: Recorded results
+        
+        Returns:
+            PerformanceStats: Aggregated performance including the delta
+        """
+        sample_count = self.sample_count + delta.sample_count
+        if not sample_count:
+            return self
+        
+        metrics = dict(self.metrics)
+        for name, value in delta.metrics.items():
+            metrics[name] = metrics.get(name, 0) + value
+        
+        return PerformanceStats(
+            model_id=self.model_id,
+            task_type=self.task_type,
+            quality_score=(
+                self.quality_score * (sample_count - delta.quality_count) + delta.quality_sum
+            ) / sample_count,
+            success_rate=(self.success_rate * self.sample_count + delta.success_count) / sample_count,
+            sample_count=sample_count,
+            metrics=metrics,
+        )
+
+
+def latency_bucket(value_ms: float) -> str:
+    """
+    Get the histogram bucket of a latency.
+    
+    Args:
+        value_ms: Latency in milliseconds
+    
+    Returns:
+        str: Bucket upper bound, or ``inf``
+    """
+    for bound in LATENCY_BUCKETS_MS:
+        if value_ms <= bound:
+            return str(bound)
+    return "inf"
+
+
+class PerformanceAggregator:
+    """
+    In-memory performance aggregate with periodic write-behind flushes.
+    """
+    
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        flush_interval: float = 5.0,
+    ):
+        """
+        Initialize the aggregator.
+        
+        Args:
+            session_factory: Creates database sessions for flushes
+            flush_interval: Seconds between flushes
+        """
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        
+        self._stored: Dict[PerformanceKey, PerformanceStats] = {}
+        self._pending: Dict[PerformanceKey, PerformanceDelta] = {}
+        self._flushing: Dict[PerformanceKey, PerformanceDelta] = {}
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+    
+    def record(
+        self,
+        model_id: str,
+        task_type: str,
+        success: bool,
+        quality_score: Optional[float] = None,
+        confidence: Optional[float] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        Record a request result. The result is written on the next flush.
+        
+        Args:
+            model_id: Model ID
+            task_type: Type of task
+            success: Whether the request was successful
+            quality_score: Estimated quality score (0.0-1.0)
+            confidence: Model's confidence in the response (0.0-1.0)
+            metadata: Request metadata with timings
+        """
+        delta = self._pending.setdefault((model_id, task_type), PerformanceDelta())
+        delta.add_result(success, quality_score, confidence, metadata)
+    
+    def record_feedback(
+        self,
+        model_id: str,
+        task_type: str,
+        success: bool,
+        quality_rating: Optional[float] = None,
+    ) -> None:
+        """
+        Record user feedback. The feedback is written on the next flush.
+        
+        Args:
+            model_id: Model ID
+            task_type: Type of task
+            success: Whether the response was successful
+            quality_rating: User-provided quality rating (0.0-1.0)
+        """
+        delta = self._pending.setdefault((model_id, task_type), PerformanceDelta())
+        delta.add_feedback(success, quality_rating)
+    
+    def get_stats(self, model_id: str, task_type: str) -> Optional[PerformanceStats]:
+        """
+        Get the current performance of a model on a task type.
+        
+        Args:
+            model_id: Model ID
+            task_type: Type of task
+        
+        Returns:
+            Optional[PerformanceStats]: Aggregated performance, or None if
+                no results were recorded
+        """
+        key = (model_id, task_type)
+        stats = self._stored.get(key)
+        for deltas in (self._flushing, self._pending):
+            delta = deltas.get(key)
+            if delta is None:
+                continue
+            stats = stats.merged(delta) if stats else PerformanceStats.from_delta(key, delta)
+        return stats
+    
+    def get_task_stats(self, task_type: str) -> List[PerformanceStats]:
+        """
+        Get the current performance of all models on a task type.
+        
+        Args:
+            task_type: Type of task
+        
+        Returns:
+            List[PerformanceStats]: Aggregated performance per model
+        """
+        model_ids = {
+            model_id
+            for deltas in (self._stored, self._flushing, self._pending)
+            for model_id, key_task_type in deltas
+            if key_task_type == task_type
+        }
+        return [self.get_stats(model_id, task_type) for model_id in model_ids]
+    
+    def get_best_model(
+        self,
+        task_type: str,
+        min_quality_score: float = 0.0,
+        min_success_rate: float = 0.0,
+        min_samples: int = 5,
+        model_ids: Optional[List[str]] = None,
+    ) -> Optional[str]:
+        """
+        Get the best model for a task type without querying the database.
+        
+        Models are ranked by quality score, then success rate, then sample
+        count.
+        
+        Args:
+            task_type: Type of task
+            min_quality_score: Minimum quality score
+            min_success_rate: Minimum success rate
+            min_samples: Minimum number of samples
+            model_ids: List of model IDs to consider
+        
+        Returns:
+            Optional[str]: Best model ID or None if no suitable model found
+        """
+        candidates = [
+            stats
+            for stats in self.get_task_stats(task_type)
+            if stats.quality_score >= min_quality_score
+            and stats.success_rate >= min_success_rate
+            and stats.sample_count >= min_samples
+            and (not model_ids or stats.model_id in model_ids)
+        ]
+        if not candidates:
+            return None
+        
+        best = max(candidates, key=lambda stats: (stats.quality_score, stats.success_rate, stats.sample_count))
+        return best.model_id
+    
+    async def start(self) -> None:
+        """
+        Load the stored aggregate and start flushing periodically.
+        """
+        await self.refresh()
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+        logger.info(f"Performance aggregator started (flush interval {self.flush_interval}s)")
+    
+    async def stop(self) -> None:
+        """
+        Stop flushing periodically and flush the remaining results.
+        """
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        
+        await self.flush()
+    
+    async def flush(self) -> int:
+        """
+        Write the recorded results to the database.
+        
+        Results that fail to be written are kept for the next flush.
+        
+        Returns:
+            int: Number of model and task type records written
+        """
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            
+            self._flushing, self._pending = self._pending, {}
+            
+            try:
+                async with self.session_factory() as session:
+                    for (model_id, task_type), delta in self._flushing.items():
+                        await session.execute(
+                            UPSERT_PERFORMANCE,
+                            self._upsert_params(model_id, task_type, delta),
+                        )
+                    await session.commit()
+            except asyncio.CancelledError:
+                self._requeue(self._flushing)
+                self._flushing = {}
+                raise
+            except Exception as e:
+                logger.error(f"Error flushing performance results: {str(e)}")
+                self._requeue(self._flushing)
+                self._flushing = {}
+                return 0
+            
+            flushed = len(self._flushing)
+            
+            try:
+                await self.refresh()
+            except Exception as e:
+                # Keep serving the flushed results until the next refresh
+                logger.error(f"Error refreshing performance aggregate: {str(e)}")
+                self._apply(self._flushing)
+            self._flushing = {}
+            
+            logger.debug(f"Flushed performance results for {flushed} model/task pairs")
+            return flushed
+    
+    async def refresh(self) -> None:
+        """
+        Reload the stored aggregate, including other instances' results.
+        """
+        async with self.session_factory() as session:
+            result = await session.execute(select(ModelPerformanceModel))
+            performances = result.scalars().all()
+        
+        self._stored = {
+            (performance.model_id, performance.task_type): PerformanceStats(
+                model_id=performance.model_id,
+                task_type=performance.task_type,
+                quality_score=performance.quality_score,
+                success_rate=performance.success_rate,
+                sample_count=performance.sample_count,
+                metrics=dict(performance.metrics or {}),
+            )
+            for performance in performances
+        }
+    
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Error in performance flush loop: {str(e)}")
+    
+    def _requeue(self, deltas: Dict[PerformanceKey, PerformanceDelta]) -> None:
+        """Put unflushed results back ahead of the ones recorded since."""
+        for key, delta in deltas.items():
+            pending = self._pending.get(key)
+            if pending is not None:
+                delta.merge(pending)
+            self._pending[key] = delta
+    
+    def _apply(self, deltas: Dict[PerformanceKey, PerformanceDelta]) -> None:
+        """Apply flushed results to the stored aggregate in memory."""
+        for key, delta in deltas.items():
+            stats = self._stored.get(key)
+            self._stored[key] = stats.merged(delta) if stats else PerformanceStats.from_delta(key, delta)
+    
+    @staticmethod
+    def _upsert_params(model_id: str, task_type: str, delta: PerformanceDelta) -> Dict[str, Any]:
+        """Bind a delta to the upsert statement."""
+        initial = PerformanceStats.from_delta((model_id, task_type), delta)
+        return {
+            "id": uuid.uuid4(),
+            "model_id": model_id,
+            "task_type": task_type,
+            "quality_score": initial.quality_score,
+            "success_rate": initial.success_rate,
+            "sample_count": delta.sample_count,
+            "success_count": delta.success_count,
+            "quality_count": delta.quality_count,
+            "quality_sum": delta.quality_sum,
+            "metrics": json.dumps(delta.metrics),
+        }
+
+
+# Singleton instance
+_performance_aggregator: Optional[PerformanceAggregator] = None
+
+
+def get_performance_aggregator(settings: ModelOrchestrationConfig) -> PerformanceAggregator:
+    """
+    Get the performance aggregator singleton instance.
+    
+    Args:
+        settings: Application settings
+    
+    Returns:
+        PerformanceAggregator: Performance aggregator instance
+    """
+    global _performance_aggregator
+    
+    if _performance_aggregator is None:
+        # Imported lazily so the aggregator can be used without a configured database
+        from ..database import async_session
+        
+        _performance_aggregator = PerformanceAggregator(
+            session_factory=async_session,
+            flush_interval=settings.performance_flush_interval,
+        )
+    
+    return _performance_aggregator
@@ -1,7 +1,7 @@
 import logging
 import uuid
 from datetime import datetime, timedelta
-from sqlalchemy import select, func, and_, or_, desc
+from sqlalchemy import select, func, and_, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional, Dict, Any, Tuple
 
@@ -11,6 +11,9 @@ from shared.utils.src.messaging import EventBus
 from ..config import ModelOrchestrationConfig
 from ..exceptions import ModelNotFoundError, InvalidRequestError
 from ..models.performance import ModelPerformanceModel, ModelFeedbackModel, ModelPerformanceHistoryModel
+from .admission_scheduler import AdmissionScheduler
+from .performance_aggregator import PerformanceAggregator, get_performance_aggregator
+from .response_cache import ResponseCache
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +28,9 @@ class PerformanceTracker:
         db: AsyncSession,
         event_bus: EventBus,
         settings: ModelOrchestrationConfig, # Updated type hint
+        aggregator: Optional[PerformanceAggregator] = None,
+        response_cache: Optional[ResponseCache] = None,
+        admission_scheduler: Optional[AdmissionScheduler] = None,
     ):
         """
         Initialize the performance tracker.
@@ -33,10 +39,17 @@ class PerformanceTracker:
             db: Database session
             event_bus: Event bus
             settings: Application settings
+            aggregator: Performance aggregator (the shared aggregator is used
+                if not given)
+            response_cache: Response cache whose metrics are reported
+            admission_scheduler: Admission scheduler whose metrics are reported
         """
         self.db = db
         self.event_bus = event_bus
         self.settings = settings
+        self.aggregator = aggregator or get_performance_aggregator(settings)
+        self.response_cache = response_cache
+        self.admission_scheduler = admission_scheduler
     
     async def record_request_result(
         self,
@@ -51,6 +64,9 @@ class PerformanceTracker:
         """
         Record the result of a model request.
         
+        The result is aggregated in memory and written to the database by
+        the performance aggregator's next flush.
+        
         Args:
             request_id: Request ID
             model_id: Model ID
@@ -60,77 +76,20 @@ class PerformanceTracker:
             confidence: Model's confidence in the response (0.0-1.0)
             metadata: Additional metadata
         """
-        try:
-            # Skip if no task type (can't categorize)
-            if not task_type:
-                return
-            
-            # Get existing performance record or create new one
-            query = select(ModelPerformanceModel).where(
-                and_(
-                    ModelPerformanceModel.model_id == model_id,
-                    ModelPerformanceModel.task_type == task_type,
-                )
-            )
-            result = await self.db.execute(query)
-            performance = result.scalars().first()
-            
-            if not performance:
-                # Create new performance record
-                performance = ModelPerformanceModel(
-                    model_id=model_id,
-                    task_type=task_type,
-                    quality_score=quality_score or 0.5,  # Default middle score
-                    success_rate=1.0 if success else 0.0,
-                    sample_count=1,
-                    metrics={
-                        "confidence_sum": confidence or 0.0,
-                        "quality_sum": quality_score or 0.5,
-                    },
-                )
-                self.db.add(performance)
-            else:
-                # Update existing performance record
-                new_sample_count = performance.sample_count + 1
-                
-                # Update success rate
-                current_success_count = performance.success_rate * performance.sample_count
-                new_success_count = current_success_count + (1 if success else 0)
-                new_success_rate = new_success_count / new_sample_count
-                
-                # Update quality score (if provided)
-                if quality_score is not None:
-                    current_quality_sum = performance.metrics.get("quality_sum", performance.quality_score * performance.sample_count)
-                    new_quality_sum = current_quality_sum + quality_score
-                    new_quality_score = new_quality_sum / new_sample_count
-                    
-                    # Update metrics
-                    metrics = performance.metrics or {}
-                    metrics["quality_sum"] = new_quality_sum
-                    
-                    performance.quality_score = new_quality_score
-                    performance.metrics = metrics
-                
-                # Update confidence (if provided)
-                if confidence is not None:
-                    metrics = performance.metrics or {}
-                    current_confidence_sum = metrics.get("confidence_sum", 0.0)
-                    metrics["confidence_sum"] = current_confidence_sum + confidence
-                    performance.metrics = metrics
-                
-                # Update success rate and sample count
-                performance.success_rate = new_success_rate
-                performance.sample_count = new_sample_count
-            
-            # Commit changes
-            await self.db.commit()
-            
-            # Log success
-            logger.info(f"Recorded performance for model {model_id} on task {task_type}: success={success}, quality={quality_score}")
-            
-        except Exception as e:
-            await self.db.rollback()
-            logger.error(f"Error recording performance: {str(e)}")
+        # Skip if no task type (can't categorize)
+        if not task_type:
+            return
+        
+        self.aggregator.record(
+            model_id=model_id,
+            task_type=task_type,
+            success=success,
+            quality_score=quality_score,
+            confidence=confidence,
+            metadata=metadata,
+        )
+        
+        logger.debug(f"Recorded performance for model {model_id} on task {task_type}: success={success}, quality={quality_score}")
     
     async def record_feedback(
         self,
@@ -188,51 +147,20 @@ class PerformanceTracker:
             
             self.db.add(feedback)
             
-            # Update performance metrics if task type is provided
-            if task_type:
-                # Get existing performance record
-                query = select(ModelPerformanceModel).where(
-                    and_(
-                        ModelPerformanceModel.model_id == model_id,
-                        ModelPerformanceModel.task_type == task_type,
-                    )
-                )
-                result = await self.db.execute(query)
-                performance = result.scalars().first()
-                
-                if performance:
-                    # Calculate new metrics
-                    # We weight user feedback more heavily than automatic metrics
-                    feedback_weight = 2.0  # User feedback counts as 2 samples
-                    
-                    # Update sample count
-                    new_sample_count = performance.sample_count + feedback_weight
-                    
-                    # Update success rate
-                    current_success_count = performance.success_rate * performance.sample_count
-                    new_success_count = current_success_count + (feedback_weight if success else 0)
-                    new_success_rate = new_success_count / new_sample_count
-                    
-                    # Update quality score (if provided)
-                    if quality_rating is not None:
-                        current_quality_sum = performance.metrics.get("quality_sum", performance.quality_score * performance.sample_count)
-                        new_quality_sum = current_quality_sum + (quality_rating * feedback_weight)
-                        new_quality_score = new_quality_sum / new_sample_count
-                        
-                        # Update metrics
-                        metrics = performance.metrics or {}
-                        metrics["quality_sum"] = new_quality_sum
-                        
-                        performance.quality_score = new_quality_score
-                        performance.metrics = metrics
-                    
-                    # Update success rate and sample count
-                    performance.success_rate = new_success_rate
-                    performance.sample_count = new_sample_count
-            
             # Commit changes
             await self.db.commit()
             
+            # Update performance metrics if task type is provided. Feedback
+            # goes through the aggregator, whose flush applies it with the
+            # same atomic upsert as request results.
+            if task_type:
+                self.aggregator.record_feedback(
+                    model_id=model_id,
+                    task_type=task_type,
+                    success=success,
+                    quality_rating=quality_rating,
+                )
+            
             # Publish event
             await self.event_bus.publish_event(
                 "model.feedback.received",
@@ -302,6 +230,32 @@ class PerformanceTracker:
             logger.error(f"Error getting model performance: {str(e)}")
             return []
     
+    def get_response_cache_metrics(self) -> Dict[str, Any]:
+        """
+        Get response cache metrics.
+        
+        Returns:
+            Dict[str, Any]: Hits, misses, hit rate and the cost and tokens
+                saved, overall and per model
+        """
+        if self.response_cache is None:
+            return {"enabled": False}
+        
+        return {"enabled": True, **self.response_cache.get_stats()}
+    
+    def get_admission_metrics(self) -> Dict[str, Any]:
+        """
+        Get admission scheduler metrics.
+        
+        Returns:
+            Dict[str, Any]: Rate budgets, queue depth and wait times per
+                provider model and priority class
+        """
+        if self.admission_scheduler is None:
+            return {"enabled": False}
+        
+        return {"enabled": True, "models": self.admission_scheduler.get_metrics()}
+    
     async def get_best_model_for_task(
         self,
         task_type: str,
@@ -313,6 +267,9 @@ class PerformanceTracker:
         """
         Get the best model for a task based on performance metrics.
         
+        Served from the in-memory performance aggregate, so routing
+        decisions do not query the database.
+        
         Args:
             task_type: Task type
             min_quality_score: Minimum quality score
@@ -323,38 +280,13 @@ class PerformanceTracker:
         Returns:
             Optional[str]: Best model ID or None if no suitable model found
         """
-        try:
-            # Build query
-            query = select(ModelPerformanceModel).where(
-                and_(
-                    ModelPerformanceModel.task_type == task_type,
-                    ModelPerformanceModel.quality_score >= min_quality_score,
-                    ModelPerformanceModel.success_rate >= min_success_rate,
-                    ModelPerformanceModel.sample_count >= min_samples,
-                )
-            )
-            
-            # Filter by model IDs if provided
-            if model_ids:
-                query = query.where(ModelPerformanceModel.model_id.in_(model_ids))
-            
-            # Order by quality score and success rate
-            query = query.order_by(
-                desc(ModelPerformanceModel.quality_score),
-                desc(ModelPerformanceModel.success_rate),
-                desc(ModelPerformanceModel.sample_count),
-            )
-            
-            # Execute query
-            result = await self.db.execute(query)
-            performance = result.scalars().first()
-            
-            # Return best model ID or None
-            return performance.model_id if performance else None
-            
-        except Exception as e:
-            logger.error(f"Error getting best model for task: {str(e)}")
-            return None
+        return self.aggregator.get_best_model(
+            task_type=task_type,
+            min_quality_score=min_quality_score,
+            min_success_rate=min_success_rate,
+            min_samples=min_samples,
+            model_ids=model_ids,
+        )
     
     async def update_performance_history(self) -> None:
         """
@@ -362,6 +294,9 @@ class PerformanceTracker:
         This should be called periodically (e.g., daily) to maintain historical data.
         """
         try:
+            # Include results that are not flushed yet
+            await self.aggregator.flush()
+            
             # Get current date
             now = datetime.utcnow()
             
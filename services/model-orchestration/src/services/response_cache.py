@@ -0,0 +1,420 @@
+"""
+Response cache for deterministic model requests.
+
+Many agent prompts are exact repeats (re-runs, template-driven prompts at
+``temperature=0``). The response cache serves them without a provider call.
+Deterministic chat and completion requests are keyed by a canonical hash of
+the model, prompt and sampling parameters, scoped per tenant. Responses are
+kept in a bounded in-memory L1 and, when Redis is available, a shared L2
+with the same TTL and per-tenant size limit. An optional similarity mode
+also serves near-duplicate prompts by comparing prompt embeddings.
+"""
+
+import hashlib
+import json
+import logging
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from shared.utils.src.redis import get_redis_client
+
+from ..config import ModelOrchestrationConfig
+from ..models.api import ChatRequest, CompletionRequest
+
+logger = logging.getLogger(__name__)
+
+# Sampling parameters that change a response
+KEY_PARAMETERS = ("max_tokens", "temperature", "top_p", "frequency_penalty", "presence_penalty", "stop")
+
+# Tenant of requests without a project or user
+DEFAULT_TENANT = "default"
+
+Embedder = Callable[[str], Awaitable[List[float]]]
+
+
+@dataclass
+class ResponseCacheKey:
+    """
+    Cache key of a deterministic request.
+    """
+    tenant: str
+    digest: str
+    """Hash of the model, prompt and parameters."""
+    scope: str
+    """Hash of the model and parameters; similar prompts must share it."""
+    prompt: str
+    """Prompt text used for similarity lookups."""
+    embedding: Optional[List[float]] = None
+    """Normalized prompt embedding, computed on the first similarity lookup."""
+
+
+@dataclass
+class CachedResponse:
+    """
+    Cached provider response.
+    """
+    response: str
+    """Serialized ChatResponse or CompletionResponse."""
+    provider: str
+    cost: Optional[float] = None
+    tokens: Optional[int] = None
+    
+    def to_json(self) -> str:
+        return json.dumps({
+            "response": self.response,
+            "provider": self.provider,
+            "cost": self.cost,
+            "tokens": self.tokens,
+        })
+    
+    @classmethod
+    def from_json(cls, data: str) -> "CachedResponse":
+        return cls(**json.loads(data))
+
+
+@dataclass
+class _Entry:
+    expires_at: float
+    value: CachedResponse
+    scope: str
+    embedding: Optional[List[float]] = None
+
+
+@dataclass
+class ResponseCacheStats:
+    """
+    Response cache counters.
+    """
+    hits: int = 0
+    l2_hits: int = 0
+    similar_hits: int = 0
+    misses: int = 0
+    saved_cost: float = 0.0
+    saved_tokens: int = 0
+    by_model: Dict[str, Dict[str, float]] = field(default_factory=dict)
+
+
+def build_cache_key(request: Any, model_id: str) -> Optional[ResponseCacheKey]:
+    """
+    Build the cache key of a request.
+    
+    Only deterministic requests (``temperature=0``) are cached. Requests
+    opt out with ``metadata={"cache": false}``.
+    
+    Args:
+        request: Chat or completion request
+        model_id: Resolved model ID
+    
+    Returns:
+        Optional[ResponseCacheKey]: Cache key, or None if the request is not
+            cacheable
+    """
+    if request.temperature != 0 or request.metadata.get("cache") is False:
+        return None
+    
+    if isinstance(request, ChatRequest):
+        # Every field but metadata affects the response, tool calls included
+        messages = [
+            message.model_dump(mode="json", exclude={"metadata"}, exclude_none=True)
+            for message in request.messages
+        ]
+        prompt = "\n".join(message.content or "" for message in request.messages)
+        content: Any = {"messages": messages}
+    elif isinstance(request, CompletionRequest):
+        prompt = request.prompt
+        content = {"prompt": request.prompt}
+    else:
+        return None
+    
+    scope = {
+        "model_id": model_id,
+        "request_type": request.request_type.value,
+        "parameters": {name: getattr(request, name, None) for name in KEY_PARAMETERS},
+    }
+    scope_json = json.dumps(scope, sort_keys=True, separators=(",", ":"))
+    content_json = json.dumps(content, sort_keys=True, separators=(",", ":"))
+    
+    return ResponseCacheKey(
+        tenant=request.project_id or request.user_id or DEFAULT_TENANT,
+        digest=hashlib.sha256(f"{scope_json}\n{content_json}".encode("utf-8")).hexdigest(),
+        scope=hashlib.sha256(scope_json.encode("utf-8")).hexdigest(),
+        prompt=prompt,
+    )
+
+
+class ResponseCache:
+    """
+    Two-level response cache with per-tenant limits.
+    """
+    
+    def __init__(
+        self,
+        ttl_seconds: float = 3600.0,
+        max_entries_per_tenant: int = 256,
+        max_tenants: int = 1024,
+        redis_client: Optional[Any] = None,
+        redis_prefix: str = "model-orchestration:response-cache",
+        similarity_threshold: Optional[float] = None,
+    ):
+        """
+        Initialize the cache.
+        
+        Args:
+            ttl_seconds: Seconds a cached response stays valid
+            max_entries_per_tenant: Maximum cached responses per tenant, in
+                each level
+            max_tenants: Maximum number of tenants kept in memory
+            redis_client: Async Redis client for the L2 (L1 only if not given)
+            redis_prefix: Redis key prefix
+            similarity_threshold: Minimum cosine similarity for serving a
+                near-duplicate prompt (similarity lookups are off if not set)
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries_per_tenant = max_entries_per_tenant
+        self.max_tenants = max_tenants
+        self.redis_client = redis_client
+        self.redis_prefix = redis_prefix
+        self.similarity_threshold = similarity_threshold
+        self.stats = ResponseCacheStats()
+        
+        self._tenants: "OrderedDict[str, OrderedDict[str, _Entry]]" = OrderedDict()
+    
+    async def get(
+        self,
+        key: ResponseCacheKey,
+        model_id: str,
+        embed: Optional[Embedder] = None,
+    ) -> Optional[CachedResponse]:
+        """
+        Look up the response of a request.
+        
+        Args:
+            key: Cache key
+            model_id: Model ID (for metrics)
+            embed: Embeds prompts for similarity lookups
+        
+        Returns:
+            Optional[CachedResponse]: Cached response, or None on a miss
+        """
+        value = self._get_local(key)
+        if value is not None:
+            self.stats.hits += 1
+            return self._saved(value, model_id)
+        
+        value = await self._get_remote(key)
+        if value is not None:
+            self.stats.hits += 1
+            self.stats.l2_hits += 1
+            self._put_local(key, value)
+            return self._saved(value, model_id)
+        
+        if self.similarity_threshold is not None and embed is not None:
+            value = await self._get_similar(key, embed)
+            if value is not None:
+                self.stats.hits += 1
+                self.stats.similar_hits += 1
+                return self._saved(value, model_id)
+        
+        self.stats.misses += 1
+        self._model_stats(model_id)["misses"] += 1
+        return None
+    
+    async def put(self, key: ResponseCacheKey, value: CachedResponse) -> None:
+        """
+        Cache the response of a request.
+        
+        Args:
+            key: Cache key
+            value: Response to cache
+        """
+        self._put_local(key, value)
+        await self._put_remote(key, value)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache metrics.
+        
+        Returns:
+            Dict[str, Any]: Hits, misses, hit rate, saved cost and tokens,
+                overall and per model
+        """
+        lookups = self.stats.hits + self.stats.misses
+        return {
+            "hits": self.stats.hits,
+            "l2_hits": self.stats.l2_hits,
+            "similar_hits": self.stats.similar_hits,
+            "misses": self.stats.misses,
+            "hit_rate": self.stats.hits / lookups if lookups else 0.0,
+            "saved_cost": self.stats.saved_cost,
+            "saved_tokens": self.stats.saved_tokens,
+            "entries": sum(len(entries) for entries in self._tenants.values()),
+            "tenants": len(self._tenants),
+            "by_model": {model_id: dict(stats) for model_id, stats in self.stats.by_model.items()},
+        }
+    
+    def _saved(self, value: CachedResponse, model_id: str) -> CachedResponse:
+        """Count the provider spend a hit saved."""
+        stats = self._model_stats(model_id)
+        stats["hits"] += 1
+        if value.cost:
+            self.stats.saved_cost += value.cost
+            stats["saved_cost"] += value.cost
+        if value.tokens:
+            self.stats.saved_tokens += value.tokens
+            stats["saved_tokens"] += value.tokens
+        return value
+    
+    def _model_stats(self, model_id: str) -> Dict[str, float]:
+        return self.stats.by_model.setdefault(
+            model_id,
+            {"hits": 0, "misses": 0, "saved_cost": 0.0, "saved_tokens": 0},
+        )
+    
+    def _get_local(self, key: ResponseCacheKey) -> Optional[CachedResponse]:
+        entries = self._tenants.get(key.tenant)
+        if entries is None:
+            return None
+        
+        entry = entries.get(key.digest)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            del entries[key.digest]
+            return None
+        
+        entries.move_to_end(key.digest)
+        self._tenants.move_to_end(key.tenant)
+        return entry.value
+    
+    def _put_local(self, key: ResponseCacheKey, value: CachedResponse) -> None:
+        entries = self._tenants.get(key.tenant)
+        if entries is None:
+            entries = self._tenants[key.tenant] = OrderedDict()
+            while len(self._tenants) > self.max_tenants:
+                self._tenants.popitem(last=False)
+        
+        entries[key.digest] = _Entry(
+            expires_at=time.monotonic() + self.ttl_seconds,
+            value=value,
+            scope=key.scope,
+            embedding=key.embedding,
+        )
+        entries.move_to_end(key.digest)
+        self._tenants.move_to_end(key.tenant)
+        while len(entries) > self.max_entries_per_tenant:
+            entries.popitem(last=False)
+    
+    async def _get_similar(self, key: ResponseCacheKey, embed: Embedder) -> Optional[CachedResponse]:
+        """
+        Find the response of the most similar cached prompt.
+        
+        Only the tenant's L1 entries with the same model and parameters are
+        compared, so the scan is bounded by the per-tenant limit.
+        """
+        entries = self._tenants.get(key.tenant)
+        candidates = [
+            entry for entry in (entries or {}).values()
+            if entry.scope == key.scope and entry.embedding is not None
+            and entry.expires_at > time.monotonic()
+        ]
+        
+        try:
+            key.embedding = _normalize(await embed(key.prompt))
+        except Exception as e:
+            logger.warning(f"Could not embed prompt for response cache lookup: {str(e)}")
+            return None
+        
+        best: Tuple[float, Optional[_Entry]] = (self.similarity_threshold, None)
+        for entry in candidates:
+            similarity = sum(a * b for a, b in zip(key.embedding, entry.embedding))
+            if similarity >= best[0]:
+                best = (similarity, entry)
+        
+        return best[1].value if best[1] is not None else None
+    
+    async def _get_remote(self, key: ResponseCacheKey) -> Optional[CachedResponse]:
+        if self.redis_client is None:
+            return None
+        
+        try:
+            data = await self.redis_client.get(self._redis_key(key))
+            return CachedResponse.from_json(data) if data else None
+        except Exception as e:
+            logger.warning(f"Error reading response cache from Redis: {str(e)}")
+            return None
+    
+    async def _put_remote(self, key: ResponseCacheKey, value: CachedResponse) -> None:
+        """
+        Store a response in Redis and enforce the tenant's size limit.
+        
+        Each tenant has a sorted set of its keys by insertion time; the
+        oldest keys beyond the limit are evicted.
+        """
+        if self.redis_client is None:
+            return
+        
+        index = f"{self.redis_prefix}:{key.tenant}:index"
+        now = time.time()
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.set(self._redis_key(key), value.to_json(), ex=int(self.ttl_seconds))
+                pipe.zadd(index, {key.digest: now})
+                pipe.zremrangebyscore(index, 0, now - self.ttl_seconds)
+                pipe.expire(index, int(self.ttl_seconds))
+                pipe.zcard(index)
+                results = await pipe.execute()
+            
+            overflow = results[-1] - self.max_entries_per_tenant
+            if overflow > 0:
+                evicted = await self.redis_client.zpopmin(index, overflow)
+                if evicted:
+                    await self.redis_client.delete(
+                        *(f"{self.redis_prefix}:{key.tenant}:{digest}" for digest, _ in evicted)
+                    )
+        except Exception as e:
+            logger.warning(f"Error writing response cache to Redis: {str(e)}")
+    
+    def _redis_key(self, key: ResponseCacheKey) -> str:
+        return f"{self.redis_prefix}:{key.tenant}:{key.digest}"
+
+
+def _normalize(vector: List[float]) -> List[float]:
+    norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+    return [value / norm for value in vector]
+
+
+# Singleton instance
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache(settings: ModelOrchestrationConfig) -> ResponseCache:
+    """
+    Get the response cache singleton instance.
+    
+    Args:
+        settings: Application settings
+    
+    Returns:
+        ResponseCache: Response cache instance
+    """
+    global _response_cache
+    
+    if _response_cache is None:
+        redis_client = None
+        if settings.response_cache_use_redis:
+            try:
+                redis_client = get_redis_client(settings.redis_url)
+            except Exception as e:
+                logger.warning(f"Response cache L2 disabled: {str(e)}")
+        
+        _response_cache = ResponseCache(
+            ttl_seconds=settings.response_cache_ttl,
+            max_entries_per_tenant=settings.response_cache_max_entries_per_tenant,
+            redis_client=redis_client,
+            similarity_threshold=settings.response_cache_similarity_threshold,
+        )
+    
+    return _response_cache
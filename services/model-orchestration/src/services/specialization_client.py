@@ -0,0 +1,231 @@
+"""
+Agent specialization client.
+
+Agent requests that carry an ``agent_specialization_id`` are enhanced with
+the agent's specialization before they reach a model. This module fetches
+specializations from the Agent Orchestrator over a pooled HTTP client,
+caches them with a TTL, and compiles their prompt fragments once per
+specialization. The Agent Orchestrator's specialization events invalidate
+cached entries.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Optional
+
+import httpx
+
+from shared.utils.src.messaging import EventBus
+
+from ..config import ModelOrchestrationConfig
+from .ttl_cache import AsyncTTLCache
+
+logger = logging.getLogger(__name__)
+
+# Events published by the Agent Orchestrator when a specialization changes
+SPECIALIZATION_EVENTS = (
+    "agent.specialization.created",
+    "agent.specialization.updated",
+    "agent.specialization.deleted",
+)
+
+
+@dataclass(frozen=True)
+class SpecializationPrompt:
+    """
+    Agent specialization with its precompiled prompt fragments.
+    """
+    data: Dict[str, Any]
+    system_suffix: str
+    """Appended to an existing system message."""
+    system_message: str
+    """Used as the system message when a chat has none."""
+    prompt_prefix: str
+    """Prepended to completion prompts."""
+    
+    @classmethod
+    def compile(cls, data: Dict[str, Any]) -> "SpecializationPrompt":
+        """
+        Compile the prompt fragments of a specialization.
+        
+        Args:
+            data: Specialization data
+        
+        Returns:
+            SpecializationPrompt: Specialization with prompt fragments
+        """
+        description = (
+            f"You are specialized as a {data.get('agent_type', 'GENERAL')} agent with the following:\n"
+            f"Skills: {', '.join(data.get('required_skills', []))}\n"
+            f"Responsibilities: {', '.join(data.get('responsibilities', []))}\n"
+            f"Knowledge Domains: {', '.join(data.get('knowledge_domains', []))}"
+        )
+        
+        return cls(
+            data=data,
+            system_suffix=f"\n\n{description}",
+            system_message=description,
+            prompt_prefix=f"[{description}]\n\n",
+        )
+
+
+class SpecializationClient:
+    """
+    Cached client for Agent Orchestrator specializations.
+    """
+    
+    def __init__(
+        self,
+        base_url: Optional[str],
+        ttl_seconds: float = 300.0,
+        max_entries: int = 256,
+        timeout: float = 5.0,
+        max_connections: int = 20,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        """
+        Initialize the client.
+        
+        Args:
+            base_url: Agent Orchestrator URL (lookups are skipped if not set)
+            ttl_seconds: Seconds a cached specialization stays valid
+            max_entries: Maximum number of cached specializations
+            timeout: Request timeout in seconds
+            max_connections: Maximum pooled connections
+            transport: Optional HTTP transport (e.g. a stub server in tests)
+        """
+        self.base_url = base_url
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.cache: AsyncTTLCache[SpecializationPrompt] = AsyncTTLCache(ttl_seconds, max_entries)
+        
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+    
+    async def get(self, specialization_id: str) -> Optional[SpecializationPrompt]:
+        """
+        Get a specialization.
+        
+        Args:
+            specialization_id: Specialization ID (agent type)
+        
+        Returns:
+            Optional[SpecializationPrompt]: Specialization, or None if not
+                found or the Agent Orchestrator is unavailable
+        """
+        if not specialization_id:
+            return None
+        
+        if not self.base_url:
+            logger.warning("Agent Orchestrator URL not configured, skipping specialization lookup")
+            return None
+        
+        try:
+            return await self.cache.get(specialization_id, self._fetch)
+        except Exception as e:
+            logger.error(f"Error getting agent specialization: {str(e)}")
+            return None
+    
+    def invalidate(self, specialization_id: Optional[str] = None) -> None:
+        """
+        Drop cached specializations.
+        
+        Args:
+            specialization_id: Specialization ID to invalidate, or None to
+                invalidate all specializations
+        """
+        self.cache.invalidate(specialization_id)
+    
+    async def subscribe(self, event_bus: EventBus) -> None:
+        """
+        Keep the cache in sync with Agent Orchestrator specialization events.
+        
+        Args:
+            event_bus: Event bus
+        """
+        for event_type in SPECIALIZATION_EVENTS:
+            await event_bus.subscribe_to_event(event_type, self._handle_specialization_event)
+        logger.info("Specialization client subscribed to specialization events")
+    
+    async def close(self) -> None:
+        """
+        Close the HTTP connection pool.
+        """
+        if self._client:
+            await self._client.aclose()
+            self._client = None
+    
+    async def _handle_specialization_event(self, data: Dict[str, Any]) -> None:
+        """Invalidate the specialization referenced by an event."""
+        agent_type = data.get("agent_type")
+        logger.debug(f"Invalidating agent specialization: {agent_type or 'all'}")
+        self.invalidate(agent_type)
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """Get the pooled HTTP client, creating it on first use."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                transport=self._transport,
+            )
+        return self._client
+    
+    async def _fetch(self, specialization_id: Hashable) -> Optional[SpecializationPrompt]:
+        """
+        Fetch a specialization from the Agent Orchestrator.
+        
+        Args:
+            specialization_id: Specialization ID (agent type)
+        
+        Returns:
+            Optional[SpecializationPrompt]: Specialization, or None if not found
+        
+        Raises:
+            httpx.HTTPError: If the request fails; failures are not cached
+        """
+        response = await self._get_client().get(f"/api/specializations/{specialization_id}")
+        
+        if response.status_code == 404:
+            logger.warning(f"Agent specialization {specialization_id} not found")
+            return None
+        
+        response.raise_for_status()
+        
+        body = response.json()
+        data = body.get("data", body) if isinstance(body, dict) else None
+        if not data:
+            return None
+        
+        return SpecializationPrompt.compile(data)
+
+
+# Singleton instance
+_specialization_client: Optional[SpecializationClient] = None
+
+
+def get_specialization_client(settings: ModelOrchestrationConfig) -> SpecializationClient:
+    """
+    Get the specialization client singleton instance.
+    
+    Args:
+        settings: Application settings
+    
+    Returns:
+        SpecializationClient: Specialization client instance
+    """
+    global _specialization_client
+    
+    if _specialization_client is None:
+        _specialization_client = SpecializationClient(
+            base_url=settings.agent_orchestrator_url,
+            ttl_seconds=settings.specialization_cache_ttl,
+            max_entries=settings.specialization_cache_max_entries,
+            timeout=settings.agent_orchestrator_timeout,
+        )
+    
+    return _specialization_client
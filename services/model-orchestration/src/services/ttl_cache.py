@@ -0,0 +1,129 @@
+"""
+Async read-through cache with TTL and LRU eviction.
+
+Lookups that miss call a loader; concurrent misses for the same key share
+a single load (single-flight). Loader results, including None for missing
+entries, are cached for the TTL. Loader errors are not cached.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class AsyncTTLCache(Generic[T]):
+    """
+    Read-through TTL + LRU cache with single-flight loads.
+    """
+    
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        """
+        Initialize the cache.
+        
+        Args:
+            ttl_seconds: Seconds a cached value stays valid
+            max_entries: Maximum number of cached values
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        
+        self._entries: "OrderedDict[Hashable, Tuple[float, Optional[T]]]" = OrderedDict()
+        self._loading: Dict[Hashable, asyncio.Future] = {}
+        self._generation = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    async def get(
+        self,
+        key: Hashable,
+        loader: Callable[[Hashable], Awaitable[Optional[T]]],
+    ) -> Optional[T]:
+        """
+        Get a value, loading it on a miss.
+        
+        Args:
+            key: Cache key
+            loader: Loads the value for a key
+        
+        Returns:
+            Optional[T]: Cached or loaded value
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+        
+        self.misses += 1
+        
+        pending = self._loading.get(key)
+        while pending is not None:
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                # Load again if the loading caller was cancelled rather than us
+                if not pending.cancelled():
+                    raise
+            pending = self._loading.get(key)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._loading[key] = future
+        generation = self._generation
+        try:
+            value = await loader(key)
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception retrieved when nobody else was waiting
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+            # Skip caching a load that raced with an invalidation
+            if generation == self._generation:
+                self._put(key, value)
+            return value
+        finally:
+            # Release waiters when the loader was cancelled
+            if not future.done():
+                future.cancel()
+            del self._loading[key]
+    
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """
+        Drop cached values.
+        
+        Args:
+            key: Key to invalidate, or None to invalidate everything
+        """
+        self._generation += 1
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+        
+        Returns:
+            Dict[str, Any]: Entry count, hits and misses
+        """
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "ttl_seconds": self.ttl_seconds,
+        }
+    
+    def _put(self, key: Hashable, value: Optional[T]) -> None:
+        """Cache a loaded value."""
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
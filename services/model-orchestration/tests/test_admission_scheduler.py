@@ -0,0 +1,153 @@
+import asyncio
+
+import pytest
+
+from src.exceptions import RateLimitError
+from src.services.admission_scheduler import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    AdmissionScheduler,
+    RateLimits,
+    estimate_tokens,
+    request_priority,
+)
+
+
+class TestAdmissionScheduler:
+    """
+    Tests for the admission scheduler.
+    """
+    
+    def test_limits_resolution(self):
+        """
+        Test that model configuration beats provider/model and provider settings.
+        """
+        scheduler = AdmissionScheduler(limits={
+            "openai": {"requests_per_minute": 100},
+            "openai/gpt-4": {"tokens_per_minute": 1000},
+        })
+        
+        assert scheduler.limits_for("openai", "gpt-3.5-turbo") == RateLimits(requests_per_minute=100)
+        assert scheduler.limits_for("openai", "gpt-4") == RateLimits(tokens_per_minute=1000)
+        assert scheduler.limits_for("openai", "gpt-4", {"requests_per_minute": 5}) == RateLimits(requests_per_minute=5)
+        assert scheduler.limits_for("ollama", "llama3") is None
+    
+    def test_estimates(self):
+        """
+        Test token estimates and priority classes.
+        """
+        assert estimate_tokens("a" * 40) == 10
+        assert estimate_tokens(["a" * 8, "b" * 4]) == 3
+        
+        class Request:
+            metadata = {"priority": "background"}
+        
+        assert request_priority(Request()) == PRIORITY_BACKGROUND
+        Request.metadata = {"priority": "urgent"}
+        assert request_priority(Request()) == PRIORITY_INTERACTIVE
+    
+    @pytest.mark.asyncio
+    async def test_admits_within_budget(self):
+        """
+        Test that requests within the budget are admitted without waiting.
+        """
+        # Setup
+        scheduler = AdmissionScheduler()
+        limits = RateLimits(requests_per_minute=60, tokens_per_minute=6000)
+        
+        # Test
+        admissions = [await scheduler.acquire("openai", "gpt-4", 100, limits=limits) for _ in range(3)]
+        
+        # Verify
+        assert all(admission.wait_ms == 0.0 for admission in admissions)
+        metrics = scheduler.get_metrics()["openai/gpt-4"]
+        assert metrics["available_tokens"] == pytest.approx(5700, abs=1)
+        assert metrics["priorities"][PRIORITY_INTERACTIVE]["admitted"] == 3
+    
+    @pytest.mark.asyncio
+    async def test_waits_for_budget_in_priority_order(self):
+        """
+        Test that waiting requests are dispatched as the budget refills, interactive first.
+        """
+        # Setup: the budget refills 50 tokens every 50 ms
+        scheduler = AdmissionScheduler()
+        limits = RateLimits(tokens_per_minute=60000)
+        await scheduler.acquire("openai", "gpt-4", 60000, limits=limits)
+        
+        order = []
+        
+        async def request(name, priority):
+            await scheduler.acquire("openai", "gpt-4", 50, priority, limits)
+            order.append(name)
+        
+        # Test
+        background = asyncio.create_task(request("background", PRIORITY_BACKGROUND))
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(request("interactive", PRIORITY_INTERACTIVE))
+        await asyncio.sleep(0)
+        
+        metrics = scheduler.get_metrics()["openai/gpt-4"]["priorities"]
+        assert metrics[PRIORITY_BACKGROUND]["waiting"] == 1
+        assert metrics[PRIORITY_INTERACTIVE]["waiting"] == 1
+        
+        await asyncio.wait_for(asyncio.gather(background, interactive), 1.0)
+        
+        # Verify
+        assert order == ["interactive", "background"]
+        metrics = scheduler.get_metrics()["openai/gpt-4"]["priorities"]
+        assert metrics[PRIORITY_BACKGROUND]["max_wait_ms"] > 0
+    
+    @pytest.mark.asyncio
+    async def test_settle_returns_unused_tokens(self):
+        """
+        Test that settling an admission corrects the reserved tokens.
+        """
+        # Setup
+        scheduler = AdmissionScheduler()
+        limits = RateLimits(tokens_per_minute=1000)
+        admission = await scheduler.acquire("openai", "gpt-4", 800, limits=limits)
+        
+        # Test
+        admission.settle(200)
+        
+        # Verify
+        assert scheduler.get_metrics()["openai/gpt-4"]["available_tokens"] == pytest.approx(800, abs=1)
+    
+    @pytest.mark.asyncio
+    async def test_admission_timeout(self):
+        """
+        Test that requests fail with a rate-limit error when no budget frees up.
+        """
+        # Setup
+        scheduler = AdmissionScheduler(admission_timeout=0.05)
+        limits = RateLimits(requests_per_minute=1)
+        await scheduler.acquire("openai", "gpt-4", 0, limits=limits)
+        
+        # Test / Verify
+        with pytest.raises(RateLimitError):
+            await scheduler.acquire("openai", "gpt-4", 0, limits=limits)
+        
+        metrics = scheduler.get_metrics()["openai/gpt-4"]
+        assert metrics["timeouts"] == 1
+        assert metrics["priorities"][PRIORITY_INTERACTIVE]["waiting"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_provider_rate_limit_pauses_dispatch(self):
+        """
+        Test that a provider rate-limit error pauses the model for its retry-after.
+        """
+        # Setup
+        scheduler = AdmissionScheduler()
+        
+        # Test
+        with pytest.raises(RateLimitError):
+            async with scheduler.admit("openai", "gpt-4", 10):
+                raise RateLimitError("openai", details={"retry_after": 0.05})
+        
+        start = asyncio.get_running_loop().time()
+        admission = await scheduler.acquire("openai", "gpt-4", 10)
+        
+        # Verify
+        assert asyncio.get_running_loop().time() - start >= 0.04
+        assert admission.wait_ms > 0
+        assert scheduler.get_metrics()["openai/gpt-4"]["rate_limited"] == 1
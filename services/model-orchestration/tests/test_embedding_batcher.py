@@ -0,0 +1,177 @@
+import pytest
+import asyncio
+from contextlib import asynccontextmanager
+from unittest.mock import MagicMock
+
+from src.models.api import EmbeddingRequest, EmbeddingResponse, EmbeddingResponseData, TokenUsage
+from src.services.embedding_batcher import EmbeddingBatcher
+
+
+class StubEmbeddingProvider:
+    """
+    Provider that embeds each input as its length and records its calls.
+    """
+    
+    provider_name = "stub"
+    
+    def __init__(self, max_embedding_batch_size: int = 2048, fail: bool = False):
+        self.max_embedding_batch_size = max_embedding_batch_size
+        self.fail = fail
+        self.calls = []
+    
+    async def embedding(self, request):
+        self.calls.append(list(request.input))
+        await asyncio.sleep(0)
+        if self.fail:
+            raise RuntimeError("rate limited")
+        return EmbeddingResponse(
+            model=request.model_id,
+            data=[
+                EmbeddingResponseData(index=i, embedding=[float(len(text)), 1.0])
+                for i, text in enumerate(request.input)
+            ],
+            usage=TokenUsage(
+                prompt_tokens=10 * len(request.input),
+                completion_tokens=0,
+                total_tokens=10 * len(request.input),
+            ),
+        )
+
+
+class RecordingAdmission:
+    """
+    Admission hook that records the inputs and settled tokens of each call.
+    """
+    
+    def __init__(self):
+        self.admitted = []
+        self.settled = []
+    
+    @asynccontextmanager
+    async def __call__(self, texts):
+        self.admitted.append(list(texts))
+        admission = MagicMock()
+        admission.settle.side_effect = self.settled.append
+        yield admission
+
+
+def embedding_request(inputs):
+    """
+    Create an embedding request.
+    """
+    return EmbeddingRequest(model_id="text-embedding-3-small", input=inputs)
+
+
+class TestEmbeddingBatcher:
+    """
+    Tests for the embedding batcher.
+    """
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_one_call(self):
+        """
+        Test that concurrent requests are coalesced and results scattered back.
+        """
+        # Setup
+        provider = StubEmbeddingProvider()
+        batcher = EmbeddingBatcher(window_ms=5)
+        texts = [f"snippet {i}" * (i + 1) for i in range(20)]
+        
+        # Test
+        responses = await asyncio.gather(*(
+            batcher.embed(provider, "text-embedding-3-small", embedding_request(text))
+            for text in texts
+        ))
+        
+        # Verify
+        assert len(provider.calls) == 1
+        assert sorted(provider.calls[0]) == sorted(texts)
+        for text, response in zip(texts, responses):
+            assert response.data[0].embedding == [float(len(text)), 1.0]
+        assert sum(response.usage.prompt_tokens for response in responses) == 200
+    
+    @pytest.mark.asyncio
+    async def test_identical_inputs_are_deduplicated_and_cached(self):
+        """
+        Test that identical inputs share a slot and repeats hit the cache.
+        """
+        # Setup
+        provider = StubEmbeddingProvider()
+        batcher = EmbeddingBatcher(window_ms=1)
+        
+        # Test
+        first, second = await asyncio.gather(
+            batcher.embed(provider, "m", embedding_request(["same", "other", "same"])),
+            batcher.embed(provider, "m", embedding_request("same")),
+        )
+        third = await batcher.embed(provider, "m", embedding_request(["other", "same"]))
+        
+        # Verify
+        assert provider.calls == [["same", "other"]]
+        assert [item.embedding[0] for item in first.data] == [4.0, 5.0, 4.0]
+        assert second.data[0].embedding == [4.0, 1.0]
+        assert [item.index for item in third.data] == [0, 1]
+        assert third.usage.prompt_tokens == 0
+        assert batcher.get_stats()["cache_hits"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_full_batches_are_sent_immediately(self):
+        """
+        Test that batches are split at the provider's maximum batch size.
+        """
+        # Setup
+        provider = StubEmbeddingProvider(max_embedding_batch_size=4)
+        batcher = EmbeddingBatcher(window_ms=1000, cache_max_entries=0)
+        
+        # Test
+        response = await asyncio.wait_for(
+            batcher.embed(provider, "m", embedding_request([str(i) for i in range(8)])),
+            timeout=0.5,
+        )
+        
+        # Verify
+        assert [len(call) for call in provider.calls] == [4, 4]
+        assert len(response.data) == 8
+    
+    @pytest.mark.asyncio
+    async def test_batch_errors_reach_every_caller(self):
+        """
+        Test that a failed provider call fails all requests in the batch.
+        """
+        # Setup
+        provider = StubEmbeddingProvider(fail=True)
+        batcher = EmbeddingBatcher(window_ms=1)
+        
+        # Test
+        results = await asyncio.gather(
+            batcher.embed(provider, "m", embedding_request("a")),
+            batcher.embed(provider, "m", embedding_request("b")),
+            return_exceptions=True,
+        )
+        
+        # Verify
+        assert len(provider.calls) == 1
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert batcher.get_stats()["cache_entries"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_batches_are_admitted_once(self):
+        """
+        Test that a batched provider call is admitted once for all its inputs.
+        """
+        # Setup
+        provider = StubEmbeddingProvider()
+        batcher = EmbeddingBatcher(window_ms=5)
+        admit = RecordingAdmission()
+        texts = [f"snippet {i}" for i in range(5)]
+        
+        # Test
+        await asyncio.gather(*(
+            batcher.embed(provider, "m", embedding_request(text), admit=admit)
+            for text in texts
+        ))
+        
+        # Verify
+        assert len(provider.calls) == 1
+        assert admit.admitted == provider.calls
+        assert admit.settled == [50]
@@ -0,0 +1,152 @@
+import pytest
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+from src.services.model_registry import ModelRegistry, MODEL_EVENTS
+
+
+class CountingLoader:
+    """
+    Model loader that counts database lookups.
+    """
+    
+    def __init__(self, models, delay: float = 0.0):
+        self.models = models
+        self.delay = delay
+        self.calls = 0
+    
+    async def __call__(self, model_id):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.models.get(model_id)
+
+
+@pytest.fixture
+def loader():
+    """
+    Loader fixture with one registered model.
+    """
+    return CountingLoader({"gpt-4": MagicMock(model_id="gpt-4", token_limit=8192)})
+
+
+class TestModelRegistry:
+    """
+    Tests for the model registry cache.
+    """
+    
+    @pytest.mark.asyncio
+    async def test_read_through(self, loader):
+        """
+        Test that repeated lookups are served from the cache.
+        """
+        registry = ModelRegistry(ttl_seconds=60)
+        
+        first = await registry.get("gpt-4", loader)
+        second = await registry.get("gpt-4", loader)
+        
+        assert first is second
+        assert first.token_limit == 8192
+        assert loader.calls == 1
+        assert registry.get_stats()["hits"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_caches_missing_models(self, loader):
+        """
+        Test that lookups of unregistered models are cached too.
+        """
+        registry = ModelRegistry(ttl_seconds=60)
+        
+        assert await registry.get("llama3:8b", loader) is None
+        assert await registry.get("llama3:8b", loader) is None
+        assert loader.calls == 1
+    
+    @pytest.mark.asyncio
+    async def test_ttl_expiry(self, loader):
+        """
+        Test that entries are reloaded after the TTL.
+        """
+        registry = ModelRegistry(ttl_seconds=0)
+        
+        await registry.get("gpt-4", loader)
+        await registry.get("gpt-4", loader)
+        
+        assert loader.calls == 2
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_load(self):
+        """
+        Test that concurrent misses for a model query the database once.
+        """
+        registry = ModelRegistry(ttl_seconds=60)
+        loader = CountingLoader({"gpt-4": MagicMock()}, delay=0.01)
+        
+        results = await asyncio.gather(*(registry.get("gpt-4", loader) for _ in range(10)))
+        
+        assert loader.calls == 1
+        assert all(result is results[0] for result in results)
+    
+    @pytest.mark.asyncio
+    async def test_loader_errors_are_not_cached(self, loader):
+        """
+        Test that a failed load is retried on the next lookup.
+        """
+        registry = ModelRegistry(ttl_seconds=60)
+        failing_loader = AsyncMock(side_effect=RuntimeError("database unavailable"))
+        
+        with pytest.raises(RuntimeError):
+            await registry.get("gpt-4", failing_loader)
+        
+        assert await registry.get("gpt-4", loader) is not None
+    
+    @pytest.mark.asyncio
+    async def test_invalidated_by_model_events(self, loader):
+        """
+        Test that model events from other instances invalidate entries.
+        """
+        registry = ModelRegistry(ttl_seconds=60)
+        event_bus = MagicMock()
+        event_bus.subscribe_to_event = AsyncMock()
+        
+        await registry.subscribe(event_bus)
+        subscribed = {call.args[0]: call.args[1] for call in event_bus.subscribe_to_event.call_args_list}
+        assert set(subscribed) == set(MODEL_EVENTS)
+        
+        await registry.get("gpt-4", loader)
+        await subscribed["model.updated"]({"model_id": "gpt-4", "provider": "OPENAI"})
+        await registry.get("gpt-4", loader)
+        
+        assert loader.calls == 2
+    
+    @pytest.mark.asyncio
+    async def test_load_racing_invalidation_is_not_cached(self):
+        """
+        Test that a load started before an invalidation is not cached.
+        """
+        registry = ModelRegistry(ttl_seconds=60)
+        loader = CountingLoader({"gpt-4": MagicMock()}, delay=0.01)
+        
+        pending = asyncio.create_task(registry.get("gpt-4", loader))
+        await asyncio.sleep(0)
+        registry.invalidate("gpt-4")
+        await pending
+        await registry.get("gpt-4", loader)
+        
+        assert loader.calls == 2
+    
+    @pytest.mark.asyncio
+    async def test_cancelled_load_does_not_strand_waiters(self):
+        """
+        Test that waiters load the model themselves when the shared load is cancelled.
+        """
+        registry = ModelRegistry(ttl_seconds=60)
+        loader = CountingLoader({"gpt-4": MagicMock()}, delay=0.01)
+        
+        first = asyncio.create_task(registry.get("gpt-4", loader))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(registry.get("gpt-4", loader))
+        await asyncio.sleep(0)
+        first.cancel()
+        
+        assert await asyncio.wait_for(waiter, timeout=1) is not None
+        assert first.cancelled()
+        assert loader.calls == 2
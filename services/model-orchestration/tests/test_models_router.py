@@ -0,0 +1,72 @@
+import pytest
+from unittest.mock import MagicMock
+
+from fastapi import BackgroundTasks
+
+from src.models import ChatMessage, MessageRole
+from src.models.api import ChatRequest
+from src.models.api.responses import StreamChunk
+from src.routers.models import _event_stream
+
+
+async def stream_of(*chunks):
+    """
+    Async iterator over the given chunks.
+    """
+    for chunk in chunks:
+        yield chunk
+
+
+async def read_events(response):
+    """
+    Read the events of a streaming response.
+    """
+    return [event async for event in response.body_iterator]
+
+
+@pytest.fixture
+def chat_request():
+    """
+    Streaming chat request fixture.
+    """
+    return ChatRequest(
+        model_id="gpt-4",
+        messages=[ChatMessage(role=MessageRole.USER, content="Hello")],
+        stream=True,
+    )
+
+
+class TestEventStream:
+    """
+    Tests for the server-sent events wrapper of streamed responses.
+    """
+    
+    @pytest.mark.asyncio
+    async def test_chunks_are_sent_as_events(self, chat_request):
+        """
+        Test that chunks are sent as data events followed by the done event.
+        """
+        chunks = [
+            StreamChunk(id="c1", created=0, model="gpt-4", delta="Hi"),
+            StreamChunk(id="c1", created=0, model="gpt-4", delta="!"),
+        ]
+        
+        response = await _event_stream(stream_of(*chunks), chat_request, "chat", BackgroundTasks(), MagicMock())
+        events = await read_events(response)
+        
+        assert response.media_type == "text/event-stream"
+        assert len(events) == 3
+        assert '"delta":"Hi"' in events[0]
+        assert events[-1] == "data: [DONE]\n\n"
+    
+    @pytest.mark.asyncio
+    async def test_empty_stream_sends_done_event(self, chat_request):
+        """
+        Test that a stream without chunks is answered with the done event only.
+        """
+        background_tasks = BackgroundTasks()
+        
+        response = await _event_stream(stream_of(), chat_request, "chat", background_tasks, MagicMock())
+        
+        assert await read_events(response) == ["data: [DONE]\n\n"]
+        assert not background_tasks.tasks
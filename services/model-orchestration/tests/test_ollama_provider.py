@@ -0,0 +1,287 @@
+import pytest
+import asyncio
+import json
+import httpx
+
+from src.providers.ollama_provider import OllamaProvider
+from src.models import ChatMessage, MessageRole
+from src.models.api import (
+    ChatRequest,
+    CompletionRequest,
+    EmbeddingRequest,
+)
+from src.exceptions import (
+    ModelNotFoundError,
+    ProviderNotAvailableError,
+    InvalidRequestError,
+)
+
+
+class StubOllamaServer:
+    """
+    Stub Ollama server served through an httpx mock transport.
+    """
+    
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.requests = []
+        self.active = 0
+        self.peak_active = 0
+    
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content) if request.content else {}
+        self.requests.append((request.url.path, body))
+        
+        if request.url.path == "/api/tags":
+            return httpx.Response(200, json={
+                "models": [
+                    {"name": "llama3:8b", "size": 4661224676, "details": {"family": "llama", "parameter_size": "8B"}},
+                    {"name": "nomic-embed-text:latest", "details": {"family": "nomic-bert"}},
+                ],
+            })
+        
+        if body.get("model") == "missing":
+            return httpx.Response(404, json={"error": "model 'missing' not found, try pulling it first"})
+        
+        self.active += 1
+        self.peak_active = max(self.peak_active, self.active)
+        await asyncio.sleep(self.delay)
+        self.active -= 1
+        
+        if request.url.path == "/api/chat" and body["stream"]:
+            lines = [
+                {"model": body["model"], "message": {"role": "assistant", "content": "Hello"}, "done": False},
+                {"model": body["model"], "message": {"role": "assistant", "content": " there"}, "done": False},
+                {"model": body["model"], "message": {"role": "assistant", "content": ""}, "done": True,
+                 "done_reason": "stop", "prompt_eval_count": 12, "eval_count": 2},
+            ]
+            return httpx.Response(200, content="\n".join(json.dumps(line) for line in lines).encode())
+        
+        if request.url.path == "/api/chat":
+            return httpx.Response(200, json={
+                "model": body["model"],
+                "message": {"role": "assistant", "content": "This is a local chat response"},
+                "done": True,
+                "done_reason": "stop",
+                "prompt_eval_count": 12,
+                "eval_count": 6,
+            })
+        
+        if request.url.path == "/api/generate":
+            return httpx.Response(200, json={
+                "model": body["model"],
+                "response": "This is a local completion",
+                "done": True,
+                "done_reason": "stop",
+                "prompt_eval_count": 4,
+                "eval_count": 5,
+            })
+        
+        if request.url.path == "/api/embed":
+            return httpx.Response(200, json={
+                "model": body["model"],
+                "embeddings": [[0.1, 0.2, 0.3] for _ in body["input"]],
+                "prompt_eval_count": 8,
+            })
+        
+        return httpx.Response(500, json={"error": "unexpected request"})
+
+
+@pytest.fixture
+def stub_server():
+    """
+    Stub Ollama server fixture.
+    """
+    return StubOllamaServer()
+
+
+@pytest.fixture
+def ollama_provider(test_settings, stub_server):
+    """
+    Ollama provider fixture.
+    """
+    provider = OllamaProvider(test_settings, transport=httpx.MockTransport(stub_server))
+    asyncio.run(provider.initialize())
+    yield provider
+
+
+def chat_request(model_id: str = "llama3:8b", **kwargs) -> ChatRequest:
+    """
+    Create a chat request with a single user message.
+    """
+    return ChatRequest(
+        model_id=model_id,
+        messages=[
+            ChatMessage(
+                role=MessageRole.USER,
+                content="Hello",
+            ),
+        ],
+        **kwargs,
+    )
+
+
+class TestOllamaProvider:
+    """
+    Tests for the Ollama provider.
+    """
+    
+    def test_provider_name(self, ollama_provider):
+        """
+        Test provider name.
+        """
+        assert ollama_provider.provider_name == "ollama"
+    
+    def test_available_models(self, ollama_provider):
+        """
+        Test that pulled models are listed.
+        """
+        models = ollama_provider.available_models
+        assert "llama3:8b" in models
+        assert models["llama3:8b"]["family"] == "llama"
+    
+    def test_supports_model(self, ollama_provider):
+        """
+        Test model support.
+        """
+        assert ollama_provider.supports_model("llama3:8b")
+        assert ollama_provider.supports_model("ollama/custom-model")
+        assert ollama_provider.supports_model("mistral")
+        assert not ollama_provider.supports_model("gpt-4")
+    
+    def test_calculate_cost(self, ollama_provider):
+        """
+        Test that local inference is free.
+        """
+        assert ollama_provider.calculate_cost("llama3:8b", 1000, 1000) == 0.0
+    
+    @pytest.mark.asyncio
+    async def test_chat_completion(self, ollama_provider, stub_server):
+        """
+        Test chat completion.
+        """
+        # Test
+        response = await ollama_provider.chat_completion(chat_request("ollama/llama3:8b", max_tokens=50))
+        
+        # Verify
+        assert response.choices[0].message.content == "This is a local chat response"
+        assert response.choices[0].message.role == MessageRole.ASSISTANT
+        assert response.usage.prompt_tokens == 12
+        assert response.usage.completion_tokens == 6
+        assert response.usage.total_tokens == 18
+        
+        # Verify API call
+        path, body = stub_server.requests[-1]
+        assert path == "/api/chat"
+        assert body["model"] == "llama3:8b"
+        assert body["messages"] == [{"role": "user", "content": "Hello"}]
+        assert body["options"]["num_predict"] == 50
+        assert body["stream"] is False
+    
+    @pytest.mark.asyncio
+    async def test_text_completion(self, ollama_provider, stub_server):
+        """
+        Test text completion.
+        """
+        # Test
+        response = await ollama_provider.text_completion(
+            CompletionRequest(model_id="llama3:8b", prompt="Once upon a time")
+        )
+        
+        # Verify
+        assert response.choices[0].text == "This is a local completion"
+        assert response.usage.total_tokens == 9
+        assert stub_server.requests[-1][0] == "/api/generate"
+    
+    @pytest.mark.asyncio
+    async def test_embedding(self, ollama_provider):
+        """
+        Test embedding.
+        """
+        # Test
+        response = await ollama_provider.embedding(
+            EmbeddingRequest(model_id="nomic-embed-text:latest", input=["first", "second"])
+        )
+        
+        # Verify
+        assert len(response.data) == 2
+        assert response.data[1].index == 1
+        assert response.data[0].embedding == [0.1, 0.2, 0.3]
+        assert response.usage.prompt_tokens == 8
+    
+    @pytest.mark.asyncio
+    async def test_stream_chat_completion(self, ollama_provider):
+        """
+        Test streaming chat completion.
+        """
+        # Test
+        chunks = [chunk async for chunk in ollama_provider.stream_chat_completion(chat_request(stream=True))]
+        
+        # Verify
+        assert "".join(chunk.delta for chunk in chunks) == "Hello there"
+        assert chunks[-1].finish_reason == "stop"
+        assert chunks[-1].usage.prompt_tokens == 12
+        assert chunks[-1].usage.completion_tokens == 2
+        assert all(chunk.usage is None for chunk in chunks[:-1])
+    
+    @pytest.mark.asyncio
+    async def test_model_concurrency_limit(self, test_settings):
+        """
+        Test that requests to one model are queued and the wait is measured.
+        """
+        # Setup
+        stub_server = StubOllamaServer(delay=0.05)
+        provider = OllamaProvider(test_settings, transport=httpx.MockTransport(stub_server))
+        await provider.initialize()
+        
+        # Test
+        await asyncio.gather(*(provider.chat_completion(chat_request()) for _ in range(3)))
+        
+        # Verify
+        assert stub_server.peak_active == test_settings.ollama_model_concurrency
+        metrics = provider.get_queue_metrics()["llama3:8b"]
+        assert metrics["completed"] == 3
+        assert metrics["waiting"] == 0
+        assert metrics["active"] == 0
+        assert metrics["max_wait_ms"] >= 50
+        
+        await provider.close()
+    
+    @pytest.mark.asyncio
+    async def test_model_not_found(self, ollama_provider):
+        """
+        Test error for a model that is not pulled.
+        """
+        with pytest.raises(ModelNotFoundError):
+            await ollama_provider.chat_completion(chat_request("missing"))
+        
+        with pytest.raises(ModelNotFoundError):
+            async for _ in ollama_provider.stream_chat_completion(chat_request("missing")):
+                pass
+    
+    @pytest.mark.asyncio
+    async def test_server_unavailable(self, test_settings):
+        """
+        Test error when the Ollama server cannot be reached.
+        """
+        # Setup
+        def refuse(request: httpx.Request) -> httpx.Response:
+            raise httpx.ConnectError("Connection refused", request=request)
+        
+        provider = OllamaProvider(test_settings, transport=httpx.MockTransport(refuse))
+        await provider.initialize()
+        
+        # Verify
+        assert await provider.validate_api_key() is False
+        with pytest.raises(ProviderNotAvailableError):
+            await provider.chat_completion(chat_request())
+    
+    @pytest.mark.asyncio
+    async def test_image_generation_not_supported(self, ollama_provider):
+        """
+        Test that unsupported operations are rejected.
+        """
+        from src.models.api import ImageGenerationRequest
+        
+        with pytest.raises(InvalidRequestError):
+            await ollama_provider.image_generation(ImageGenerationRequest(prompt="A cat"))
@@ -242,6 +242,97 @@ class TestOpenAIProvider:
         assert call_args["max_tokens"] == 100
         assert call_args["temperature"] == 0.7
     
+    @pytest.mark.asyncio
+    async def test_stream_chat_completion(self, openai_provider, mock_openai_client):
+        """
+        Test streaming chat completion.
+        """
+        # Set up mock stream
+        def make_chunk(content, finish_reason=None):
+            return MagicMock(
+                id="mock-chat-id",
+                created=1700000000,
+                model="gpt-3.5-turbo",
+                choices=[
+                    MagicMock(
+                        index=0,
+                        delta=MagicMock(content=content),
+                        finish_reason=finish_reason,
+                    )
+                ],
+                usage=None,
+            )
+        
+        async def mock_stream():
+            yield make_chunk("Hello")
+            yield make_chunk(" there")
+            yield make_chunk(None, finish_reason="stop")
+            yield MagicMock(
+                id="mock-chat-id",
+                created=1700000000,
+                model="gpt-3.5-turbo",
+                choices=[],
+                usage=MagicMock(prompt_tokens=10, completion_tokens=2, total_tokens=12),
+            )
+        
+        mock_openai_client.chat.completions.create = AsyncMock(return_value=mock_stream())
+        
+        # Create request
+        request = ChatRequest(
+            model_id="gpt-3.5-turbo",
+            messages=[
+                ChatMessage(
+                    role=MessageRole.USER,
+                    content="Hello",
+                ),
+            ],
+            stream=True,
+        )
+        
+        # Test
+        chunks = [chunk async for chunk in openai_provider.stream_chat_completion(request)]
+        
+        # Verify
+        assert "".join(chunk.delta for chunk in chunks) == "Hello there"
+        assert chunks[2].finish_reason == "stop"
+        assert chunks[-1].usage.prompt_tokens == 10
+        assert chunks[-1].usage.completion_tokens == 2
+        assert chunks[-1].usage.total_tokens == 12
+        
+        # Verify API call
+        call_args = mock_openai_client.chat.completions.create.call_args[1]
+        assert call_args["stream"] is True
+        assert call_args["stream_options"] == {"include_usage": True}
+    
+    @pytest.mark.asyncio
+    async def test_stream_chat_completion_error(self, openai_provider, mock_openai_client):
+        """
+        Test error mapping for streaming chat completion.
+        """
+        # Set up mock
+        from httpx import Response
+        mock_response = Response(status_code=401, content=b'{"error": {"message": "Invalid API key"}}')
+        mock_openai_client.chat.completions.create = AsyncMock(
+            side_effect=openai.AuthenticationError("Invalid API key", response=mock_response, body={"error": {"message": "Invalid API key"}})
+        )
+        
+        # Create request
+        request = ChatRequest(
+            model_id="gpt-3.5-turbo",
+            messages=[
+                ChatMessage(
+                    role=MessageRole.USER,
+                    content="Hello",
+                ),
+            ],
+            stream=True,
+        )
+        
+        # Test
+        with pytest.raises(ProviderAuthenticationError):
+            async for _ in openai_provider.stream_chat_completion(request):
+                pass
+    
     @pytest.mark.asyncio
     async def test_embedding(self, openai_provider, mock_openai_client):
         """
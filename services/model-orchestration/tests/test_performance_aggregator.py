@@ -0,0 +1,159 @@
+import pytest
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+from src.services.performance_aggregator import (
+    PerformanceAggregator,
+    PerformanceDelta,
+    PerformanceStats,
+    UPSERT_PERFORMANCE,
+    latency_bucket,
+)
+
+
+class FakeSessionFactory:
+    """
+    Session factory recording the statements of each flush.
+    """
+    
+    def __init__(self, rows=None):
+        self.rows = rows or []
+        self.executed = []
+        self.commits = 0
+        self.fail = False
+    
+    def __call__(self):
+        factory = self
+        session = AsyncMock()
+        
+        async def execute(statement, params=None):
+            if factory.fail:
+                raise RuntimeError("database unavailable")
+            if statement is UPSERT_PERFORMANCE:
+                factory.executed.append(params)
+                return MagicMock()
+            return MagicMock(scalars=lambda: MagicMock(all=lambda: factory.rows))
+        
+        async def commit():
+            factory.commits += 1
+        
+        session.execute = execute
+        session.commit = commit
+        session.__aenter__.return_value = session
+        return session
+
+
+@pytest.fixture
+def sessions():
+    """
+    Fake session factory fixture.
+    """
+    return FakeSessionFactory()
+
+
+class TestPerformanceAggregator:
+    """
+    Tests for the write-behind performance aggregator.
+    """
+    
+    def test_merged_matches_upsert(self):
+        """
+        Test that merging a delta recomputes the averages from the stored row.
+        """
+        # Setup
+        stats = PerformanceStats("gpt-4", "reasoning", quality_score=0.8, success_rate=0.5, sample_count=2)
+        delta = PerformanceDelta()
+        delta.add_result(success=True, quality_score=0.9)
+        delta.add_result(success=True)
+        
+        # Test
+        merged = stats.merged(delta)
+        
+        # Verify samples without a quality score keep the average quality
+        assert merged.sample_count == 4
+        assert merged.success_rate == pytest.approx(0.75)
+        assert merged.quality_score == pytest.approx((0.8 * 3 + 0.9) / 4)
+    
+    def test_latency_bucket(self):
+        """
+        Test latency histogram buckets.
+        """
+        assert latency_bucket(5) == "10"
+        assert latency_bucket(100) == "100"
+        assert latency_bucket(101) == "250"
+        assert latency_bucket(60000) == "inf"
+    
+    @pytest.mark.asyncio
+    async def test_flush_batches_results_per_model_and_task(self, sessions):
+        """
+        Test that a flush writes one upsert per model and task type in one commit.
+        """
+        # Setup
+        aggregator = PerformanceAggregator(session_factory=sessions)
+        for _ in range(3):
+            aggregator.record("gpt-4", "reasoning", success=True, quality_score=0.9, metadata={"latency_ms": 120.0})
+        aggregator.record("gpt-4", "code_generation", success=False)
+        
+        # Test
+        flushed = await aggregator.flush()
+        
+        # Verify
+        assert flushed == 2
+        assert sessions.commits == 1
+        params = {p["task_type"]: p for p in sessions.executed}
+        assert params["reasoning"]["sample_count"] == 3
+        assert params["reasoning"]["success_count"] == 3
+        assert params["reasoning"]["quality_sum"] == pytest.approx(2.7)
+        assert json.loads(params["reasoning"]["metrics"])["latency_ms_bucket_250"] == 3
+        assert params["code_generation"]["success_rate"] == 0.0
+        assert params["code_generation"]["quality_score"] == 0.5
+        
+        # Nothing left to flush
+        assert await aggregator.flush() == 0
+        assert sessions.commits == 1
+    
+    @pytest.mark.asyncio
+    async def test_failed_flush_keeps_results(self, sessions):
+        """
+        Test that results are kept for the next flush when a flush fails.
+        """
+        # Setup
+        aggregator = PerformanceAggregator(session_factory=sessions)
+        aggregator.record("gpt-4", "reasoning", success=True)
+        sessions.fail = True
+        
+        # Test
+        assert await aggregator.flush() == 0
+        aggregator.record("gpt-4", "reasoning", success=False)
+        sessions.fail = False
+        assert await aggregator.flush() == 1
+        
+        # Verify
+        assert sessions.executed[0]["sample_count"] == 2
+        assert sessions.executed[0]["success_count"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_refresh_after_flush(self, sessions):
+        """
+        Test that the stored aggregate is reloaded after a flush.
+        """
+        # Setup
+        row = MagicMock(
+            model_id="gpt-4",
+            task_type="reasoning",
+            quality_score=0.7,
+            success_rate=1.0,
+            sample_count=40,
+            metrics={},
+        )
+        sessions.rows = [row]
+        aggregator = PerformanceAggregator(session_factory=sessions)
+        aggregator.record("gpt-4", "reasoning", success=True)
+        
+        # Test
+        await aggregator.flush()
+        
+        # Verify the flushed result is not counted twice
+        stats = aggregator.get_stats("gpt-4", "reasoning")
+        assert stats.sample_count == 40
+        assert aggregator.get_best_model("reasoning") == "gpt-4"
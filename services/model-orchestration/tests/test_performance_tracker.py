@@ -8,8 +8,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from shared.utils.src.messaging import EventBus
 
-from src.config import Settings
+from src.config import ModelOrchestrationConfig
 from src.services.performance_tracker import PerformanceTracker
+from src.services.performance_aggregator import PerformanceAggregator, PerformanceStats
 from src.models.performance import (
     ModelPerformanceModel,
     ModelFeedbackModel,
@@ -27,16 +28,34 @@ def mock_event_bus():
     return event_bus
 
 
+@pytest.fixture
+def mock_db_session():
+    """
+    Fixture for a mock database session.
+    """
+    session = AsyncMock()
+    session.add = MagicMock()
+    return session
+
+
 @pytest.fixture
 def mock_settings():
     """
     Fixture for mock settings.
     """
-    return Settings()
+    return ModelOrchestrationConfig()
+
+
+@pytest.fixture
+def aggregator():
+    """
+    Fixture for a performance aggregator that is never flushed.
+    """
+    return PerformanceAggregator(session_factory=MagicMock())
 
 
 @pytest.fixture
-def performance_tracker(mock_db_session, mock_event_bus, mock_settings):
+def performance_tracker(mock_db_session, mock_event_bus, mock_settings, aggregator):
     """
     Fixture for a performance tracker.
     """
@@ -44,6 +63,7 @@ def performance_tracker(mock_db_session, mock_event_bus, mock_settings):
         db=mock_db_session,
         event_bus=mock_event_bus,
         settings=mock_settings,
+        aggregator=aggregator,
     )
 
 
@@ -53,14 +73,10 @@ class TestPerformanceTracker:
     """
     
     @pytest.mark.asyncio
-    async def test_record_request_result_new_model(self, performance_tracker, mock_db_session):
+    async def test_record_request_result_new_model(self, performance_tracker, aggregator, mock_db_session):
         """
         Test recording a request result for a new model.
         """
-        # Setup
-        mock_db_session.execute = AsyncMock(return_value=MagicMock(scalars=lambda: MagicMock(first=lambda: None)))
-        mock_db_session.commit = AsyncMock()
-        
         # Execute
         await performance_tracker.record_request_result(
             request_id="req-123",
@@ -71,28 +87,24 @@ class TestPerformanceTracker:
             confidence=0.8,
         )
         
-        # Verify
-        mock_db_session.add.assert_called_once()
-        mock_db_session.commit.assert_called_once()
+        # Verify the result is buffered instead of written
+        mock_db_session.execute.assert_not_called()
+        mock_db_session.commit.assert_not_called()
         
-        # Check the model that was added
-        added_model = mock_db_session.add.call_args[0][0]
-        assert isinstance(added_model, ModelPerformanceModel)
-        assert added_model.model_id == "gpt-4"
-        assert added_model.task_type == "code_generation"
-        assert added_model.quality_score == 0.9
-        assert added_model.success_rate == 1.0
-        assert added_model.sample_count == 1
-        assert added_model.metrics["confidence_sum"] == 0.8
-        assert added_model.metrics["quality_sum"] == 0.9
+        stats = aggregator.get_stats("gpt-4", "code_generation")
+        assert stats.quality_score == 0.9
+        assert stats.success_rate == 1.0
+        assert stats.sample_count == 1
+        assert stats.metrics["confidence_sum"] == 0.8
+        assert stats.metrics["quality_sum"] == 0.9
     
     @pytest.mark.asyncio
-    async def test_record_request_result_existing_model(self, performance_tracker, mock_db_session):
+    async def test_record_request_result_existing_model(self, performance_tracker, aggregator):
         """
         Test recording a request result for an existing model.
         """
         # Setup
-        existing_model = ModelPerformanceModel(
+        aggregator._stored[("gpt-4", "code_generation")] = PerformanceStats(
             model_id="gpt-4",
             task_type="code_generation",
             quality_score=0.8,
@@ -104,11 +116,6 @@ class TestPerformanceTracker:
             },
         )
         
-        mock_db_session.execute = AsyncMock(
-            return_value=MagicMock(scalars=lambda: MagicMock(first=lambda: existing_model))
-        )
-        mock_db_session.commit = AsyncMock()
-        
         # Execute
         await performance_tracker.record_request_result(
             request_id="req-123",
@@ -120,22 +127,67 @@ class TestPerformanceTracker:
         )
         
         # Verify
-        mock_db_session.commit.assert_called_once()
+        stats = aggregator.get_stats("gpt-4", "code_generation")
+        assert stats.quality_score == pytest.approx(0.8333, abs=0.001)  # (0.8*2 + 0.9) / 3
+        assert stats.success_rate == pytest.approx(0.6667, abs=0.001)  # (0.5*2 + 1) / 3
+        assert stats.sample_count == 3
+        assert stats.metrics["confidence_sum"] == pytest.approx(2.3)  # 1.5 + 0.8
+        assert stats.metrics["quality_sum"] == pytest.approx(2.5)  # 1.6 + 0.9
+    
+    @pytest.mark.asyncio
+    async def test_record_request_result_streaming_latency(self, performance_tracker, aggregator):
+        """
+        Test that streaming timings are accumulated separately from total latency.
+        """
+        # Setup
+        aggregator._stored[("gpt-4", "code_generation")] = PerformanceStats(
+            model_id="gpt-4",
+            task_type="code_generation",
+            quality_score=0.8,
+            success_rate=1.0,
+            sample_count=1,
+            metrics={
+                "confidence_sum": 0.9,
+                "quality_sum": 0.8,
+                "latency_ms_sum": 900.0,
+                "latency_ms_count": 1,
+            },
+        )
         
-        # Check the updated model
-        assert existing_model.quality_score == pytest.approx(0.8333, abs=0.001)  # (1.6 + 0.9) / 3
-        assert existing_model.success_rate == pytest.approx(0.6667, abs=0.001)  # (0.5*2 + 1) / 3
-        assert existing_model.sample_count == 3
-        assert existing_model.metrics["confidence_sum"] == 2.3  # 1.5 + 0.8
-        assert existing_model.metrics["quality_sum"] == 2.5  # 1.6 + 0.9
+        # Execute
+        await performance_tracker.record_request_result(
+            request_id="req-123",
+            model_id="gpt-4",
+            task_type="code_generation",
+            success=True,
+            confidence=0.9,
+            metadata={
+                "latency_ms": 1100.0,
+                "time_to_first_token_ms": 250.0,
+                "inter_token_latency_ms": 20.0,
+                "tokens": 50,
+            },
+        )
+        
+        # Verify
+        metrics = aggregator.get_stats("gpt-4", "code_generation").metrics
+        assert metrics["latency_ms_sum"] == 2000.0
+        assert metrics["latency_ms_count"] == 2
+        assert metrics["latency_ms_bucket_2500"] == 1
+        assert metrics["time_to_first_token_ms_sum"] == 250.0
+        assert metrics["time_to_first_token_ms_count"] == 1
+        assert metrics["time_to_first_token_ms_bucket_250"] == 1
+        assert metrics["inter_token_latency_ms_sum"] == 20.0
+        assert metrics["inter_token_latency_ms_count"] == 1
+        assert metrics["inter_token_latency_ms_bucket_25"] == 1
     
     @pytest.mark.asyncio
-    async def test_record_feedback(self, performance_tracker, mock_db_session, mock_event_bus):
+    async def test_record_feedback(self, performance_tracker, aggregator, mock_db_session, mock_event_bus):
         """
         Test recording feedback.
         """
         # Setup
-        existing_model = ModelPerformanceModel(
+        aggregator._stored[("gpt-4", "code_generation")] = PerformanceStats(
             model_id="gpt-4",
             task_type="code_generation",
             quality_score=0.8,
@@ -146,11 +198,6 @@ class TestPerformanceTracker:
             },
         )
         
-        mock_db_session.execute = AsyncMock(
-            return_value=MagicMock(scalars=lambda: MagicMock(first=lambda: existing_model))
-        )
-        mock_db_session.commit = AsyncMock()
-        
         # Execute
         feedback_id = await performance_tracker.record_feedback(
             request_id="req-123",
@@ -169,6 +216,9 @@ class TestPerformanceTracker:
         mock_db_session.commit.assert_called_once()
         mock_event_bus.publish_event.assert_called_once()
         
+        # The performance row is not read or written by the tracker
+        mock_db_session.execute.assert_not_called()
+        
         # Check the feedback that was added
         added_feedback = mock_db_session.add.call_args[0][0]
         assert isinstance(added_feedback, ModelFeedbackModel)
@@ -180,12 +230,43 @@ class TestPerformanceTracker:
         assert added_feedback.feedback_text == "Great response!"
         assert added_feedback.user_id == "user-123"
         
-        # Check the updated model (feedback is weighted more heavily)
-        feedback_weight = 2.0
-        assert existing_model.quality_score == pytest.approx(0.85, abs=0.001)  # (1.6 + 0.9*2) / (2 + 2)
-        assert existing_model.success_rate == pytest.approx(0.75, abs=0.001)  # (0.5*2 + 1*2) / (2 + 2)
-        assert existing_model.sample_count == 4  # 2 + 2
-        assert existing_model.metrics["quality_sum"] == pytest.approx(3.4)  # 1.6 + 0.9*2
+        # Check the aggregated performance (feedback is weighted more heavily)
+        stats = aggregator.get_stats("gpt-4", "code_generation")
+        assert stats.quality_score == pytest.approx(0.85, abs=0.001)  # (0.8*2 + 0.9*2) / (2 + 2)
+        assert stats.success_rate == pytest.approx(0.75, abs=0.001)  # (0.5*2 + 1*2) / (2 + 2)
+        assert stats.sample_count == 4  # 2 + 2
+        assert stats.metrics["quality_sum"] == pytest.approx(3.4)  # 1.6 + 0.9*2
+    
+    @pytest.mark.asyncio
+    async def test_record_feedback_without_rating(self, performance_tracker, aggregator):
+        """
+        Test that feedback without a rating leaves the quality score unchanged.
+        """
+        # Setup
+        aggregator._stored[("gpt-4", "code_generation")] = PerformanceStats(
+            model_id="gpt-4",
+            task_type="code_generation",
+            quality_score=0.8,
+            success_rate=1.0,
+            sample_count=2,
+            metrics={
+                "quality_sum": 1.6,
+            },
+        )
+        
+        # Execute
+        await performance_tracker.record_feedback(
+            request_id="req-123",
+            model_id="gpt-4",
+            success=False,
+            task_type="code_generation",
+        )
+        
+        # Verify
+        stats = aggregator.get_stats("gpt-4", "code_generation")
+        assert stats.quality_score == pytest.approx(0.8)
+        assert stats.success_rate == pytest.approx(0.5)  # (1.0*2 + 0) / (2 + 2)
+        assert stats.metrics["quality_sum"] == pytest.approx(1.6)
     
     @pytest.mark.asyncio
     async def test_get_model_performance(self, performance_tracker, mock_db_session):
@@ -259,39 +340,27 @@ class TestPerformanceTracker:
         assert result[0]["task_type"] == "code_generation"
     
     @pytest.mark.asyncio
-    async def test_get_best_model_for_task(self, performance_tracker, mock_db_session):
+    async def test_get_best_model_for_task(self, performance_tracker, aggregator, mock_db_session):
         """
         Test getting the best model for a task.
         """
         # Setup
-        models = [
-            ModelPerformanceModel(
-                id=uuid.uuid4(),
+        aggregator._stored = {
+            ("gpt-4", "code_generation"): PerformanceStats(
                 model_id="gpt-4",
                 task_type="code_generation",
                 quality_score=0.9,
                 success_rate=0.8,
                 sample_count=10,
-                metrics={},
-                created_at=datetime.utcnow(),
-                updated_at=datetime.utcnow(),
             ),
-            ModelPerformanceModel(
-                id=uuid.uuid4(),
+            ("claude-2", "code_generation"): PerformanceStats(
                 model_id="claude-2",
                 task_type="code_generation",
                 quality_score=0.88,
                 success_rate=0.82,
                 sample_count=12,
-                metrics={},
-                created_at=datetime.utcnow(),
-                updated_at=datetime.utcnow(),
             ),
-        ]
-        
-        mock_db_session.execute = AsyncMock(
-            return_value=MagicMock(scalars=lambda: MagicMock(first=lambda: models[0]))
-        )
+        }
         
         # Execute
         result = await performance_tracker.get_best_model_for_task(
@@ -302,12 +371,27 @@ class TestPerformanceTracker:
         
         # Verify
         assert result == "gpt-4"
+        mock_db_session.execute.assert_not_called()
         
-        # Test with no results
-        mock_db_session.execute = AsyncMock(
-            return_value=MagicMock(scalars=lambda: MagicMock(first=lambda: None))
+        # Unflushed results count towards the ranking
+        for _ in range(10):
+            await performance_tracker.record_request_result(
+                request_id="req-123",
+                model_id="gpt-4",
+                task_type="code_generation",
+                success=False,
+                quality_score=0.5,
+            )
+        
+        result = await performance_tracker.get_best_model_for_task(
+            task_type="code_generation",
+            min_quality_score=0.8,
+            min_success_rate=0.7,
         )
         
+        assert result == "claude-2"
+        
+        # Test with no results
         result = await performance_tracker.get_best_model_for_task(
             task_type="unknown_task",
         )
@@ -0,0 +1,235 @@
+import pytest
+
+from src.models.api import ChatRequest, CompletionRequest
+from src.models import ChatMessage, MessageRole
+from src.services.response_cache import CachedResponse, ResponseCache, build_cache_key
+
+
+class FakePipeline:
+    """
+    Pipeline of the fake Redis client.
+    """
+    
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *args):
+        return False
+    
+    def __getattr__(self, name):
+        def command(*args, **kwargs):
+            self.commands.append((name, args, kwargs))
+        return command
+    
+    async def execute(self):
+        return [await getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in self.commands]
+
+
+class FakeRedis:
+    """
+    In-memory stand-in for the async Redis commands the cache uses.
+    """
+    
+    def __init__(self):
+        self.values = {}
+        self.sorted_sets = {}
+    
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+    
+    async def get(self, key):
+        return self.values.get(key)
+    
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+        return True
+    
+    async def delete(self, *keys):
+        return sum(self.values.pop(key, None) is not None for key in keys)
+    
+    async def zadd(self, key, mapping):
+        self.sorted_sets.setdefault(key, {}).update(mapping)
+    
+    async def zremrangebyscore(self, key, low, high):
+        members = self.sorted_sets.get(key, {})
+        for member in [m for m, score in members.items() if low <= score <= high]:
+            del members[member]
+    
+    async def expire(self, key, ttl):
+        return True
+    
+    async def zcard(self, key):
+        return len(self.sorted_sets.get(key, {}))
+    
+    async def zpopmin(self, key, count):
+        members = sorted(self.sorted_sets.get(key, {}).items(), key=lambda item: item[1])[:count]
+        for member, _ in members:
+            del self.sorted_sets[key][member]
+        return members
+
+
+def chat_request(content: str, temperature: float = 0.0, **kwargs) -> ChatRequest:
+    """
+    Create a chat request.
+    """
+    return ChatRequest(
+        model_id="gpt-4",
+        messages=[ChatMessage(role=MessageRole.USER, content=content)],
+        temperature=temperature,
+        **kwargs,
+    )
+
+
+def cached(text: str, cost: float = 0.01) -> CachedResponse:
+    """
+    Create a cached response.
+    """
+    return CachedResponse(response=text, provider="openai", cost=cost, tokens=100)
+
+
+class TestResponseCache:
+    """
+    Tests for the response cache.
+    """
+    
+    def test_only_deterministic_requests_are_cacheable(self):
+        """
+        Test which requests get a cache key.
+        """
+        assert build_cache_key(chat_request("hi"), "gpt-4") is not None
+        assert build_cache_key(chat_request("hi", temperature=0.7), "gpt-4") is None
+        assert build_cache_key(chat_request("hi", metadata={"cache": False}), "gpt-4") is None
+    
+    def test_key_is_canonical(self):
+        """
+        Test that keys depend on the prompt and parameters, not request IDs.
+        """
+        key = build_cache_key(chat_request("hi", user_id="u1", task_id="t1"), "gpt-4")
+        
+        assert key.digest == build_cache_key(chat_request("hi", user_id="u1", task_id="t2"), "gpt-4").digest
+        assert key.digest != build_cache_key(chat_request("hi", user_id="u1", max_tokens=10), "gpt-4").digest
+        assert key.digest != build_cache_key(chat_request("hi", user_id="u1"), "gpt-4o").digest
+        assert key.tenant == "u1"
+        
+        completion = build_cache_key(CompletionRequest(model_id="gpt-4", prompt="hi", temperature=0), "gpt-4")
+        assert completion.digest != key.digest
+    
+    def test_key_includes_tool_calls(self):
+        """
+        Test that conversations differing only in tool calls get different keys.
+        """
+        def tool_request(**fields):
+            messages = [
+                ChatMessage(role=MessageRole.USER, content="weather in Paris?"),
+                ChatMessage(role=MessageRole.ASSISTANT, **fields),
+            ]
+            return ChatRequest(model_id="gpt-4", messages=messages, temperature=0)
+        
+        calls = [
+            tool_request(tool_calls=[{"id": "call_1", "function": {"name": "weather", "arguments": '{"city": "Paris"}'}}]),
+            tool_request(tool_calls=[{"id": "call_1", "function": {"name": "weather", "arguments": '{"city": "Rome"}'}}]),
+            tool_request(function_call={"name": "weather", "arguments": '{"city": "Paris"}'}),
+            tool_request(tool_call_id="call_1"),
+            tool_request(),
+        ]
+        digests = {build_cache_key(request, "gpt-4").digest for request in calls}
+        
+        assert len(digests) == len(calls)
+        assert build_cache_key(tool_request(metadata={"trace": "x"}), "gpt-4").digest in digests
+    
+    @pytest.mark.asyncio
+    async def test_hits_report_saved_cost(self):
+        """
+        Test that hits are served from memory and counted as saved spend.
+        """
+        # Setup
+        cache = ResponseCache()
+        key = build_cache_key(chat_request("hi"), "gpt-4")
+        
+        # Test
+        assert await cache.get(key, "gpt-4") is None
+        await cache.put(key, cached("response"))
+        hit = await cache.get(key, "gpt-4")
+        
+        # Verify
+        assert hit.response == "response"
+        stats = cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["saved_cost"] == pytest.approx(0.01)
+        assert stats["saved_tokens"] == 100
+        assert stats["by_model"]["gpt-4"]["hits"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_per_tenant_limit(self):
+        """
+        Test that each tenant's entries are bounded separately.
+        """
+        # Setup
+        cache = ResponseCache(max_entries_per_tenant=2)
+        
+        # Test
+        for i in range(3):
+            await cache.put(build_cache_key(chat_request(f"prompt {i}", project_id="a"), "gpt-4"), cached(str(i)))
+        await cache.put(build_cache_key(chat_request("prompt 0", project_id="b"), "gpt-4"), cached("b"))
+        
+        # Verify
+        assert await cache.get(build_cache_key(chat_request("prompt 0", project_id="a"), "gpt-4"), "gpt-4") is None
+        assert (await cache.get(build_cache_key(chat_request("prompt 2", project_id="a"), "gpt-4"), "gpt-4")).response == "2"
+        assert (await cache.get(build_cache_key(chat_request("prompt 0", project_id="b"), "gpt-4"), "gpt-4")).response == "b"
+    
+    @pytest.mark.asyncio
+    async def test_redis_second_level(self):
+        """
+        Test that responses are shared through Redis and evicted per tenant.
+        """
+        # Setup
+        redis = FakeRedis()
+        writer = ResponseCache(redis_client=redis, max_entries_per_tenant=2)
+        reader = ResponseCache(redis_client=redis, max_entries_per_tenant=2)
+        keys = [build_cache_key(chat_request(f"prompt {i}", project_id="a"), "gpt-4") for i in range(3)]
+        
+        # Test
+        for i, key in enumerate(keys):
+            await writer.put(key, cached(str(i)))
+        
+        # Verify
+        assert await reader.get(keys[0], "gpt-4") is None
+        assert (await reader.get(keys[2], "gpt-4")).response == "2"
+        assert reader.get_stats()["l2_hits"] == 1
+        assert len(redis.values) == 2
+    
+    @pytest.mark.asyncio
+    async def test_similar_prompts(self):
+        """
+        Test that near-duplicate prompts are served when similarity is on.
+        """
+        # Setup
+        vectors = {
+            "summarize the report": [1.0, 0.0, 0.1],
+            "summarise the report": [1.0, 0.0, 0.12],
+            "write a poem": [0.0, 1.0, 0.0],
+        }
+        
+        async def embed(text):
+            return vectors[text]
+        
+        cache = ResponseCache(similarity_threshold=0.99)
+        original = build_cache_key(chat_request("summarize the report"), "gpt-4")
+        assert await cache.get(original, "gpt-4", embed) is None
+        await cache.put(original, cached("summary"))
+        
+        # Test
+        similar = await cache.get(build_cache_key(chat_request("summarise the report"), "gpt-4"), "gpt-4", embed)
+        different = await cache.get(build_cache_key(chat_request("write a poem"), "gpt-4"), "gpt-4", embed)
+        other_model = await cache.get(build_cache_key(chat_request("summarise the report"), "gpt-4o"), "gpt-4o", embed)
+        
+        # Verify
+        assert similar.response == "summary"
+        assert different is None
+        assert other_model is None
+        assert cache.get_stats()["similar_hits"] == 1
@@ -0,0 +1,164 @@
+import pytest
+import asyncio
+import httpx
+
+from src.services.specialization_client import (
+    SpecializationClient,
+    SpecializationPrompt,
+    SPECIALIZATION_EVENTS,
+)
+
+
+SPECIALIZATION = {
+    "agent_type": "DEVELOPER",
+    "required_skills": ["python", "testing"],
+    "responsibilities": ["write code"],
+    "knowledge_domains": ["software"],
+    "collaboration_patterns": [],
+}
+
+
+class StubAgentOrchestrator:
+    """
+    Stub Agent Orchestrator serving specializations.
+    """
+    
+    def __init__(self, specializations, delay: float = 0.0):
+        self.specializations = specializations
+        self.delay = delay
+        self.requests = []
+        self.fail = False
+    
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request.url.path)
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            return httpx.Response(503, json={"detail": "unavailable"})
+        agent_type = request.url.path.rsplit("/", 1)[-1]
+        if agent_type not in self.specializations:
+            return httpx.Response(404, json={"detail": "not found"})
+        return httpx.Response(200, json=self.specializations[agent_type])
+
+
+@pytest.fixture
+def server():
+    """
+    Stub Agent Orchestrator fixture.
+    """
+    return StubAgentOrchestrator({"DEVELOPER": SPECIALIZATION})
+
+
+@pytest.fixture
+def client(server):
+    """
+    Specialization client fixture backed by the stub server.
+    """
+    return SpecializationClient(
+        "http://agent-orchestrator",
+        ttl_seconds=60,
+        transport=httpx.MockTransport(server.handle),
+    )
+
+
+class TestSpecializationClient:
+    """
+    Tests for the agent specialization client.
+    """
+    
+    def test_compile_prompt_fragments(self):
+        """
+        Test that prompt fragments are compiled from the specialization.
+        """
+        prompt = SpecializationPrompt.compile(SPECIALIZATION)
+        
+        description = (
+            "You are specialized as a DEVELOPER agent with the following:\n"
+            "Skills: python, testing\n"
+            "Responsibilities: write code\n"
+            "Knowledge Domains: software"
+        )
+        assert prompt.system_message == description
+        assert prompt.system_suffix == "\n\n" + description
+        assert prompt.prompt_prefix == f"[{description}]\n\n"
+    
+    @pytest.mark.asyncio
+    async def test_lookups_are_cached(self, client, server):
+        """
+        Test that repeated lookups are served from the cache.
+        """
+        first = await client.get("DEVELOPER")
+        second = await client.get("DEVELOPER")
+        
+        assert first is second
+        assert first.data["agent_type"] == "DEVELOPER"
+        assert len(server.requests) == 1
+        
+        await client.close()
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_lookups_share_one_request(self, server):
+        """
+        Test that concurrent misses for one specialization share a request.
+        """
+        server.delay = 0.05
+        client = SpecializationClient(
+            "http://agent-orchestrator",
+            transport=httpx.MockTransport(server.handle),
+        )
+        
+        results = await asyncio.gather(*(client.get("DEVELOPER") for _ in range(10)))
+        
+        assert all(result is results[0] for result in results)
+        assert len(server.requests) == 1
+        
+        await client.close()
+    
+    @pytest.mark.asyncio
+    async def test_missing_and_failed_lookups(self, client, server):
+        """
+        Test that missing specializations are cached and failures are not.
+        """
+        assert await client.get("UNKNOWN") is None
+        assert await client.get("UNKNOWN") is None
+        assert len(server.requests) == 1
+        
+        server.fail = True
+        client.invalidate()
+        assert await client.get("DEVELOPER") is None
+        
+        server.fail = False
+        assert (await client.get("DEVELOPER")) is not None
+        assert len(server.requests) == 3
+        
+        await client.close()
+    
+    @pytest.mark.asyncio
+    async def test_specialization_events_invalidate(self, client, server):
+        """
+        Test that specialization events invalidate the cached entry.
+        """
+        subscriptions = {}
+        
+        class EventBus:
+            async def subscribe_to_event(self, event_type, handler):
+                subscriptions[event_type] = handler
+        
+        await client.subscribe(EventBus())
+        assert set(subscriptions) == set(SPECIALIZATION_EVENTS)
+        
+        await client.get("DEVELOPER")
+        await subscriptions["agent.specialization.updated"]({"agent_type": "DEVELOPER"})
+        await client.get("DEVELOPER")
+        
+        assert len(server.requests) == 2
+        
+        await client.close()
+    
+    @pytest.mark.asyncio
+    async def test_unconfigured_url(self):
+        """
+        Test that lookups are skipped without an Agent Orchestrator URL.
+        """
+        client = SpecializationClient(None)
+        
+        assert await client.get("DEVELOPER") is None
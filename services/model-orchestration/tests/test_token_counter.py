@@ -0,0 +1,185 @@
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import tiktoken
+
+from src.exceptions import TokenLimitError
+from src.providers.token_counter import TokenCounter, estimate_max_tokens
+from src.services.model_service.request_processing import RequestContext, RequestProcessingMixin
+
+
+class WordEncoding:
+    """
+    Encoding that produces one token per word.
+    """
+    
+    name = "words"
+    
+    def encode(self, text):
+        return text.split()
+
+
+@pytest.fixture
+def encoding():
+    """
+    Encoding fixture.
+    """
+    return WordEncoding()
+
+
+@pytest.fixture
+def bpe_encoding():
+    """
+    Byte-level BPE encoding fixture.
+    """
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        pytest.skip("cl100k_base encoding is not available")
+
+
+class CountingEncoding:
+    """
+    Encoding wrapper that counts encode calls.
+    """
+    
+    def __init__(self, encoding):
+        self.name = encoding.name
+        self.encoding = encoding
+        self.calls = 0
+    
+    def encode(self, text):
+        self.calls += 1
+        return self.encoding.encode(text)
+
+
+class TestTokenCounter:
+    """
+    Tests for the token counter.
+    """
+    
+    @pytest.mark.asyncio
+    async def test_counts_match_encoding(self, encoding):
+        """
+        Test that counts match a direct encode, inline and off the loop.
+        """
+        # Setup
+        texts = ["Hello, world!", "Ünïcödé text " * 500]
+        counter = TokenCounter(inline_chars=100)
+        
+        # Test
+        counts = await counter.count(encoding, texts)
+        
+        # Verify
+        assert counts == [len(encoding.encode(text)) for text in texts]
+    
+    @pytest.mark.asyncio
+    async def test_repeated_content_is_memoized(self, encoding):
+        """
+        Test that repeated content is only encoded once.
+        """
+        # Setup
+        counting = CountingEncoding(encoding)
+        counter = TokenCounter()
+        system_prompt = "You are a helpful assistant. " * 50
+        
+        # Test
+        first = await counter.count_messages(counting, [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": "First question"},
+        ])
+        second = await counter.count_messages(counting, [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": "Second question"},
+        ])
+        
+        # Verify
+        assert counting.calls == 3
+        assert first == len(encoding.encode(system_prompt)) + len(encoding.encode("First question")) + 2 * 4 + 2
+        assert second - first == len(encoding.encode("Second question")) - len(encoding.encode("First question"))
+        assert counter.get_stats()["hits"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_large_batches_encode_off_the_loop(self, encoding):
+        """
+        Test that large batches are encoded on the executor.
+        """
+        # Setup
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="test-encode")
+        counter = TokenCounter(executor=executor, inline_chars=10)
+        threads = []
+        
+        class ThreadRecordingEncoding(CountingEncoding):
+            def encode(self, text):
+                import threading
+                threads.append(threading.current_thread().name)
+                return super().encode(text)
+        
+        # Test
+        await counter.count(ThreadRecordingEncoding(encoding), ["a long enough text"])
+        
+        # Verify
+        assert threads and all(name.startswith("test-encode") for name in threads)
+        executor.shutdown()
+    
+    def test_estimate_is_upper_bound(self, bpe_encoding):
+        """
+        Test that the byte-based estimate never undercounts.
+        """
+        texts = ["plain ascii text", "漢字とかなの混じった文章", "emoji 🎉🎉🎉", "x" * 1000]
+        
+        for text in texts:
+            assert estimate_max_tokens([text]) >= len(bpe_encoding.encode(text))
+        
+        assert estimate_max_tokens(["ab", "c"], messages=2) == 3 + 2 * 4 + 2
+
+
+class FailingCountProvider:
+    """
+    Provider whose exact token counting fails.
+    """
+    
+    def __init__(self, upper_bound):
+        self.upper_bound = upper_bound
+    
+    def estimate_max_tokens(self, text, model_id):
+        return self.upper_bound
+    
+    async def count_tokens(self, text, model_id):
+        raise RuntimeError("tokenizer unavailable")
+
+
+class TestTokenLimitCheck:
+    """
+    Tests for the token limit check of model requests.
+    """
+    
+    @staticmethod
+    def context(provider, token_limit=100):
+        return RequestContext(
+            model_id="gpt-4",
+            provider_name="openai",
+            provider=provider,
+            model=SimpleNamespace(token_limit=token_limit),
+        )
+    
+    @pytest.mark.asyncio
+    async def test_counting_errors_fall_back_to_upper_bound(self):
+        """
+        Test that a failed count rejects prompts whose upper bound exceeds the limit.
+        """
+        context = self.context(FailingCountProvider(upper_bound=500))
+        
+        with pytest.raises(TokenLimitError):
+            await RequestProcessingMixin()._check_token_limits("x" * 500, context)
+    
+    @pytest.mark.asyncio
+    async def test_counting_errors_propagate_without_upper_bound(self):
+        """
+        Test that a failed count is not treated as an empty prompt.
+        """
+        context = self.context(FailingCountProvider(upper_bound=None))
+        
+        with pytest.raises(RuntimeError):
+            await RequestProcessingMixin()._check_token_limits("x" * 500, context)
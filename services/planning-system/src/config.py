@@ -24,13 +24,20 @@ class PlanningSystemConfig(BaseServiceConfig):
     max_dependency_chain: int = 50  # Maximum length of dependency chain
     default_planning_horizon: int = 90  # Default planning horizon in days
     resource_optimization_timeout: int = 30  # Timeout for resource optimization in seconds
+    resource_optimization_process_pool_threshold: int = 2_000  # Task-resource pairs above which optimization runs in a process pool
     forecasting_confidence_interval: float = 0.8  # Confidence interval for forecasting (0.0-1.0)
+    monte_carlo_iterations: int = 10000  # Default number of Monte Carlo forecast iterations
+    monte_carlo_process_pool_threshold: int = 100_000_000  # Task-iterations above which simulations run in a process pool
+    scheduling_process_pool_workers: int = 2  # Worker processes for large scheduling workloads
+    what_if_iterations: int = 2000  # Monte Carlo iterations per what-if scenario
+    what_if_max_batch_scenarios: int = 100  # Maximum scenarios analyzed in one batch
     
     # NetworkX settings
     dependency_cycle_detection: bool = True  # Detect cycles in dependency graphs
     
     # Cache settings
     plan_cache_ttl: int = 600  # Time to live for plan cache in seconds
+    dependency_graph_cache_size: int = 128  # Maximum number of plans with a cached dependency graph
     forecast_cache_ttl: int = 3600  # Time to live for forecast cache in seconds
     
     # Default solver for resource optimization
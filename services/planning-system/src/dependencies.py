@@ -22,10 +22,11 @@ from .services.forecaster import ProjectForecaster
 from .services.resource_optimizer import ResourceOptimizer
 from .services.resource_service import ResourceService
 from .services.dependency_manager import DependencyManager
-from .services.repository import PlanningRepository
+from .services.repository import PlanningRepository, ROLLBACK_CALLBACKS
 from .services.task_template_service import TaskTemplateService
 from .services.dependency_type_service import DependencyTypeService
 from .services.what_if_analysis_service import WhatIfAnalysisService
+from .services.scheduling import DependencyGraphCache
 
 logger = logging.getLogger(__name__)
 
@@ -71,6 +72,8 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.commit()
         except Exception:
             await session.rollback()
+            for callback in session.info.pop(ROLLBACK_CALLBACKS, []):
+                callback()
             raise
         finally:
             await session.close()
@@ -124,23 +127,49 @@ def get_repository(db: AsyncSession = Depends(get_db)) -> PlanningRepository:
     """
     return PlanningRepository(db)
 
+# Dependency graph cache singleton
+_dependency_graph_cache = None
+
+def get_dependency_graph_cache() -> DependencyGraphCache:
+    """
+    Dependency for the per-plan dependency graph cache.
+    
+    Returns:
+        DependencyGraphCache: Shared graph cache
+    """
+    global _dependency_graph_cache
+    if _dependency_graph_cache is None:
+        _dependency_graph_cache = DependencyGraphCache(
+            max_plans=get_settings().dependency_graph_cache_size
+        )
+    return _dependency_graph_cache
+
 # Component dependencies
 def get_dependency_manager(
     repository: PlanningRepository = Depends(get_repository),
+    event_bus: EventBus = Depends(get_event_bus),
+    graph_cache: DependencyGraphCache = Depends(get_dependency_graph_cache),
 ) -> DependencyManager:
     """
     Dependency for dependency manager.
     
+    The instance is shared by all components of a request so that the
+    critical path of a plan is computed only once.
+    
     Args:
         repository: Repository instance
+        event_bus: Event bus instance
+        graph_cache: Shared dependency graph cache
         
     Returns:
         DependencyManager: Dependency manager instance
     """
-    return DependencyManager(repository)
+    return DependencyManager(repository, event_bus, graph_cache)
 
 def get_resource_optimizer(
     repository: PlanningRepository = Depends(get_repository),
+    event_bus: EventBus = Depends(get_event_bus),
+    dependency_manager: DependencyManager = Depends(get_dependency_manager),
     settings: PlanningSystemConfig = Depends(get_settings),
 ) -> ResourceOptimizer:
     """
@@ -148,6 +177,8 @@ def get_resource_optimizer(
     
     Args:
         repository: Repository instance
+        event_bus: Event bus instance
+        dependency_manager: Dependency manager instance
         settings: Service settings
         
     Returns:
@@ -155,8 +186,9 @@ def get_resource_optimizer(
     """
     return ResourceOptimizer(
         repository=repository,
-        solver=settings.default_solver,
-        timeout=settings.resource_optimization_timeout,
+        event_bus=event_bus,
+        dependency_manager=dependency_manager,
+        settings=settings,
     )
 
 def get_strategic_planner(
@@ -225,7 +257,7 @@ def get_forecaster(
         repository=repository,
         event_bus=event_bus,
         dependency_manager=dependency_manager,
-        confidence_interval=settings.forecasting_confidence_interval,
+        settings=settings,
     )
 
 # Resource service dependency
@@ -11,7 +11,8 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from .config import config, get_settings
-from .dependencies import get_db, get_planning_service
+from .services.scheduling import shutdown_process_pool
+from .dependencies import get_db, get_planning_service, get_event_bus, get_dependency_graph_cache
 from .exceptions import (
     PlanningSystemError,
     PlanNotFoundError,
@@ -159,11 +160,18 @@ async def general_exception_handler(request, exc):
 async def startup_event():
     """Execute actions on app startup"""
     logger.info(f"Starting Planning System Service in {config.environment} mode")
+    
+    # Keep cached dependency graphs in sync with changes from other instances
+    try:
+        await get_dependency_graph_cache().subscribe(get_event_bus(get_settings()))
+    except Exception as e:
+        logger.warning(f"Dependency graph cache not subscribed to events: {str(e)}")
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Execute actions on app shutdown"""
     logger.info("Shutting down Planning System Service")
+    shutdown_process_pool()
 
 # Health check endpoint
 @app.get("/health", tags=["health"])
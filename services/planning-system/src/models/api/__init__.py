@@ -170,5 +170,7 @@ from .what_if_analysis import (
     WhatIfScenarioResponse,
     WhatIfScenarioListResponse,
     WhatIfAnalysisResult,
-    WhatIfAnalysisResultResponse
+    WhatIfAnalysisResultResponse,
+    WhatIfBatchRequest,
+    WhatIfBatchResult
 )
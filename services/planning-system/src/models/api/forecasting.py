@@ -2,6 +2,8 @@
 Forecasting API models.
 """
 
+from typing import Literal
+
 from .common import *
 
 # Forecasting models
@@ -21,13 +23,18 @@ class TimelineForecastData(BaseModel):
     expected_completion: datetime = Field(..., description="Expected completion date")
     best_case_completion: datetime = Field(..., description="Best case completion date")
     worst_case_completion: datetime = Field(..., description="Worst case completion date")
-    
+    completion_percentiles: Optional[Dict[str, datetime]] = Field(None, description="Completion date per percentile (Monte Carlo only)")
+    task_criticality: Optional[Dict[str, float]] = Field(None, description="Fraction of iterations in which each task was critical (Monte Carlo only)")
+    simulation_iterations: Optional[int] = Field(None, description="Number of simulation iterations (Monte Carlo only)")
+
 class ForecastRequest(BaseModel):
     """Request to generate a forecast"""
     plan_id: UUID = Field(..., description="Strategic plan ID")
     confidence_interval: Optional[float] = Field(None, ge=0, le=1, description="Confidence interval (0.0-1.0)")
     include_historical: bool = Field(False, description="Include historical data in response")
     time_unit: str = Field("day", description="Time unit for forecast (hour, day, week, month)")
+    method: Literal["monte_carlo", "analytic"] = Field("monte_carlo", description="Forecasting method (monte_carlo, analytic)")
+    iterations: Optional[int] = Field(None, gt=0, le=1_000_000, description="Number of Monte Carlo iterations")
 
 class BottleneckAnalysisData(BaseModel):
     """Bottleneck analysis model"""
@@ -11,6 +11,7 @@ class OptimizationRequest(BaseModel):
     optimization_target: OptimizationTarget = Field(OptimizationTarget.PERFORMANCE, description="Optimization target")
     constraints: Dict[str, Any] = Field(..., description="Optimization constraints")
     preferences: Optional[Dict[str, Any]] = Field(None, description="Optimization preferences")
+    time_budget_seconds: Optional[float] = Field(None, gt=0, description="Solver time budget in seconds (defaults to the service setting)")
     
     # Add validator for optimization_target to handle string values
     @validator('optimization_target', pre=True)
@@ -43,6 +43,20 @@ class WhatIfAnalysisResult(BaseModel):
     scenario_name: str = Field(..., description="Scenario name")
     scenario_description: str = Field("", description="Scenario description")
 
+class WhatIfBatchRequest(BaseModel):
+    """Request to analyze several scenarios of a plan at once"""
+    scenario_ids: Optional[List[UUID]] = Field(None, description="Scenario IDs (all scenarios of the plan if omitted)")
+    confidence_interval: Optional[float] = Field(None, ge=0, le=1, description="Confidence interval (0.0-1.0)")
+    iterations: Optional[int] = Field(None, gt=0, le=100_000, description="Monte Carlo iterations per scenario")
+
+class WhatIfBatchResult(BaseModel):
+    """Result of a batch what-if analysis"""
+    plan_id: UUID = Field(..., description="Strategic plan ID")
+    generated_at: datetime = Field(..., description="Generation timestamp")
+    baseline_forecast: TimelineForecast = Field(..., description="Baseline forecast shared by all scenarios")
+    results: List[WhatIfAnalysisResult] = Field(..., description="Analysis result per scenario")
+    errors: Dict[str, str] = Field({}, description="Error per scenario ID that could not be analyzed")
+
 # Create response models using shared templates
 WhatIfScenarioResponse = create_data_response_model(WhatIfScenarioResponseData)
 WhatIfScenarioListResponse = create_list_response_model(WhatIfScenarioResponseData)
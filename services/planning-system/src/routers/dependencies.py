@@ -73,6 +73,49 @@ async def create_dependency(
             detail=f"Error creating dependency: {str(e)}"
         )
 
+@router.post("/batch", response_model=List[DependencyResponse], status_code=status.HTTP_201_CREATED)
+async def create_dependencies(
+    dependencies_data: List[DependencyCreate],
+    service: PlanningService = Depends(get_planning_service)
+):
+    """
+    Create many task dependencies of one plan at once.
+    
+    The whole edge list is validated in one pass; either all dependencies
+    are created or none.
+    
+    Args:
+        dependencies_data: Dependency data
+        service: Planning service
+        
+    Returns:
+        List[DependencyResponse]: Created dependencies
+        
+    Raises:
+        HTTPException: If dependency creation fails
+    """
+    logger.info(f"Creating {len(dependencies_data)} dependencies")
+    try:
+        return await service.create_dependencies(dependencies_data)
+    except TaskNotFoundError as e:
+        logger.error(f"Task not found: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Task not found: {str(e)}"
+        )
+    except InvalidDependencyError as e:
+        logger.error(f"Invalid dependency: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid dependency: {str(e)}"
+        )
+    except Exception as e:
+        logger.error(f"Error creating dependencies: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error creating dependencies: {str(e)}"
+        )
+
 @router.get("/{dependency_id}", response_model=DependencyResponse)
 async def get_dependency(
     dependency_id: UUID = Path(..., description="Dependency ID"),
@@ -45,7 +45,14 @@ async def generate_timeline_forecast(
     """
     logger.info(f"Generating timeline forecast for plan: {forecast_request.plan_id}")
     try:
-        return await service.generate_timeline_forecast(forecast_request)
+        return await service.create_forecast(
+            plan_id=forecast_request.plan_id,
+            confidence_interval=forecast_request.confidence_interval,
+            include_historical=forecast_request.include_historical,
+            time_unit=forecast_request.time_unit,
+            method=forecast_request.method,
+            iterations=forecast_request.iterations
+        )
     except PlanNotFoundError:
         logger.error(f"Plan not found: {forecast_request.plan_id}")
         raise HTTPException(
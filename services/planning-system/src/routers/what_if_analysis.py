@@ -15,6 +15,8 @@ from ..models.api import (
     WhatIfScenarioListResponse,
     WhatIfAnalysisResult,
     WhatIfAnalysisResultResponse,
+    WhatIfBatchRequest,
+    WhatIfBatchResult,
     PaginatedResponse
 )
 from ..services.what_if_analysis_service import WhatIfAnalysisService
@@ -97,6 +99,22 @@ async def run_what_if_analysis(
         confidence_interval=confidence_interval
     )
 
+@router.post("/plans/{plan_id}/analyze", response_model=WhatIfBatchResult)
+async def run_batch_what_if(
+    batch_request: WhatIfBatchRequest,
+    plan_id: UUID = Path(..., description="Plan ID"),
+    what_if_service: WhatIfAnalysisService = Depends(get_what_if_analysis_service),
+):
+    """
+    Run what-if analysis for several scenarios of a plan at once.
+    """
+    return await what_if_service.run_batch_what_if(
+        plan_id=plan_id,
+        scenario_ids=batch_request.scenario_ids,
+        confidence_interval=batch_request.confidence_interval,
+        iterations=batch_request.iterations
+    )
+
 @router.post("/scenarios/compare", response_model=Dict[str, Any])
 async def compare_scenarios(
     scenario_id_1: UUID = Query(..., description="First scenario ID"),
@@ -10,6 +10,7 @@ import uuid
 from typing import List, Dict, Any, Optional, Tuple, Set
 from uuid import UUID
 from datetime import datetime
+from types import SimpleNamespace
 
 from shared.utils.src.messaging import EventBus
 
@@ -23,11 +24,18 @@ from ..models.api import (
 )
 from ..exceptions import (
     TaskNotFoundError,
-    InvalidDependencyError
+    InvalidDependencyError,
+    CyclicDependencyError
 )
 from .repository import PlanningRepository
 from .base import BasePlannerComponent
 from .validation import ValidationFactory
+from .scheduling import (
+    CriticalPathEngine,
+    CriticalPathResult,
+    DependencyGraphCache,
+    DynamicTopologicalOrder,
+)
 
 class DependencyManager(BasePlannerComponent):
     """
@@ -41,6 +49,7 @@ class DependencyManager(BasePlannerComponent):
         self,
         repository: PlanningRepository,
         event_bus: EventBus,
+        graph_cache: Optional[DependencyGraphCache] = None,
     ):
         """
         Initialize the dependency manager.
@@ -48,9 +57,13 @@ class DependencyManager(BasePlannerComponent):
         Args:
             repository: Planning repository
             event_bus: Event bus
+            graph_cache: Optional shared dependency graph cache
         """
         super().__init__(repository, event_bus, "DependencyManager")
         self.validator = ValidationFactory.get_validator("dependency")
+        self.cpm_engine = CriticalPathEngine()
+        self.graph_cache = graph_cache or DependencyGraphCache()
+        self._schedules: Dict[UUID, CriticalPathResult] = {}
     
     async def create_dependency(self, dependency_data: DependencyCreate) -> DependencyResponse:
         """
@@ -118,24 +131,173 @@ class DependencyManager(BasePlannerComponent):
             )
         
         # Check for circular dependencies
-        if await self._would_create_cycle(dependency_data.from_task_id, dependency_data.to_task_id):
+        graph = await self._get_dependency_graph(from_task.plan_id)
+        if graph.would_create_cycle(dependency_data.from_task_id, dependency_data.to_task_id):
             raise InvalidDependencyError(
                 message="Circular dependency detected",
-                validation_errors=["This dependency would create a circular reference"]
+                details={
+                    "from_task_id": str(dependency_data.from_task_id),
+                    "to_task_id": str(dependency_data.to_task_id),
+                    "validation_errors": ["This dependency would create a circular reference"],
+                }
             )
         
         # Convert to dict for repository
         dependency_dict = dependency_data.model_dump()
         
         # Create dependency in repository
-        dependency = await self.repository.create_dependency(dependency_dict)
+        dependency = await self.repository.create_dependency(**dependency_dict)
+        
+        # Keep the cached graph and order in sync. The graph may have changed
+        # while the dependency was stored, so check for a cycle again with no
+        # await in between.
+        graph = self.graph_cache.get(from_task.plan_id)
+        if graph is not None:
+            try:
+                graph.add_edge(dependency_data.from_task_id, dependency_data.to_task_id)
+            except CyclicDependencyError:
+                raise InvalidDependencyError(
+                    message="Circular dependency detected",
+                    details={
+                        "from_task_id": str(dependency_data.from_task_id),
+                        "to_task_id": str(dependency_data.to_task_id),
+                        "validation_errors": ["This dependency would create a circular reference"],
+                    }
+                )
+        self._invalidate_graph_on_rollback(from_task.plan_id)
+        
+        # Schedule of the plan is no longer valid
+        self.invalidate_schedule(from_task.plan_id)
         
         # Publish event
-        await self._publish_event("dependency.created", dependency)
+        await self._publish_event(
+            "dependency.created",
+            dependency,
+            self._event_data(from_task.plan_id)
+        )
         
         # Convert to response model
         return await self._to_response_model(dependency)
     
+    async def create_dependencies(
+        self,
+        dependencies_data: List[DependencyCreate]
+    ) -> List[DependencyResponse]:
+        """
+        Create many task dependencies of one plan at once.
+        
+        The whole edge list is validated in one pass against the plan's
+        cached dependency graph, including cycles formed by edges of the
+        batch itself, and stored with one bulk insert. Either all
+        dependencies are created or none.
+        
+        Args:
+            dependencies_data: Dependency data
+            
+        Returns:
+            List[DependencyResponse]: Created dependencies
+            
+        Raises:
+            TaskNotFoundError: If a task is not found
+            InvalidDependencyError: If a dependency is invalid
+        """
+        await self._log_operation(
+            "Creating",
+            "dependencies",
+            entity_name=f"{len(dependencies_data)} edges"
+        )
+        
+        if not dependencies_data:
+            return []
+        
+        # All tasks must belong to the plan of the first task
+        first_task = await self.repository.get_task_by_id(dependencies_data[0].from_task_id)
+        if not first_task:
+            await self._handle_not_found_error("task", dependencies_data[0].from_task_id, TaskNotFoundError)
+        
+        plan_id = first_task.plan_id
+        tasks = {task.id: task for task in await self.repository.get_tasks_by_plan(plan_id)}
+        graph = await self._get_dependency_graph(plan_id)
+        
+        added: List[Tuple[UUID, UUID]] = []
+        try:
+            for dependency_data in dependencies_data:
+                from_task_id = dependency_data.from_task_id
+                to_task_id = dependency_data.to_task_id
+                details = {
+                    "from_task_id": str(from_task_id),
+                    "to_task_id": str(to_task_id),
+                }
+                
+                # Validate tasks exist and are in the same plan
+                for task_id in (from_task_id, to_task_id):
+                    if task_id in tasks:
+                        continue
+                    if not await self.repository.get_task_by_id(task_id):
+                        await self._handle_not_found_error("task", task_id, TaskNotFoundError)
+                    raise InvalidDependencyError(
+                        message="Tasks must be in the same plan",
+                        details={**details, "plan_id": str(plan_id)}
+                    )
+                
+                # Validate dependency data (cycles are checked below)
+                validation_errors = await self.validator.validate(dependency_data, {})
+                if validation_errors:
+                    raise InvalidDependencyError(
+                        message="Invalid dependency data",
+                        details={**details, "validation_errors": validation_errors}
+                    )
+                
+                if graph.has_edge(from_task_id, to_task_id):
+                    raise InvalidDependencyError(
+                        message="Dependency already exists",
+                        details=details
+                    )
+                
+                try:
+                    graph.add_edge(from_task_id, to_task_id)
+                except CyclicDependencyError:
+                    raise InvalidDependencyError(
+                        message="Circular dependency detected",
+                        details={
+                            **details,
+                            "validation_errors": ["This dependency would create a circular reference"],
+                        }
+                    )
+                added.append((from_task_id, to_task_id))
+            
+            # Store all dependencies with one bulk insert
+            dependency_rows = [dependency_data.model_dump() for dependency_data in dependencies_data]
+            await self.repository.bulk_create_dependencies(dependency_rows)
+        except Exception:
+            # Roll back the cached graph; removing edges keeps the order valid
+            for from_task_id, to_task_id in added:
+                graph.remove_edge(from_task_id, to_task_id)
+            raise
+        
+        # Publishing or the commit may still fail
+        self._invalidate_graph_on_rollback(plan_id)
+        
+        # Schedule of the plan is no longer valid
+        self.invalidate_schedule(plan_id)
+        
+        # Publish one event for the whole batch
+        await self.event_bus.publish("dependency.batch_created", {
+            "plan_id": str(plan_id),
+            "count": len(dependency_rows),
+            "origin": self.graph_cache.instance_id,
+        })
+        
+        # Convert to response models
+        return [
+            await self._to_response_model(
+                row,
+                from_task=tasks[row["from_task_id"]],
+                to_task=tasks[row["to_task_id"]]
+            )
+            for row in dependency_rows
+        ]
+    
     async def update_dependency(
         self,
         from_task_id: UUID,
@@ -199,6 +361,9 @@ class DependencyManager(BasePlannerComponent):
             dependency_data=update_dict
         )
         
+        # Lag or type changes affect the schedule
+        self.invalidate_schedule()
+        
         # Publish event
         await self._publish_event("dependency.updated", dependency)
         
@@ -237,6 +402,8 @@ class DependencyManager(BasePlannerComponent):
                 }
             )
         
+        from_task = await self.repository.get_task_by_id(from_task_id)
+        
         # Delete dependency in repository
         success = await self.repository.delete_dependency(
             from_task_id=from_task_id,
@@ -252,8 +419,22 @@ class DependencyManager(BasePlannerComponent):
                 }
             )
         
+        # Keep the cached graph in sync
+        plan_id = from_task.plan_id if from_task else None
+        graph = self.graph_cache.get(plan_id) if plan_id else None
+        if graph is not None:
+            graph.remove_edge(from_task_id, to_task_id)
+            self._invalidate_graph_on_rollback(plan_id)
+        
+        # Schedule of the plan is no longer valid
+        self.invalidate_schedule(plan_id)
+        
         # Publish event
-        await self._publish_event("dependency.deleted", dependency)
+        await self._publish_event(
+            "dependency.deleted",
+            dependency,
+            self._event_data(plan_id)
+        )
     
     async def list_dependencies(
         self,
@@ -323,7 +504,8 @@ class DependencyManager(BasePlannerComponent):
         await self._log_operation("Calculating", "critical path", entity_id=plan_id)
         
         # Calculate critical path
-        path_tasks = await self._calculate_critical_path(plan_id)
+        schedule = await self.analyze_schedule(plan_id)
+        path_tasks = schedule.critical_tasks
         
         # Load full task data
         task_responses = []
@@ -398,10 +580,62 @@ class DependencyManager(BasePlannerComponent):
             return False
         
         # Get critical path for the plan
-        critical_path_tasks = await self._calculate_critical_path(task.plan_id)
+        schedule = await self.analyze_schedule(task.plan_id)
         
         # Check if task is in the critical path
-        return any(path_task.id == task_id for path_task in critical_path_tasks)
+        return schedule.is_critical(task_id)
+    
+    async def analyze_schedule(
+        self,
+        plan_id: UUID,
+        start_date: Optional[datetime] = None,
+        persist: bool = True
+    ) -> CriticalPathResult:
+        """
+        Run the CPM analysis for a plan.
+        
+        The plan is loaded with one query for tasks and one for dependencies,
+        and the result is memoized so that the critical path, forecasts and
+        resource optimization share a single computation.
+        
+        Args:
+            plan_id: Plan ID
+            start_date: Optional calendar start of the plan (defaults to now)
+            persist: Whether to store schedule data on the tasks
+            
+        Returns:
+            CriticalPathResult: Calculated schedule
+            
+        Raises:
+            CyclicDependencyError: If the plan contains a dependency cycle
+        """
+        schedule = self._schedules.get(plan_id)
+        if schedule is not None:
+            return schedule
+        
+        tasks, dependencies = await self.repository.get_plan_task_graph(plan_id)
+        schedule = self.cpm_engine.compute_for_plan(tasks, dependencies)
+        
+        # Store schedule data for all tasks with one bulk update
+        if persist and tasks:
+            await self.repository.bulk_update_task_schedule_data(
+                schedule.schedule_rows(start_date or datetime.utcnow())
+            )
+        
+        self._schedules[plan_id] = schedule
+        return schedule
+    
+    def invalidate_schedule(self, plan_id: Optional[UUID] = None) -> None:
+        """
+        Drop memoized schedules.
+        
+        Args:
+            plan_id: Plan ID to invalidate, or None to invalidate all plans
+        """
+        if plan_id is None:
+            self._schedules.clear()
+        else:
+            self._schedules.pop(plan_id, None)
     
     async def would_create_cycle(self, from_task_id: UUID, to_task_id: UUID) -> bool:
         """
@@ -418,19 +652,31 @@ class DependencyManager(BasePlannerComponent):
     
     # Helper methods
     
-    async def _to_response_model(self, dependency) -> DependencyResponse:
+    async def _to_response_model(
+        self,
+        dependency,
+        from_task: Any = None,
+        to_task: Any = None
+    ) -> DependencyResponse:
         """
         Convert a dependency model to a response model.
         
         Args:
-            dependency: Dependency model
+            dependency: Dependency model or row dictionary
+            from_task: Optional already loaded source task
+            to_task: Optional already loaded target task
             
         Returns:
             DependencyResponse: Dependency response model
         """
+        if isinstance(dependency, dict):
+            dependency = SimpleNamespace(**{"id": None, "created_at": None, "updated_at": None, **dependency})
+        
         # Get task names
-        from_task = await self.repository.get_task_by_id(dependency.from_task_id)
-        to_task = await self.repository.get_task_by_id(dependency.to_task_id)
+        if from_task is None:
+            from_task = await self.repository.get_task_by_id(dependency.from_task_id)
+        if to_task is None:
+            to_task = await self.repository.get_task_by_id(dependency.to_task_id)
         
         from_task_name = from_task.name if from_task else "Unknown Task"
         to_task_name = to_task.name if to_task else "Unknown Task"
@@ -438,17 +684,8 @@ class DependencyManager(BasePlannerComponent):
         # Check if dependency is on critical path
         is_critical = False
         if from_task and to_task:
-            # Get critical path for the plan
-            critical_path_tasks = await self._calculate_critical_path(from_task.plan_id)
-            critical_path_ids = [task.id for task in critical_path_tasks]
-            
-            # Check if both tasks are in the critical path and adjacent
-            if (from_task.id in critical_path_ids and to_task.id in critical_path_ids):
-                from_index = critical_path_ids.index(from_task.id)
-                to_index = critical_path_ids.index(to_task.id)
-                
-                if from_index + 1 == to_index:
-                    is_critical = True
+            schedule = await self.analyze_schedule(from_task.plan_id)
+            is_critical = schedule.is_critical_edge(from_task.id, to_task.id)
         
         # Convert to response model
         return DependencyResponse(
@@ -468,166 +705,14 @@ class DependencyManager(BasePlannerComponent):
         """
         Calculate the critical path for a plan.
         
-        This implements a simplified version of the Critical Path Method (CPM).
-        
         Args:
             plan_id: Plan ID
             
         Returns:
-            List[Any]: Tasks on the critical path
+            List[Any]: Tasks on the critical path, in dependency order
         """
-        # Get all tasks for the plan
-        tasks = await self.repository.get_tasks_by_plan(plan_id)
-        if not tasks:
-            return []
-        
-        # Build dependency graph
-        graph = {}
-        for task in tasks:
-            graph[task.id] = {
-                "task": task,
-                "duration": task.estimated_duration,
-                "predecessors": [],
-                "successors": [],
-                "earliest_start": 0,
-                "earliest_finish": task.estimated_duration,
-                "latest_start": 0,  # Will be calculated later
-                "latest_finish": 0,  # Will be calculated later
-                "slack": 0,  # Will be calculated later
-            }
-        
-        # Add dependencies
-        for task_id, node in graph.items():
-            # Get outgoing dependencies (tasks that depend on this task)
-            outgoing, _ = await self.repository.list_dependencies(
-                task_id=task_id,
-                direction="outgoing",
-                pagination=None  # Get all
-            )
-            
-            for dep in outgoing:
-                if dep.to_task_id in graph:
-                    node["successors"].append(dep.to_task_id)
-                    graph[dep.to_task_id]["predecessors"].append(task_id)
-        
-        # Find start nodes (tasks with no predecessors)
-        start_nodes = [task_id for task_id, node in graph.items() if not node["predecessors"]]
-        
-        # Forward pass - calculate earliest start and finish times
-        # Starting with nodes that have no predecessors
-        processed = set(start_nodes)
-        to_process = start_nodes.copy()
-        
-        while to_process:
-            task_id = to_process.pop(0)
-            node = graph[task_id]
-            
-            # For each successor, calculate earliest start time
-            for successor_id in node["successors"]:
-                successor = graph[successor_id]
-                
-                # Earliest start time is the maximum of all predecessors' earliest finish times
-                new_earliest_start = max(
-                    successor["earliest_start"],
-                    node["earliest_finish"]
-                )
-                
-                # Update earliest start and finish times
-                successor["earliest_start"] = new_earliest_start
-                successor["earliest_finish"] = new_earliest_start + successor["duration"]
-                
-                # Add successor to processing queue if all its predecessors have been processed
-                if (
-                    successor_id not in processed and
-                    all(pred in processed for pred in successor["predecessors"])
-                ):
-                    to_process.append(successor_id)
-                    processed.add(successor_id)
-        
-        # Find end nodes (tasks with no successors)
-        end_nodes = [task_id for task_id, node in graph.items() if not node["successors"]]
-        
-        # Find project completion time (maximum earliest finish of all tasks)
-        project_completion = max(graph[task_id]["earliest_finish"] for task_id in end_nodes)
-        
-        # Backward pass - calculate latest start and finish times
-        # Starting with the end nodes
-        for task_id in graph:
-            if task_id in end_nodes:
-                # For end nodes, latest finish = project completion
-                graph[task_id]["latest_finish"] = project_completion
-            else:
-                # For other nodes, initialize to a large value
-                graph[task_id]["latest_finish"] = float("inf")
-        
-        # Process all tasks in reverse topological order
-        processed = set()
-        to_process = end_nodes.copy()
-        
-        while to_process:
-            task_id = to_process.pop(0)
-            node = graph[task_id]
-            processed.add(task_id)
-            
-            # Calculate latest start time
-            node["latest_start"] = node["latest_finish"] - node["duration"]
-            
-            # For each predecessor, calculate latest finish time
-            for predecessor_id in node["predecessors"]:
-                predecessor = graph[predecessor_id]
-                
-                # Latest finish time is the minimum of all successors' latest start times
-                new_latest_finish = min(
-                    predecessor["latest_finish"],
-                    node["latest_start"]
-                )
-                
-                # Update latest finish time
-                predecessor["latest_finish"] = new_latest_finish
-                
-                # Add predecessor to processing queue if not already processed
-                if predecessor_id not in processed:
-                    to_process.append(predecessor_id)
-        
-        # Calculate slack and identify critical path
-        critical_path_ids = []
-        for task_id, node in graph.items():
-            # Calculate slack
-            node["slack"] = node["latest_start"] - node["earliest_start"]
-            
-            # Tasks with zero slack are on the critical path
-            if node["slack"] == 0:
-                critical_path_ids.append(task_id)
-        
-        # Sort critical path in correct order
-        ordered_path = []
-        current_ids = [task_id for task_id in critical_path_ids if not graph[task_id]["predecessors"] or all(pred not in critical_path_ids for pred in graph[task_id]["predecessors"])]
-        
-        while current_ids:
-            task_id = current_ids.pop(0)
-            ordered_path.append(graph[task_id]["task"])
-            
-            # Find successors on critical path
-            for succ_id in graph[task_id]["successors"]:
-                if succ_id in critical_path_ids and succ_id not in ordered_path:
-                    # Add to current_ids if all predecessors have been processed
-                    if all(pred not in critical_path_ids or graph[pred]["task"] in ordered_path for pred in graph[succ_id]["predecessors"]):
-                        current_ids.append(succ_id)
-        
-        # Store schedule data for tasks
-        for task_id, node in graph.items():
-            await self.repository.update_task_schedule_data(
-                task_id=task_id,
-                schedule_data={
-                    "earliest_start": datetime.utcnow(),  # Placeholder - would use actual dates
-                    "earliest_finish": datetime.utcnow(),  # Placeholder
-                    "latest_start": datetime.utcnow(),  # Placeholder
-                    "latest_finish": datetime.utcnow(),  # Placeholder
-                    "slack": node["slack"]
-                }
-            )
-        
-        return ordered_path
+        schedule = await self.analyze_schedule(plan_id)
+        return schedule.critical_tasks
     
     async def _would_create_cycle(self, from_task_id: UUID, to_task_id: UUID) -> bool:
         """
@@ -640,47 +725,63 @@ class DependencyManager(BasePlannerComponent):
         Returns:
             bool: True if adding the dependency would create a cycle, False otherwise
         """
-        # If to_task depends on from_task (directly or indirectly), adding a dependency
-        # from from_task to to_task would create a cycle
+        # If to_task reaches from_task, adding the dependency would close a cycle
+        from_task = await self.repository.get_task_by_id(from_task_id)
+        if not from_task:
+            return False
         
-        # Get all dependencies as a graph
-        dependencies, _ = await self.repository.get_all_dependencies_for_plan_containing_task(
-            task_id=from_task_id
-        )
+        graph = await self._get_dependency_graph(from_task.plan_id)
+        return graph.would_create_cycle(from_task_id, to_task_id)
+    
+    async def _get_dependency_graph(self, plan_id: UUID) -> DynamicTopologicalOrder:
+        """
+        Get the dependency graph of a plan, loading it on a cache miss.
         
-        # Build a graph representation
-        graph = {}
-        for dep in dependencies:
-            if dep.from_task_id not in graph:
-                graph[dep.from_task_id] = []
-            graph[dep.from_task_id].append(dep.to_task_id)
-        
-        # Add the new dependency
-        if from_task_id not in graph:
-            graph[from_task_id] = []
-        if to_task_id not in graph:
-            graph[to_task_id] = []
-        
-        # DFS to check for cycles
-        def has_path(start, end, visited=None):
-            if visited is None:
-                visited = set()
-            
-            if start == end:
-                return True
-            
-            visited.add(start)
+        Args:
+            plan_id: Plan ID
             
-            for neighbor in graph.get(start, []):
-                if neighbor not in visited:
-                    if has_path(neighbor, end, visited):
-                        return True
+        Returns:
+            DynamicTopologicalOrder: Dependency graph with topological order
             
-            return False
+        Raises:
+            CyclicDependencyError: If the stored dependencies contain a cycle
+        """
+        graph = self.graph_cache.get(plan_id)
+        if graph is None:
+            tasks, dependencies = await self.repository.get_plan_task_graph(plan_id)
+            graph = DynamicTopologicalOrder.from_edges(
+                (task.id for task in tasks),
+                ((dep.from_task_id, dep.to_task_id) for dep in dependencies)
+            )
+            self.graph_cache.put(plan_id, graph)
+        return graph
+    
+    def _invalidate_graph_on_rollback(self, plan_id: UUID) -> None:
+        """
+        Drop the cached graph of a plan if the current transaction is rolled back.
+        
+        The cached graph is updated before the transaction commits, so it
+        must not outlive a rollback of the dependency changes it mirrors.
         
-        # If there's a path from to_task to from_task, adding the new dependency
-        # would create a cycle
-        return has_path(to_task_id, from_task_id)
+        Args:
+            plan_id: Plan ID
+        """
+        self.repository.on_rollback(lambda: self.graph_cache.invalidate(plan_id))
+    
+    def _event_data(self, plan_id: Optional[UUID]) -> Dict[str, Any]:
+        """
+        Build the additional data of dependency events.
+        
+        Args:
+            plan_id: Plan ID of the dependency
+            
+        Returns:
+            Dict[str, Any]: Event data
+        """
+        return {
+            "plan_id": str(plan_id) if plan_id else None,
+            "origin": self.graph_cache.instance_id,
+        }
     
     async def _are_all_predecessors_completed(self, task_id: UUID) -> bool:
         """
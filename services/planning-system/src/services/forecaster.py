@@ -5,9 +5,10 @@ This module implements the forecasting component, which handles
 timeline forecasts, bottleneck analysis, and project predictions.
 """
 
+import heapq
 import logging
 import uuid
-from typing import List, Dict, Any, Optional, Tuple, Set, Union
+from typing import List, Dict, Any, Optional, Tuple, Union
 from uuid import UUID
 from datetime import datetime, timedelta
 
@@ -21,12 +22,38 @@ from ..models.api import (
 )
 from ..exceptions import (
     PlanNotFoundError,
-    ForecastingError
+    ForecastingError,
+    CyclicDependencyError
 )
 from .repository import PlanningRepository
 from .dependency_manager import DependencyManager
 from .base import BasePlannerComponent
-from ..config import PlanningSystemConfig as Settings
+from .scheduling import (
+    PlanGraph,
+    analyze_chains,
+    DurationModel,
+    SimulationModel,
+    SimulationResult,
+    simulate_schedule,
+    history_ratios_for_tasks,
+    run_off_loop,
+)
+from ..config import PlanningSystemConfig as Settings, get_settings
+
+# Forecasting methods
+MONTE_CARLO = "monte_carlo"
+ANALYTIC = "analytic"
+FORECAST_METHODS = (MONTE_CARLO, ANALYTIC)
+
+# Fan-in/fan-out above which a task is reported as a hot spot
+HOT_SPOT_DEGREE = 3
+
+# Fraction of dependency paths through a task that marks it as a funnel
+FUNNEL_PATH_SHARE = 0.5
+
+# Maximum number of long dependency chains and funnels reported
+MAX_CHAIN_BOTTLENECKS = 10
+MAX_FUNNEL_BOTTLENECKS = 10
 
 class ProjectForecaster(BasePlannerComponent):
     """
@@ -41,6 +68,7 @@ class ProjectForecaster(BasePlannerComponent):
         repository: PlanningRepository,
         event_bus: EventBus,
         dependency_manager: DependencyManager,
+        settings: Optional[Settings] = None,
     ):
         """
         Initialize the project forecaster.
@@ -49,16 +77,20 @@ class ProjectForecaster(BasePlannerComponent):
             repository: Planning repository
             event_bus: Event bus
             dependency_manager: Dependency manager component
+            settings: Optional service settings
         """
         super().__init__(repository, event_bus, "ProjectForecaster")
         self.dependency_manager = dependency_manager
+        self.settings = settings or get_settings()
     
     async def create_forecast(
         self,
         plan_id: UUID,
         confidence_interval: Optional[float] = None,
         include_historical: bool = False,
-        time_unit: str = "day"
+        time_unit: str = "day",
+        method: str = MONTE_CARLO,
+        iterations: Optional[int] = None
     ) -> TimelineForecast:
         """
         Create a timeline forecast for a plan.
@@ -68,16 +100,24 @@ class ProjectForecaster(BasePlannerComponent):
             confidence_interval: Optional confidence interval (0.0-1.0)
             include_historical: Whether to include historical data
             time_unit: Time unit for forecast (hour, day, week, month)
+            method: Forecasting method (monte_carlo, analytic)
+            iterations: Optional number of Monte Carlo iterations
             
         Returns:
             TimelineForecast: Generated forecast
             
         Raises:
             PlanNotFoundError: If plan not found
-            ForecastingError: If forecasting fails
+            ForecastingError: If the method is unknown or forecasting fails
         """
         await self._log_operation("Creating", "forecast", entity_id=plan_id)
         
+        if method not in FORECAST_METHODS:
+            raise ForecastingError(
+                message=f"Unknown forecasting method: {method}",
+                details={"method": method, "supported_methods": list(FORECAST_METHODS)}
+            )
+        
         # Set default confidence interval if not provided
         confidence_interval = confidence_interval or 0.95  # 95% confidence interval
         
@@ -91,27 +131,38 @@ class ProjectForecaster(BasePlannerComponent):
             tasks = await self.repository.get_tasks_by_plan(plan_id)
             dependencies = await self.repository.get_all_dependencies_for_plan(plan_id)
             
-            # Generate timeline
-            timeline_points = await self._generate_timeline(
-                plan=plan,
-                tasks=tasks,
-                dependencies=dependencies,
-                confidence_interval=confidence_interval,
-                time_unit=time_unit
-            )
-            
-            # Calculate completion dates
-            completion_dates = await self._calculate_completion_dates(
-                timeline_points=timeline_points,
-                confidence_interval=confidence_interval
-            )
+            simulation_fields: Dict[str, Any] = {}
+            if method == MONTE_CARLO:
+                # Simulate the schedule
+                timeline_points, completion_dates, simulation_fields = await self._simulate_timeline(
+                    tasks=tasks,
+                    dependencies=dependencies,
+                    confidence_interval=confidence_interval,
+                    time_unit=time_unit,
+                    iterations=iterations or self.settings.monte_carlo_iterations
+                )
+            else:
+                # Generate timeline
+                timeline_points = await self._generate_timeline(
+                    plan=plan,
+                    tasks=tasks,
+                    dependencies=dependencies,
+                    confidence_interval=confidence_interval,
+                    time_unit=time_unit
+                )
+                
+                # Calculate completion dates
+                completion_dates = await self._calculate_completion_dates(
+                    timeline_points=timeline_points,
+                    confidence_interval=confidence_interval
+                )
             
             # Create forecast record
             forecast_data = {
                 "plan_id": plan_id,
                 "generated_at": datetime.utcnow(),
                 "confidence_interval": confidence_interval,
-                "timeline": [point.model_dump() for point in timeline_points],
+                "timeline_data": [point.model_dump(mode="json") for point in timeline_points],
                 "expected_completion": completion_dates["expected"],
                 "best_case_completion": completion_dates["best_case"],
                 "worst_case_completion": completion_dates["worst_case"]
@@ -135,7 +186,8 @@ class ProjectForecaster(BasePlannerComponent):
                 timeline=timeline_points,
                 expected_completion=forecast.expected_completion,
                 best_case_completion=forecast.best_case_completion,
-                worst_case_completion=forecast.worst_case_completion
+                worst_case_completion=forecast.worst_case_completion,
+                **simulation_fields
             )
             
             return forecast_response
@@ -487,9 +539,8 @@ class ProjectForecaster(BasePlannerComponent):
         Returns:
             List[TimelinePoint]: Timeline forecast points
         """
-        # In a real implementation, this would use Monte Carlo simulation
-        # or other forecasting techniques to generate timeline points
-        # For this example, we'll create simplified data
+        # Analytic approximation: an S-curve around the CPM duration.
+        # See _simulate_timeline for the Monte Carlo forecast.
         
         # Define time unit in days
         unit_days = {
@@ -499,11 +550,11 @@ class ProjectForecaster(BasePlannerComponent):
             "month": 30
         }.get(time_unit, 1)
         
-        # Get critical path
-        critical_path = await self.dependency_manager.get_critical_path(plan.id)
+        # Get the shared CPM schedule for the plan
+        schedule = await self.dependency_manager.analyze_schedule(plan.id)
         
-        # Calculate total duration based on critical path
-        total_duration_days = sum(task.estimated_duration / 8 for task in critical_path)  # 8 hours per day
+        # Total duration is the length of the critical path
+        total_duration_days = schedule.project_duration / 8  # 8 hours per day
         
         # Create timeline points
         start_date = datetime.utcnow()
@@ -549,6 +600,130 @@ class ProjectForecaster(BasePlannerComponent):
         
         return points
     
+    async def _simulate_timeline(
+        self,
+        tasks: List[Any],
+        dependencies: List[Any],
+        confidence_interval: float,
+        time_unit: str,
+        iterations: int
+    ) -> Tuple[List[TimelinePoint], Dict[str, datetime], Dict[str, Any]]:
+        """
+        Generate a timeline forecast by Monte Carlo simulation.
+        
+        Task durations are fitted from estimates and the plan's completed
+        tasks, then sampled and propagated through the dependency network.
+        Large simulations run in the shared process pool.
+        
+        Args:
+            tasks: Task data
+            dependencies: Dependency data
+            confidence_interval: Confidence interval (0.0-1.0)
+            time_unit: Time unit (hour, day, week, month)
+            iterations: Number of iterations
+            
+        Returns:
+            Tuple[List[TimelinePoint], Dict[str, datetime], Dict[str, Any]]:
+                Timeline points, completion dates and simulation fields
+        """
+        # Hours per time unit (8 working hours per day)
+        step_hours = {
+            "hour": 1,
+            "day": 8,
+            "week": 40,
+            "month": 160
+        }.get(time_unit, 8)
+        
+        graph = PlanGraph.from_plan(tasks, dependencies)
+        durations = DurationModel.from_graph(graph, history_ratios_for_tasks(tasks))
+        model = SimulationModel.from_graph(graph, durations)
+        
+        use_process_pool = len(graph) * iterations > self.settings.monte_carlo_process_pool_threshold
+        result: SimulationResult = await run_off_loop(
+            simulate_schedule,
+            model,
+            iterations=iterations,
+            confidence_interval=confidence_interval,
+            time_step_hours=step_hours,
+            use_process_pool=use_process_pool,
+            max_workers=self.settings.scheduling_process_pool_workers
+        )
+        
+        points, completion_dates, simulation_fields = self._simulation_forecast(
+            result=result,
+            task_ids=graph.task_ids,
+            confidence_interval=confidence_interval
+        )
+        
+        self.logger.info(
+            f"Simulated {result.iterations} iterations over {len(graph)} tasks "
+            f"(process pool: {use_process_pool})"
+        )
+        
+        return points, completion_dates, simulation_fields
+    
+    def _simulation_forecast(
+        self,
+        result: SimulationResult,
+        task_ids: List[UUID],
+        confidence_interval: float,
+        start_date: Optional[datetime] = None
+    ) -> Tuple[List[TimelinePoint], Dict[str, datetime], Dict[str, Any]]:
+        """
+        Convert a simulation result into forecast timeline points and dates.
+        
+        Args:
+            result: Simulation result
+            task_ids: Task IDs in simulation index order
+            confidence_interval: Confidence interval (0.0-1.0)
+            start_date: Optional forecast start (defaults to now)
+            
+        Returns:
+            Tuple[List[TimelinePoint], Dict[str, datetime], Dict[str, Any]]:
+                Timeline points, completion dates and simulation fields
+        """
+        # Simulation offsets are working hours from the start date
+        start_date = start_date or datetime.utcnow()
+        
+        def to_date(hours: float) -> datetime:
+            return start_date + timedelta(days=hours / 8)
+        
+        points = [
+            TimelinePoint(
+                date=to_date(hours),
+                value=float(median),
+                lower_bound=float(lower),
+                upper_bound=float(upper)
+            )
+            for hours, lower, median, upper in zip(
+                result.timeline_hours,
+                result.progress_lower,
+                result.progress_median,
+                result.progress_upper
+            )
+        ]
+        
+        lower_q = (1 - confidence_interval) / 2 * 100
+        upper_q = (1 + confidence_interval) / 2 * 100
+        completion_dates = {
+            "expected": to_date(result.percentiles[50]),
+            "best_case": to_date(result.percentile(lower_q)),
+            "worst_case": to_date(result.percentile(upper_q))
+        }
+        
+        simulation_fields = {
+            "completion_percentiles": {
+                f"p{q}": to_date(hours) for q, hours in result.percentiles.items()
+            },
+            "task_criticality": {
+                str(task_id): float(result.criticality[i])
+                for i, task_id in enumerate(task_ids)
+            },
+            "simulation_iterations": result.iterations
+        }
+        
+        return points, completion_dates, simulation_fields
+    
     async def _calculate_completion_dates(
         self,
         timeline_points: List[TimelinePoint],
@@ -732,95 +907,74 @@ class ProjectForecaster(BasePlannerComponent):
         """
         bottlenecks = []
         
-        # Count dependencies per task
-        task_dependencies = {}
-        for task in tasks:
-            task_dependencies[task.id] = {
-                "task": task,
-                "incoming": 0,
-                "outgoing": 0,
-                "predecessors": [],
-                "successors": []
-            }
+        graph = PlanGraph.from_plan(tasks, dependencies)
+        try:
+            analysis = analyze_chains(graph, top_k=MAX_CHAIN_BOTTLENECKS)
+        except CyclicDependencyError as e:
+            self.logger.warning(f"Skipping dependency bottleneck analysis: {str(e)}")
+            return bottlenecks
         
-        for dependency in dependencies:
-            # Increment incoming count for to_task
-            if dependency.to_task_id in task_dependencies:
-                task_dependencies[dependency.to_task_id]["incoming"] += 1
-                task_dependencies[dependency.to_task_id]["predecessors"].append(dependency.from_task_id)
-            
-            # Increment outgoing count for from_task
-            if dependency.from_task_id in task_dependencies:
-                task_dependencies[dependency.from_task_id]["outgoing"] += 1
-                task_dependencies[dependency.from_task_id]["successors"].append(dependency.to_task_id)
-        
-        # Check for dependency bottlenecks
-        for task_id, data in task_dependencies.items():
-            task = data["task"]
+        def task_ref(i: int) -> Dict[str, str]:
+            return {"id": str(graph.task_ids[i]), "name": graph.tasks[i].name}
+        
+        # Check fan-in/fan-out hot spots
+        for i in analysis.hot_spots(HOT_SPOT_DEGREE):
+            task = graph.tasks[i]
             
             # High incoming dependencies
-            if data["incoming"] > 3:
-                # Get predecessor tasks
-                predecessor_tasks = []
-                for pred_id in data["predecessors"]:
-                    pred_task = next((t for t in tasks if t.id == pred_id), None)
-                    if pred_task:
-                        predecessor_tasks.append({
-                            "id": str(pred_task.id),
-                            "name": pred_task.name
-                        })
-                
+            if analysis.fan_in[i] > HOT_SPOT_DEGREE:
                 bottlenecks.append({
                     "type": "high_incoming_dependencies",
-                    "severity": min(data["incoming"] / 5, 1) * 7,  # 0-7 scale
-                    "task_id": str(task_id),
+                    "severity": min(analysis.fan_in[i] / 5, 1) * 7,  # 0-7 scale
+                    "task_id": str(task.id),
                     "task_name": task.name,
-                    "dependency_count": data["incoming"],
-                    "predecessors": predecessor_tasks,
+                    "dependency_count": analysis.fan_in[i],
+                    "predecessors": [task_ref(p) for p, _, _ in graph.predecessors[i]],
                     "risk": "Task depends on many predecessors, increasing risk of delays"
                 })
             
             # High outgoing dependencies
-            if data["outgoing"] > 3:
-                # Get successor tasks
-                successor_tasks = []
-                for succ_id in data["successors"]:
-                    succ_task = next((t for t in tasks if t.id == succ_id), None)
-                    if succ_task:
-                        successor_tasks.append({
-                            "id": str(succ_task.id),
-                            "name": succ_task.name
-                        })
-                
+            if analysis.fan_out[i] > HOT_SPOT_DEGREE:
                 bottlenecks.append({
                     "type": "high_outgoing_dependencies",
-                    "severity": min(data["outgoing"] / 5, 1) * 8,  # 0-8 scale
-                    "task_id": str(task_id),
+                    "severity": min(analysis.fan_out[i] / 5, 1) * 8,  # 0-8 scale
+                    "task_id": str(task.id),
                     "task_name": task.name,
-                    "dependency_count": data["outgoing"],
-                    "successors": successor_tasks,
+                    "dependency_count": analysis.fan_out[i],
+                    "successors": [task_ref(s) for s, _, _ in graph.successors[i]],
                     "risk": "Many tasks depend on this one, making it a critical bottleneck"
                 })
         
-        # Look for long dependency chains
-        chains = await self._find_dependency_chains(task_dependencies)
+        # Check for funnels that most dependency paths pass through
+        funnels = []
+        for i in range(len(graph)):
+            fan_in, fan_out = analysis.fan_in[i], analysis.fan_out[i]
+            if not (fan_in and fan_out) or (fan_in == 1 and fan_out == 1):
+                continue
+            share = analysis.path_share(i)
+            if share >= FUNNEL_PATH_SHARE:
+                funnels.append((share, i))
         
-        for chain in chains:
+        for share, i in heapq.nlargest(MAX_FUNNEL_BOTTLENECKS, funnels):
+            task = graph.tasks[i]
+            bottlenecks.append({
+                "type": "dependency_funnel",
+                "severity": share * 8,  # 0-8 scale
+                "task_id": str(task.id),
+                "task_name": task.name,
+                "path_share": share,
+                "risk": "Most dependency paths run through this task, so any delay propagates widely"
+            })
+        
+        # Look for long dependency chains
+        for chain in analysis.chains:
             if len(chain) > 4:  # Arbitrarily consider chains of 5+ tasks as bottlenecks
-                chain_tasks = []
-                for task_id in chain:
-                    task = next((t for t in tasks if t.id == task_id), None)
-                    if task:
-                        chain_tasks.append({
-                            "id": str(task.id),
-                            "name": task.name
-                        })
-                
                 bottlenecks.append({
                     "type": "long_dependency_chain",
                     "severity": min((len(chain) - 3) / 5, 1) * 9,  # 0-9 scale
                     "chain_length": len(chain),
-                    "tasks": chain_tasks,
+                    "chain_duration": chain.duration,
+                    "tasks": [task_ref(i) for i in chain.nodes],
                     "risk": "Long sequential dependency chain limits parallelization"
                 })
         
@@ -931,91 +1085,6 @@ class ProjectForecaster(BasePlannerComponent):
         
         return bottlenecks
     
-    async def _find_dependency_chains(
-        self,
-        task_dependencies: Dict[Any, Dict[str, Any]]
-    ) -> List[List[Any]]:
-        """
-        Find dependency chains in the task network.
-        
-        Args:
-            task_dependencies: Dictionary of task dependencies
-            
-        Returns:
-            List[List[Any]]: List of dependency chains
-        """
-        chains = []
-        
-        # Find start nodes (no predecessors)
-        start_nodes = [
-            task_id for task_id, data in task_dependencies.items()
-            if not data["predecessors"]
-        ]
-        
-        # Find all paths from start nodes
-        for start_node in start_nodes:
-            # DFS to find all paths
-            self._find_paths(
-                task_id=start_node,
-                task_dependencies=task_dependencies,
-                current_path=[],
-                all_paths=chains,
-                visited=set()
-            )
-        
-        # Sort chains by length (descending)
-        chains.sort(key=len, reverse=True)
-        
-        return chains
-    
-    def _find_paths(
-        self,
-        task_id: Any,
-        task_dependencies: Dict[Any, Dict[str, Any]],
-        current_path: List[Any],
-        all_paths: List[List[Any]],
-        visited: Set[Any]
-    ) -> None:
-        """
-        Recursive helper to find all paths in the dependency graph.
-        
-        Args:
-            task_id: Current task ID
-            task_dependencies: Dictionary of task dependencies
-            current_path: Current path being explored
-            all_paths: List to collect all paths
-            visited: Set of visited nodes in current path
-        """
-        # Skip if node already visited (avoid cycles)
-        if task_id in visited:
-            return
-        
-        # Add node to path and visited set
-        current_path.append(task_id)
-        visited.add(task_id)
-        
-        # Get successors
-        successors = task_dependencies[task_id]["successors"]
-        
-        if not successors:
-            # End of path, save if path length > 1
-            if len(current_path) > 1:
-                all_paths.append(current_path.copy())
-        else:
-            # Continue DFS with each successor
-            for succ_id in successors:
-                self._find_paths(
-                    task_id=succ_id,
-                    task_dependencies=task_dependencies,
-                    current_path=current_path,
-                    all_paths=all_paths,
-                    visited=visited.copy()
-                )
-        
-        # Backtrack: remove node from path
-        current_path.pop()
-        visited.remove(task_id)
-    
     async def _forecast_milestone_completion(
         self,
         milestone: Any,
@@ -1115,7 +1184,7 @@ class ProjectForecaster(BasePlannerComponent):
                     "affected_resources": [bottleneck.get("resource_id")]
                 })
             
-            elif bottleneck_type in ["high_incoming_dependencies", "high_outgoing_dependencies"]:
+            elif bottleneck_type in ["high_incoming_dependencies", "high_outgoing_dependencies", "dependency_funnel"]:
                 # Recommend dependency structure changes
                 task_id = bottleneck.get("task_id")
                 task_name = bottleneck.get("task_name", "task")
@@ -1253,7 +1322,7 @@ class ProjectForecaster(BasePlannerComponent):
                 estimated_delay_days += severity * 0.5  # 0.5 days per severity point
             elif bottleneck_type == "critical_resource_dependency":
                 estimated_delay_days += severity * 0.7  # 0.7 days per severity point
-            elif bottleneck_type in ["high_incoming_dependencies", "high_outgoing_dependencies"]:
+            elif bottleneck_type in ["high_incoming_dependencies", "high_outgoing_dependencies", "dependency_funnel"]:
                 estimated_delay_days += severity * 0.3  # 0.3 days per severity point
             elif bottleneck_type == "long_dependency_chain":
                 estimated_delay_days += severity * 0.6  # 0.6 days per severity point
@@ -378,6 +378,23 @@ class PlanningService:
         logger.info(f"Creating dependency from {dependency_data.from_task_id} to {dependency_data.to_task_id}")
         return await self.dependency_manager.create_dependency(dependency_data)
     
+    async def create_dependencies(self, dependencies_data: List[DependencyCreate]) -> List[DependencyResponse]:
+        """
+        Create many task dependencies of one plan at once.
+        
+        Args:
+            dependencies_data: Dependency data
+            
+        Returns:
+            List[DependencyResponse]: Created dependencies
+            
+        Raises:
+            TaskNotFoundError: If a task is not found
+            InvalidDependencyError: If a dependency is invalid
+        """
+        logger.info(f"Creating {len(dependencies_data)} dependencies")
+        return await self.dependency_manager.create_dependencies(dependencies_data)
+    
     async def update_dependency(
         self,
         from_task_id: UUID,
@@ -468,7 +485,9 @@ class PlanningService:
         plan_id: UUID,
         confidence_interval: Optional[float] = None,
         include_historical: bool = False,
-        time_unit: str = "day"
+        time_unit: str = "day",
+        method: str = "monte_carlo",
+        iterations: Optional[int] = None
     ) -> TimelineForecast:
         """
         Create a timeline forecast for a plan.
@@ -478,6 +497,8 @@ class PlanningService:
             confidence_interval: Optional confidence interval (0.0-1.0)
             include_historical: Whether to include historical data
             time_unit: Time unit for forecast (hour, day, week, month)
+            method: Forecasting method (monte_carlo, analytic)
+            iterations: Optional number of Monte Carlo iterations
             
         Returns:
             TimelineForecast: Generated forecast
@@ -491,7 +512,9 @@ class PlanningService:
             plan_id=plan_id,
             confidence_interval=confidence_interval,
             include_historical=include_historical,
-            time_unit=time_unit
+            time_unit=time_unit,
+            method=method,
+            iterations=iterations
         )
     
     async def get_latest_forecast(self, plan_id: UUID) -> TimelineForecast:
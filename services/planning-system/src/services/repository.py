@@ -6,7 +6,7 @@ encapsulating database operations and queries.
 """
 
 import logging
-from typing import List, Dict, Any, Optional, Tuple, Union, cast
+from typing import List, Dict, Any, Callable, Optional, Tuple, Union, cast
 from uuid import UUID
 from datetime import datetime
 from sqlalchemy import select, update, delete, insert, func
@@ -44,6 +44,9 @@ from ..exceptions import (
 
 logger = logging.getLogger(__name__)
 
+# Session info key of the callbacks to run when the transaction is rolled back
+ROLLBACK_CALLBACKS = "rollback_callbacks"
+
 class PlanningRepository:
     """
     Repository for Planning System database operations.
@@ -62,6 +65,17 @@ class PlanningRepository:
         self.db = db
         logger.debug("Planning Repository initialized")
     
+    def on_rollback(self, callback: Callable[[], None]) -> None:
+        """
+        Register a callback to run if the session's transaction is rolled back.
+        
+        Used to undo in-memory state that mirrors uncommitted writes.
+        
+        Args:
+            callback: Callback without arguments
+        """
+        self.db.info.setdefault(ROLLBACK_CALLBACKS, []).append(callback)
+    
     # Plan operations
     
     async def create_plan(self, plan_data: Dict[str, Any]) -> StrategicPlanModel:
@@ -1249,7 +1263,114 @@ class PlanningRepository:
         
         result = await self.db.execute(query)
         return result.scalars().all()
-    
+
+    async def get_all_dependencies_for_plan(self, plan_id: UUID) -> List[Any]:
+        """
+        Get all task dependencies for a plan in a single query.
+
+        Args:
+            plan_id: Plan ID
+
+        Returns:
+            List[Any]: Dependency rows with from_task_id, to_task_id,
+                dependency_type and lag
+        """
+        logger.debug(f"Getting dependencies for plan: {plan_id}")
+
+        query = (
+            select(
+                task_dependencies.c.from_task_id,
+                task_dependencies.c.to_task_id,
+                task_dependencies.c.dependency_type,
+                task_dependencies.c.lag,
+            )
+            .select_from(
+                task_dependencies.join(
+                    PlanningTaskModel,
+                    task_dependencies.c.from_task_id == PlanningTaskModel.id
+                )
+            )
+            .where(PlanningTaskModel.plan_id == plan_id)
+        )
+
+        result = await self.db.execute(query)
+        return result.all()
+
+    async def get_plan_task_graph(
+        self,
+        plan_id: UUID
+    ) -> Tuple[List[PlanningTaskModel], List[Any]]:
+        """
+        Load all tasks and dependencies of a plan.
+
+        Uses one query for tasks and one for dependency edges, so the
+        full task network can be analyzed in memory.
+
+        Args:
+            plan_id: Plan ID
+
+        Returns:
+            Tuple[List[PlanningTaskModel], List[Any]]: Tasks and dependency rows
+        """
+        tasks = await self.get_tasks_by_plan(plan_id)
+        if not tasks:
+            return [], []
+
+        dependencies = await self.get_all_dependencies_for_plan(plan_id)
+        return tasks, dependencies
+
+    async def bulk_update_task_schedule_data(
+        self,
+        schedule_rows: List[Dict[str, Any]]
+    ) -> None:
+        """
+        Persist schedule data for many tasks with one bulk UPDATE.
+
+        Args:
+            schedule_rows: Rows keyed by task ``id`` with earliest/latest
+                start and finish, slack and is_critical_path values
+        """
+        if not schedule_rows:
+            return
+
+        logger.debug(f"Updating schedule data for {len(schedule_rows)} tasks")
+
+        # ORM bulk UPDATE by primary key - executed as a single executemany
+        await self.db.execute(update(PlanningTaskModel), schedule_rows)
+
+    async def bulk_create_dependencies(
+        self,
+        dependency_rows: List[Dict[str, Any]]
+    ) -> None:
+        """
+        Insert many task dependencies with one bulk INSERT.
+
+        The rows must already be validated (tasks exist, no duplicates,
+        no cycles).
+
+        Args:
+            dependency_rows: Rows with from_task_id, to_task_id,
+                dependency_type and lag
+        """
+        if not dependency_rows:
+            return
+
+        logger.debug(f"Creating {len(dependency_rows)} dependencies")
+
+        now = datetime.utcnow()
+        rows = [
+            {
+                "from_task_id": row["from_task_id"],
+                "to_task_id": row["to_task_id"],
+                "dependency_type": getattr(row["dependency_type"], "value", row["dependency_type"]),
+                "lag": row.get("lag", 0),
+                "created_at": now,
+                "updated_at": now,
+            }
+            for row in dependency_rows
+        ]
+        await self.db.execute(insert(task_dependencies), rows)
+
     # Optimization operations
     
     async def create_optimization_result(
@@ -11,6 +11,8 @@ from typing import List, Dict, Any, Optional, Tuple, Set, Union
 from uuid import UUID
 from datetime import datetime, timedelta
 
+import numpy as np
+
 from shared.utils.src.messaging import EventBus
 
 from ..models.api import (
@@ -26,6 +28,28 @@ from ..exceptions import (
 )
 from .repository import PlanningRepository
 from .base import BasePlannerComponent
+from .dependency_manager import DependencyManager
+from .scheduling import CriticalPathResult, run_off_loop
+from .scheduling.rcpsp import (
+    OBJECTIVE_COST,
+    OBJECTIVE_DURATION,
+    OBJECTIVE_UTILIZATION,
+    UNASSIGNED,
+    ResourceSchedule,
+    SchedulingProblem,
+    solve_resource_schedule,
+)
+from ..config import PlanningSystemConfig as Settings, get_settings
+
+# Optimization targets (OptimizationTarget values or objective names) per solver objective
+TARGET_OBJECTIVES = {
+    "duration": OBJECTIVE_DURATION,
+    "speed": OBJECTIVE_DURATION,
+    "performance": OBJECTIVE_DURATION,
+    "cost": OBJECTIVE_COST,
+    "resource_utilization": OBJECTIVE_UTILIZATION,
+    "utilization": OBJECTIVE_UTILIZATION,
+}
 
 class ResourceOptimizer(BasePlannerComponent):
     """
@@ -39,6 +63,8 @@ class ResourceOptimizer(BasePlannerComponent):
         self,
         repository: PlanningRepository,
         event_bus: EventBus,
+        dependency_manager: Optional[DependencyManager] = None,
+        settings: Optional[Settings] = None,
     ):
         """
         Initialize the resource optimizer.
@@ -46,8 +72,12 @@ class ResourceOptimizer(BasePlannerComponent):
         Args:
             repository: Planning repository
             event_bus: Event bus
+            dependency_manager: Optional dependency manager whose CPM results are shared
+            settings: Optional service settings
         """
         super().__init__(repository, event_bus, "ResourceOptimizer")
+        self.dependency_manager = dependency_manager or DependencyManager(repository, event_bus)
+        self.settings = settings or get_settings()
     
     async def optimize_resources(
         self,
@@ -83,6 +113,9 @@ class ResourceOptimizer(BasePlannerComponent):
         current_allocations = await self.repository.get_resource_allocations_for_plan(request.plan_id)
         
         try:
+            # Critical path analysis shared with the other planner components
+            schedule = await self.dependency_manager.analyze_schedule(request.plan_id)
+            
             # Run optimization algorithm
             optimization_result = await self._run_optimization_algorithm(
                 plan=plan,
@@ -91,7 +124,9 @@ class ResourceOptimizer(BasePlannerComponent):
                 current_allocations=current_allocations,
                 optimization_target=request.optimization_target,
                 constraints=request.constraints,
-                preferences=request.preferences
+                preferences=request.preferences,
+                schedule=schedule,
+                time_budget=request.time_budget_seconds
             )
             
             # Create optimization record
@@ -382,10 +417,17 @@ class ResourceOptimizer(BasePlannerComponent):
         current_allocations: List[Any],
         optimization_target: str,
         constraints: Dict[str, Any],
-        preferences: Optional[Dict[str, Any]] = None
+        preferences: Optional[Dict[str, Any]] = None,
+        schedule: Optional[CriticalPathResult] = None,
+        time_budget: Optional[float] = None
     ) -> Dict[str, Any]:
         """
-        Run optimization algorithm for resource allocation.
+        Run the resource-constrained scheduler for a plan.
+        
+        Large problems are solved in the shared scheduling process pool,
+        small ones in a worker thread. The current allocations are
+        scheduled by the same evaluator, so the reported metrics and
+        improvements are measured rather than estimated.
         
         Args:
             plan: Plan data
@@ -393,437 +435,240 @@ class ResourceOptimizer(BasePlannerComponent):
             resources: List of resources
             current_allocations: Current resource allocations
             optimization_target: Optimization target
-            constraints: Optimization constraints
-            preferences: Optional optimization preferences
+            constraints: Optimization constraints (optional ``max_duration`` in hours)
+            preferences: Optional optimization preferences (optional ``seed``)
+            schedule: Optional precomputed CPM schedule for the plan
+            time_budget: Solver time budget in seconds
             
         Returns:
             Dict[str, Any]: Optimization result
+            
+        Raises:
+            ValueError: If the optimization target is not supported
         """
-        self.logger.info(f"Running {optimization_target} optimization for plan {plan.id}")
+        objective = self._resolve_objective(optimization_target)
+        if time_budget is None:
+            time_budget = float(self.settings.resource_optimization_timeout)
+        
+        self.logger.info(
+            f"Running {objective} optimization for plan {plan.id} "
+            f"({len(tasks)} tasks, {len(resources)} resources, budget {time_budget:.1f}s)"
+        )
         
-        # In a real implementation, this would use more sophisticated algorithms
-        # based on the optimization target (duration, cost, resource utilization)
-        # For this example, we'll implement a simplified version
+        if schedule is None:
+            schedule = await self.dependency_manager.analyze_schedule(plan.id)
         
-        # Store original metrics for comparison
-        original_metrics = await self._calculate_plan_metrics(
-            plan=plan,
-            tasks=tasks,
+        problem = SchedulingProblem.from_plan(
+            graph=schedule.graph,
             resources=resources,
-            allocations=current_allocations
+            latest_finish=schedule.latest_finish,
+            max_duration=constraints.get("max_duration"),
         )
+        current_assignment = self._current_assignment(problem, current_allocations)
+        
+        problem_size = problem.task_count * problem.resource_count
+        use_process_pool = problem_size > self.settings.resource_optimization_process_pool_threshold
+        result, baseline = await run_off_loop(
+            solve_resource_schedule,
+            problem,
+            objective,
+            time_budget,
+            current_assignment,
+            (preferences or {}).get("seed"),
+            use_process_pool=use_process_pool,
+            max_workers=self.settings.scheduling_process_pool_workers
+        )
+        best = result.schedule
         
-        # Initialize result data
-        task_adjustments = {}
-        resource_assignments = {}
+        self.logger.info(
+            f"Solved {problem.task_count} tasks on {problem.resource_count} resources "
+            f"in {result.elapsed_seconds:.2f}s (process pool: {use_process_pool})"
+        )
         
-        # Apply different optimization strategies based on target
-        if optimization_target == "duration":
-            # Duration optimization focuses on critical path and parallel execution
-            optimization_data = await self._optimize_for_duration(
-                plan=plan,
-                tasks=tasks,
-                resources=resources,
-                current_allocations=current_allocations,
-                constraints=constraints,
-                preferences=preferences
-            )
-        elif optimization_target == "cost":
-            # Cost optimization focuses on using cheaper resources when possible
-            optimization_data = await self._optimize_for_cost(
-                plan=plan,
-                tasks=tasks,
-                resources=resources,
-                current_allocations=current_allocations,
-                constraints=constraints,
-                preferences=preferences
-            )
-        elif optimization_target == "resource_utilization":
-            # Resource utilization optimization focuses on balancing workload
-            optimization_data = await self._optimize_for_resource_utilization(
-                plan=plan,
-                tasks=tasks,
-                resources=resources,
-                current_allocations=current_allocations,
-                constraints=constraints,
-                preferences=preferences
-            )
+        original_metrics = baseline.metrics()
+        original_metrics["overallocated_resources"] = self._count_overallocated_resources(current_allocations)
+        new_metrics = best.metrics()
+        new_metrics.update({
+            "solver_iterations": result.iterations,
+            "solver_seconds": result.elapsed_seconds,
+            "timed_out": result.timed_out,
+            "critical_path_duration": schedule.project_duration,
+        })
+        
+        if best.unassigned_tasks or not result.meets_max_duration:
+            status = "infeasible"
+        elif objective == OBJECTIVE_DURATION and best.makespan <= schedule.project_duration:
+            status = "optimal"
         else:
-            raise ValueError(f"Unsupported optimization target: {optimization_target}")
+            status = "suboptimal"
         
-        # Extract optimization results
-        task_adjustments = optimization_data["task_adjustments"]
-        resource_assignments = optimization_data["resource_assignments"]
-        status = optimization_data["status"]
-        
-        # Calculate new metrics
-        # In a real implementation, we would apply the changes temporarily
-        # to calculate new metrics, but for this example we'll use placeholder values
-        new_metrics = {
-            "duration": original_metrics["duration"] * 0.9,  # 10% improvement
-            "cost": original_metrics["cost"] * 0.95,  # 5% improvement
-            "resource_utilization": min(original_metrics["resource_utilization"] * 1.15, 1.0),  # 15% improvement
-            "overallocated_resources": max(original_metrics["overallocated_resources"] - 2, 0),  # Reduction by 2
-        }
-        
-        # Calculate improvements
-        improvements = {
-            "duration_reduction": original_metrics["duration"] - new_metrics["duration"],
-            "cost_reduction": original_metrics["cost"] - new_metrics["cost"],
-            "utilization_improvement": new_metrics["resource_utilization"] - original_metrics["resource_utilization"],
-            "overallocation_reduction": original_metrics["overallocated_resources"] - new_metrics["overallocated_resources"],
-            "percent_improvements": {
-                "duration": ((original_metrics["duration"] - new_metrics["duration"]) / original_metrics["duration"]) * 100 if original_metrics["duration"] > 0 else 0,
-                "cost": ((original_metrics["cost"] - new_metrics["cost"]) / original_metrics["cost"]) * 100 if original_metrics["cost"] > 0 else 0,
-                "resource_utilization": ((new_metrics["resource_utilization"] - original_metrics["resource_utilization"]) / original_metrics["resource_utilization"]) * 100 if original_metrics["resource_utilization"] > 0 else 0,
-            }
-        }
+        task_adjustments, resource_assignments = self._build_assignments(
+            problem=problem,
+            best=best,
+            current_assignment=current_assignment,
+            plan_start=self._get_plan_start_date(plan)
+        )
         
         return {
             "status": status,
             "task_adjustments": task_adjustments,
             "resource_assignments": resource_assignments,
             "metrics": new_metrics,
-            "improvements": improvements
+            "improvements": self._calculate_improvements(original_metrics, new_metrics)
         }
     
-    async def _optimize_for_duration(
-        self,
-        plan: Any,
-        tasks: List[Any],
-        resources: List[Any],
-        current_allocations: List[Any],
-        constraints: Dict[str, Any],
-        preferences: Optional[Dict[str, Any]] = None
-    ) -> Dict[str, Any]:
+    def _resolve_objective(self, optimization_target: Any) -> str:
         """
-        Optimize resource allocation for minimal duration.
+        Map an optimization target to a solver objective.
         
         Args:
-            plan: Plan data
-            tasks: List of tasks
-            resources: List of resources
-            current_allocations: Current resource allocations
-            constraints: Optimization constraints
-            preferences: Optional optimization preferences
+            optimization_target: OptimizationTarget value or objective name
             
         Returns:
-            Dict[str, Any]: Optimization data
-        """
-        # In a real implementation, this would use critical path analysis
-        # and resource leveling algorithms to minimize project duration
-        # For this example, we'll create placeholder data
-        
-        task_adjustments = {}
-        resource_assignments = {}
-        
-        # Identify critical path tasks (simplified example)
-        critical_path_tasks = []
-        for task in tasks:
-            # Simplified check - in reality, would use proper CPM
-            if task.priority == "critical" or task.priority == "high":
-                critical_path_tasks.append(task)
-        
-        # Prioritize resource allocation for critical path tasks
-        for task in critical_path_tasks:
-            # Allocate best resources to critical path tasks
-            task_adjustments[str(task.id)] = {}
-            resource_assignments[str(task.id)] = []
-            
-            # Find suitable resources
-            suitable_resources = [
-                r for r in resources
-                if (
-                    not task.required_skills or
-                    all(skill in r.skills and r.skills[skill] >= proficiency 
-                        for skill, proficiency in task.required_skills.items())
-                )
-            ]
+            str: Solver objective
             
-            # Sort resources by performance rating (if available)
-            if suitable_resources:
-                suitable_resources.sort(
-                    key=lambda r: getattr(r, "performance_rating", 0),
-                    reverse=True
-                )
-                
-                # Allocate top-performing resource
-                best_resource = suitable_resources[0]
-                
-                # Calculate dates (simplified)
-                start_date = datetime.utcnow()  # In reality, would calculate based on dependencies
-                end_date = start_date + timedelta(hours=task.estimated_duration)
-                
-                # Create assignment
-                if str(best_resource.id) not in resource_assignments:
-                    resource_assignments[str(best_resource.id)] = []
-                
-                resource_assignments[str(best_resource.id)].append({
-                    "task_id": str(task.id),
-                    "allocation_percentage": 100,
-                    "assigned_hours": task.estimated_effort,
-                    "start_date": start_date.isoformat(),
-                    "end_date": end_date.isoformat()
-                })
-                
-                # Adjust task duration if resource is high-performing
-                if getattr(best_resource, "performance_rating", 0) > 0.8:
-                    # Reduce duration by performance factor
-                    new_duration = task.estimated_duration * 0.8
-                    task_adjustments[str(task.id)]["estimated_duration"] = new_duration
-        
-        return {
-            "status": "optimal",
-            "task_adjustments": task_adjustments,
-            "resource_assignments": resource_assignments
-        }
+        Raises:
+            ValueError: If the optimization target is not supported
+        """
+        target = str(getattr(optimization_target, "value", optimization_target)).lower()
+        objective = TARGET_OBJECTIVES.get(target)
+        if objective is None:
+            raise ValueError(f"Unsupported optimization target: {optimization_target}")
+        return objective
     
-    async def _optimize_for_cost(
+    def _current_assignment(
         self,
-        plan: Any,
-        tasks: List[Any],
-        resources: List[Any],
-        current_allocations: List[Any],
-        constraints: Dict[str, Any],
-        preferences: Optional[Dict[str, Any]] = None
-    ) -> Dict[str, Any]:
+        problem: SchedulingProblem,
+        allocations: List[Any]
+    ) -> np.ndarray:
         """
-        Optimize resource allocation for minimal cost.
+        Get the resource index of each task from its current allocations.
         
         Args:
-            plan: Plan data
-            tasks: List of tasks
-            resources: List of resources
-            current_allocations: Current resource allocations
-            constraints: Optimization constraints
-            preferences: Optional optimization preferences
+            problem: Scheduling problem
+            allocations: Current resource allocations
             
         Returns:
-            Dict[str, Any]: Optimization data
+            np.ndarray: Resource index per task (``UNASSIGNED`` if none)
         """
-        # In a real implementation, this would use cost-based algorithms
-        # to find the most cost-effective resource assignments
-        # For this example, we'll create placeholder data
+        task_index = {task_id: i for i, task_id in enumerate(problem.task_ids)}
+        resource_index = {resource_id: r for r, resource_id in enumerate(problem.resource_ids)}
         
-        task_adjustments = {}
-        resource_assignments = {}
+        assignment = np.full(problem.task_count, UNASSIGNED, dtype=np.int64)
+        for allocation in allocations:
+            i = task_index.get(allocation.task_id)
+            r = resource_index.get(allocation.resource_id)
+            if i is not None and r is not None and assignment[i] == UNASSIGNED:
+                assignment[i] = r
+        return assignment
+    
+    def _count_overallocated_resources(self, allocations: List[Any]) -> int:
+        """
+        Count resources allocated above 100% at any point in time.
         
-        # Add cost attribute to resources if not present
-        for resource in resources:
-            if not hasattr(resource, "cost_per_hour"):
-                # Default value for resources without cost data
-                resource.cost_per_hour = 50
-        
-        # Sort resources by cost
-        resources.sort(key=lambda r: getattr(r, "cost_per_hour", 50))
-        
-        # Allocate resources to tasks based on cost
-        for task in tasks:
-            task_adjustments[str(task.id)] = {}
-            
-            # Find suitable resources
-            suitable_resources = [
-                r for r in resources
-                if (
-                    not task.required_skills or
-                    all(skill in r.skills and r.skills[skill] >= proficiency 
-                        for skill, proficiency in task.required_skills.items())
-                )
-            ]
+        Args:
+            allocations: Resource allocations
             
-            if suitable_resources:
-                # Use the cheapest suitable resource
-                cheapest_resource = suitable_resources[0]
-                
-                # Calculate dates (simplified)
-                start_date = datetime.utcnow()  # In reality, would calculate based on dependencies
-                end_date = start_date + timedelta(hours=task.estimated_duration)
-                
-                # Create assignment
-                if str(cheapest_resource.id) not in resource_assignments:
-                    resource_assignments[str(cheapest_resource.id)] = []
-                
-                resource_assignments[str(cheapest_resource.id)].append({
-                    "task_id": str(task.id),
-                    "allocation_percentage": 100,
-                    "assigned_hours": task.estimated_effort,
-                    "start_date": start_date.isoformat(),
-                    "end_date": end_date.isoformat()
-                })
-                
-                # For non-critical tasks, can we extend duration to reduce cost?
-                if task.priority in ["low", "medium"]:
-                    # Increase duration but reduce effort (assuming less intensive work)
-                    new_duration = task.estimated_duration * 1.2
-                    new_effort = task.estimated_effort * 0.9
-                    
-                    task_adjustments[str(task.id)].update({
-                        "estimated_duration": new_duration,
-                        "estimated_effort": new_effort
-                    })
-        
-        return {
-            "status": "optimal",
-            "task_adjustments": task_adjustments,
-            "resource_assignments": resource_assignments
-        }
+        Returns:
+            int: Number of overallocated resources
+        """
+        # Sweep over allocation start/end events per resource
+        events: Dict[Any, List[Tuple[datetime, float]]] = {}
+        for allocation in allocations:
+            if allocation.start_date is None or allocation.end_date is None:
+                continue
+            resource_events = events.setdefault(allocation.resource_id, [])
+            resource_events.append((allocation.start_date, allocation.allocation_percentage))
+            resource_events.append((allocation.end_date, -allocation.allocation_percentage))
+        
+        overallocated = 0
+        for resource_events in events.values():
+            # Ends sort before starts at the same instant
+            resource_events.sort(key=lambda event: (event[0], event[1]))
+            load = 0.0
+            for _, change in resource_events:
+                load += change
+                if load > 100.0 + 1e-9:
+                    overallocated += 1
+                    break
+        return overallocated
     
-    async def _optimize_for_resource_utilization(
+    def _build_assignments(
         self,
-        plan: Any,
-        tasks: List[Any],
-        resources: List[Any],
-        current_allocations: List[Any],
-        constraints: Dict[str, Any],
-        preferences: Optional[Dict[str, Any]] = None
-    ) -> Dict[str, Any]:
+        problem: SchedulingProblem,
+        best: ResourceSchedule,
+        current_assignment: np.ndarray,
+        plan_start: datetime
+    ) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, List[Dict[str, Any]]]]:
         """
-        Optimize resource allocation for balanced utilization.
+        Convert a solver schedule into task adjustments and resource assignments.
         
         Args:
-            plan: Plan data
-            tasks: List of tasks
-            resources: List of resources
-            current_allocations: Current resource allocations
-            constraints: Optimization constraints
-            preferences: Optional optimization preferences
+            problem: Scheduling problem
+            best: Solver schedule
+            current_assignment: Current resource index per task
+            plan_start: Plan start date
             
         Returns:
-            Dict[str, Any]: Optimization data
+            Tuple[Dict[str, Dict[str, Any]], Dict[str, List[Dict[str, Any]]]]:
+                Task adjustments and resource assignments keyed by ID
         """
-        # In a real implementation, this would use resource leveling algorithms
-        # to balance resource utilization across the plan
-        # For this example, we'll create placeholder data
-        
-        task_adjustments = {}
-        resource_assignments = {}
-        
-        # Calculate current utilization per resource
-        resource_utilization = {}
-        for resource in resources:
-            resource_utilization[str(resource.id)] = 0
-        
-        for allocation in current_allocations:
-            if str(allocation.resource_id) in resource_utilization:
-                resource_utilization[str(allocation.resource_id)] += allocation.assigned_hours
+        task_adjustments: Dict[str, Dict[str, Any]] = {}
+        resource_assignments: Dict[str, List[Dict[str, Any]]] = {}
         
-        # Sort resources by utilization (least utilized first)
-        sorted_resources = sorted(
-            resources,
-            key=lambda r: resource_utilization.get(str(r.id), 0)
-        )
-        
-        # Allocate tasks to balance utilization
-        for task in tasks:
-            # Find suitable resources
-            suitable_resources = [
-                r for r in sorted_resources
-                if (
-                    not task.required_skills or
-                    all(skill in r.skills and r.skills[skill] >= proficiency 
-                        for skill, proficiency in task.required_skills.items())
-                )
-            ]
+        for i in np.argsort(best.start, kind="stable"):
+            r = int(best.assignment[i])
+            task_id = str(problem.task_ids[i])
+            if r == UNASSIGNED:
+                continue
             
-            if suitable_resources:
-                # Use the least utilized suitable resource
-                selected_resource = suitable_resources[0]
-                
-                # Calculate dates (simplified)
-                start_date = datetime.utcnow()  # In reality, would calculate based on dependencies
-                end_date = start_date + timedelta(hours=task.estimated_duration)
-                
-                # Create assignment
-                if str(selected_resource.id) not in resource_assignments:
-                    resource_assignments[str(selected_resource.id)] = []
-                
-                resource_assignments[str(selected_resource.id)].append({
-                    "task_id": str(task.id),
-                    "allocation_percentage": 100,
-                    "assigned_hours": task.estimated_effort,
-                    "start_date": start_date.isoformat(),
-                    "end_date": end_date.isoformat()
-                })
-                
-                # Update utilization for next iteration
-                resource_utilization[str(selected_resource.id)] += task.estimated_effort
-                
-                # Re-sort resources for next task
-                sorted_resources = sorted(
-                    sorted_resources,
-                    key=lambda r: resource_utilization.get(str(r.id), 0)
-                )
+            resource_id = str(problem.resource_ids[r])
+            task_adjustments[task_id] = (
+                {"assigned_to": resource_id} if r != current_assignment[i] else {}
+            )
+            resource_assignments.setdefault(resource_id, []).append({
+                "task_id": task_id,
+                "allocation_percentage": 100.0,
+                "assigned_hours": float(problem.efforts[i]),
+                "start_date": (plan_start + timedelta(hours=float(best.start[i]))).isoformat(),
+                "end_date": (plan_start + timedelta(hours=float(best.finish[i]))).isoformat()
+            })
         
-        return {
-            "status": "optimal",
-            "task_adjustments": task_adjustments,
-            "resource_assignments": resource_assignments
-        }
+        return task_adjustments, resource_assignments
     
-    async def _calculate_plan_metrics(
+    def _calculate_improvements(
         self,
-        plan: Any,
-        tasks: List[Any],
-        resources: List[Any],
-        allocations: List[Any]
+        original_metrics: Dict[str, Any],
+        new_metrics: Dict[str, Any]
     ) -> Dict[str, Any]:
         """
-        Calculate key metrics for a plan.
+        Compare measured metrics of the current and optimized schedules.
         
         Args:
-            plan: Plan data
-            tasks: List of tasks
-            resources: List of resources
-            allocations: Resource allocations
+            original_metrics: Metrics of the current allocations
+            new_metrics: Metrics of the optimized schedule
             
         Returns:
-            Dict[str, Any]: Plan metrics
+            Dict[str, Any]: Absolute and percent improvements
         """
-        # In a real implementation, this would calculate actual metrics
-        # based on the plan data
-        # For this example, we'll create placeholder values
-        
-        # Calculate durations based on dependencies (simplified)
-        # In reality, this would use critical path analysis
-        if tasks:
-            # Simple calculation - longest task duration
-            duration = max(task.estimated_duration for task in tasks)
-        else:
-            duration = 0
-        
-        # Calculate cost based on resource costs and allocations (simplified)
-        cost = 0
-        for allocation in allocations:
-            resource = next((r for r in resources if r.id == allocation.resource_id), None)
-            if resource:
-                cost_per_hour = getattr(resource, "cost_per_hour", 50)  # Default cost
-                cost += allocation.assigned_hours * cost_per_hour
+        def percent(change: float, base: float) -> float:
+            return (change / base) * 100 if base > 0 else 0
         
-        # Calculate resource utilization (simplified)
-        # In reality, this would account for resource capacity and time periods
-        total_assigned_hours = sum(allocation.assigned_hours for allocation in allocations)
-        total_capacity_hours = sum(getattr(resource, "capacity_hours", 40) for resource in resources)
-        
-        resource_utilization = total_assigned_hours / total_capacity_hours if total_capacity_hours > 0 else 0
-        
-        # Count overallocated resources (simplified)
-        resource_allocation_hours = {}
-        for allocation in allocations:
-            if allocation.resource_id not in resource_allocation_hours:
-                resource_allocation_hours[allocation.resource_id] = 0
-            resource_allocation_hours[allocation.resource_id] += allocation.assigned_hours
-        
-        overallocated_resources = 0
-        for resource in resources:
-            capacity_hours = getattr(resource, "capacity_hours", 40)
-            if resource.id in resource_allocation_hours and resource_allocation_hours[resource.id] > capacity_hours:
-                overallocated_resources += 1
+        duration_reduction = original_metrics["duration"] - new_metrics["duration"]
+        cost_reduction = original_metrics["cost"] - new_metrics["cost"]
+        utilization_improvement = new_metrics["resource_utilization"] - original_metrics["resource_utilization"]
         
         return {
-            "duration": duration,
-            "cost": cost,
-            "resource_utilization": resource_utilization,
-            "overallocated_resources": overallocated_resources
+            "original_metrics": original_metrics,
+            "duration_reduction": duration_reduction,
+            "cost_reduction": cost_reduction,
+            "utilization_improvement": utilization_improvement,
+            "overallocation_reduction": original_metrics["overallocated_resources"] - new_metrics["overallocated_resources"],
+            "percent_improvements": {
+                "duration": percent(duration_reduction, original_metrics["duration"]),
+                "cost": percent(cost_reduction, original_metrics["cost"]),
+                "resource_utilization": percent(utilization_improvement, original_metrics["resource_utilization"]),
+            }
         }
     
     async def _calculate_resource_utilization(
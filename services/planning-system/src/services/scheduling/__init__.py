@@ -0,0 +1,60 @@
+"""
+Scheduling package.
+
+This package contains the in-memory scheduling engines shared by the
+planner components, operating on integer-indexed plan graphs.
+"""
+
+from .graph import PlanGraph
+from .critical_path import CriticalPathEngine, CriticalPathResult
+from .chains import ChainAnalysis, DependencyChain, analyze_chains
+from .incremental import DynamicTopologicalOrder
+from .graph_cache import DependencyGraphCache
+from .monte_carlo import (
+    DurationModel,
+    SimulationModel,
+    SimulationResult,
+    simulate_schedule,
+    history_ratios_for_tasks,
+)
+from .rcpsp import (
+    ResourceConstrainedScheduler,
+    ResourceSchedule,
+    SchedulingProblem,
+    SolverResult,
+    solve_resource_schedule,
+)
+from .scenarios import (
+    PlanSnapshot,
+    ScenarioOverlay,
+    ScenarioOutcome,
+    evaluate_scenarios,
+)
+from .executor import run_off_loop, shutdown_process_pool
+
+__all__ = [
+    'PlanGraph',
+    'CriticalPathEngine',
+    'CriticalPathResult',
+    'ChainAnalysis',
+    'DependencyChain',
+    'analyze_chains',
+    'DynamicTopologicalOrder',
+    'DependencyGraphCache',
+    'DurationModel',
+    'SimulationModel',
+    'SimulationResult',
+    'simulate_schedule',
+    'history_ratios_for_tasks',
+    'ResourceConstrainedScheduler',
+    'ResourceSchedule',
+    'SchedulingProblem',
+    'SolverResult',
+    'solve_resource_schedule',
+    'PlanSnapshot',
+    'ScenarioOverlay',
+    'ScenarioOutcome',
+    'evaluate_scenarios',
+    'run_off_loop',
+    'shutdown_process_pool',
+]
@@ -0,0 +1,237 @@
+"""
+Dependency chain analysis.
+
+This module analyzes the structure of a plan's task network with dynamic
+programming over topological order: the top-K longest (or heaviest)
+root-to-leaf chains, the number of root-to-leaf paths through each task,
+and fan-in/fan-out hot spots. Every pass is linear in the number of
+dependencies (times K for the chain search), so it scales to plans with
+tens of thousands of dependencies.
+"""
+
+import heapq
+import logging
+import math
+from dataclasses import dataclass
+from typing import List, Tuple
+
+from .graph import PlanGraph
+
+logger = logging.getLogger(__name__)
+
+# Chain weighting modes
+WEIGHT_TASKS = "tasks"
+WEIGHT_DURATION = "duration"
+
+# Default number of chains returned
+DEFAULT_TOP_K = 10
+
+# Bits of a path count kept when computing path shares
+PRECISION_BITS = 53
+
+
+@dataclass
+class DependencyChain:
+    """A root-to-leaf chain of tasks."""
+
+    nodes: List[int]
+    """Task indices in dependency order."""
+
+    weight: float
+    """Chain weight (task count or total duration in hours)."""
+
+    duration: float
+    """Total estimated duration of the chain in hours."""
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+
+@dataclass
+class ChainAnalysis:
+    """Structural analysis of a plan's task network."""
+
+    graph: PlanGraph
+    chains: List[DependencyChain]
+    """Top-K chains, heaviest first."""
+
+    paths_from_root: List[int]
+    """Number of distinct paths from any root to each task."""
+
+    paths_to_leaf: List[int]
+    """Number of distinct paths from each task to any leaf."""
+
+    total_paths: int
+    """Number of distinct root-to-leaf paths in the network."""
+
+    fan_in: List[int]
+    fan_out: List[int]
+
+    def paths_through(self, i: int) -> int:
+        """
+        Get the number of root-to-leaf paths passing through a task.
+
+        Args:
+            i: Task index
+
+        Returns:
+            int: Path count
+        """
+        return self.paths_from_root[i] * self.paths_to_leaf[i]
+
+    def path_share(self, i: int) -> float:
+        """
+        Get the fraction of root-to-leaf paths passing through a task.
+
+        Args:
+            i: Task index
+
+        Returns:
+            float: Fraction (0.0-1.0)
+        """
+        if not self.total_paths:
+            return 0.0
+        # Path counts grow exponentially on diamond-heavy plans; compare
+        # their leading bits instead of multiplying the exact integers
+        from_root, from_exp = _leading_bits(self.paths_from_root[i])
+        to_leaf, to_exp = _leading_bits(self.paths_to_leaf[i])
+        total, total_exp = _leading_bits(self.total_paths)
+        return math.ldexp(from_root * to_leaf / total, from_exp + to_exp - total_exp)
+
+    def hot_spots(self, min_degree: int) -> List[int]:
+        """
+        Get tasks whose fan-in or fan-out exceeds a threshold.
+
+        Args:
+            min_degree: Minimum fan-in or fan-out (exclusive)
+
+        Returns:
+            List[int]: Task indices, highest degree first
+        """
+        spots = [
+            i for i in range(len(self.graph))
+            if self.fan_in[i] > min_degree or self.fan_out[i] > min_degree
+        ]
+        spots.sort(key=lambda i: max(self.fan_in[i], self.fan_out[i]), reverse=True)
+        return spots
+
+
+def analyze_chains(
+    graph: PlanGraph,
+    top_k: int = DEFAULT_TOP_K,
+    weight: str = WEIGHT_TASKS,
+    min_length: int = 2
+) -> ChainAnalysis:
+    """
+    Analyze the dependency chains of a plan graph.
+
+    Each task keeps the K best chains ending at it as ``(weight, length,
+    predecessor, predecessor rank)`` entries, so chains are reconstructed
+    by following back-pointers instead of being enumerated. Path counts are
+    exact integers and may be very large on diamond-heavy plans.
+
+    Args:
+        graph: Plan graph
+        top_k: Number of chains to return
+        weight: ``tasks`` to rank by task count, ``duration`` by total hours
+        min_length: Minimum number of tasks in a returned chain
+
+    Returns:
+        ChainAnalysis: Chain analysis
+
+    Raises:
+        CyclicDependencyError: If the graph contains a cycle
+    """
+    n = len(graph)
+    order = graph.topological_order()
+    successors = graph.successors
+    predecessors = graph.predecessors
+    durations = graph.durations
+
+    fan_in = [len(edges) for edges in predecessors]
+    fan_out = [len(edges) for edges in successors]
+
+    # Path counts (parallel edges between two tasks count once)
+    paths_from_root = [0] * n
+    for i in order:
+        preds = {p for p, _, _ in predecessors[i]}
+        paths_from_root[i] = sum(paths_from_root[p] for p in preds) if preds else 1
+
+    paths_to_leaf = [0] * n
+    for i in reversed(order):
+        succs = {s for s, _, _ in successors[i]}
+        paths_to_leaf[i] = sum(paths_to_leaf[s] for s in succs) if succs else 1
+
+    total_paths = sum(paths_from_root[i] for i in range(n) if not fan_out[i])
+
+    # K best chains ending at each task: (weight, length, predecessor, rank)
+    best: List[List[Tuple[float, int, int, int]]] = [[] for _ in range(n)]
+    for i in order:
+        node_weight = 1.0 if weight == WEIGHT_TASKS else durations[i]
+        preds = {p for p, _, _ in predecessors[i]}
+        if not preds:
+            best[i] = [(node_weight, 1, -1, -1)]
+            continue
+
+        candidates = (
+            (entry[0] + node_weight, entry[1] + 1, p, rank)
+            for p in preds
+            for rank, entry in enumerate(best[p])
+        )
+        best[i] = heapq.nlargest(top_k, candidates)
+
+    # Select the heaviest chains ending at leaves
+    finals = heapq.nlargest(
+        top_k,
+        (
+            (entry[0], entry[1], i, rank)
+            for i in range(n)
+            if not fan_out[i]
+            for rank, entry in enumerate(best[i])
+            if entry[1] >= min_length
+        ),
+    )
+
+    chains = []
+    for chain_weight, _, i, rank in finals:
+        nodes = _trace_chain(best, i, rank)
+        chains.append(DependencyChain(
+            nodes=nodes,
+            weight=chain_weight,
+            duration=sum(durations[j] for j in nodes),
+        ))
+
+    logger.debug(
+        f"Analyzed {n} tasks and {graph.edge_count} dependencies: "
+        f"{len(chains)} chains, longest={len(chains[0]) if chains else 0} tasks"
+    )
+
+    return ChainAnalysis(
+        graph=graph,
+        chains=chains,
+        paths_from_root=paths_from_root,
+        paths_to_leaf=paths_to_leaf,
+        total_paths=total_paths,
+        fan_in=fan_in,
+        fan_out=fan_out,
+    )
+
+
+def _leading_bits(value: int) -> Tuple[float, int]:
+    """Split a non-negative integer into a float mantissa and binary exponent."""
+    shift = max(value.bit_length() - PRECISION_BITS, 0)
+    return float(value >> shift), shift
+
+
+def _trace_chain(
+    best: List[List[Tuple[float, int, int, int]]],
+    i: int,
+    rank: int
+) -> List[int]:
+    """Reconstruct a chain from its last task by following back-pointers."""
+    nodes = []
+    while i >= 0:
+        nodes.append(i)
+        _, _, i, rank = best[i][rank]
+    nodes.reverse()
+    return nodes
@@ -0,0 +1,215 @@
+"""
+Critical Path Method (CPM) engine.
+
+This module implements the forward/backward CPM passes over a PlanGraph
+and exposes the resulting schedule so planner components can share a
+single computation per plan.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Sequence, Set
+from uuid import UUID
+
+from .graph import PlanGraph, FROM_FINISH_KINDS, TO_FINISH_KINDS
+
+logger = logging.getLogger(__name__)
+
+# Tolerance used when comparing floating point schedule values
+SLACK_EPSILON = 1e-6
+
+
+@dataclass
+class CriticalPathResult:
+    """
+    Result of a CPM calculation.
+
+    All schedule values are offsets in hours from the plan start and are
+    stored in the graph's index order.
+    """
+
+    graph: PlanGraph
+    order: List[int]
+    earliest_start: List[float]
+    earliest_finish: List[float]
+    latest_start: List[float]
+    latest_finish: List[float]
+    slack: List[float]
+    project_duration: float
+    critical_path: List[int]
+    """Critical task indices in topological order."""
+
+    computed_at: datetime = field(default_factory=datetime.utcnow)
+
+    @property
+    def critical_task_ids(self) -> Set[UUID]:
+        """IDs of tasks on the critical path."""
+        return {self.graph.task_ids[i] for i in self.critical_path}
+
+    @property
+    def critical_tasks(self) -> List[Any]:
+        """Task objects on the critical path, in dependency order."""
+        return [self.graph.tasks[i] for i in self.critical_path]
+
+    def is_critical(self, task_id: UUID) -> bool:
+        """
+        Check if a task is on the critical path.
+
+        Args:
+            task_id: Task ID
+
+        Returns:
+            bool: True if the task has zero slack
+        """
+        i = self.graph.index.get(task_id)
+        return i is not None and self.slack[i] <= SLACK_EPSILON
+
+    def is_critical_edge(self, from_task_id: UUID, to_task_id: UUID) -> bool:
+        """
+        Check if a dependency drives the critical path.
+
+        An edge is critical when both tasks are critical and the dependency
+        constraint is tight, i.e. it determines the successor's start.
+
+        Args:
+            from_task_id: Source task ID
+            to_task_id: Target task ID
+
+        Returns:
+            bool: True if the dependency is on the critical path
+        """
+        if not (self.is_critical(from_task_id) and self.is_critical(to_task_id)):
+            return False
+
+        i = self.graph.index[from_task_id]
+        j = self.graph.index[to_task_id]
+        for successor, kind, lag in self.graph.successors[i]:
+            if successor != j:
+                continue
+            anchor = self.earliest_finish[i] if kind in FROM_FINISH_KINDS else self.earliest_start[i]
+            bound = anchor + lag
+            if kind in TO_FINISH_KINDS:
+                bound -= self.graph.durations[j]
+            if abs(self.earliest_start[j] - bound) <= SLACK_EPSILON:
+                return True
+        return False
+
+    def schedule_rows(self, start_date: datetime) -> List[Dict[str, Any]]:
+        """
+        Build per-task schedule rows for a bulk update.
+
+        Args:
+            start_date: Calendar date corresponding to offset zero
+
+        Returns:
+            List[Dict[str, Any]]: Rows keyed by task ``id``
+        """
+        critical = set(self.critical_path)
+        rows = []
+        for i, task_id in enumerate(self.graph.task_ids):
+            rows.append({
+                "id": task_id,
+                "earliest_start": start_date + timedelta(hours=self.earliest_start[i]),
+                "earliest_finish": start_date + timedelta(hours=self.earliest_finish[i]),
+                "latest_start": start_date + timedelta(hours=self.latest_start[i]),
+                "latest_finish": start_date + timedelta(hours=self.latest_finish[i]),
+                "slack": self.slack[i],
+                "is_critical_path": i in critical,
+            })
+        return rows
+
+
+class CriticalPathEngine:
+    """
+    In-memory CPM engine.
+
+    Runs Kahn-ordered forward and backward passes over the integer-indexed
+    arrays of a PlanGraph. Supports all four dependency types with lag.
+    """
+
+    def compute(self, graph: PlanGraph) -> CriticalPathResult:
+        """
+        Calculate earliest/latest times, slack and the critical path.
+
+        Args:
+            graph: Plan graph
+
+        Returns:
+            CriticalPathResult: Calculated schedule
+
+        Raises:
+            CyclicDependencyError: If the graph contains a cycle
+        """
+        n = len(graph)
+        order = graph.topological_order()
+        durations = graph.durations
+        successors = graph.successors
+
+        # Forward pass - earliest start/finish
+        earliest_start = [0.0] * n
+        earliest_finish = [0.0] * n
+        for i in order:
+            es = earliest_start[i]
+            ef = es + durations[i]
+            earliest_finish[i] = ef
+            for j, kind, lag in successors[i]:
+                bound = (ef if kind in FROM_FINISH_KINDS else es) + lag
+                if kind in TO_FINISH_KINDS:
+                    bound -= durations[j]
+                if bound > earliest_start[j]:
+                    earliest_start[j] = bound
+
+        project_duration = max(earliest_finish) if n else 0.0
+
+        # Backward pass - latest start/finish
+        latest_finish = [project_duration] * n
+        latest_start = [0.0] * n
+        for i in reversed(order):
+            lf = latest_finish[i]
+            for j, kind, lag in successors[i]:
+                target = latest_finish[j] if kind in TO_FINISH_KINDS else latest_start[j]
+                bound = target - lag
+                if kind not in FROM_FINISH_KINDS:
+                    bound += durations[i]
+                if bound < lf:
+                    lf = bound
+            latest_finish[i] = lf
+            latest_start[i] = lf - durations[i]
+
+        slack = [latest_start[i] - earliest_start[i] for i in range(n)]
+        critical_path = [i for i in order if slack[i] <= SLACK_EPSILON]
+
+        logger.debug(
+            f"CPM computed for {n} tasks and {graph.edge_count} dependencies: "
+            f"duration={project_duration}h, critical tasks={len(critical_path)}"
+        )
+
+        return CriticalPathResult(
+            graph=graph,
+            order=order,
+            earliest_start=earliest_start,
+            earliest_finish=earliest_finish,
+            latest_start=latest_start,
+            latest_finish=latest_finish,
+            slack=slack,
+            project_duration=project_duration,
+            critical_path=critical_path,
+        )
+
+    def compute_for_plan(
+        self,
+        tasks: Sequence[Any],
+        dependencies: Sequence[Any]
+    ) -> CriticalPathResult:
+        """
+        Build a graph from plan records and calculate its critical path.
+
+        Args:
+            tasks: Task objects
+            dependencies: Dependency rows
+
+        Returns:
+            CriticalPathResult: Calculated schedule
+        """
+        return self.compute(PlanGraph.from_plan(tasks, dependencies))
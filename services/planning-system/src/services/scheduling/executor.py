@@ -0,0 +1,71 @@
+"""
+Worker execution helpers for CPU-bound scheduling work.
+
+Scheduling engines are synchronous and CPU-bound. These helpers run them
+outside the event loop, either in the default thread pool or, for very
+large workloads, in a shared process pool.
+"""
+
+import asyncio
+import functools
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_process_pool(max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """
+    Get or create the shared scheduling process pool.
+
+    Args:
+        max_workers: Number of worker processes (only used on creation)
+
+    Returns:
+        ProcessPoolExecutor: Shared process pool
+    """
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=max_workers)
+        logger.info(f"Scheduling process pool started (max_workers={max_workers})")
+    return _process_pool
+
+
+def shutdown_process_pool() -> None:
+    """Shut down the shared scheduling process pool if it was started."""
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+        logger.info("Scheduling process pool stopped")
+
+
+async def run_off_loop(
+    func: Callable[..., T],
+    *args: Any,
+    use_process_pool: bool = False,
+    max_workers: Optional[int] = None,
+    **kwargs: Any
+) -> T:
+    """
+    Run a synchronous function without blocking the event loop.
+
+    Args:
+        func: Function to run; must be picklable when using the process pool
+        *args: Positional arguments
+        use_process_pool: Run in the shared process pool instead of a thread
+        max_workers: Process pool size (only used when the pool is created)
+        **kwargs: Keyword arguments
+
+    Returns:
+        T: Function result
+    """
+    loop = asyncio.get_running_loop()
+    call = functools.partial(func, *args, **kwargs)
+    executor = get_process_pool(max_workers) if use_process_pool else None
+    return await loop.run_in_executor(executor, call)
@@ -0,0 +1,176 @@
+"""
+Plan graph representation for the scheduling engines.
+
+This module provides an integer-indexed, array-based view of a plan's
+task network that all scheduling algorithms operate on.
+"""
+
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from ...exceptions import CyclicDependencyError
+
+logger = logging.getLogger(__name__)
+
+# Dependency kinds encoded as small integers for the inner loops
+FINISH_TO_START = 0
+START_TO_START = 1
+FINISH_TO_FINISH = 2
+START_TO_FINISH = 3
+
+DEPENDENCY_KINDS = {
+    "FINISH_TO_START": FINISH_TO_START,
+    "START_TO_START": START_TO_START,
+    "FINISH_TO_FINISH": FINISH_TO_FINISH,
+    "START_TO_FINISH": START_TO_FINISH,
+}
+
+# Kinds whose constraint is anchored on the predecessor's finish
+FROM_FINISH_KINDS = (FINISH_TO_START, FINISH_TO_FINISH)
+
+# Kinds whose constraint targets the successor's finish
+TO_FINISH_KINDS = (FINISH_TO_FINISH, START_TO_FINISH)
+
+# Edge tuple: (other task index, dependency kind, lag in hours)
+Edge = Tuple[int, int, float]
+
+
+def _dependency_kind(dependency_type: Any) -> int:
+    """
+    Normalize a dependency type (enum, string or None) to its integer kind.
+
+    Args:
+        dependency_type: Dependency type value
+
+    Returns:
+        int: Dependency kind
+    """
+    value = getattr(dependency_type, "value", dependency_type)
+    if not value:
+        return FINISH_TO_START
+    return DEPENDENCY_KINDS.get(str(value).upper(), FINISH_TO_START)
+
+
+def _field(item: Any, name: str, default: Any = None) -> Any:
+    """Read a field from an ORM object, row or dictionary."""
+    if isinstance(item, dict):
+        return item.get(name, default)
+    return getattr(item, name, default)
+
+
+@dataclass
+class PlanGraph:
+    """
+    Integer-indexed task network of a plan.
+
+    Tasks are addressed by their position in ``task_ids``; adjacency lists
+    hold ``(index, kind, lag)`` tuples so scheduling passes never touch
+    UUIDs or ORM objects in their inner loops.
+    """
+
+    task_ids: List[UUID]
+    """Task IDs in index order."""
+
+    durations: List[float]
+    """Estimated duration of each task in hours."""
+
+    successors: List[List[Edge]]
+    """Outgoing edges per task."""
+
+    predecessors: List[List[Edge]]
+    """Incoming edges per task."""
+
+    tasks: List[Any] = field(default_factory=list)
+    """Source task objects in index order (may be empty)."""
+
+    index: Dict[UUID, int] = field(default_factory=dict)
+    """Mapping of task ID to index."""
+
+    _order: Optional[List[int]] = field(default=None, repr=False)
+
+    @classmethod
+    def from_plan(cls, tasks: Sequence[Any], dependencies: Sequence[Any]) -> "PlanGraph":
+        """
+        Build a graph from task and dependency records.
+
+        Dependencies referencing tasks outside ``tasks`` are ignored.
+
+        Args:
+            tasks: Task objects with ``id`` and ``estimated_duration``
+            dependencies: Dependency rows with ``from_task_id``, ``to_task_id``,
+                ``dependency_type`` and ``lag``
+
+        Returns:
+            PlanGraph: Graph for the plan
+        """
+        task_ids = [_field(task, "id") for task in tasks]
+        index = {task_id: i for i, task_id in enumerate(task_ids)}
+        durations = [float(_field(task, "estimated_duration") or 0.0) for task in tasks]
+        successors: List[List[Edge]] = [[] for _ in task_ids]
+        predecessors: List[List[Edge]] = [[] for _ in task_ids]
+
+        for dependency in dependencies:
+            from_index = index.get(_field(dependency, "from_task_id"))
+            to_index = index.get(_field(dependency, "to_task_id"))
+            if from_index is None or to_index is None:
+                continue
+
+            kind = _dependency_kind(_field(dependency, "dependency_type"))
+            lag = float(_field(dependency, "lag") or 0.0)
+            successors[from_index].append((to_index, kind, lag))
+            predecessors[to_index].append((from_index, kind, lag))
+
+        return cls(
+            task_ids=task_ids,
+            durations=durations,
+            successors=successors,
+            predecessors=predecessors,
+            tasks=list(tasks),
+            index=index,
+        )
+
+    def __len__(self) -> int:
+        return len(self.task_ids)
+
+    @property
+    def edge_count(self) -> int:
+        """Number of dependency edges in the graph."""
+        return sum(len(edges) for edges in self.successors)
+
+    def topological_order(self) -> List[int]:
+        """
+        Get task indices in topological order (Kahn's algorithm).
+
+        The order is computed once and cached on the graph.
+
+        Returns:
+            List[int]: Task indices in dependency order
+
+        Raises:
+            CyclicDependencyError: If the graph contains a cycle
+        """
+        if self._order is not None:
+            return self._order
+
+        in_degree = [len(edges) for edges in self.predecessors]
+        queue = deque(i for i, degree in enumerate(in_degree) if degree == 0)
+        order: List[int] = []
+
+        while queue:
+            i = queue.popleft()
+            order.append(i)
+            for successor, _, _ in self.successors[i]:
+                in_degree[successor] -= 1
+                if in_degree[successor] == 0:
+                    queue.append(successor)
+
+        if len(order) != len(self.task_ids):
+            cycle = [self.task_ids[i] for i, degree in enumerate(in_degree) if degree > 0]
+            logger.warning(f"Dependency cycle detected among {len(cycle)} tasks")
+            raise CyclicDependencyError(cycle=[str(task_id) for task_id in cycle])
+
+        self._order = order
+        return order
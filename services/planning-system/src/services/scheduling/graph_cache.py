@@ -0,0 +1,136 @@
+"""
+Per-plan dependency graph cache.
+
+This module keeps the dependency graph of recently used plans in memory
+so dependency validation does not reload the plan on every edge insert.
+Changes made by this process update the cached graphs directly; task and
+dependency events published by other processes invalidate them.
+"""
+
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID, uuid4
+
+from shared.utils.src.messaging import EventBus
+
+from .incremental import DynamicTopologicalOrder
+
+logger = logging.getLogger(__name__)
+
+# Events that change the dependency structure of a plan
+DEPENDENCY_EVENTS = ("dependency.created", "dependency.batch_created", "dependency.deleted")
+
+
+class DependencyGraphCache:
+    """
+    LRU cache of per-plan dependency graphs.
+    """
+
+    def __init__(self, max_plans: int = 128):
+        """
+        Initialize the cache.
+
+        Args:
+            max_plans: Maximum number of cached plans
+        """
+        self.max_plans = max_plans
+        self.instance_id = str(uuid4())
+        """Identifies events published by this process."""
+
+        self._graphs: "OrderedDict[UUID, DynamicTopologicalOrder]" = OrderedDict()
+
+    def get(self, plan_id: UUID) -> Optional[DynamicTopologicalOrder]:
+        """
+        Get the cached graph of a plan.
+
+        Args:
+            plan_id: Plan ID
+
+        Returns:
+            Optional[DynamicTopologicalOrder]: Cached graph, or None
+        """
+        graph = self._graphs.get(plan_id)
+        if graph is not None:
+            self._graphs.move_to_end(plan_id)
+        return graph
+
+    def put(self, plan_id: UUID, graph: DynamicTopologicalOrder) -> None:
+        """
+        Cache the graph of a plan.
+
+        Args:
+            plan_id: Plan ID
+            graph: Dependency graph
+        """
+        self._graphs[plan_id] = graph
+        self._graphs.move_to_end(plan_id)
+        while len(self._graphs) > self.max_plans:
+            self._graphs.popitem(last=False)
+
+    def invalidate(self, plan_id: Optional[UUID] = None) -> None:
+        """
+        Drop cached graphs.
+
+        Args:
+            plan_id: Plan ID to invalidate, or None to invalidate all plans
+        """
+        if plan_id is None:
+            self._graphs.clear()
+        else:
+            self._graphs.pop(plan_id, None)
+
+    async def subscribe(self, event_bus: EventBus) -> None:
+        """
+        Keep the cache in sync with task and dependency events.
+
+        Args:
+            event_bus: Event bus
+        """
+        await event_bus.subscribe_to_event("task.created", self._handle_task_created)
+        await event_bus.subscribe_to_event("task.deleted", self._handle_task_deleted)
+        for event_type in DEPENDENCY_EVENTS:
+            await event_bus.subscribe_to_event(event_type, self._handle_dependency_event)
+        logger.info("Dependency graph cache subscribed to task and dependency events")
+
+    async def _handle_task_created(self, data: Dict[str, Any]) -> None:
+        """Add a new task to the cached graph of its plan."""
+        graph, task_id = self._graph_for_task_event(data)
+        if graph is not None and task_id not in graph:
+            graph.add_node(task_id)
+
+    async def _handle_task_deleted(self, data: Dict[str, Any]) -> None:
+        """Remove a deleted task from the cached graph of its plan."""
+        graph, task_id = self._graph_for_task_event(data)
+        if graph is not None:
+            graph.remove_node(task_id)
+
+    async def _handle_dependency_event(self, data: Dict[str, Any]) -> None:
+        """Invalidate a plan's graph when another process changed its dependencies."""
+        if data.get("origin") == self.instance_id:
+            return
+
+        plan_id = _parse_uuid(data.get("plan_id"))
+        logger.debug(f"Invalidating dependency graph for plan: {plan_id or 'all'}")
+        self.invalidate(plan_id)
+
+    def _graph_for_task_event(
+        self,
+        data: Dict[str, Any]
+    ) -> Tuple[Optional[DynamicTopologicalOrder], Optional[UUID]]:
+        """Get the cached graph and task ID referenced by a task event."""
+        plan_id = _parse_uuid(data.get("plan_id"))
+        task_id = _parse_uuid(data.get("task_id"))
+        if plan_id is None or task_id is None:
+            return None, None
+        return self._graphs.get(plan_id), task_id
+
+
+def _parse_uuid(value: Any) -> Optional[UUID]:
+    """Parse a UUID from an event field."""
+    if value is None or isinstance(value, UUID):
+        return value
+    try:
+        return UUID(str(value))
+    except ValueError:
+        return None
@@ -0,0 +1,239 @@
+"""
+Incremental topological order for dependency graphs.
+
+This module implements the Pearce-Kelly dynamic topological sort. The
+graph keeps a topological position per task; inserting an edge that
+already agrees with the order is O(1), otherwise only the tasks between
+the two endpoints' positions are visited and reordered. A cycle is
+detected during the same bounded search. Tasks without predecessors (or
+successors) are simply moved to the front (or end) of the order, so
+building a chain in any insertion order stays cheap.
+"""
+
+import logging
+from collections import deque
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+from ...exceptions import CyclicDependencyError
+
+logger = logging.getLogger(__name__)
+
+
+class DynamicTopologicalOrder:
+    """
+    Directed acyclic graph with an incrementally maintained topological order.
+
+    Nodes are arbitrary hashable keys (task IDs). All searches are iterative,
+    so long dependency chains cannot exceed the recursion limit.
+    """
+
+    def __init__(self) -> None:
+        self._position: Dict[Hashable, int] = {}
+        self._successors: Dict[Hashable, Set[Hashable]] = {}
+        self._predecessors: Dict[Hashable, Set[Hashable]] = {}
+        self._next_position = 0
+        self._first_position = 0
+
+    @classmethod
+    def from_edges(
+        cls,
+        nodes: Iterable[Hashable],
+        edges: Iterable[Tuple[Hashable, Hashable]]
+    ) -> "DynamicTopologicalOrder":
+        """
+        Build a graph and its initial order (Kahn's algorithm).
+
+        Args:
+            nodes: Node keys
+            edges: ``(from, to)`` pairs; endpoints are added as nodes
+
+        Returns:
+            DynamicTopologicalOrder: Graph with a valid topological order
+
+        Raises:
+            CyclicDependencyError: If the edges contain a cycle
+        """
+        graph = cls()
+        for node in nodes:
+            graph._ensure_node(node)
+        for u, v in edges:
+            graph._ensure_node(u)
+            graph._ensure_node(v)
+            graph._successors[u].add(v)
+            graph._predecessors[v].add(u)
+
+        in_degree = {node: len(preds) for node, preds in graph._predecessors.items()}
+        queue = deque(node for node, degree in in_degree.items() if degree == 0)
+        position = 0
+        while queue:
+            node = queue.popleft()
+            graph._position[node] = position
+            position += 1
+            for successor in graph._successors[node]:
+                in_degree[successor] -= 1
+                if in_degree[successor] == 0:
+                    queue.append(successor)
+
+        if position != len(in_degree):
+            cycle = [str(node) for node, degree in in_degree.items() if degree > 0]
+            raise CyclicDependencyError(cycle=cycle)
+
+        graph._next_position = position
+        return graph
+
+    def __len__(self) -> int:
+        return len(self._position)
+
+    def __contains__(self, node: Hashable) -> bool:
+        return node in self._position
+
+    @property
+    def edge_count(self) -> int:
+        """Number of edges in the graph."""
+        return sum(len(successors) for successors in self._successors.values())
+
+    def has_edge(self, u: Hashable, v: Hashable) -> bool:
+        """Check if the edge ``u -> v`` exists."""
+        return v in self._successors.get(u, ())
+
+    def add_node(self, node: Hashable) -> None:
+        """Add a node at the end of the order (no-op if present)."""
+        self._ensure_node(node)
+
+    def remove_node(self, node: Hashable) -> None:
+        """Remove a node and its edges (no-op if absent)."""
+        if node not in self._position:
+            return
+        for successor in self._successors.pop(node):
+            self._predecessors[successor].discard(node)
+        for predecessor in self._predecessors.pop(node):
+            self._successors[predecessor].discard(node)
+        del self._position[node]
+
+    def remove_edge(self, u: Hashable, v: Hashable) -> None:
+        """Remove the edge ``u -> v``; the current order stays valid."""
+        if u in self._successors:
+            self._successors[u].discard(v)
+        if v in self._predecessors:
+            self._predecessors[v].discard(u)
+
+    def would_create_cycle(self, u: Hashable, v: Hashable) -> bool:
+        """
+        Check if adding ``u -> v`` would create a cycle.
+
+        Args:
+            u: Source node
+            v: Target node
+
+        Returns:
+            bool: True if ``v`` already reaches ``u``
+        """
+        if u == v:
+            return True
+        if u not in self._position or v not in self._position:
+            return False
+        if not self._predecessors[u] or not self._successors[v]:
+            return False
+        if self._position[u] > self._position[v]:
+            return self._forward_region(v, self._position[u], u) is None
+        return False
+
+    def add_edge(self, u: Hashable, v: Hashable) -> None:
+        """
+        Insert the edge ``u -> v`` and restore the topological order.
+
+        Args:
+            u: Source node
+            v: Target node
+
+        Raises:
+            CyclicDependencyError: If the edge would create a cycle
+        """
+        if u == v:
+            raise CyclicDependencyError(cycle=[str(u)])
+
+        self._ensure_node(u)
+        self._ensure_node(v)
+        if v in self._successors[u]:
+            return
+
+        upper = self._position[u]
+        lower = self._position[v]
+        if upper > lower and not self._predecessors[u]:
+            # A task without predecessors can move to the front of the order
+            self._first_position -= 1
+            self._position[u] = self._first_position
+        elif upper > lower and not self._successors[v]:
+            # A task without successors can move to the end of the order
+            self._position[v] = self._next_position
+            self._next_position += 1
+        elif upper > lower:
+            # Affected region: tasks reachable from v and reaching u
+            # whose positions lie between the two endpoints
+            forward = self._forward_region(v, upper, u)
+            if forward is None:
+                raise CyclicDependencyError(cycle=[str(u), str(v)])
+            backward = self._backward_region(u, lower)
+            self._reorder(backward, forward)
+
+        self._successors[u].add(v)
+        self._predecessors[v].add(u)
+
+    def order(self) -> List[Hashable]:
+        """
+        Get all nodes in topological order.
+
+        Returns:
+            List[Hashable]: Nodes sorted by position
+        """
+        return sorted(self._position, key=self._position.__getitem__)
+
+    def _ensure_node(self, node: Hashable) -> None:
+        if node not in self._position:
+            self._position[node] = self._next_position
+            self._next_position += 1
+            self._successors[node] = set()
+            self._predecessors[node] = set()
+
+    def _forward_region(
+        self,
+        start: Hashable,
+        upper: int,
+        target: Hashable
+    ) -> Optional[List[Hashable]]:
+        """Nodes reachable from ``start`` up to position ``upper`` (None if ``target`` is reached)."""
+        position = self._position
+        visited = {start}
+        stack = [start]
+        while stack:
+            node = stack.pop()
+            for successor in self._successors[node]:
+                if successor == target:
+                    return None
+                if successor not in visited and position[successor] < upper:
+                    visited.add(successor)
+                    stack.append(successor)
+        return list(visited)
+
+    def _backward_region(self, start: Hashable, lower: int) -> List[Hashable]:
+        """Nodes reaching ``start`` down to position ``lower``."""
+        position = self._position
+        visited = {start}
+        stack = [start]
+        while stack:
+            node = stack.pop()
+            for predecessor in self._predecessors[node]:
+                if predecessor not in visited and position[predecessor] > lower:
+                    visited.add(predecessor)
+                    stack.append(predecessor)
+        return list(visited)
+
+    def _reorder(self, backward: List[Hashable], forward: List[Hashable]) -> None:
+        """Reassign the region's positions so ``backward`` precedes ``forward``."""
+        position = self._position
+        backward.sort(key=position.__getitem__)
+        forward.sort(key=position.__getitem__)
+        nodes = backward + forward
+        slots = sorted(position[node] for node in nodes)
+        for node, slot in zip(nodes, slots):
+            position[node] = slot
@@ -0,0 +1,540 @@
+"""
+Monte Carlo schedule simulation.
+
+This module samples per-task duration distributions and propagates them
+through a plan's task network for thousands of iterations at once, using
+NumPy arrays laid out as ``(task, iteration)`` and grouped by topological
+level so each level is a handful of vectorized operations.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .graph import PlanGraph, FROM_FINISH_KINDS, TO_FINISH_KINDS
+
+logger = logging.getLogger(__name__)
+
+# Default duration spread relative to the estimate when no history exists
+DEFAULT_OPTIMISTIC_FACTOR = 0.75
+DEFAULT_PESSIMISTIC_FACTOR = 1.5
+
+# Minimum number of completed tasks before history is used for fitting
+MIN_HISTORY_SAMPLES = 3
+
+# Upper bound on task-iteration cells held in memory per chunk
+MAX_CHUNK_CELLS = 8_000_000
+
+# Number of iterations used to build the progress timeline
+TIMELINE_SAMPLES = 256
+
+# Relative tolerance (of the iteration's project duration) for zero slack
+SLACK_TOLERANCE = 1e-5
+
+# Number of quantiles per standardized duration distribution
+QUANTILE_TABLE_SIZE = 1024
+
+# Seed of the generator estimating PERT quantile tables, kept separate from
+# the simulation generator so cached tables do not shift seeded results
+QUANTILE_TABLE_SEED = 0
+
+# Floating point type of the simulation arrays
+SIM_DTYPE = np.float32
+
+# Reported completion percentiles
+PERCENTILES = (5, 10, 25, 50, 75, 90, 95)
+
+
+@dataclass
+class DurationModel:
+    """
+    Per-task three-point duration estimates in hours.
+
+    Tasks with a known actual duration have all three points equal.
+    """
+
+    optimistic: np.ndarray
+    most_likely: np.ndarray
+    pessimistic: np.ndarray
+    distribution: str = "pert"
+    """Sampling distribution: ``pert`` or ``triangular``."""
+
+    _tables: Optional[np.ndarray] = field(default=None, repr=False)
+    _shape_index: Optional[np.ndarray] = field(default=None, repr=False)
+
+    @classmethod
+    def from_graph(
+        cls,
+        graph: PlanGraph,
+        history_ratios: Optional[Sequence[float]] = None,
+        distribution: str = "pert"
+    ) -> "DurationModel":
+        """
+        Fit duration distributions from task estimates and history.
+
+        Historical actual/estimated ratios (when enough are available)
+        determine the optimistic, most likely and pessimistic factors;
+        otherwise default factors are applied to ``estimated_duration``.
+        Completed tasks use their actual duration.
+
+        Args:
+            graph: Plan graph
+            history_ratios: Actual/estimated duration ratios of completed tasks
+            distribution: Sampling distribution (``pert`` or ``triangular``)
+
+        Returns:
+            DurationModel: Fitted duration model
+        """
+        estimates = np.asarray(graph.durations, dtype=np.float64)
+        low, mode, high = DEFAULT_OPTIMISTIC_FACTOR, 1.0, DEFAULT_PESSIMISTIC_FACTOR
+
+        if history_ratios is not None and len(history_ratios) >= MIN_HISTORY_SAMPLES:
+            ratios = np.asarray(history_ratios, dtype=np.float64)
+            low, mode, high = np.percentile(ratios, [10, 50, 90])
+            low = max(float(low), 0.1)
+            mode = max(float(mode), low)
+            high = max(float(high), mode)
+
+        optimistic = estimates * low
+        most_likely = estimates * mode
+        pessimistic = estimates * high
+
+        # Completed tasks have a fixed duration
+        for i, task in enumerate(graph.tasks):
+            actual = actual_duration_hours(task)
+            if actual is not None:
+                optimistic[i] = most_likely[i] = pessimistic[i] = actual
+
+        return cls(
+            optimistic=optimistic,
+            most_likely=most_likely,
+            pessimistic=pessimistic,
+            distribution=distribution,
+        )
+
+    def sample(self, rng: np.random.Generator, iterations: int) -> np.ndarray:
+        """
+        Draw task durations.
+
+        Tasks are grouped by the standardized shape of their distribution
+        (shared by all tasks fitted with the same factors). Each shape gets
+        a quantile table once, after which sampling is a uniform integer
+        draw and a table lookup instead of a per-cell beta draw.
+
+        Args:
+            rng: Random generator
+            iterations: Number of iterations
+
+        Returns:
+            np.ndarray: Durations shaped ``(task, iteration)``
+        """
+        if self._tables is None:
+            self._build_tables()
+
+        a = self.optimistic.astype(SIM_DTYPE)[:, None]
+        width = (self.pessimistic - self.optimistic).astype(SIM_DTYPE)[:, None]
+        draws = rng.integers(0, QUANTILE_TABLE_SIZE, size=(len(a), iterations), dtype=np.int16)
+        if len(self._tables) == 1:
+            samples = np.take(self._tables[0], draws)
+        else:
+            offsets = (self._shape_index * QUANTILE_TABLE_SIZE)[:, None]
+            samples = np.take(self._tables.reshape(-1), draws + offsets)
+        samples *= width
+        samples += a
+        return samples
+
+    def _build_tables(self) -> None:
+        """Build one quantile table per distinct standardized shape."""
+        rng = np.random.default_rng(QUANTILE_TABLE_SEED)
+        width = self.pessimistic - self.optimistic
+        safe_width = np.where(width > 0, width, 1.0)
+        mode = np.where(width > 0, (self.most_likely - self.optimistic) / safe_width, 0.5)
+        shapes, shape_index = np.unique(np.round(mode, 3), return_inverse=True)
+
+        probabilities = (np.arange(QUANTILE_TABLE_SIZE) + 0.5) / QUANTILE_TABLE_SIZE
+        tables = np.empty((len(shapes), QUANTILE_TABLE_SIZE), dtype=SIM_DTYPE)
+        for k, c in enumerate(shapes):
+            if self.distribution == "triangular":
+                # Exact inverse CDF of the standard triangular distribution
+                tables[k] = np.where(
+                    probabilities < c,
+                    np.sqrt(probabilities * c),
+                    1.0 - np.sqrt((1.0 - probabilities) * (1.0 - c)),
+                )
+            else:
+                # PERT: beta(1 + 4c, 1 + 4(1 - c)) quantiles from a sorted sample
+                oversample = 64
+                draws = np.sort(rng.beta(1.0 + 4.0 * c, 1.0 + 4.0 * (1.0 - c), QUANTILE_TABLE_SIZE * oversample))
+                tables[k] = draws[oversample // 2::oversample]
+
+        self._tables = tables
+        self._shape_index = shape_index.reshape(-1).astype(np.intp)
+
+
+def actual_duration_hours(task: Any) -> Optional[float]:
+    """
+    Get the actual duration of a completed task in hours.
+
+    Args:
+        task: Task object
+
+    Returns:
+        Optional[float]: Actual duration, or None if not completed
+    """
+    start = getattr(task, "actual_start", None)
+    finish = getattr(task, "actual_finish", None)
+    if start is None or finish is None or finish < start:
+        return None
+    return (finish - start).total_seconds() / 3600
+
+
+def history_ratios_for_tasks(tasks: Sequence[Any]) -> List[float]:
+    """
+    Collect actual/estimated duration ratios from completed tasks.
+
+    Args:
+        tasks: Task objects
+
+    Returns:
+        List[float]: Duration ratios
+    """
+    ratios = []
+    for task in tasks:
+        actual = actual_duration_hours(task)
+        estimate = getattr(task, "estimated_duration", None)
+        if actual is not None and estimate:
+            ratios.append(actual / estimate)
+    return ratios
+
+
+@dataclass
+class _Slot:
+    """
+    Edges of a level in which every grouped node appears at most once.
+
+    Slot ``k`` holds the ``k``-th edge of each node, so a level is reduced
+    with one vectorized maximum/minimum per slot.
+    """
+
+    positions: np.ndarray
+    """Positions of the grouped nodes within the level."""
+
+    sources: np.ndarray
+    targets: np.ndarray
+    lags: np.ndarray
+    from_start: Optional[np.ndarray]
+    """Mask of edges anchored on the predecessor's start (None if none)."""
+
+    to_finish: Optional[np.ndarray]
+    """Mask of edges targeting the successor's finish (None if none)."""
+
+
+@dataclass
+class _Level:
+    """Edges into (forward) or out of (backward) one topological level."""
+
+    nodes: np.ndarray
+    slots: List[_Slot]
+
+
+@dataclass
+class SimulationModel:
+    """
+    Picklable, array-only simulation input.
+
+    Holds the duration model and the level-grouped edge layout of a plan
+    so the simulation can run in a worker process.
+    """
+
+    durations: DurationModel
+    forward_levels: List[_Level]
+    backward_levels: List[_Level]
+    task_count: int
+
+    @classmethod
+    def from_graph(cls, graph: PlanGraph, durations: DurationModel) -> "SimulationModel":
+        """
+        Compile a plan graph into level-grouped edge arrays.
+
+        Args:
+            graph: Plan graph
+            durations: Duration model for the graph's tasks
+
+        Returns:
+            SimulationModel: Compiled simulation input
+        """
+        n = len(graph)
+        order = graph.topological_order()
+
+        # Level = length of the longest predecessor chain
+        level = [0] * n
+        for i in order:
+            for j, _, _ in graph.successors[i]:
+                if level[i] + 1 > level[j]:
+                    level[j] = level[i] + 1
+
+        edges = [
+            (i, j, kind, lag)
+            for i in range(n)
+            for j, kind, lag in graph.successors[i]
+        ]
+        depth = max(level) + 1 if n else 0
+
+        forward = cls._group(edges, depth, key=lambda e: (level[e[1]], e[1]), node=1, level=level)
+        backward = cls._group(edges, depth, key=lambda e: (level[e[0]], e[0]), node=0, level=level)
+        backward.reverse()
+
+        return cls(
+            durations=durations,
+            forward_levels=forward,
+            backward_levels=backward,
+            task_count=n,
+        )
+
+    @staticmethod
+    def _group(
+        edges: List[Tuple[int, int, int, float]],
+        depth: int,
+        key: Any,
+        node: int,
+        level: List[int]
+    ) -> List[_Level]:
+        """Group edges by the level of their target (or source) node."""
+        buckets: List[List[Tuple[int, int, int, float]]] = [[] for _ in range(depth)]
+        for edge in sorted(edges, key=key):
+            buckets[level[edge[node]]].append(edge)
+
+        levels = []
+        for bucket in buckets:
+            if not bucket:
+                continue
+
+            # Split the level's edges into slots by their rank per node
+            nodes: List[int] = []
+            slot_edges: List[List[Tuple[int, int, int, float, int]]] = []
+            rank = 0
+            for k, edge in enumerate(bucket):
+                if k == 0 or edge[node] != bucket[k - 1][node]:
+                    nodes.append(edge[node])
+                    rank = 0
+                if rank == len(slot_edges):
+                    slot_edges.append([])
+                slot_edges[rank].append(edge + (len(nodes) - 1,))
+                rank += 1
+
+            slots = []
+            for group in slot_edges:
+                kinds = np.array([edge[2] for edge in group], dtype=np.int64)
+                from_start = ~np.isin(kinds, FROM_FINISH_KINDS)
+                to_finish = np.isin(kinds, TO_FINISH_KINDS)
+                slots.append(_Slot(
+                    positions=np.array([edge[4] for edge in group], dtype=np.intp),
+                    sources=np.array([edge[0] for edge in group], dtype=np.intp),
+                    targets=np.array([edge[1] for edge in group], dtype=np.intp),
+                    lags=np.array([edge[3] for edge in group], dtype=SIM_DTYPE)[:, None],
+                    from_start=from_start[:, None] if from_start.any() else None,
+                    to_finish=to_finish[:, None] if to_finish.any() else None,
+                ))
+
+            levels.append(_Level(nodes=np.array(nodes, dtype=np.intp), slots=slots))
+        return levels
+
+
+@dataclass
+class SimulationResult:
+    """Summary of a Monte Carlo schedule simulation (hours from plan start)."""
+
+    iterations: int
+    mean_duration: float
+    std_duration: float
+    percentiles: Dict[int, float]
+    """Completion duration per percentile."""
+
+    criticality: np.ndarray
+    """Fraction of iterations in which each task was critical."""
+
+    timeline_hours: np.ndarray = field(default_factory=lambda: np.zeros(0))
+    progress_lower: np.ndarray = field(default_factory=lambda: np.zeros(0))
+    progress_median: np.ndarray = field(default_factory=lambda: np.zeros(0))
+    progress_upper: np.ndarray = field(default_factory=lambda: np.zeros(0))
+
+    def percentile(self, q: float) -> float:
+        """
+        Get an arbitrary completion percentile by interpolation.
+
+        Args:
+            q: Percentile (0-100)
+
+        Returns:
+            float: Completion duration in hours
+        """
+        keys = sorted(self.percentiles)
+        return float(np.interp(q, keys, [self.percentiles[k] for k in keys]))
+
+
+def _forward_pass(model: SimulationModel, d: np.ndarray) -> np.ndarray:
+    """Calculate earliest finish for all iterations of a chunk."""
+    ef = d.copy()
+    for lvl in model.forward_levels:
+        start = None
+        for slot in lvl.slots:
+            values = ef[slot.sources]
+            if slot.from_start is not None:
+                values -= d[slot.sources] * slot.from_start
+            values += slot.lags
+            if slot.to_finish is not None:
+                values -= d[slot.targets] * slot.to_finish
+            if start is None:
+                # The first slot covers every node of the level
+                start = values
+            else:
+                start[slot.positions] = np.maximum(start[slot.positions], values)
+        np.maximum(start, 0.0, out=start)
+        start += d[lvl.nodes]
+        ef[lvl.nodes] = start
+    return ef
+
+
+def _backward_pass(model: SimulationModel, d: np.ndarray, project_end: np.ndarray) -> np.ndarray:
+    """Calculate latest finish for all iterations of a chunk."""
+    lf = np.broadcast_to(project_end, d.shape).copy()
+    for lvl in model.backward_levels:
+        finish = None
+        for slot in lvl.slots:
+            values = lf[slot.targets]
+            if slot.to_finish is None:
+                values -= d[slot.targets]
+            else:
+                values -= d[slot.targets] * ~slot.to_finish
+            values -= slot.lags
+            if slot.from_start is not None:
+                values += d[slot.sources] * slot.from_start
+            if finish is None:
+                # The first slot covers every node of the level
+                finish = values
+            else:
+                finish[slot.positions] = np.minimum(finish[slot.positions], values)
+        np.minimum(finish, project_end, out=finish)
+        lf[lvl.nodes] = finish
+    return lf
+
+
+def _progress_curves(
+    ef: np.ndarray,
+    d: np.ndarray,
+    grid: np.ndarray
+) -> np.ndarray:
+    """
+    Completed-work fraction (0-100) over time for sampled iterations.
+
+    Args:
+        ef: Earliest finish ``(task, sample)``
+        d: Durations ``(task, sample)``
+        grid: Time grid in hours
+
+    Returns:
+        np.ndarray: Progress ``(sample, point)``
+    """
+    samples = ef.shape[1]
+    curves = np.zeros((samples, len(grid)))
+    for s in range(samples):
+        order = np.argsort(ef[:, s], kind="stable")
+        finish = ef[order, s]
+        work = np.cumsum(d[order, s])
+        total = work[-1] if len(work) and work[-1] > 0 else 1.0
+        positions = np.searchsorted(finish, grid, side="right")
+        done = np.where(positions > 0, work[np.maximum(positions - 1, 0)], 0.0)
+        curves[s] = done / total * 100
+    return curves
+
+
+def simulate_schedule(
+    model: SimulationModel,
+    iterations: int = 10000,
+    seed: Optional[int] = None,
+    confidence_interval: float = 0.95,
+    time_step_hours: float = 8.0,
+    max_timeline_points: int = 100
+) -> SimulationResult:
+    """
+    Run a Monte Carlo simulation of a plan's schedule.
+
+    Iterations are processed in chunks so memory stays bounded for large
+    plans. This function is synchronous and picklable so it can run in a
+    worker thread or process.
+
+    Args:
+        model: Compiled simulation input
+        iterations: Number of iterations
+        seed: Optional random seed for reproducibility
+        confidence_interval: Confidence interval for the progress bands
+        time_step_hours: Spacing of timeline points in hours
+        max_timeline_points: Maximum number of timeline points
+
+    Returns:
+        SimulationResult: Simulation summary
+    """
+    n = model.task_count
+    if n == 0 or iterations <= 0:
+        return SimulationResult(
+            iterations=0,
+            mean_duration=0.0,
+            std_duration=0.0,
+            percentiles={p: 0.0 for p in PERCENTILES},
+            criticality=np.zeros(n),
+        )
+
+    rng = np.random.default_rng(seed)
+    chunk_size = max(1, min(iterations, MAX_CHUNK_CELLS // n))
+    completion = np.empty(iterations)
+    critical_counts = np.zeros(n)
+    sample_ef = sample_d = None
+
+    done = 0
+    while done < iterations:
+        size = min(chunk_size, iterations - done)
+        d = model.durations.sample(rng, size)
+        ef = _forward_pass(model, d)
+        project_end = ef.max(axis=0)
+        lf = _backward_pass(model, d, project_end)
+
+        tolerance = np.maximum(project_end, 1.0) * SLACK_TOLERANCE
+        critical_counts += ((lf - ef) <= tolerance).sum(axis=1)
+        completion[done:done + size] = project_end
+
+        if sample_ef is None:
+            samples = min(TIMELINE_SAMPLES, size)
+            sample_ef = ef[:, :samples].copy()
+            sample_d = d[:, :samples].copy()
+
+        done += size
+
+    percentiles = dict(zip(PERCENTILES, np.percentile(completion, PERCENTILES).tolist()))
+
+    # Progress timeline up to the upper confidence bound of completion
+    upper_q = (1 + confidence_interval) / 2 * 100
+    lower_q = (1 - confidence_interval) / 2 * 100
+    horizon = float(np.percentile(completion, upper_q))
+    step = max(time_step_hours, horizon / max(max_timeline_points - 1, 1))
+    grid = np.arange(0.0, horizon + step, step)[:max_timeline_points]
+    curves = _progress_curves(sample_ef, sample_d, grid)
+    lower, median, upper = np.percentile(curves, [lower_q, 50, upper_q], axis=0)
+
+    logger.debug(
+        f"Simulated {iterations} iterations over {n} tasks: "
+        f"p50={percentiles[50]:.1f}h, p90={percentiles[90]:.1f}h"
+    )
+
+    return SimulationResult(
+        iterations=iterations,
+        mean_duration=float(completion.mean()),
+        std_duration=float(completion.std()),
+        percentiles=percentiles,
+        criticality=critical_counts / iterations,
+        timeline_hours=grid,
+        progress_lower=lower,
+        progress_median=median,
+        progress_upper=upper,
+    )
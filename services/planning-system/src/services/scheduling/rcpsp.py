@@ -0,0 +1,575 @@
+"""
+Resource-constrained project scheduling (RCPSP) solver.
+
+This module assigns each task to one skilled resource and schedules it
+with a serial schedule generation scheme (SGS): tasks are taken from a
+precedence-feasible activity list and started as early as their
+predecessors and the chosen resource allow. Priority-rule activity lists
+seed a local search that shifts tasks in the list and reassigns them to
+other feasible resources until the time budget is spent.
+"""
+
+import heapq
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+import numpy as np
+
+from .graph import PlanGraph, FROM_FINISH_KINDS, TO_FINISH_KINDS
+
+logger = logging.getLogger(__name__)
+
+# Optimization objectives
+OBJECTIVE_DURATION = "duration"
+OBJECTIVE_COST = "cost"
+OBJECTIVE_UTILIZATION = "resource_utilization"
+OBJECTIVES = (OBJECTIVE_DURATION, OBJECTIVE_COST, OBJECTIVE_UTILIZATION)
+
+# Hourly rate used for resources without cost data
+DEFAULT_COST_PER_HOUR = 50.0
+
+# Marker for tasks without an assigned resource
+UNASSIGNED = -1
+
+# Probability of a reassignment move (otherwise the task is shifted)
+REASSIGN_PROBABILITY = 0.3
+
+# Iterations without improvement before restarting from the best solution
+RESTART_AFTER = 200
+
+
+def _resource_cost(resource: Any) -> float:
+    """Get the hourly cost of a resource."""
+    for name in ("cost_per_hour", "cost_rate"):
+        value = getattr(resource, name, None)
+        if value is not None:
+            return float(value)
+    return DEFAULT_COST_PER_HOUR
+
+
+@dataclass
+class SchedulingProblem:
+    """
+    Picklable, array-based RCPSP instance.
+
+    Each resource works on one task at a time. ``feasible[i, r]`` tells
+    whether resource ``r`` has every skill task ``i`` requires at the
+    required level.
+    """
+
+    task_ids: List[UUID]
+    resource_ids: List[UUID]
+    durations: np.ndarray
+    efforts: np.ndarray
+    cost_rates: np.ndarray
+    performance: np.ndarray
+    feasible: np.ndarray
+
+    predecessors: List[List[Tuple[int, float]]]
+    """Per task: ``(predecessor, offset)`` with ``start >= start[pred] + offset``."""
+
+    successors: List[List[int]]
+    priority: np.ndarray
+    """Latest finish of each task in the unconstrained CPM schedule."""
+
+    max_duration: Optional[float] = None
+    """Optional makespan limit in hours."""
+
+    candidates: List[np.ndarray] = field(default_factory=list, repr=False)
+
+    def __post_init__(self) -> None:
+        if not self.candidates:
+            self.candidates = [np.flatnonzero(row) for row in self.feasible]
+
+    @classmethod
+    def from_plan(
+        cls,
+        graph: PlanGraph,
+        resources: Sequence[Any],
+        latest_finish: Optional[Sequence[float]] = None,
+        max_duration: Optional[float] = None
+    ) -> "SchedulingProblem":
+        """
+        Build a problem from a plan graph and its resources.
+
+        Args:
+            graph: Plan graph
+            resources: Resource objects with ``skills`` and cost data
+            latest_finish: Optional CPM latest finish per task (priority rule)
+            max_duration: Optional makespan limit in hours
+
+        Returns:
+            SchedulingProblem: Problem instance
+        """
+        n = len(graph)
+        durations = np.asarray(graph.durations, dtype=np.float64)
+        efforts = np.array([
+            float(getattr(task, "estimated_effort", None) or graph.durations[i])
+            for i, task in enumerate(graph.tasks)
+        ]) if graph.tasks else durations.copy()
+
+        # Skill matrices: requirement (task x skill) and level (resource x skill)
+        skills: Dict[str, int] = {}
+        for task in graph.tasks:
+            for skill in (getattr(task, "required_skills", None) or {}):
+                skills.setdefault(skill, len(skills))
+
+        required = np.full((n, len(skills)), -np.inf)
+        for i, task in enumerate(graph.tasks):
+            for skill, level in (getattr(task, "required_skills", None) or {}).items():
+                required[i, skills[skill]] = float(level)
+
+        levels = np.full((len(resources), len(skills)), -np.inf)
+        for r, resource in enumerate(resources):
+            for skill, level in (getattr(resource, "skills", None) or {}).items():
+                if skill in skills:
+                    levels[r, skills[skill]] = float(level)
+
+        if skills:
+            feasible = (levels[None, :, :] >= required[:, None, :]).all(axis=2)
+        else:
+            feasible = np.ones((n, len(resources)), dtype=bool)
+
+        # Precedence offsets (all dependency kinds with lag)
+        predecessors: List[List[Tuple[int, float]]] = [[] for _ in range(n)]
+        successors: List[List[int]] = [[] for _ in range(n)]
+        for i in range(n):
+            for j, kind, lag in graph.successors[i]:
+                offset = (durations[i] if kind in FROM_FINISH_KINDS else 0.0) + lag
+                if kind in TO_FINISH_KINDS:
+                    offset -= durations[j]
+                predecessors[j].append((i, float(offset)))
+                successors[i].append(j)
+
+        priority = np.asarray(latest_finish if latest_finish is not None else np.zeros(n), dtype=np.float64)
+
+        return cls(
+            task_ids=list(graph.task_ids),
+            resource_ids=[resource.id for resource in resources],
+            durations=durations,
+            efforts=efforts,
+            cost_rates=np.array([_resource_cost(resource) for resource in resources], dtype=np.float64),
+            performance=np.array(
+                [float(getattr(resource, "performance_rating", 0) or 0) for resource in resources],
+                dtype=np.float64,
+            ),
+            feasible=feasible,
+            predecessors=predecessors,
+            successors=successors,
+            priority=priority,
+            max_duration=max_duration,
+        )
+
+    @property
+    def task_count(self) -> int:
+        return len(self.task_ids)
+
+    @property
+    def resource_count(self) -> int:
+        return len(self.resource_ids)
+
+
+@dataclass
+class ResourceSchedule:
+    """A resource-feasible schedule and its measured metrics (hours from plan start)."""
+
+    start: np.ndarray
+    finish: np.ndarray
+    assignment: np.ndarray
+    """Resource index per task (``UNASSIGNED`` if no resource is skilled)."""
+
+    makespan: float
+    cost: float
+    busy_hours: np.ndarray
+    """Working hours per resource."""
+
+    @property
+    def unassigned_tasks(self) -> int:
+        return int((self.assignment == UNASSIGNED).sum())
+
+    @property
+    def utilization(self) -> float:
+        """Fraction of resource time spent working up to the makespan."""
+        capacity = self.makespan * len(self.busy_hours)
+        return float(self.busy_hours.sum() / capacity) if capacity > 0 else 0.0
+
+    @property
+    def load_imbalance(self) -> float:
+        """Coefficient of variation of the working hours across resources."""
+        mean = self.busy_hours.mean() if len(self.busy_hours) else 0.0
+        return float(self.busy_hours.std() / mean) if mean > 0 else 0.0
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Get the schedule metrics.
+
+        Returns:
+            Dict[str, Any]: Duration, cost, utilization and assignment counts
+        """
+        return {
+            "duration": float(self.makespan),
+            "cost": float(self.cost),
+            "resource_utilization": self.utilization,
+            "load_imbalance": self.load_imbalance,
+            "overallocated_resources": 0,
+            "unassigned_tasks": self.unassigned_tasks,
+        }
+
+
+@dataclass
+class SolverResult:
+    """Best schedule found by the solver and search statistics."""
+
+    schedule: ResourceSchedule
+    objective: str
+    iterations: int
+    elapsed_seconds: float
+    timed_out: bool
+    meets_max_duration: bool
+
+
+class ResourceConstrainedScheduler:
+    """
+    Serial-SGS scheduler with local-search improvement.
+
+    A solution is an activity list plus optional per-task resource
+    overrides; tasks without an override get a resource by the objective's
+    rule (earliest start, cheapest or least loaded feasible resource).
+    """
+
+    def __init__(
+        self,
+        problem: SchedulingProblem,
+        objective: str = OBJECTIVE_DURATION,
+        seed: Optional[int] = None
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            problem: Problem instance
+            objective: Optimization objective
+            seed: Optional random seed
+
+        Raises:
+            ValueError: If the objective is not supported
+        """
+        if objective not in OBJECTIVES:
+            raise ValueError(f"Unsupported optimization target: {objective}")
+        self.problem = problem
+        self.objective = objective
+        self.random = random.Random(seed)
+
+        # Latest start that still meets the makespan limit (cost rule);
+        # the limit's slack over the critical path is shared by all tasks
+        self.latest_start = None
+        if problem.max_duration is not None and problem.task_count:
+            allowance = problem.max_duration - float(problem.priority.max())
+            self.latest_start = problem.priority - problem.durations + allowance
+
+    def generate(
+        self,
+        activity_list: Sequence[int],
+        overrides: Optional[np.ndarray] = None,
+        fixed: bool = False
+    ) -> ResourceSchedule:
+        """
+        Build a schedule with the serial schedule generation scheme.
+
+        Args:
+            activity_list: Precedence-feasible task order
+            overrides: Optional resource index per task (``UNASSIGNED`` = use rule)
+            fixed: Use ``overrides`` as the complete assignment, leaving
+                ``UNASSIGNED`` tasks without a resource
+
+        Returns:
+            ResourceSchedule: Generated schedule
+        """
+        p = self.problem
+        n, resources = p.task_count, p.resource_count
+        start = np.zeros(n)
+        finish = np.zeros(n)
+        assignment = np.full(n, UNASSIGNED, dtype=np.int64)
+        free_at = np.zeros(resources)
+        busy = np.zeros(resources)
+        durations, efforts = p.durations, p.efforts
+
+        for i in activity_list:
+            earliest = 0.0
+            for pred, offset in p.predecessors[i]:
+                bound = start[pred] + offset
+                if bound > earliest:
+                    earliest = bound
+
+            r = UNASSIGNED if overrides is None else overrides[i]
+            if r == UNASSIGNED and not fixed:
+                r = self._choose_resource(i, p.candidates[i], earliest, free_at, busy)
+
+            if r != UNASSIGNED:
+                if free_at[r] > earliest:
+                    earliest = free_at[r]
+                free_at[r] = earliest + durations[i]
+                busy[r] += durations[i]
+
+            start[i] = earliest
+            finish[i] = earliest + durations[i]
+            assignment[i] = r
+
+        assigned = assignment != UNASSIGNED
+        cost = float((efforts[assigned] * p.cost_rates[assignment[assigned]]).sum())
+
+        return ResourceSchedule(
+            start=start,
+            finish=finish,
+            assignment=assignment,
+            makespan=float(finish.max()) if n else 0.0,
+            cost=cost,
+            busy_hours=busy,
+        )
+
+    def score(self, schedule: ResourceSchedule) -> Tuple[float, ...]:
+        """
+        Rank a schedule for the objective (lower is better).
+
+        Args:
+            schedule: Schedule
+
+        Returns:
+            Tuple[float, ...]: Lexicographic score
+        """
+        overrun = 0.0
+        if self.problem.max_duration is not None:
+            overrun = max(schedule.makespan - self.problem.max_duration, 0.0)
+
+        if self.objective == OBJECTIVE_COST:
+            return (overrun, schedule.cost, schedule.makespan)
+        if self.objective == OBJECTIVE_UTILIZATION:
+            return (overrun, round(schedule.load_imbalance, 9), schedule.makespan)
+        return (overrun, schedule.makespan, schedule.cost)
+
+    def priority_list(self, keys: Sequence[float]) -> List[int]:
+        """
+        Build a precedence-feasible activity list by a priority rule.
+
+        Args:
+            keys: Priority per task (lower is scheduled first when eligible)
+
+        Returns:
+            List[int]: Activity list
+        """
+        p = self.problem
+        in_degree = [len({pred for pred, _ in preds}) for preds in p.predecessors]
+        heap = [(keys[i], i) for i in range(p.task_count) if in_degree[i] == 0]
+        heapq.heapify(heap)
+        order = []
+        while heap:
+            _, i = heapq.heappop(heap)
+            order.append(i)
+            for j in set(p.successors[i]):
+                in_degree[j] -= 1
+                if in_degree[j] == 0:
+                    heapq.heappush(heap, (keys[j], j))
+        return order
+
+    def evaluate_assignment(self, assignment: np.ndarray, keys: Optional[Sequence[float]] = None) -> ResourceSchedule:
+        """
+        Schedule a fixed resource assignment (e.g. the current allocations).
+
+        Args:
+            assignment: Resource index per task (``UNASSIGNED`` if none)
+            keys: Optional priority per task (defaults to CPM latest finish)
+
+        Returns:
+            ResourceSchedule: Resource-feasible schedule of the assignment
+        """
+        activity_list = self.priority_list(self.problem.priority if keys is None else keys)
+        return self.generate(activity_list, assignment, fixed=True)
+
+    def solve(
+        self,
+        time_budget: float,
+        max_iterations: Optional[int] = None
+    ) -> SolverResult:
+        """
+        Search for the best schedule within a time budget.
+
+        Args:
+            time_budget: Time budget in seconds
+            max_iterations: Optional cap on local-search iterations
+
+        Returns:
+            SolverResult: Best schedule found
+        """
+        p = self.problem
+        started = time.perf_counter()
+        deadline = started + max(time_budget, 0.0)
+
+        # Seed with priority-rule lists: latest finish, most successors, longest task
+        successor_counts = np.array([len(succ) for succ in p.successors], dtype=np.float64)
+        seeds = [
+            self.priority_list(p.priority),
+            self.priority_list(-successor_counts),
+            self.priority_list(-p.durations),
+        ]
+
+        no_override = np.full(p.task_count, UNASSIGNED, dtype=np.int64)
+        best_list, best_overrides, best_schedule, best_score = None, no_override, None, None
+        for activity_list in seeds:
+            schedule = self.generate(activity_list, no_override)
+            score = self.score(schedule)
+            if best_score is None or score < best_score:
+                best_list, best_schedule, best_score = activity_list, schedule, score
+
+        # No schedule can finish before the unconstrained critical path
+        lower_bound = float(p.priority.max()) if p.task_count else 0.0
+
+        current_list, current_overrides, current_score = list(best_list), best_overrides.copy(), best_score
+        positions = {task: k for k, task in enumerate(current_list)}
+        iterations = 0
+        stale = 0
+        timed_out = False
+
+        while p.task_count > 1:
+            if time.perf_counter() >= deadline:
+                timed_out = True
+                break
+            if max_iterations is not None and iterations >= max_iterations:
+                break
+            if self.objective == OBJECTIVE_DURATION and best_schedule.makespan <= lower_bound:
+                break
+            iterations += 1
+
+            candidate_list, candidate_overrides = self._neighbor(current_list, current_overrides, positions)
+            schedule = self.generate(candidate_list, candidate_overrides)
+            score = self.score(schedule)
+
+            if score <= current_score:
+                current_list, current_overrides, current_score = candidate_list, candidate_overrides, score
+                positions = {task: k for k, task in enumerate(current_list)}
+                if score < best_score:
+                    best_list, best_overrides = list(candidate_list), candidate_overrides.copy()
+                    best_schedule, best_score = schedule, score
+                    stale = 0
+                    continue
+            stale += 1
+
+            # Restart from the best solution when the search stagnates
+            if stale >= RESTART_AFTER:
+                current_list, current_overrides, current_score = list(best_list), best_overrides.copy(), best_score
+                positions = {task: k for k, task in enumerate(current_list)}
+                stale = 0
+
+        elapsed = time.perf_counter() - started
+        meets_max_duration = p.max_duration is None or best_schedule.makespan <= p.max_duration
+
+        logger.debug(
+            f"RCPSP {self.objective}: {p.task_count} tasks, {p.resource_count} resources, "
+            f"{iterations} iterations in {elapsed:.2f}s, makespan={best_schedule.makespan:.1f}h, "
+            f"cost={best_schedule.cost:.2f}"
+        )
+
+        return SolverResult(
+            schedule=best_schedule,
+            objective=self.objective,
+            iterations=iterations,
+            elapsed_seconds=elapsed,
+            timed_out=timed_out,
+            meets_max_duration=meets_max_duration,
+        )
+
+    def _choose_resource(
+        self,
+        task: int,
+        candidates: np.ndarray,
+        earliest: float,
+        free_at: np.ndarray,
+        busy: np.ndarray
+    ) -> int:
+        """Pick a feasible resource by the objective's rule."""
+        if not len(candidates):
+            return UNASSIGNED
+
+        starts = np.maximum(free_at[candidates], earliest)
+        if self.objective == OBJECTIVE_COST:
+            # Cheapest resource (among those starting in time), then earliest start
+            rates = self.problem.cost_rates[candidates]
+            if self.latest_start is not None:
+                rates = np.where(starts <= self.latest_start[task], rates, np.inf)
+                if np.isinf(rates).all():
+                    return int(candidates[np.argmin(starts)])
+            k = np.lexsort((starts, rates))[0]
+        elif self.objective == OBJECTIVE_UTILIZATION:
+            # Least loaded resource, then earliest start
+            k = np.lexsort((starts, busy[candidates]))[0]
+        else:
+            # Earliest start, then best performing resource
+            k = np.lexsort((-self.problem.performance[candidates], starts))[0]
+        return int(candidates[k])
+
+    def _neighbor(
+        self,
+        activity_list: List[int],
+        overrides: np.ndarray,
+        positions: Dict[int, int]
+    ) -> Tuple[List[int], np.ndarray]:
+        """Create a neighboring solution by a shift or reassignment move."""
+        p = self.problem
+        task = self.random.randrange(p.task_count)
+
+        if self.random.random() < REASSIGN_PROBABILITY and len(p.candidates[task]) > 1:
+            overrides = overrides.copy()
+            overrides[task] = int(self.random.choice(p.candidates[task]))
+            return activity_list, overrides
+
+        # Shift the task anywhere between its last predecessor and first successor
+        k = positions[task]
+        low = max((positions[pred] for pred, _ in p.predecessors[task]), default=-1) + 1
+        high = min((positions[succ] for succ in p.successors[task]), default=len(activity_list))
+        if high - low <= 1:
+            return activity_list, overrides
+
+        target = self.random.randrange(low, high)
+        if target == k:
+            return activity_list, overrides
+
+        # Positions after k shift down by one once the task is removed, so
+        # inserting at ``target`` keeps it inside the precedence window
+        candidate = list(activity_list)
+        del candidate[k]
+        candidate.insert(target, task)
+        return candidate, overrides
+
+
+def solve_resource_schedule(
+    problem: SchedulingProblem,
+    objective: str,
+    time_budget: float,
+    current_assignment: Optional[np.ndarray] = None,
+    seed: Optional[int] = None
+) -> Tuple[SolverResult, Optional[ResourceSchedule]]:
+    """
+    Solve a problem and measure the current assignment for comparison.
+
+    This function is synchronous and picklable so it can run in a worker
+    thread or process.
+
+    Args:
+        problem: Problem instance
+        objective: Optimization objective
+        time_budget: Time budget in seconds
+        current_assignment: Optional current resource index per task
+        seed: Optional random seed
+
+    Returns:
+        Tuple[SolverResult, Optional[ResourceSchedule]]: Solver result and
+            the schedule of the current assignment
+    """
+    scheduler = ResourceConstrainedScheduler(problem, objective, seed)
+    baseline = None
+    if current_assignment is not None:
+        baseline = scheduler.evaluate_assignment(current_assignment)
+    return scheduler.solve(time_budget), baseline
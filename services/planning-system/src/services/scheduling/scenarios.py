@@ -0,0 +1,408 @@
+"""
+Plan snapshots and what-if scenario overlays.
+
+A ``PlanSnapshot`` is an immutable, array-based copy of the parts of a
+plan that drive its schedule: task durations, the dependency edge list
+and resource capacities. A ``ScenarioOverlay`` records only what a
+scenario changes, keyed by snapshot index, so evaluating a scenario
+never copies the plan. Both are picklable; a batch of overlays is
+evaluated against one shared snapshot, typically in a worker process.
+"""
+
+import logging
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, FrozenSet, List, Mapping, Optional, Sequence, Tuple
+from uuid import UUID
+
+import numpy as np
+
+from ...exceptions import CyclicDependencyError
+from .graph import PlanGraph, Edge, _dependency_kind, _field
+from .critical_path import CriticalPathEngine
+from .monte_carlo import (
+    DurationModel,
+    SimulationModel,
+    SimulationResult,
+    simulate_schedule,
+    actual_duration_hours,
+    history_ratios_for_tasks,
+)
+
+logger = logging.getLogger(__name__)
+
+# Scenario dependency modification actions
+ADD = "add"
+REMOVE = "remove"
+UPDATE = "update"
+
+# Resource weekly hours used when a resource has no capacity
+DEFAULT_CAPACITY_HOURS = 40.0
+
+
+def _read_only(values: Sequence[Any], dtype: Any) -> np.ndarray:
+    array = np.array(values, dtype=dtype)
+    array.flags.writeable = False
+    return array
+
+
+def _as_uuid(value: Any) -> Optional[UUID]:
+    if value is None or isinstance(value, UUID):
+        return value
+    try:
+        return UUID(str(value))
+    except ValueError:
+        return None
+
+
+@dataclass(frozen=True)
+class PlanSnapshot:
+    """Immutable scheduling view of a plan."""
+
+    plan_id: UUID
+    task_ids: Tuple[UUID, ...]
+    durations: np.ndarray
+    """Estimated duration per task in hours."""
+
+    actual_durations: np.ndarray
+    """Actual duration of completed tasks in hours (NaN otherwise)."""
+
+    assigned_resource: np.ndarray
+    """Resource index per task (-1 if unassigned)."""
+
+    edge_from: np.ndarray
+    edge_to: np.ndarray
+    edge_kind: np.ndarray
+    edge_lag: np.ndarray
+
+    resource_ids: Tuple[UUID, ...]
+    capacity_hours: np.ndarray
+
+    history_ratios: Tuple[float, ...] = ()
+    """Actual/estimated duration ratios of completed tasks."""
+
+    task_index: Dict[UUID, int] = field(default_factory=dict, repr=False)
+    resource_index: Dict[UUID, int] = field(default_factory=dict, repr=False)
+    edge_index: Dict[Tuple[int, int], int] = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def from_plan(
+        cls,
+        plan_id: UUID,
+        tasks: Sequence[Any],
+        dependencies: Sequence[Any],
+        resources: Sequence[Any] = ()
+    ) -> "PlanSnapshot":
+        """
+        Take a snapshot of a plan.
+
+        Dependencies referencing tasks outside ``tasks`` are ignored.
+
+        Args:
+            plan_id: Plan ID
+            tasks: Task objects
+            dependencies: Dependency rows
+            resources: Resource objects
+
+        Returns:
+            PlanSnapshot: Plan snapshot
+        """
+        task_ids = tuple(_field(task, "id") for task in tasks)
+        task_index = {task_id: i for i, task_id in enumerate(task_ids)}
+        resource_ids = tuple(resource.id for resource in resources)
+        resource_index = {resource_id: r for r, resource_id in enumerate(resource_ids)}
+
+        actual = [actual_duration_hours(task) for task in tasks]
+        assigned = [
+            resource_index.get(_as_uuid(_field(task, "assigned_to")), -1)
+            for task in tasks
+        ]
+
+        edges: Dict[Tuple[int, int], Tuple[int, float]] = {}
+        for dependency in dependencies:
+            i = task_index.get(_field(dependency, "from_task_id"))
+            j = task_index.get(_field(dependency, "to_task_id"))
+            if i is None or j is None:
+                continue
+            edges[(i, j)] = (
+                _dependency_kind(_field(dependency, "dependency_type")),
+                float(_field(dependency, "lag") or 0.0),
+            )
+
+        return cls(
+            plan_id=plan_id,
+            task_ids=task_ids,
+            durations=_read_only(
+                [float(_field(task, "estimated_duration") or 0.0) for task in tasks], np.float64
+            ),
+            actual_durations=_read_only(
+                [np.nan if value is None else value for value in actual], np.float64
+            ),
+            assigned_resource=_read_only(assigned, np.int64),
+            edge_from=_read_only([i for i, _ in edges], np.int64),
+            edge_to=_read_only([j for _, j in edges], np.int64),
+            edge_kind=_read_only([kind for kind, _ in edges.values()], np.int64),
+            edge_lag=_read_only([lag for _, lag in edges.values()], np.float64),
+            resource_ids=resource_ids,
+            capacity_hours=_read_only(
+                [float(getattr(resource, "capacity_hours", None) or DEFAULT_CAPACITY_HOURS) for resource in resources],
+                np.float64,
+            ),
+            history_ratios=tuple(history_ratios_for_tasks(tasks)),
+            task_index=task_index,
+            resource_index=resource_index,
+            edge_index={edge: k for k, edge in enumerate(edges)},
+        )
+
+    def __len__(self) -> int:
+        return len(self.task_ids)
+
+    def graph(self, overlay: Optional["ScenarioOverlay"] = None) -> PlanGraph:
+        """
+        Build the plan graph with an overlay applied.
+
+        Args:
+            overlay: Optional scenario overlay
+
+        Returns:
+            PlanGraph: Graph of the (modified) plan
+        """
+        overlay = overlay or ScenarioOverlay()
+        durations = self.durations.copy()
+        for i, hours in overlay.durations.items():
+            durations[i] = hours
+
+        # Tasks of a resource with changed capacity take proportionally longer
+        if overlay.capacity_factors and len(self.resource_ids):
+            factors = np.ones(len(self.resource_ids))
+            for r, factor in overlay.capacity_factors.items():
+                factors[r] = factor
+            assigned = self.assigned_resource >= 0
+            durations[assigned] /= factors[self.assigned_resource[assigned]]
+
+        n = len(self.task_ids)
+        successors: List[List[Edge]] = [[] for _ in range(n)]
+        predecessors: List[List[Edge]] = [[] for _ in range(n)]
+
+        kinds = self.edge_kind.tolist()
+        lags = self.edge_lag.tolist()
+        for k, (kind, lag) in overlay.updated_edges.items():
+            kinds[k], lags[k] = kind, lag
+
+        edges = zip(self.edge_from.tolist(), self.edge_to.tolist(), kinds, lags)
+        for k, (i, j, kind, lag) in enumerate(edges):
+            if k in overlay.removed_edges:
+                continue
+            successors[i].append((j, kind, lag))
+            predecessors[j].append((i, kind, lag))
+
+        for i, j, kind, lag in overlay.added_edges:
+            successors[i].append((j, kind, lag))
+            predecessors[j].append((i, kind, lag))
+
+        return PlanGraph(
+            task_ids=list(self.task_ids),
+            durations=durations.tolist(),
+            successors=successors,
+            predecessors=predecessors,
+            index=self.task_index,
+        )
+
+    def duration_model(self, graph: PlanGraph) -> DurationModel:
+        """
+        Fit the duration model of a (modified) plan graph.
+
+        Args:
+            graph: Graph built from this snapshot
+
+        Returns:
+            DurationModel: Duration model; completed tasks keep their actual duration
+        """
+        model = DurationModel.from_graph(graph, self.history_ratios)
+        completed = ~np.isnan(self.actual_durations)
+        for values in (model.optimistic, model.most_likely, model.pessimistic):
+            values[completed] = self.actual_durations[completed]
+        return model
+
+
+@dataclass(frozen=True)
+class ScenarioOverlay:
+    """Sparse set of changes a scenario makes to a plan snapshot."""
+
+    durations: Mapping[int, float] = field(default_factory=dict)
+    """Estimated duration override per task index."""
+
+    capacity_factors: Mapping[int, float] = field(default_factory=dict)
+    """Capacity relative to the snapshot per resource index."""
+
+    removed_edges: FrozenSet[int] = frozenset()
+    updated_edges: Mapping[int, Tuple[int, float]] = field(default_factory=dict)
+    """``(kind, lag)`` per snapshot edge index."""
+
+    added_edges: Tuple[Tuple[int, int, int, float], ...] = ()
+    """``(from, to, kind, lag)`` of new dependencies."""
+
+    @classmethod
+    def from_modifications(
+        cls,
+        snapshot: PlanSnapshot,
+        task_modifications: Sequence[Dict[str, Any]] = (),
+        resource_modifications: Sequence[Dict[str, Any]] = (),
+        dependency_modifications: Sequence[Dict[str, Any]] = ()
+    ) -> "ScenarioOverlay":
+        """
+        Build an overlay from stored scenario modifications.
+
+        Only schedule-relevant changes are kept: task durations, resource
+        capacity (``capacity_hours`` or a numeric ``availability``
+        fraction) and dependency additions, removals and updates.
+        Modifications referencing unknown tasks or resources are ignored.
+
+        Args:
+            snapshot: Plan snapshot
+            task_modifications: Task modifications
+            resource_modifications: Resource modifications
+            dependency_modifications: Dependency modifications
+
+        Returns:
+            ScenarioOverlay: Scenario overlay
+        """
+        durations: Dict[int, float] = {}
+        for mod in task_modifications:
+            i = snapshot.task_index.get(_as_uuid(mod.get("task_id")))
+            if i is not None and mod.get("estimated_duration") is not None:
+                durations[i] = float(mod["estimated_duration"])
+
+        capacity_factors: Dict[int, float] = {}
+        for mod in resource_modifications:
+            r = snapshot.resource_index.get(_as_uuid(mod.get("resource_id")))
+            if r is None:
+                continue
+            factor = None
+            if mod.get("capacity_hours") is not None:
+                factor = float(mod["capacity_hours"]) / snapshot.capacity_hours[r]
+            elif isinstance(mod.get("availability"), (int, float)):
+                factor = float(mod["availability"])
+            if factor is not None and factor > 0:
+                capacity_factors[r] = factor
+
+        removed_edges = set()
+        updated_edges: Dict[int, Tuple[int, float]] = {}
+        added_edges = []
+        for mod in dependency_modifications:
+            i = snapshot.task_index.get(_as_uuid(mod.get("from_task_id")))
+            j = snapshot.task_index.get(_as_uuid(mod.get("to_task_id")))
+            if i is None or j is None:
+                continue
+
+            k = snapshot.edge_index.get((i, j))
+            action = mod.get("action")
+            if action == ADD and k is None:
+                added_edges.append((
+                    i,
+                    j,
+                    _dependency_kind(mod.get("dependency_type", "finish_to_start")),
+                    float(mod.get("lag") or 0.0),
+                ))
+            elif action == REMOVE and k is not None:
+                removed_edges.add(k)
+            elif action == UPDATE and k is not None:
+                kind = (
+                    _dependency_kind(mod["dependency_type"])
+                    if "dependency_type" in mod else int(snapshot.edge_kind[k])
+                )
+                lag = float(mod["lag"]) if "lag" in mod else float(snapshot.edge_lag[k])
+                updated_edges[k] = (kind, lag)
+
+        return cls(
+            durations=durations,
+            capacity_factors=capacity_factors,
+            removed_edges=frozenset(removed_edges),
+            updated_edges=updated_edges,
+            added_edges=tuple(added_edges),
+        )
+
+    @property
+    def changes_dependencies(self) -> bool:
+        """Whether the overlay changes the dependency structure of the plan."""
+        return bool(self.removed_edges or self.updated_edges or self.added_edges)
+
+
+@dataclass
+class ScenarioOutcome:
+    """Schedule of a plan snapshot with one overlay applied."""
+
+    project_duration: float
+    """Deterministic (CPM) duration in hours."""
+
+    critical_path: List[UUID]
+    simulation: Optional[SimulationResult]
+    error: Optional[str] = None
+    """Reason the scenario could not be scheduled (e.g. a dependency cycle)."""
+
+
+def evaluate_scenarios(
+    snapshot: PlanSnapshot,
+    overlays: Sequence[ScenarioOverlay],
+    iterations: int,
+    confidence_interval: float = 0.95,
+    time_step_hours: float = 8.0,
+    seed: Optional[int] = None
+) -> List[ScenarioOutcome]:
+    """
+    Schedule and simulate a batch of scenarios against one snapshot.
+
+    This function is synchronous and picklable so a batch can run in a
+    worker process; the snapshot is transferred once per batch. Scenarios
+    that keep the plan's dependencies share its compiled simulation layout
+    and topological order, so only their duration model is rebuilt.
+
+    Args:
+        snapshot: Plan snapshot
+        overlays: Scenario overlays
+        iterations: Monte Carlo iterations per scenario
+        confidence_interval: Confidence interval (0.0-1.0)
+        time_step_hours: Timeline resolution in hours
+        seed: Optional random seed (shared by all scenarios for comparable draws)
+
+    Returns:
+        List[ScenarioOutcome]: One outcome per overlay
+    """
+    engine = CriticalPathEngine()
+    base: Optional[Tuple[List[int], SimulationModel]] = None
+    outcomes = []
+    for overlay in overlays:
+        graph = snapshot.graph(overlay)
+        try:
+            if overlay.changes_dependencies:
+                model = SimulationModel.from_graph(graph, snapshot.duration_model(graph))
+            else:
+                if base is None:
+                    base_graph = snapshot.graph()
+                    base = (
+                        base_graph.topological_order(),
+                        SimulationModel.from_graph(base_graph, snapshot.duration_model(base_graph)),
+                    )
+                graph._order = base[0]
+                model = replace(base[1], durations=snapshot.duration_model(graph))
+            schedule = engine.compute(graph)
+        except CyclicDependencyError as e:
+            outcomes.append(ScenarioOutcome(
+                project_duration=0.0,
+                critical_path=[],
+                simulation=None,
+                error=e.message,
+            ))
+            continue
+
+        outcomes.append(ScenarioOutcome(
+            project_duration=schedule.project_duration,
+            critical_path=[graph.task_ids[i] for i in schedule.critical_path],
+            simulation=simulate_schedule(
+                model,
+                iterations=iterations,
+                seed=seed,
+                confidence_interval=confidence_interval,
+                time_step_hours=time_step_hours,
+            ),
+        ))
+    return outcomes
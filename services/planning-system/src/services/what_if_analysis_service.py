@@ -5,12 +5,13 @@ This module implements the what-if analysis service, which provides
 functionality for scenario modeling and impact analysis.
 """
 
+import asyncio
 import logging
+import random
 import uuid
-from typing import List, Dict, Any, Optional, Tuple, Union
+from typing import List, Dict, Any, Optional, Union
 from uuid import UUID
 from datetime import datetime, timedelta
-import copy
 
 from shared.utils.src.messaging import EventBus
 
@@ -19,6 +20,7 @@ from ..models.api import (
     WhatIfScenarioUpdate,
     WhatIfScenarioResponse,
     WhatIfAnalysisResult,
+    WhatIfBatchResult,
     TimelineForecast,
     PaginatedResponse
 )
@@ -29,6 +31,13 @@ from ..exceptions import (
 from .repository import PlanningRepository
 from .forecaster import ProjectForecaster
 from .base import BasePlannerComponent
+from .scheduling import (
+    PlanSnapshot,
+    ScenarioOverlay,
+    ScenarioOutcome,
+    evaluate_scenarios,
+    run_off_loop,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -56,6 +65,7 @@ class WhatIfAnalysisService(BasePlannerComponent):
         """
         super().__init__(repository, event_bus, "WhatIfAnalysisService")
         self.forecaster = forecaster
+        self.settings = forecaster.settings
     
     async def create_scenario(self, scenario_data: WhatIfScenarioCreate) -> WhatIfScenarioResponse:
         """
@@ -228,6 +238,10 @@ class WhatIfAnalysisService(BasePlannerComponent):
         """
         Run what-if analysis for a scenario.
         
+        The baseline and the scenario are evaluated together on one
+        snapshot of the plan with the same random draws, so the comparison
+        reflects only the scenario's modifications.
+        
         Args:
             scenario_id: Scenario ID
             confidence_interval: Optional confidence interval (0.0-1.0)
@@ -252,27 +266,21 @@ class WhatIfAnalysisService(BasePlannerComponent):
         if not plan:
             await self._handle_not_found_error("plan", scenario.plan_id)
         
+        confidence_interval = confidence_interval or 0.95
+        
         try:
-            # Apply scenario modifications to create a temporary plan state
-            modified_plan, modified_tasks, modified_resources = await self._apply_scenario_modifications(scenario)
-            
-            # Generate forecast for modified plan
-            forecast = await self._generate_forecast_for_modified_plan(
-                plan=modified_plan,
-                tasks=modified_tasks,
-                resources=modified_resources,
-                confidence_interval=confidence_interval or 0.95
-            )
+            # Overlay the scenario's modifications on a snapshot of the plan
+            snapshot = await self._load_snapshot(scenario.plan_id)
+            overlays = [ScenarioOverlay(), self._scenario_overlay(snapshot, scenario)]
             
-            # Get baseline forecast for comparison
-            baseline_forecast = await self.forecaster.get_latest_forecast(scenario.plan_id)
-            
-            # If no baseline forecast exists, create one
-            if not baseline_forecast:
-                baseline_forecast = await self.forecaster.create_forecast(
-                    plan_id=scenario.plan_id,
-                    confidence_interval=confidence_interval or 0.95
-                )
+            # Evaluate the baseline and the modified plan in one batch
+            outcomes = await self._evaluate_overlays(
+                snapshot=snapshot,
+                overlays=overlays,
+                confidence_interval=confidence_interval
+            )
+            baseline_forecast = self._outcome_to_forecast(snapshot, outcomes[0], confidence_interval)
+            forecast = self._outcome_to_forecast(snapshot, outcomes[1], confidence_interval)
             
             # Compare forecasts
             comparison = await self._compare_forecasts(baseline_forecast, forecast)
@@ -309,6 +317,106 @@ class WhatIfAnalysisService(BasePlannerComponent):
                 details={"scenario_id": str(scenario_id)}
             )
     
+    async def run_batch_what_if(
+        self,
+        plan_id: UUID,
+        scenario_ids: Optional[List[UUID]] = None,
+        confidence_interval: Optional[float] = None,
+        iterations: Optional[int] = None,
+    ) -> WhatIfBatchResult:
+        """
+        Run what-if analysis for several scenarios of a plan at once.
+        
+        The plan is loaded once into a snapshot; every scenario is a sparse
+        overlay on it. The baseline and all scenarios are evaluated
+        concurrently in the scheduling process pool with the same random
+        draws, so their forecasts are directly comparable.
+        
+        Args:
+            plan_id: Plan ID
+            scenario_ids: Optional scenario IDs (all scenarios of the plan if omitted)
+            confidence_interval: Optional confidence interval (0.0-1.0)
+            iterations: Optional Monte Carlo iterations per scenario
+            
+        Returns:
+            WhatIfBatchResult: Baseline forecast and per-scenario results
+            
+        Raises:
+            PlanNotFoundError: If plan not found
+            ScenarioNotFoundError: If a scenario is not found
+            ForecastingError: If the scenarios belong to another plan or too many are requested
+        """
+        await self._log_operation("Running", "batch what-if analysis", entity_id=plan_id)
+        confidence_interval = confidence_interval or 0.95
+        
+        plan = await self.repository.get_plan_by_id(plan_id)
+        if not plan:
+            await self._handle_not_found_error("plan", plan_id)
+        
+        scenarios = await self._load_batch_scenarios(plan_id, scenario_ids)
+        
+        snapshot = await self._load_snapshot(plan_id)
+        overlays = [ScenarioOverlay()] + [
+            self._scenario_overlay(snapshot, scenario) for scenario in scenarios
+        ]
+        
+        try:
+            outcomes = await self._evaluate_overlays(
+                snapshot=snapshot,
+                overlays=overlays,
+                confidence_interval=confidence_interval,
+                iterations=iterations
+            )
+            baseline_forecast = self._outcome_to_forecast(snapshot, outcomes[0], confidence_interval)
+        except Exception as e:
+            self.logger.error(f"Batch what-if analysis error: {str(e)}")
+            raise ForecastingError(
+                message=f"Failed to run batch what-if analysis: {str(e)}",
+                details={"plan_id": str(plan_id)}
+            )
+        
+        results = []
+        errors = {}
+        for scenario, outcome in zip(scenarios, outcomes[1:]):
+            if outcome.error:
+                errors[str(scenario.id)] = outcome.error
+                continue
+            
+            forecast = self._outcome_to_forecast(snapshot, outcome, confidence_interval)
+            analysis_result = WhatIfAnalysisResult(
+                scenario_id=scenario.id,
+                plan_id=plan_id,
+                generated_at=datetime.utcnow(),
+                baseline_forecast=baseline_forecast,
+                scenario_forecast=forecast,
+                comparison=await self._compare_forecasts(baseline_forecast, forecast),
+                scenario_description=scenario.description,
+                scenario_name=scenario.name
+            )
+            await self.repository.create_what_if_analysis_result(analysis_result.model_dump())
+            results.append(analysis_result)
+        
+        batch_result = WhatIfBatchResult(
+            plan_id=plan_id,
+            generated_at=datetime.utcnow(),
+            baseline_forecast=baseline_forecast,
+            results=results,
+            errors=errors
+        )
+        
+        # Publish event
+        await self._publish_event(
+            "what_if_analysis.batch_completed",
+            plan,
+            {
+                "plan_id": str(plan_id),
+                "scenario_ids": [str(result.scenario_id) for result in results],
+                "failed_scenario_ids": list(errors)
+            }
+        )
+        
+        return batch_result
+    
     async def compare_scenarios(
         self,
         scenario_id_1: UUID,
@@ -595,113 +703,179 @@ class WhatIfAnalysisService(BasePlannerComponent):
             has_analysis_results=latest_result is not None
         )
     
-    async def _apply_scenario_modifications(self, scenario) -> Tuple[Any, List[Any], List[Any]]:
+    async def _load_snapshot(self, plan_id: UUID) -> PlanSnapshot:
         """
-        Apply scenario modifications to create a temporary plan state.
+        Load a plan into an immutable snapshot.
         
         Args:
-            scenario: What-if scenario
+            plan_id: Plan ID
             
         Returns:
-            Tuple[Any, List[Any], List[Any]]: Modified plan, tasks, and resources
+            PlanSnapshot: Plan snapshot
         """
-        # Get plan and related data
-        plan = await self.repository.get_plan_by_id(scenario.plan_id)
-        tasks = await self.repository.get_tasks_by_plan(scenario.plan_id)
-        resources = await self.repository.get_resources_for_plan(scenario.plan_id)
+        tasks = await self.repository.get_tasks_by_plan(plan_id)
+        dependencies = await self.repository.get_all_dependencies_for_plan(plan_id)
+        resources = await self.repository.get_resources_for_plan(plan_id)
         
-        # Create deep copies to avoid modifying the original data
-        modified_plan = copy.deepcopy(plan)
-        modified_tasks = copy.deepcopy(tasks)
-        modified_resources = copy.deepcopy(resources)
+        return PlanSnapshot.from_plan(plan_id, tasks, dependencies, resources)
+    
+    def _scenario_overlay(self, snapshot: PlanSnapshot, scenario: Any) -> ScenarioOverlay:
+        """
+        Build the overlay of a scenario's modifications on a snapshot.
         
-        # Apply task modifications
-        for task_mod in scenario.task_modifications:
-            task_id = task_mod.get("task_id")
-            if not task_id:
-                continue
+        Args:
+            snapshot: Plan snapshot
+            scenario: What-if scenario
             
-            # Find task in modified tasks
-            for i, task in enumerate(modified_tasks):
-                if str(task.id) == task_id:
-                    # Apply modifications
-                    if "estimated_duration" in task_mod:
-                        modified_tasks[i].estimated_duration = task_mod["estimated_duration"]
-                    if "estimated_effort" in task_mod:
-                        modified_tasks[i].estimated_effort = task_mod["estimated_effort"]
-                    if "required_skills" in task_mod:
-                        modified_tasks[i].required_skills = task_mod["required_skills"]
-                    if "priority" in task_mod:
-                        modified_tasks[i].priority = task_mod["priority"]
-                    break
+        Returns:
+            ScenarioOverlay: Scenario overlay
+        """
+        return ScenarioOverlay.from_modifications(
+            snapshot,
+            task_modifications=scenario.task_modifications or [],
+            resource_modifications=scenario.resource_modifications or [],
+            dependency_modifications=scenario.dependency_modifications or []
+        )
+    
+    async def _load_batch_scenarios(
+        self,
+        plan_id: UUID,
+        scenario_ids: Optional[List[UUID]]
+    ) -> List[Any]:
+        """
+        Load the scenarios of a batch analysis.
         
-        # Apply resource modifications
-        for resource_mod in scenario.resource_modifications:
-            resource_id = resource_mod.get("resource_id")
-            if not resource_id:
-                continue
+        Args:
+            plan_id: Plan ID
+            scenario_ids: Optional scenario IDs (all scenarios of the plan if None)
+            
+        Returns:
+            List[Any]: Scenarios
             
-            # Find resource in modified resources
-            for i, resource in enumerate(modified_resources):
-                if str(resource.id) == resource_id:
-                    # Apply modifications
-                    if "availability" in resource_mod:
-                        modified_resources[i].availability = resource_mod["availability"]
-                    if "skills" in resource_mod:
-                        modified_resources[i].skills = resource_mod["skills"]
-                    break
-        
-        return modified_plan, modified_tasks, modified_resources
+        Raises:
+            ScenarioNotFoundError: If a scenario is not found
+            ForecastingError: If a scenario belongs to another plan or too many are requested
+        """
+        max_scenarios = self.settings.what_if_max_batch_scenarios
+        
+        if scenario_ids is None:
+            scenarios, _ = await self.repository.list_what_if_scenarios(
+                filters={"plan_id": plan_id},
+                pagination={"page": 1, "page_size": max_scenarios}
+            )
+            return list(scenarios)
+        
+        if len(scenario_ids) > max_scenarios:
+            raise ForecastingError(
+                message=f"Too many scenarios in batch: {len(scenario_ids)} (maximum {max_scenarios})",
+                details={"plan_id": str(plan_id)}
+            )
+        
+        scenarios = []
+        for scenario_id in dict.fromkeys(scenario_ids):
+            scenario = await self.repository.get_what_if_scenario_by_id(scenario_id)
+            if not scenario:
+                await self._handle_not_found_error("what-if scenario", scenario_id, ScenarioNotFoundError)
+            if scenario.plan_id != plan_id:
+                raise ForecastingError(
+                    message="Cannot analyze scenarios of a different plan",
+                    details={
+                        "plan_id": str(plan_id),
+                        "scenario_id": str(scenario_id),
+                        "scenario_plan_id": str(scenario.plan_id)
+                    }
+                )
+            scenarios.append(scenario)
+        return scenarios
+    
+    async def _evaluate_overlays(
+        self,
+        snapshot: PlanSnapshot,
+        overlays: List[ScenarioOverlay],
+        confidence_interval: float,
+        iterations: Optional[int] = None
+    ) -> List[ScenarioOutcome]:
+        """
+        Evaluate overlays against a snapshot in the scheduling process pool.
+        
+        Overlays are split into one interleaved batch per worker so the
+        snapshot is sent to each worker once. All batches share one seed.
+        
+        Args:
+            snapshot: Plan snapshot
+            overlays: Scenario overlays
+            confidence_interval: Confidence interval (0.0-1.0)
+            iterations: Optional Monte Carlo iterations per scenario
+            
+        Returns:
+            List[ScenarioOutcome]: One outcome per overlay, in order
+        """
+        workers = self.settings.scheduling_process_pool_workers
+        batch_count = max(min(workers, len(overlays)), 1)
+        seed = random.getrandbits(32)
+        
+        batches = await asyncio.gather(*(
+            run_off_loop(
+                evaluate_scenarios,
+                snapshot,
+                overlays[k::batch_count],
+                iterations or self.settings.what_if_iterations,
+                confidence_interval,
+                8.0,
+                seed,
+                use_process_pool=True,
+                max_workers=workers
+            )
+            for k in range(batch_count)
+        ))
+        
+        outcomes: List[Optional[ScenarioOutcome]] = [None] * len(overlays)
+        for k, batch in enumerate(batches):
+            outcomes[k::batch_count] = batch
+        return outcomes
     
-    async def _generate_forecast_for_modified_plan(
+    def _outcome_to_forecast(
         self,
-        plan: Any,
-        tasks: List[Any],
-        resources: List[Any],
+        snapshot: PlanSnapshot,
+        outcome: ScenarioOutcome,
         confidence_interval: float
     ) -> TimelineForecast:
         """
-        Generate a forecast for a modified plan.
+        Convert a scenario outcome into a timeline forecast.
         
         Args:
-            plan: Modified plan
-            tasks: Modified tasks
-            resources: Modified resources
+            snapshot: Plan snapshot the outcome was evaluated on
+            outcome: Scenario outcome
             confidence_interval: Confidence interval
             
         Returns:
-            TimelineForecast: Generated forecast
+            TimelineForecast: Forecast of the scenario
+            
+        Raises:
+            ForecastingError: If the scenario could not be scheduled
         """
-        # Get dependencies
-        dependencies = await self.repository.get_all_dependencies_for_plan(plan.id)
-        
-        # Generate timeline
-        timeline_points = await self.forecaster._generate_timeline(
-            plan=plan,
-            tasks=tasks,
-            dependencies=dependencies,
-            confidence_interval=confidence_interval,
-            time_unit="day"
-        )
+        if outcome.error:
+            raise ForecastingError(
+                message=f"Scenario cannot be scheduled: {outcome.error}",
+                details={"plan_id": str(snapshot.plan_id)}
+            )
         
-        # Calculate completion dates
-        completion_dates = await self.forecaster._calculate_completion_dates(
-            timeline_points=timeline_points,
+        timeline_points, completion_dates, simulation_fields = self.forecaster._simulation_forecast(
+            result=outcome.simulation,
+            task_ids=list(snapshot.task_ids),
             confidence_interval=confidence_interval
         )
         
-        # Create forecast
-        forecast = TimelineForecast(
-            plan_id=plan.id,
+        return TimelineForecast(
+            plan_id=snapshot.plan_id,
             generated_at=datetime.utcnow(),
             confidence_interval=confidence_interval,
             timeline=timeline_points,
             expected_completion=completion_dates["expected"],
             best_case_completion=completion_dates["best_case"],
-            worst_case_completion=completion_dates["worst_case"]
+            worst_case_completion=completion_dates["worst_case"],
+            **simulation_fields
         )
-        
-        return forecast
     
     async def _compare_forecasts(
         self,
@@ -0,0 +1,220 @@
+import pytest
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from src.exceptions import CyclicDependencyError
+from src.services.dependency_manager import DependencyManager
+from src.services.repository import PlanningRepository
+from src.services.scheduling import CriticalPathEngine, PlanGraph
+
+
+def make_tasks(*durations):
+    """
+    Create tasks with the given durations in hours.
+    """
+    return [SimpleNamespace(id=uuid.uuid4(), estimated_duration=duration) for duration in durations]
+
+
+def dependency(from_task, to_task, dependency_type="FINISH_TO_START", lag=0.0):
+    """
+    Create a dependency row.
+    """
+    return {
+        "from_task_id": from_task.id,
+        "to_task_id": to_task.id,
+        "dependency_type": dependency_type,
+        "lag": lag,
+    }
+
+
+def compute(tasks, dependencies):
+    """
+    Run the CPM engine for tasks and dependencies.
+    """
+    return CriticalPathEngine().compute_for_plan(tasks, dependencies)
+
+
+class TestCriticalPathEngine:
+    """
+    Tests for the CPM forward and backward passes.
+    """
+    
+    @pytest.mark.parametrize("dependency_type, lag, successor_start, project_duration", [
+        ("FINISH_TO_START", 2.0, 6.0, 9.0),   # B starts 2h after A finishes
+        ("START_TO_START", 1.0, 1.0, 4.0),    # B starts 1h after A starts
+        ("FINISH_TO_FINISH", 2.0, 3.0, 6.0),  # B finishes 2h after A finishes
+        ("START_TO_FINISH", 5.0, 2.0, 5.0),   # B finishes 5h after A starts
+    ])
+    def test_dependency_types_with_lag(self, dependency_type, lag, successor_start, project_duration):
+        """
+        Test the forward and backward passes for every dependency type.
+        """
+        a, b = make_tasks(4, 3)
+        
+        result = compute([a, b], [dependency(a, b, dependency_type, lag)])
+        
+        assert result.earliest_start == [0.0, successor_start]
+        assert result.earliest_finish == [4.0, successor_start + 3]
+        assert result.project_duration == project_duration
+        assert result.latest_finish[1] == project_duration
+        assert result.slack == [0.0, 0.0]
+        assert result.critical_path == [0, 1]
+    
+    def test_backward_pass_slack(self):
+        """
+        Test that tasks off the longest path get latest times and slack.
+        """
+        a, b, c = make_tasks(4, 2, 1)
+        
+        result = compute([a, b, c], [dependency(a, c), dependency(b, c)])
+        
+        assert result.project_duration == 5.0
+        assert result.latest_start == [0.0, 2.0, 4.0]
+        assert result.latest_finish == [4.0, 4.0, 5.0]
+        assert result.slack == [0.0, 2.0, 0.0]
+        assert result.critical_task_ids == {a.id, c.id}
+        assert not result.is_critical(b.id)
+    
+    def test_negative_float_is_critical(self):
+        """
+        Test that tasks with negative float from rounding are critical.
+        """
+        a, b, c, d = make_tasks(0.1, 0.1, 0.2, 0.7)
+        
+        result = compute([a, b, c, d], [dependency(a, b), dependency(b, d), dependency(c, d)])
+        
+        assert min(result.slack) < 0
+        assert result.critical_task_ids == {a.id, b.id, c.id, d.id}
+    
+    def test_critical_edges(self):
+        """
+        Test that only tight dependencies between critical tasks are critical.
+        """
+        a, b, c, d = make_tasks(2, 2, 1, 1)
+        
+        result = compute([a, b, c, d], [
+            dependency(a, b),
+            dependency(b, c),
+            dependency(a, c),  # Both tasks are critical, but the edge is not tight
+            dependency(d, c),  # D has slack
+        ])
+        
+        assert result.is_critical_edge(a.id, b.id)
+        assert result.is_critical_edge(b.id, c.id)
+        assert not result.is_critical_edge(a.id, c.id)
+        assert not result.is_critical_edge(d.id, c.id)
+    
+    def test_cycles_are_rejected(self):
+        """
+        Test that a cyclic graph raises CyclicDependencyError.
+        """
+        a, b, c = make_tasks(1, 1, 1)
+        
+        with pytest.raises(CyclicDependencyError):
+            compute([a, b, c], [dependency(a, b), dependency(b, c), dependency(c, b)])
+    
+    def test_dependencies_outside_the_plan_are_ignored(self):
+        """
+        Test that dependencies to unknown tasks do not enter the graph.
+        """
+        a, b = make_tasks(1, 1)
+        
+        graph = PlanGraph.from_plan([a], [dependency(a, b)])
+        
+        assert graph.edge_count == 0
+    
+    def test_schedule_rows(self):
+        """
+        Test that schedule rows are calendar dates relative to the start date.
+        """
+        a, b = make_tasks(4, 2)
+        start_date = datetime(2024, 1, 1)
+        
+        rows = compute([a, b], [dependency(a, b)]).schedule_rows(start_date)
+        
+        assert rows[1] == {
+            "id": b.id,
+            "earliest_start": start_date + timedelta(hours=4),
+            "earliest_finish": start_date + timedelta(hours=6),
+            "latest_start": start_date + timedelta(hours=4),
+            "latest_finish": start_date + timedelta(hours=6),
+            "slack": 0.0,
+            "is_critical_path": True,
+        }
+
+
+class TestAnalyzeSchedule:
+    """
+    Tests for the memoized schedule analysis of the dependency manager.
+    """
+    
+    @pytest.fixture
+    def plan(self):
+        """
+        Plan with two dependent tasks.
+        """
+        a, b = make_tasks(4, 2)
+        return uuid.uuid4(), [a, b], [dependency(a, b)]
+    
+    @pytest.fixture
+    def repository(self, plan):
+        """
+        Repository returning the plan's task graph.
+        """
+        _, tasks, dependencies = plan
+        repository = MagicMock()
+        repository.get_plan_task_graph = AsyncMock(return_value=(tasks, dependencies))
+        repository.bulk_update_task_schedule_data = AsyncMock()
+        return repository
+    
+    @pytest.mark.asyncio
+    async def test_schedules_are_memoized_until_invalidated(self, plan, repository):
+        """
+        Test that a plan is analyzed once until its schedule is invalidated.
+        """
+        plan_id, _, _ = plan
+        manager = DependencyManager(repository, MagicMock())
+        
+        first = await manager.analyze_schedule(plan_id)
+        second = await manager.analyze_schedule(plan_id)
+        manager.invalidate_schedule(uuid.uuid4())
+        third = await manager.analyze_schedule(plan_id)
+        manager.invalidate_schedule(plan_id)
+        fourth = await manager.analyze_schedule(plan_id)
+        
+        assert first is second is third
+        assert fourth is not first
+        assert repository.get_plan_task_graph.await_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_schedule_is_persisted_in_bulk(self, plan, repository):
+        """
+        Test that schedule data of all tasks is stored with one bulk update.
+        """
+        plan_id, tasks, _ = plan
+        manager = DependencyManager(repository, MagicMock())
+        
+        await manager.analyze_schedule(plan_id, start_date=datetime(2024, 1, 1))
+        await manager.analyze_schedule(uuid.uuid4(), persist=False)
+        
+        repository.bulk_update_task_schedule_data.assert_awaited_once()
+        rows = repository.bulk_update_task_schedule_data.await_args.args[0]
+        assert [row["id"] for row in rows] == [task.id for task in tasks]
+    
+    @pytest.mark.asyncio
+    async def test_bulk_update_is_one_statement(self):
+        """
+        Test that the repository writes schedule rows with one executemany.
+        """
+        session = MagicMock()
+        session.execute = AsyncMock()
+        a, b = make_tasks(4, 2)
+        rows = compute([a, b], [dependency(a, b)]).schedule_rows(datetime(2024, 1, 1))
+        
+        await PlanningRepository(session).bulk_update_task_schedule_data(rows)
+        await PlanningRepository(session).bulk_update_task_schedule_data([])
+        
+        session.execute.assert_awaited_once()
+        assert session.execute.await_args.args[1] == rows
@@ -0,0 +1,337 @@
+import pytest
+import random
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from src.exceptions import CyclicDependencyError, InvalidDependencyError
+from src.models.api import DependencyCreate
+from src.services.dependency_manager import DependencyManager
+from src.services.repository import PlanningRepository, ROLLBACK_CALLBACKS
+from src.services.scheduling import DependencyGraphCache, DynamicTopologicalOrder
+
+
+def assert_valid_order(graph, edges):
+    """
+    Assert that every edge goes forward in the graph's order.
+    """
+    position = {node: i for i, node in enumerate(graph.order())}
+    for u, v in edges:
+        assert position[u] < position[v], f"{u} -> {v} is out of order"
+
+
+class TestDynamicTopologicalOrder:
+    """
+    Tests for the incremental topological order.
+    """
+    
+    def test_order_is_repaired_after_insertion(self):
+        """
+        Test that inserting edges against the order reorders the affected tasks.
+        """
+        graph = DynamicTopologicalOrder.from_edges(range(6), [(0, 1), (2, 3), (4, 5)])
+        edges = [(0, 1), (2, 3), (4, 5)]
+        
+        # Chain the pairs backwards: 4 -> 5 -> 2 -> 3 -> 0 -> 1
+        for u, v in [(5, 2), (3, 0)]:
+            assert not graph.would_create_cycle(u, v)
+            graph.add_edge(u, v)
+            edges.append((u, v))
+            assert_valid_order(graph, edges)
+        
+        assert graph.order() == [4, 5, 2, 3, 0, 1]
+        assert graph.would_create_cycle(1, 4)
+    
+    def test_random_insertions_keep_a_valid_order(self):
+        """
+        Test that random acyclic insertions keep the order valid.
+        """
+        rng = random.Random(7)
+        ranks = list(range(200))
+        rng.shuffle(ranks)
+        graph = DynamicTopologicalOrder.from_edges(range(200), [])
+        edges = []
+        
+        for _ in range(1000):
+            u, v = rng.sample(range(200), 2)
+            # Edges follow the hidden ranking, so the graph stays acyclic
+            if ranks[u] > ranks[v]:
+                u, v = v, u
+            graph.add_edge(u, v)
+            edges.append((u, v))
+        
+        assert graph.edge_count == len(set(edges))
+        assert_valid_order(graph, edges)
+    
+    def test_cycles_are_rejected(self):
+        """
+        Test that an edge closing a cycle is rejected and not inserted.
+        """
+        graph = DynamicTopologicalOrder.from_edges(["a", "b", "c", "d"], [("a", "b"), ("b", "c"), ("c", "d")])
+        
+        assert graph.would_create_cycle("d", "a")
+        assert graph.would_create_cycle("a", "a")
+        with pytest.raises(CyclicDependencyError):
+            graph.add_edge("d", "a")
+        with pytest.raises(CyclicDependencyError):
+            graph.add_edge("b", "b")
+        
+        assert not graph.has_edge("d", "a")
+        assert_valid_order(graph, [("a", "b"), ("b", "c"), ("c", "d")])
+    
+    def test_initial_cycles_are_rejected(self):
+        """
+        Test that building a graph from cyclic edges fails.
+        """
+        with pytest.raises(CyclicDependencyError):
+            DynamicTopologicalOrder.from_edges([], [("a", "b"), ("b", "a")])
+    
+    def test_removed_edges_allow_reverse_edges(self):
+        """
+        Test that removing edges and nodes keeps the order usable.
+        """
+        graph = DynamicTopologicalOrder.from_edges(["a", "b", "c"], [("a", "b"), ("b", "c")])
+        
+        graph.remove_edge("b", "c")
+        graph.add_edge("c", "a")
+        graph.remove_node("b")
+        
+        assert "b" not in graph
+        assert graph.edge_count == 1
+        assert_valid_order(graph, [("c", "a")])
+
+
+class FakePlan:
+    """
+    Plan with tasks, backed by a mocked repository and real graph cache.
+    """
+    
+    def __init__(self, task_count):
+        self.id = uuid.uuid4()
+        self.tasks = [
+            SimpleNamespace(id=uuid.uuid4(), plan_id=self.id, name=f"Task {i}", estimated_duration=1.0)
+            for i in range(task_count)
+        ]
+        by_id = {task.id: task for task in self.tasks}
+        
+        self.session = MagicMock()
+        self.session.info = {}
+        self.repository = PlanningRepository(self.session)
+        self.repository.get_task_by_id = AsyncMock(side_effect=by_id.get)
+        self.repository.get_tasks_by_plan = AsyncMock(return_value=self.tasks)
+        self.repository.get_plan_task_graph = AsyncMock(return_value=(self.tasks, []))
+        self.repository.get_dependency = AsyncMock(return_value=None)
+        self.repository.bulk_create_dependencies = AsyncMock()
+        self.repository.bulk_update_task_schedule_data = AsyncMock()
+        
+        self.event_bus = MagicMock()
+        self.event_bus.publish = AsyncMock()
+        self.cache = DependencyGraphCache()
+        self.manager = DependencyManager(self.repository, self.event_bus, self.cache)
+        self.manager._to_response_model = AsyncMock(side_effect=lambda dependency, **tasks: dependency)
+    
+    def edge(self, i, j):
+        return DependencyCreate(from_task_id=self.tasks[i].id, to_task_id=self.tasks[j].id)
+    
+    def roll_back(self):
+        """Run the rollback callbacks the way the request session does."""
+        for callback in self.session.info.pop(ROLLBACK_CALLBACKS, []):
+            callback()
+
+
+class TestCreateDependencies:
+    """
+    Tests for batch dependency creation.
+    """
+    
+    @pytest.mark.asyncio
+    async def test_batch_is_stored_with_one_insert(self):
+        """
+        Test that a valid batch is inserted and published once.
+        """
+        plan = FakePlan(4)
+        
+        responses = await plan.manager.create_dependencies([plan.edge(0, 1), plan.edge(1, 2), plan.edge(2, 3)])
+        
+        assert len(responses) == 3
+        plan.repository.bulk_create_dependencies.assert_awaited_once()
+        assert len(plan.repository.bulk_create_dependencies.await_args.args[0]) == 3
+        plan.event_bus.publish.assert_awaited_once()
+        assert plan.event_bus.publish.await_args.args[0] == "dependency.batch_created"
+        assert plan.cache.get(plan.id).edge_count == 3
+    
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("edges, message", [
+        ([(0, 1), (1, 2), (2, 0)], "Circular dependency detected"),
+        ([(0, 1), (0, 1)], "Dependency already exists"),
+    ])
+    async def test_invalid_batches_leave_the_cache_unchanged(self, edges, message):
+        """
+        Test that a rejected batch is not stored and its edges are rolled back.
+        """
+        plan = FakePlan(3)
+        
+        with pytest.raises(InvalidDependencyError) as error:
+            await plan.manager.create_dependencies([plan.edge(i, j) for i, j in edges])
+        
+        assert error.value.message == message
+        plan.repository.bulk_create_dependencies.assert_not_awaited()
+        assert plan.cache.get(plan.id).edge_count == 0
+    
+    @pytest.mark.asyncio
+    async def test_tasks_of_other_plans_are_rejected(self):
+        """
+        Test that a batch must stay within the plan of its first task.
+        """
+        plan = FakePlan(2)
+        other = FakePlan(1)
+        plan.repository.get_task_by_id.side_effect = {
+            task.id: task for task in plan.tasks + other.tasks
+        }.get
+        
+        with pytest.raises(InvalidDependencyError) as error:
+            await plan.manager.create_dependencies([
+                plan.edge(0, 1),
+                DependencyCreate(from_task_id=plan.tasks[1].id, to_task_id=other.tasks[0].id),
+            ])
+        
+        assert error.value.message == "Tasks must be in the same plan"
+        assert plan.cache.get(plan.id).edge_count == 0
+    
+    @pytest.mark.asyncio
+    async def test_rollback_invalidates_the_cached_graph(self):
+        """
+        Test that a rolled back batch does not stay in the cached graph.
+        """
+        plan = FakePlan(2)
+        
+        await plan.manager.create_dependencies([plan.edge(0, 1)])
+        assert plan.cache.get(plan.id).has_edge(plan.tasks[0].id, plan.tasks[1].id)
+        
+        plan.roll_back()
+        
+        assert plan.cache.get(plan.id) is None
+
+
+class TestCreateDependency:
+    """
+    Tests for single dependency creation against the cached graph.
+    """
+    
+    @pytest.mark.asyncio
+    async def test_cycle_formed_while_storing_is_rejected(self):
+        """
+        Test that the cycle check is repeated after the dependency is stored.
+        """
+        plan = FakePlan(2)
+        a, b = plan.tasks
+        
+        async def create_dependency(**dependency):
+            # Another request adds b -> a while this dependency is stored
+            plan.cache.get(plan.id).add_edge(b.id, a.id)
+            return SimpleNamespace(id=uuid.uuid4(), **dependency)
+        
+        plan.repository.create_dependency = create_dependency
+        
+        with pytest.raises(InvalidDependencyError):
+            await plan.manager.create_dependency(plan.edge(0, 1))
+        
+        assert not plan.cache.get(plan.id).has_edge(a.id, b.id)
+    
+    @pytest.mark.asyncio
+    async def test_failed_publish_invalidates_the_cached_graph(self):
+        """
+        Test that a dependency whose request fails after the insert is dropped from the cache.
+        """
+        plan = FakePlan(2)
+        plan.repository.create_dependency = AsyncMock(
+            side_effect=lambda **dependency: SimpleNamespace(id=uuid.uuid4(), **dependency)
+        )
+        plan.event_bus.publish.side_effect = RuntimeError("event bus unavailable")
+        
+        with pytest.raises(RuntimeError):
+            await plan.manager.create_dependency(plan.edge(0, 1))
+        plan.roll_back()
+        
+        assert plan.cache.get(plan.id) is None
+
+
+class TestDependencyGraphCache:
+    """
+    Tests for the per-plan graph cache.
+    """
+    
+    @pytest.mark.asyncio
+    async def test_events_of_other_processes_invalidate(self):
+        """
+        Test that only dependency events of other processes invalidate a plan.
+        """
+        cache = DependencyGraphCache()
+        plan_id = uuid.uuid4()
+        cache.put(plan_id, DynamicTopologicalOrder())
+        
+        await cache._handle_dependency_event({"plan_id": str(plan_id), "origin": cache.instance_id})
+        assert cache.get(plan_id) is not None
+        
+        await cache._handle_dependency_event({"plan_id": str(plan_id), "origin": "other"})
+        assert cache.get(plan_id) is None
+    
+    def test_least_recently_used_plans_are_evicted(self):
+        """
+        Test that the cache keeps at most max_plans graphs.
+        """
+        cache = DependencyGraphCache(max_plans=2)
+        first, second, third = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+        
+        cache.put(first, DynamicTopologicalOrder())
+        cache.put(second, DynamicTopologicalOrder())
+        cache.get(first)
+        cache.put(third, DynamicTopologicalOrder())
+        
+        assert cache.get(second) is None
+        assert cache.get(first) is not None
+
+
+class TestRollbackCallbacks:
+    """
+    Tests for the rollback callbacks of request sessions.
+    """
+    
+    @pytest.mark.asyncio
+    async def test_get_db_runs_callbacks_after_rollback(self, monkeypatch):
+        """
+        Test that callbacks run when a request fails, and only then.
+        """
+        from src import dependencies
+        
+        sessions = []
+        
+        def session_factory():
+            session = MagicMock()
+            session.info = {}
+            session.commit = AsyncMock()
+            session.rollback = AsyncMock()
+            session.close = AsyncMock()
+            session.__aenter__ = AsyncMock(return_value=session)
+            session.__aexit__ = AsyncMock(return_value=False)
+            sessions.append(session)
+            return session
+        
+        monkeypatch.setattr(dependencies, "_get_sessionmaker", lambda: session_factory)
+        callback = MagicMock()
+        
+        # Successful request
+        generator = dependencies.get_db()
+        PlanningRepository(await generator.__anext__()).on_rollback(callback)
+        with pytest.raises(StopAsyncIteration):
+            await generator.__anext__()
+        callback.assert_not_called()
+        
+        # Failed request
+        generator = dependencies.get_db()
+        PlanningRepository(await generator.__anext__()).on_rollback(callback)
+        with pytest.raises(RuntimeError):
+            await generator.athrow(RuntimeError("request failed"))
+        
+        sessions[1].rollback.assert_awaited_once()
+        callback.assert_called_once_with()
@@ -0,0 +1,221 @@
+import pytest
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+from pydantic import ValidationError
+
+from src.models.api import ForecastRequest
+from src.services.scheduling import (
+    DurationModel,
+    PlanGraph,
+    SimulationModel,
+    history_ratios_for_tasks,
+    simulate_schedule,
+)
+from src.services.scheduling.monte_carlo import PERCENTILES
+
+
+def make_tasks(*durations):
+    """
+    Create tasks with the given estimated durations in hours.
+    """
+    return [SimpleNamespace(id=uuid.uuid4(), estimated_duration=duration) for duration in durations]
+
+
+def chain(tasks):
+    """
+    Create finish-to-start dependencies linking tasks in order.
+    """
+    return [
+        {"from_task_id": a.id, "to_task_id": b.id, "dependency_type": "FINISH_TO_START", "lag": 0.0}
+        for a, b in zip(tasks, tasks[1:])
+    ]
+
+
+def build_model(tasks, dependencies, distribution="pert"):
+    """
+    Compile tasks and dependencies into a simulation model.
+    """
+    graph = PlanGraph.from_plan(tasks, dependencies)
+    durations = DurationModel.from_graph(graph, history_ratios_for_tasks(tasks), distribution=distribution)
+    return graph, SimulationModel.from_graph(graph, durations)
+
+
+def single_task_model(optimistic, most_likely, pessimistic, distribution):
+    """
+    Create a duration model for one task.
+    """
+    return DurationModel(
+        optimistic=np.array([optimistic], dtype=np.float64),
+        most_likely=np.array([most_likely], dtype=np.float64),
+        pessimistic=np.array([pessimistic], dtype=np.float64),
+        distribution=distribution,
+    )
+
+
+class TestDurationModel:
+    """
+    Tests for duration fitting and sampling.
+    """
+    
+    def test_default_factors(self):
+        """
+        Test that estimates are spread by the default factors without history.
+        """
+        graph = PlanGraph.from_plan(make_tasks(4, 10), [])
+        
+        model = DurationModel.from_graph(graph)
+        
+        assert model.optimistic.tolist() == [3.0, 7.5]
+        assert model.most_likely.tolist() == [4.0, 10.0]
+        assert model.pessimistic.tolist() == [6.0, 15.0]
+    
+    def test_completed_tasks_have_fixed_duration(self):
+        """
+        Test that completed tasks always sample their actual duration.
+        """
+        done, pending = make_tasks(4, 4)
+        done.actual_start = datetime(2026, 1, 1, 9)
+        done.actual_finish = done.actual_start + timedelta(hours=5)
+        graph = PlanGraph.from_plan([done, pending], [])
+        
+        samples = DurationModel.from_graph(graph).sample(np.random.default_rng(0), 1000)
+        
+        assert np.allclose(samples[0], 5.0)
+        assert samples[1].min() >= 3.0 and samples[1].max() <= 6.0
+    
+    @pytest.mark.parametrize("distribution, expected_mean", [
+        ("pert", (0 + 4 * 1 + 4) / 6),
+        ("triangular", (0 + 1 + 4) / 3),
+    ])
+    def test_sampling_distribution(self, distribution, expected_mean):
+        """
+        Test that PERT and triangular sampling have their distribution's mean.
+        """
+        model = single_task_model(0.0, 1.0, 4.0, distribution)
+        
+        samples = model.sample(np.random.default_rng(7), 200_000)[0]
+        
+        assert samples.min() >= 0.0 and samples.max() <= 4.0
+        assert samples.mean() == pytest.approx(expected_mean, abs=0.02)
+    
+    def test_pert_is_narrower_than_triangular(self):
+        """
+        Test that PERT concentrates more mass around the mode than triangular.
+        """
+        pert = single_task_model(0.0, 1.0, 4.0, "pert").sample(np.random.default_rng(1), 100_000)[0]
+        triangular = single_task_model(0.0, 1.0, 4.0, "triangular").sample(np.random.default_rng(1), 100_000)[0]
+        
+        assert pert.std() < triangular.std()
+
+
+class TestSimulateSchedule:
+    """
+    Tests for the Monte Carlo schedule simulation.
+    """
+    
+    def test_seed_is_deterministic(self):
+        """
+        Test that the same seed reproduces the same result.
+        """
+        tasks = make_tasks(4, 8, 2, 6)
+        _, model = build_model(tasks, chain(tasks))
+        
+        first = simulate_schedule(model, iterations=2000, seed=42)
+        second = simulate_schedule(model, iterations=2000, seed=42)
+        other = simulate_schedule(model, iterations=2000, seed=43)
+        
+        assert first.percentiles == second.percentiles
+        assert first.mean_duration == second.mean_duration
+        assert np.array_equal(first.criticality, second.criticality)
+        assert np.array_equal(first.progress_median, second.progress_median)
+        assert first.mean_duration != other.mean_duration
+    
+    def test_percentiles_are_ordered_and_bounded(self):
+        """
+        Test that completion percentiles are non-decreasing and within the chain's bounds.
+        """
+        tasks = make_tasks(4, 8, 2, 6)
+        _, model = build_model(tasks, chain(tasks))
+        
+        result = simulate_schedule(model, iterations=5000, seed=3)
+        
+        values = [result.percentiles[p] for p in PERCENTILES]
+        assert values == sorted(values)
+        assert values[0] >= 20 * 0.75 - 1e-3
+        assert values[-1] <= 20 * 1.5 + 1e-3
+        assert result.percentile(50) == pytest.approx(result.percentiles[50])
+        assert result.percentiles[25] <= result.percentile(40) <= result.percentiles[50]
+    
+    def test_progress_bands_are_ordered(self):
+        """
+        Test that the progress bands nest around the median.
+        """
+        tasks = make_tasks(4, 8, 2, 6)
+        _, model = build_model(tasks, chain(tasks))
+        
+        result = simulate_schedule(model, iterations=1000, seed=5, confidence_interval=0.9)
+        
+        assert np.all(result.progress_lower <= result.progress_median + 1e-9)
+        assert np.all(result.progress_median <= result.progress_upper + 1e-9)
+    
+    def test_criticality(self):
+        """
+        Test that chain tasks are always critical and a short parallel task never is.
+        """
+        a, b, short = make_tasks(10, 10, 1)
+        _, model = build_model([a, b, short], chain([a, b]))
+        
+        result = simulate_schedule(model, iterations=1000, seed=11)
+        
+        assert result.criticality.tolist() == [1.0, 1.0, 0.0]
+    
+    def test_fixed_durations(self):
+        """
+        Test that a fully completed plan has no spread.
+        """
+        tasks = make_tasks(4, 4)
+        for task in tasks:
+            task.actual_start = datetime(2026, 1, 1, 9)
+            task.actual_finish = task.actual_start + timedelta(hours=3)
+        _, model = build_model(tasks, chain(tasks))
+        
+        result = simulate_schedule(model, iterations=500, seed=0)
+        
+        assert all(value == pytest.approx(6.0) for value in result.percentiles.values())
+        assert result.std_duration == pytest.approx(0.0, abs=1e-5)
+    
+    def test_empty_plan(self):
+        """
+        Test that an empty plan yields an empty result.
+        """
+        _, model = build_model([], [])
+        
+        result = simulate_schedule(model, iterations=100, seed=0)
+        
+        assert result.iterations == 0
+        assert set(result.percentiles) == set(PERCENTILES)
+
+
+class TestForecastRequest:
+    """
+    Tests for forecast request validation.
+    """
+    
+    def test_defaults_to_monte_carlo(self):
+        """
+        Test the default forecasting method.
+        """
+        request = ForecastRequest(plan_id=uuid.uuid4())
+        
+        assert request.method == "monte_carlo"
+        assert request.iterations is None
+    
+    def test_rejects_unknown_method(self):
+        """
+        Test that an unknown method fails validation.
+        """
+        with pytest.raises(ValidationError):
+            ForecastRequest(plan_id=uuid.uuid4(), method="bogus")
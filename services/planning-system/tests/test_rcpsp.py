@@ -0,0 +1,272 @@
+import pytest
+import random
+import uuid
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from src.config import get_settings
+from src.services import resource_optimizer
+from src.services.resource_optimizer import ResourceOptimizer
+from src.services.scheduling import CriticalPathEngine
+from src.services.scheduling.rcpsp import (
+    OBJECTIVE_COST,
+    OBJECTIVE_DURATION,
+    OBJECTIVE_UTILIZATION,
+    UNASSIGNED,
+    ResourceConstrainedScheduler,
+    SchedulingProblem,
+)
+
+
+def make_resources(*skill_sets, cost=50.0):
+    """
+    Create resources with the given skills.
+    """
+    return [
+        SimpleNamespace(id=uuid.uuid4(), skills=skills, cost_per_hour=cost, performance_rating=3)
+        for skills in skill_sets
+    ]
+
+
+def random_plan(seed, task_count=30, edge_probability=0.1):
+    """
+    Create a random acyclic plan with mixed dependency types and lags.
+    
+    Returns:
+        Tuple of tasks and dependencies
+    """
+    rng = random.Random(seed)
+    tasks = [
+        SimpleNamespace(
+            id=uuid.uuid4(),
+            estimated_duration=float(rng.randint(1, 16)),
+            required_skills={"python": 2} if rng.random() < 0.5 else {},
+        )
+        for _ in range(task_count)
+    ]
+    dependencies = [
+        {
+            "from_task_id": tasks[i].id,
+            "to_task_id": tasks[j].id,
+            "dependency_type": rng.choice(["FINISH_TO_START", "START_TO_START", "FINISH_TO_FINISH"]),
+            "lag": float(rng.randint(0, 4)),
+        }
+        for i in range(task_count)
+        for j in range(i + 1, task_count)
+        if rng.random() < edge_probability
+    ]
+    return tasks, dependencies
+
+
+def make_problem(tasks, dependencies, resources, max_duration=None):
+    """
+    Build a scheduling problem with CPM priorities.
+    """
+    schedule = CriticalPathEngine().compute_for_plan(tasks, dependencies)
+    return SchedulingProblem.from_plan(
+        graph=schedule.graph,
+        resources=resources,
+        latest_finish=schedule.latest_finish,
+        max_duration=max_duration,
+    )
+
+
+def assert_feasible(problem, schedule):
+    """
+    Assert that a schedule meets precedence, skill and resource capacity constraints.
+    """
+    for j, predecessors in enumerate(problem.predecessors):
+        for i, offset in predecessors:
+            assert schedule.start[j] >= schedule.start[i] + offset - 1e-9
+    
+    for i, r in enumerate(schedule.assignment):
+        if r == UNASSIGNED:
+            assert not problem.feasible[i].any()
+        else:
+            assert problem.feasible[i, r]
+    
+    # Each resource works on one task at a time
+    for r in range(problem.resource_count):
+        tasks = sorted(np.flatnonzero(schedule.assignment == r), key=lambda i: schedule.start[i])
+        for previous, current in zip(tasks, tasks[1:]):
+            assert schedule.start[current] >= schedule.finish[previous] - 1e-9
+        assert schedule.busy_hours[r] == pytest.approx(problem.durations[tasks].sum())
+
+
+class TestSerialScheduleGeneration:
+    """
+    Tests for the serial schedule generation scheme.
+    """
+    
+    @pytest.mark.parametrize("seed", range(5))
+    @pytest.mark.parametrize("objective", [OBJECTIVE_DURATION, OBJECTIVE_COST, OBJECTIVE_UTILIZATION])
+    def test_random_activity_lists_are_feasible(self, seed, objective):
+        """
+        Test that any precedence-feasible activity list gives a feasible schedule.
+        """
+        tasks, dependencies = random_plan(seed)
+        resources = make_resources({"python": 3}, {"python": 1}, {"sql": 2})
+        problem = make_problem(tasks, dependencies, resources)
+        scheduler = ResourceConstrainedScheduler(problem, objective, seed=seed)
+        rng = random.Random(seed)
+        
+        for _ in range(10):
+            activity_list = scheduler.priority_list([rng.random() for _ in range(problem.task_count)])
+            assert sorted(activity_list) == list(range(problem.task_count))
+            assert_feasible(problem, scheduler.generate(activity_list))
+    
+    def test_one_resource_serializes_independent_tasks(self):
+        """
+        Test that independent tasks run in parallel only with enough resources.
+        """
+        tasks = [SimpleNamespace(id=uuid.uuid4(), estimated_duration=duration) for duration in (4.0, 6.0, 2.0)]
+        
+        single = ResourceConstrainedScheduler(make_problem(tasks, [], make_resources({})))
+        double = ResourceConstrainedScheduler(make_problem(tasks, [], make_resources({}, {})))
+        
+        assert single.generate([0, 1, 2]).makespan == 12.0
+        assert double.generate([0, 1, 2]).makespan == 6.0
+    
+    def test_tasks_without_skilled_resources_are_unassigned(self):
+        """
+        Test that a task no resource is skilled for is left unassigned.
+        """
+        tasks = [
+            SimpleNamespace(id=uuid.uuid4(), estimated_duration=2.0, required_skills={"rust": 1}),
+            SimpleNamespace(id=uuid.uuid4(), estimated_duration=2.0, required_skills={"python": 2}),
+        ]
+        problem = make_problem(tasks, [], make_resources({"python": 1}, {"python": 2}))
+        
+        schedule = ResourceConstrainedScheduler(problem).generate([0, 1])
+        
+        assert schedule.assignment.tolist() == [UNASSIGNED, 1]
+        assert schedule.unassigned_tasks == 1
+    
+    def test_fixed_assignment(self):
+        """
+        Test that a fixed assignment is scheduled without reassigning tasks.
+        """
+        tasks, dependencies = random_plan(3, task_count=10)
+        resources = make_resources({"python": 3}, {"python": 3})
+        problem = make_problem(tasks, dependencies, resources)
+        scheduler = ResourceConstrainedScheduler(problem)
+        
+        schedule = scheduler.evaluate_assignment(np.zeros(problem.task_count, dtype=np.int64))
+        
+        assert schedule.assignment.tolist() == [0] * problem.task_count
+        assert schedule.makespan >= problem.durations.sum()
+        assert_feasible(problem, schedule)
+
+
+class TestLocalSearch:
+    """
+    Tests for the local-search solver.
+    """
+    
+    @pytest.mark.parametrize("seed", range(5))
+    @pytest.mark.parametrize("objective", [OBJECTIVE_DURATION, OBJECTIVE_COST, OBJECTIVE_UTILIZATION])
+    def test_never_worse_than_priority_rules(self, seed, objective):
+        """
+        Test that the search result scores at least as well as every seed list.
+        """
+        tasks, dependencies = random_plan(seed)
+        resources = make_resources({"python": 3}, {"python": 2}, {"sql": 1}, cost=40.0)
+        problem = make_problem(tasks, dependencies, resources)
+        scheduler = ResourceConstrainedScheduler(problem, objective, seed=seed)
+        
+        seed_scores = [
+            scheduler.score(scheduler.generate(scheduler.priority_list(keys)))
+            for keys in (
+                problem.priority,
+                -np.array([len(successors) for successors in problem.successors], dtype=np.float64),
+                -problem.durations,
+            )
+        ]
+        result = scheduler.solve(time_budget=60, max_iterations=300)
+        
+        assert scheduler.score(result.schedule) <= min(seed_scores)
+        assert_feasible(problem, result.schedule)
+    
+    @pytest.mark.parametrize("seed", range(3))
+    def test_more_iterations_never_increase_the_makespan(self, seed):
+        """
+        Test that the best makespan is non-increasing in the iteration budget.
+        """
+        tasks, dependencies = random_plan(seed, task_count=40)
+        resources = make_resources({"python": 3}, {"python": 2}, {})
+        problem = make_problem(tasks, dependencies, resources)
+        
+        makespans = [
+            ResourceConstrainedScheduler(problem, OBJECTIVE_DURATION, seed=seed)
+            .solve(time_budget=60, max_iterations=iterations)
+            .schedule.makespan
+            for iterations in (0, 50, 200, 800)
+        ]
+        
+        assert makespans == sorted(makespans, reverse=True)
+    
+    def test_stops_at_the_critical_path(self):
+        """
+        Test that the duration search stops once the CPM lower bound is reached.
+        """
+        tasks = [SimpleNamespace(id=uuid.uuid4(), estimated_duration=duration) for duration in (4.0, 6.0)]
+        problem = make_problem(tasks, [], make_resources({}, {}))
+        
+        result = ResourceConstrainedScheduler(problem, seed=1).solve(time_budget=60)
+        
+        assert result.schedule.makespan == 6.0
+        assert result.iterations == 0
+        assert not result.timed_out
+    
+    def test_max_duration(self):
+        """
+        Test that an unreachable makespan limit is reported.
+        """
+        tasks = [SimpleNamespace(id=uuid.uuid4(), estimated_duration=duration) for duration in (4.0, 6.0)]
+        problem = make_problem(tasks, [], make_resources({}), max_duration=8.0)
+        
+        result = ResourceConstrainedScheduler(problem, seed=1).solve(time_budget=60, max_iterations=50)
+        
+        assert result.schedule.makespan == 10.0
+        assert not result.meets_max_duration
+
+
+class TestResourceOptimizerExecution:
+    """
+    Tests for where the resource optimizer runs the solver.
+    """
+    
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("task_count, use_process_pool", [(4, False), (40, True)])
+    async def test_process_pool_threshold(self, monkeypatch, task_count, use_process_pool):
+        """
+        Test that only problems above the size threshold use the process pool.
+        """
+        tasks, dependencies = random_plan(0, task_count=task_count)
+        resources = make_resources({"python": 3}, {"python": 2})
+        settings = get_settings().model_copy(update={"resource_optimization_process_pool_threshold": 20})
+        optimizer = ResourceOptimizer(MagicMock(), MagicMock(), MagicMock(), settings)
+        calls = []
+        
+        async def run_inline(func, *args, use_process_pool=False, max_workers=None, **kwargs):
+            calls.append(use_process_pool)
+            return func(*args, **kwargs)
+        
+        monkeypatch.setattr(resource_optimizer, "run_off_loop", run_inline)
+        
+        result = await optimizer._run_optimization_algorithm(
+            plan=SimpleNamespace(id=uuid.uuid4()),
+            tasks=tasks,
+            resources=resources,
+            current_allocations=[],
+            optimization_target="duration",
+            constraints={},
+            preferences={"seed": 1},
+            schedule=CriticalPathEngine().compute_for_plan(tasks, dependencies),
+            time_budget=0.1
+        )
+        
+        assert calls == [use_process_pool]
+        assert result["status"] in ("optimal", "suboptimal")
@@ -0,0 +1,341 @@
+import pytest
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import numpy as np
+
+from src.config import get_settings
+from src.services import what_if_analysis_service
+from src.services.forecaster import ProjectForecaster
+from src.services.scheduling import (
+    PlanSnapshot,
+    ScenarioOverlay,
+    evaluate_scenarios,
+)
+from src.services.what_if_analysis_service import WhatIfAnalysisService
+
+
+def make_plan():
+    """
+    Create a plan of three chained tasks and a parallel task with one resource.
+    
+    Returns:
+        Tuple of plan ID, tasks, dependencies and resources
+    """
+    plan_id = uuid.uuid4()
+    resource = SimpleNamespace(id=uuid.uuid4(), capacity_hours=40.0)
+    a, b, c, d = [
+        SimpleNamespace(id=uuid.uuid4(), estimated_duration=duration, assigned_to=None)
+        for duration in (4.0, 8.0, 2.0, 3.0)
+    ]
+    b.assigned_to = str(resource.id)
+    dependencies = [
+        {"from_task_id": a.id, "to_task_id": b.id, "dependency_type": "FINISH_TO_START", "lag": 0.0},
+        {"from_task_id": b.id, "to_task_id": c.id, "dependency_type": "FINISH_TO_START", "lag": 1.0},
+    ]
+    return plan_id, [a, b, c, d], dependencies, [resource]
+
+
+def snapshot_state(snapshot):
+    """
+    Copy the array fields of a snapshot for later comparison.
+    """
+    return {
+        name: getattr(snapshot, name).copy()
+        for name in (
+            "durations", "actual_durations", "assigned_resource",
+            "edge_from", "edge_to", "edge_kind", "edge_lag", "capacity_hours",
+        )
+    }
+
+
+def assert_unchanged(snapshot, state):
+    """
+    Assert that the array fields of a snapshot still match a copy.
+    """
+    for name, values in state.items():
+        np.testing.assert_array_equal(getattr(snapshot, name), values, err_msg=name)
+
+
+class TestPlanSnapshot:
+    """
+    Tests for plan snapshots.
+    """
+    
+    def test_from_plan(self):
+        """
+        Test that a snapshot captures durations, edges and resource assignments.
+        """
+        plan_id, tasks, dependencies, resources = make_plan()
+        
+        snapshot = PlanSnapshot.from_plan(plan_id, tasks, dependencies, resources)
+        
+        assert len(snapshot) == 4
+        assert snapshot.durations.tolist() == [4.0, 8.0, 2.0, 3.0]
+        assert snapshot.assigned_resource.tolist() == [-1, 0, -1, -1]
+        assert snapshot.edge_index == {(0, 1): 0, (1, 2): 1}
+        assert snapshot.edge_lag.tolist() == [0.0, 1.0]
+        assert snapshot.capacity_hours.tolist() == [40.0]
+    
+    def test_arrays_are_read_only(self):
+        """
+        Test that snapshot arrays cannot be modified in place.
+        """
+        plan_id, tasks, dependencies, resources = make_plan()
+        snapshot = PlanSnapshot.from_plan(plan_id, tasks, dependencies, resources)
+        
+        with pytest.raises(ValueError):
+            snapshot.durations[0] = 1.0
+        with pytest.raises(ValueError):
+            snapshot.edge_lag[0] = 1.0
+    
+    def test_dependencies_outside_the_plan_are_ignored(self):
+        """
+        Test that edges to unknown tasks are dropped.
+        """
+        plan_id, tasks, dependencies, resources = make_plan()
+        dependencies.append({"from_task_id": tasks[0].id, "to_task_id": uuid.uuid4(), "dependency_type": "FINISH_TO_START"})
+        
+        snapshot = PlanSnapshot.from_plan(plan_id, tasks, dependencies, resources)
+        
+        assert len(snapshot.edge_from) == 2
+    
+    def test_completed_tasks_keep_their_actual_duration(self):
+        """
+        Test that the duration model uses actual durations of completed tasks.
+        """
+        plan_id, tasks, dependencies, resources = make_plan()
+        tasks[0].actual_start = datetime(2026, 1, 1, 9)
+        tasks[0].actual_finish = tasks[0].actual_start + timedelta(hours=6)
+        snapshot = PlanSnapshot.from_plan(plan_id, tasks, dependencies, resources)
+        
+        model = snapshot.duration_model(snapshot.graph())
+        
+        assert model.optimistic[0] == model.most_likely[0] == model.pessimistic[0] == 6.0
+
+
+class TestScenarioOverlay:
+    """
+    Tests for scenario overlays.
+    """
+    
+    def test_from_modifications(self):
+        """
+        Test that stored modifications are mapped to snapshot indexes.
+        """
+        plan_id, (a, b, c, d), dependencies, resources = make_plan()
+        snapshot = PlanSnapshot.from_plan(plan_id, [a, b, c, d], dependencies, resources)
+        
+        overlay = ScenarioOverlay.from_modifications(
+            snapshot,
+            task_modifications=[
+                {"task_id": str(c.id), "estimated_duration": 5},
+                {"task_id": str(uuid.uuid4()), "estimated_duration": 1},
+            ],
+            resource_modifications=[{"resource_id": str(resources[0].id), "capacity_hours": 20}],
+            dependency_modifications=[
+                {"action": "remove", "from_task_id": str(a.id), "to_task_id": str(b.id)},
+                {"action": "update", "from_task_id": str(b.id), "to_task_id": str(c.id), "lag": 3},
+                {"action": "add", "from_task_id": str(c.id), "to_task_id": str(d.id)},
+            ]
+        )
+        
+        assert overlay.durations == {2: 5.0}
+        assert overlay.capacity_factors == {0: 0.5}
+        assert overlay.removed_edges == frozenset({0})
+        assert overlay.updated_edges == {1: (int(snapshot.edge_kind[1]), 3.0)}
+        assert [edge[:2] for edge in overlay.added_edges] == [(2, 3)]
+        assert overlay.changes_dependencies
+    
+    def test_graph_applies_the_overlay(self):
+        """
+        Test that the overlay graph has the modified durations and edges.
+        """
+        plan_id, (a, b, c, d), dependencies, resources = make_plan()
+        snapshot = PlanSnapshot.from_plan(plan_id, [a, b, c, d], dependencies, resources)
+        overlay = ScenarioOverlay(
+            durations={2: 5.0},
+            capacity_factors={0: 0.5},
+            removed_edges=frozenset({0}),
+            added_edges=((2, 3, 0, 0.0),),
+        )
+        
+        graph = snapshot.graph(overlay)
+        
+        assert graph.durations == [4.0, 16.0, 5.0, 3.0]
+        assert [j for j, _, _ in graph.successors[0]] == []
+        assert [j for j, _, _ in graph.successors[2]] == [3]
+    
+    def test_overlays_never_change_the_snapshot(self):
+        """
+        Test that building overlay graphs leaves the shared snapshot untouched.
+        """
+        plan_id, tasks, dependencies, resources = make_plan()
+        snapshot = PlanSnapshot.from_plan(plan_id, tasks, dependencies, resources)
+        state = snapshot_state(snapshot)
+        overlay = ScenarioOverlay(
+            durations={0: 40.0},
+            capacity_factors={0: 0.25},
+            removed_edges=frozenset({0}),
+            updated_edges={1: (0, 10.0)},
+            added_edges=((2, 3, 0, 2.0),),
+        )
+        
+        snapshot.graph(overlay)
+        snapshot.duration_model(snapshot.graph(overlay))
+        
+        assert_unchanged(snapshot, state)
+        assert snapshot.graph().durations == [4.0, 8.0, 2.0, 3.0]
+        assert [j for j, _, _ in snapshot.graph().successors[0]] == [1]
+
+
+class TestEvaluateScenarios:
+    """
+    Tests for batch scenario evaluation.
+    """
+    
+    def test_outcomes_follow_the_overlays(self):
+        """
+        Test deterministic durations and critical paths of a batch.
+        """
+        plan_id, (a, b, c, d), dependencies, resources = make_plan()
+        snapshot = PlanSnapshot.from_plan(plan_id, [a, b, c, d], dependencies, resources)
+        overlays = [
+            ScenarioOverlay(),
+            ScenarioOverlay(durations={1: 2.0}),
+            ScenarioOverlay(capacity_factors={0: 0.5}),
+            ScenarioOverlay(added_edges=((2, 3, 0, 0.0),)),
+        ]
+        
+        baseline, shorter, slower, extended = evaluate_scenarios(snapshot, overlays, iterations=200, seed=1)
+        
+        assert baseline.project_duration == 15.0
+        assert baseline.critical_path == [a.id, b.id, c.id]
+        assert shorter.project_duration == 9.0
+        assert slower.project_duration == 23.0
+        assert extended.project_duration == 18.0
+        assert extended.critical_path == [a.id, b.id, c.id, d.id]
+        assert all(outcome.simulation.iterations == 200 for outcome in (baseline, shorter, slower, extended))
+    
+    def test_batch_leaves_the_snapshot_unchanged(self):
+        """
+        Test that evaluating a batch never changes the shared snapshot.
+        """
+        plan_id, tasks, dependencies, resources = make_plan()
+        snapshot = PlanSnapshot.from_plan(plan_id, tasks, dependencies, resources)
+        state = snapshot_state(snapshot)
+        overlays = [
+            ScenarioOverlay(durations={0: 40.0}),
+            ScenarioOverlay(capacity_factors={0: 0.1}),
+            ScenarioOverlay(updated_edges={1: (0, 10.0)}),
+            ScenarioOverlay(),
+        ]
+        
+        outcomes = evaluate_scenarios(snapshot, overlays, iterations=100, seed=1)
+        
+        assert_unchanged(snapshot, state)
+        assert outcomes[3].project_duration == 15.0
+    
+    def test_shared_seed_gives_identical_baselines(self):
+        """
+        Test that unmodified overlays in one batch get identical simulations.
+        """
+        plan_id, tasks, dependencies, resources = make_plan()
+        snapshot = PlanSnapshot.from_plan(plan_id, tasks, dependencies, resources)
+        
+        first, _, second = evaluate_scenarios(
+            snapshot,
+            [ScenarioOverlay(), ScenarioOverlay(durations={1: 20.0}), ScenarioOverlay()],
+            iterations=500,
+            seed=9
+        )
+        
+        assert first.simulation.percentiles == second.simulation.percentiles
+    
+    def test_cycles_are_reported_per_scenario(self):
+        """
+        Test that a cyclic scenario fails alone.
+        """
+        plan_id, tasks, dependencies, resources = make_plan()
+        snapshot = PlanSnapshot.from_plan(plan_id, tasks, dependencies, resources)
+        
+        baseline, cyclic = evaluate_scenarios(
+            snapshot,
+            [ScenarioOverlay(), ScenarioOverlay(added_edges=((2, 0, 0, 0.0),))],
+            iterations=100,
+            seed=1
+        )
+        
+        assert baseline.error is None
+        assert cyclic.error is not None
+        assert cyclic.simulation is None
+
+
+class AnalysisResult(SimpleNamespace):
+    """
+    Stand-in for the analysis result model holding outcomes instead of forecasts.
+    """
+    
+    def model_dump(self):
+        return vars(self)
+
+
+class TestRunWhatIfAnalysis:
+    """
+    Tests for single-scenario what-if analysis.
+    """
+    
+    @pytest.mark.asyncio
+    async def test_baseline_is_evaluated_with_the_scenario(self, monkeypatch):
+        """
+        Test that the baseline comes from the same batch, not the stored forecast.
+        """
+        plan_id, tasks, dependencies, resources = make_plan()
+        scenario = SimpleNamespace(
+            id=uuid.uuid4(),
+            plan_id=plan_id,
+            name="Longer design",
+            description="Design takes twice as long",
+            task_modifications=[{"task_id": str(tasks[0].id), "estimated_duration": 8}],
+            resource_modifications=[],
+            dependency_modifications=[],
+        )
+        
+        repository = MagicMock()
+        repository.get_what_if_scenario_by_id = AsyncMock(return_value=scenario)
+        repository.get_plan_by_id = AsyncMock(return_value=SimpleNamespace(id=plan_id))
+        repository.get_tasks_by_plan = AsyncMock(return_value=tasks)
+        repository.get_all_dependencies_for_plan = AsyncMock(return_value=dependencies)
+        repository.get_resources_for_plan = AsyncMock(return_value=resources)
+        repository.create_what_if_analysis_result = AsyncMock(return_value=SimpleNamespace(id=uuid.uuid4()))
+        event_bus = MagicMock()
+        event_bus.publish = AsyncMock()
+        
+        forecaster = ProjectForecaster(repository, event_bus, MagicMock(), get_settings())
+        forecaster.get_latest_forecast = AsyncMock()
+        forecaster.create_forecast = AsyncMock()
+        service = WhatIfAnalysisService(repository, event_bus, forecaster)
+        service._outcome_to_forecast = MagicMock(side_effect=lambda snapshot, outcome, confidence_interval: outcome)
+        service._compare_forecasts = AsyncMock(return_value={})
+        
+        service._evaluate_overlays = AsyncMock(side_effect=service._evaluate_overlays)
+        
+        async def run_inline(func, *args, use_process_pool=False, max_workers=None, **kwargs):
+            return func(*args, **kwargs)
+        
+        monkeypatch.setattr(what_if_analysis_service, "run_off_loop", run_inline)
+        monkeypatch.setattr(what_if_analysis_service, "WhatIfAnalysisResult", AnalysisResult)
+        
+        result = await service.run_what_if_analysis(scenario.id)
+        
+        forecaster.get_latest_forecast.assert_not_awaited()
+        forecaster.create_forecast.assert_not_awaited()
+        service._evaluate_overlays.assert_awaited_once()
+        baseline, overlay = service._evaluate_overlays.await_args.kwargs["overlays"]
+        assert baseline == ScenarioOverlay()
+        assert overlay.durations == {0: 8.0}
+        assert result.baseline_forecast.project_duration == 15.0
+        assert result.scenario_forecast.project_duration == 19.0
+        assert result.baseline_forecast.simulation.iterations == result.scenario_forecast.simulation.iterations
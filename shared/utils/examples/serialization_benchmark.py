@@ -0,0 +1,103 @@
+"""
+Micro-benchmark of the message serializers.
+
+This script compares encode time, decode time and payload size of the
+serializers on representative agent messages, with plain json.dumps as the
+baseline. Codecs and compressions whose libraries are not installed are
+skipped.
+
+Usage:
+    python -m shared.utils.examples.serialization_benchmark [iterations]
+"""
+
+import sys
+import json
+import time
+import random
+from datetime import datetime
+from uuid import uuid4
+from typing import Any, Callable, Dict, List, Tuple
+
+from shared.utils.src.serialization import HAS_MSGPACK, HAS_ORJSON, HAS_ZSTD, Serializer
+
+
+def envelope(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Wrap message data the way the message broker does."""
+    return {
+        "id": str(uuid4()),
+        "timestamp": datetime.utcnow().isoformat(),
+        "sender": "agent-orchestrator",
+        "data": data,
+    }
+
+
+def sample_messages() -> Dict[str, Dict[str, Any]]:
+    """Create representative agent messages."""
+    rng = random.Random(42)
+    words = ["agent", "task", "model", "plan", "result", "context", "tool", "memory", "step", "output"]
+
+    return {
+        "command": envelope({
+            "command": "assign_task",
+            "response_channel": "response:agent-orchestrator:1f2e",
+            "data": {"agent_id": str(uuid4()), "task_id": str(uuid4()), "priority": 3},
+        }),
+        "chat_result": envelope({
+            "type": "model.result",
+            "request_id": str(uuid4()),
+            "model_id": "gpt-4o",
+            "content": " ".join(rng.choice(words) for _ in range(2000)),
+            "usage": {"prompt_tokens": 1200, "completion_tokens": 2000, "total_tokens": 3200},
+        }),
+        "embedding_result": envelope({
+            "type": "model.embedding",
+            "request_id": str(uuid4()),
+            "model_id": "text-embedding-3-small",
+            "embeddings": [[rng.uniform(-1, 1) for _ in range(1536)] for _ in range(4)],
+        }),
+    }
+
+
+def candidates() -> List[Tuple[str, Callable[[Any], Any], Callable[[Any], Any]]]:
+    """List the encoders to compare as (name, dumps, loads)."""
+    result = [("json.dumps (baseline)", lambda value: json.dumps(value).encode("utf-8"), json.loads)]
+
+    configurations = [(f"json ({'orjson' if HAS_ORJSON else 'stdlib'})", {}), ("json + zlib", {"compression": "zlib"})]
+    if HAS_ZSTD:
+        configurations.append(("json + zstd", {"compression": "zstd"}))
+    if HAS_MSGPACK:
+        configurations.append(("msgpack", {"format": "msgpack"}))
+        if HAS_ZSTD:
+            configurations.append(("msgpack + zstd", {"format": "msgpack", "compression": "zstd"}))
+
+    for name, options in configurations:
+        serializer = Serializer(compress_threshold=4096, **options)
+        result.append((name, serializer.dumps, serializer.loads))
+
+    return result
+
+
+def measure(function: Callable[[Any], Any], value: Any, iterations: int) -> float:
+    """Measure the mean time of a call in microseconds."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        function(value)
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+def main(iterations: int = 1000) -> None:
+    """Run the benchmark and print a table per message."""
+    for message_name, message in sample_messages().items():
+        print(f"\n{message_name}")
+        print(f"{'serializer':<24}{'bytes':>10}{'encode us':>12}{'decode us':>12}")
+
+        for name, dumps, loads in candidates():
+            payload = dumps(message)
+            assert loads(payload) == json.loads(json.dumps(message))
+            encode = measure(dumps, message, iterations)
+            decode = measure(loads, payload, iterations)
+            print(f"{name:<24}{len(payload):>10}{encode:>12.1f}{decode:>12.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
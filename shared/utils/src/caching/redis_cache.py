@@ -6,7 +6,6 @@ production environment. It includes decorators and utilities for implementing
 caching at various levels of the application.
 """
 
-import json
 import hashlib
 import time
 import logging
@@ -16,6 +15,8 @@ from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar, Union, c
 import redis
 from redis.exceptions import RedisError
 
+from ..serialization import Serializer, SerializationError, get_serializer
+
 # Type variables for generic function signatures
 T = TypeVar('T')
 F = TypeVar('F', bound=Callable[..., Any])
@@ -34,7 +35,8 @@ class RedisCache:
         password: Optional[str] = None,
         socket_timeout: int = 5,
         socket_connect_timeout: int = 5,
-        prefix: str = 'berrys:cache:'
+        prefix: str = 'berrys:cache:',
+        serializer: Optional[Serializer] = None
     ):
         """
         Initialize Redis cache.
@@ -47,8 +49,11 @@ class RedisCache:
             socket_timeout: Socket timeout in seconds
             socket_connect_timeout: Socket connection timeout in seconds
             prefix: Key prefix for all cache keys
+            serializer: Serializer of cached values (the one configured
+                through the environment if not given)
         """
         self.prefix = prefix
+        self.serializer = serializer or get_serializer()
         try:
             self.client = redis.Redis(
                 host=host,
@@ -121,9 +126,9 @@ class RedisCache:
         try:
             data = self.client.get(key)
             if data:
-                return json.loads(data)
+                return self.serializer.loads(data)
             return None
-        except (RedisError, json.JSONDecodeError) as e:
+        except (RedisError, SerializationError) as e:
             logger.warning(f"Error retrieving from cache: {e}")
             return None
     
@@ -143,7 +148,7 @@ class RedisCache:
             return False
         
         try:
-            serialized = json.dumps(value, default=str)
+            serialized = self.serializer.dumps(value)
             return bool(self.client.setex(key, ttl, serialized))
         except (RedisError, TypeError) as e:
             logger.warning(f"Error setting cache: {e}")
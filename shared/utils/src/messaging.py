@@ -3,16 +3,72 @@ import json
 import asyncio
 # Import aioredis but avoid importing its TimeoutError
 import redis.asyncio as redis 
-from typing import Dict, List, Any, Callable, Awaitable, Optional, Union
+from typing import Dict, List, Any, Callable, Awaitable, Optional, Set, Union
 import logging
 from uuid import uuid4
 from datetime import datetime
 
+from .serialization import Serializer, SerializationError, get_serializer
+
 logger = logging.getLogger(__name__)
 
 # Configuration
 REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379/0")
 SERVICE_NAME = os.getenv("SERVICE_NAME", "mas-framework")
+MAX_IN_FLIGHT = int(os.getenv("MESSAGING_MAX_IN_FLIGHT", "256"))
+CHANNEL_CONCURRENCY = int(os.getenv("MESSAGING_CHANNEL_CONCURRENCY", "8"))
+CHANNEL_QUEUE_SIZE = int(os.getenv("MESSAGING_CHANNEL_QUEUE_SIZE", "1000"))
+COMMAND_TRANSPORT = os.getenv("MESSAGING_COMMAND_TRANSPORT", "pubsub")
+
+# Command transports
+TRANSPORT_PUBSUB = "pubsub"
+TRANSPORT_STREAMS = "streams"
+
+
+class ChannelDispatcher:
+    """
+    Bounded queue and worker pool of one channel.
+    
+    Messages of a channel are handled by up to ``concurrency`` workers, so a
+    slow handler only holds up its own channel. Messages are handled in
+    arrival order when the concurrency is 1.
+    """
+    
+    def __init__(self, channel: str, concurrency: int, queue_size: int):
+        """
+        Initialize the dispatcher.
+        
+        Args:
+            channel: Channel name
+            concurrency: Maximum messages handled at once
+            queue_size: Maximum messages waiting for a worker
+        """
+        self.channel = channel
+        self.concurrency = concurrency
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.workers: List[asyncio.Task] = []
+        self.active = 0
+        self.processed = 0
+        self.failed = 0
+        self.max_depth = 0
+        self.backpressure_waits = 0
+        
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get dispatcher metrics.
+        
+        Returns:
+            Dict[str, Any]: Queue depth, active handlers and counters
+        """
+        return {
+            "concurrency": self.concurrency,
+            "queued": self.queue.qsize(),
+            "max_queued": self.max_depth,
+            "active": self.active,
+            "processed": self.processed,
+            "failed": self.failed,
+            "backpressure_waits": self.backpressure_waits,
+        }
 
 
 class MessageBroker:
@@ -20,21 +76,46 @@ class MessageBroker:
     Message broker for inter-service communication using Redis.
     """
     
-    def __init__(self, redis_url: str = REDIS_URL, service_name: str = SERVICE_NAME):
+    def __init__(
+        self,
+        redis_url: str = REDIS_URL,
+        service_name: str = SERVICE_NAME,
+        max_in_flight: int = MAX_IN_FLIGHT,
+        channel_concurrency: int = CHANNEL_CONCURRENCY,
+        channel_queue_size: int = CHANNEL_QUEUE_SIZE,
+        serializer: Optional[Serializer] = None,
+    ):
         """
         Initialize the message broker.
         
         Args:
             redis_url: Redis connection URL
             service_name: Name of the service
+            max_in_flight: Maximum messages queued or being handled across
+                all channels; reading pauses when it is reached
+            channel_concurrency: Default number of workers per channel
+            channel_queue_size: Maximum messages waiting per channel
+            serializer: Serializer of published messages (the one configured
+                through the environment if not given)
         """
         self.redis_url = redis_url
         self.service_name = service_name
+        self.max_in_flight = max_in_flight
+        self.channel_concurrency = channel_concurrency
+        self.channel_queue_size = channel_queue_size
+        self.serializer = serializer or get_serializer()
         self.redis = None
+        self.subscriber = None
         self.pubsub = None
         self.handlers = {}
         self.running = False
         self.tasks = []
+        self.dispatchers: Dict[str, ChannelDispatcher] = {}
+        self.concurrency: Dict[str, int] = {}
+        self.include_own: Set[str] = set()
+        self.in_flight = 0
+        self._in_flight: Optional[asyncio.Semaphore] = None
+        self._subscribed = asyncio.Event()
         
     async def connect(self) -> None:
         """
@@ -42,7 +123,10 @@ class MessageBroker:
         """
         try:
             self.redis = await redis.from_url(self.redis_url, decode_responses=True)
-            self.pubsub = self.redis.pubsub()
+            # Messages are read as bytes, since binary serializers may not
+            # produce valid UTF-8
+            self.subscriber = await redis.from_url(self.redis_url, decode_responses=False)
+            self.pubsub = self.subscriber.pubsub()
             logger.info(f"Connected to Redis at {self.redis_url}")
         except Exception as e:
             logger.error(f"Failed to connect to Redis: {str(e)}")
@@ -55,6 +139,9 @@ class MessageBroker:
         if self.running:
             await self.stop()
             
+        if self.subscriber:
+            await self.subscriber.close()
+            
         if self.redis:
             await self.redis.close()
             logger.info("Disconnected from Redis")
@@ -71,21 +158,35 @@ class MessageBroker:
             await self.connect()
             
         # Add metadata to message
-        message_with_metadata = {
+        message_with_metadata = self.envelope(message)
+        
+        # Publish message
+        await self.redis.publish(channel, self.serializer.dumps(message_with_metadata))
+        logger.debug(f"Published message to {channel}: {message_with_metadata['id']}")
+            
+    def envelope(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Wrap a message with its ID, timestamp and sender.
+        
+        Args:
+            message: Message data
+            
+        Returns:
+            Dict[str, Any]: Message with metadata
+        """
+        return {
             "id": str(uuid4()),
             "timestamp": datetime.utcnow().isoformat(),
             "sender": self.service_name,
             "data": message,
         }
         
-        # Publish message
-        await self.redis.publish(channel, json.dumps(message_with_metadata))
-        logger.debug(f"Published message to {channel}: {message_with_metadata['id']}")
-            
     async def subscribe(
         self, 
         channel: str, 
-        handler: Callable[[Dict[str, Any]], Awaitable[None]]
+        handler: Callable[[Dict[str, Any]], Awaitable[None]],
+        concurrency: Optional[int] = None,
+        include_own: bool = False,
     ) -> None:
         """
         Subscribe to a channel.
@@ -93,6 +194,10 @@ class MessageBroker:
         Args:
             channel: Channel to subscribe to
             handler: Async function to handle messages
+            concurrency: Number of workers for the channel (the broker's
+                default if not given; 1 keeps messages in order)
+            include_own: Whether to handle messages sent by this service
+                (e.g. replies between replicas)
         """
         if not self.redis:
             await self.connect()
@@ -101,9 +206,14 @@ class MessageBroker:
         if channel not in self.handlers:
             self.handlers[channel] = []
         self.handlers[channel].append(handler)
+        if concurrency is not None:
+            self.concurrency[channel] = concurrency
+        if include_own:
+            self.include_own.add(channel)
         
         # Subscribe to channel
         await self.pubsub.subscribe(channel)
+        self._subscribed.set()
         logger.info(f"Subscribed to channel: {channel}")
         
         # Start message processing if not already running
@@ -126,6 +236,13 @@ class MessageBroker:
         # Remove handlers
         if channel in self.handlers:
             del self.handlers[channel]
+        self.concurrency.pop(channel, None)
+        self.include_own.discard(channel)
+        
+        # Stop the channel's workers; queued messages are dropped
+        dispatcher = self.dispatchers.pop(channel, None)
+        if dispatcher:
+            await self._stop_dispatcher(dispatcher)
             
         logger.info(f"Unsubscribed from channel: {channel}")
             
@@ -137,6 +254,7 @@ class MessageBroker:
             return
             
         self.running = True
+        self._in_flight = asyncio.Semaphore(self.max_in_flight)
         self.tasks.append(asyncio.create_task(self._process_messages()))
         logger.info("Started message processing")
             
@@ -157,47 +275,166 @@ class MessageBroker:
         await asyncio.gather(*self.tasks, return_exceptions=True)
         self.tasks = []
         
+        # Stop channel workers
+        for dispatcher in self.dispatchers.values():
+            await self._stop_dispatcher(dispatcher)
+        self.dispatchers = {}
+        
         logger.info("Stopped message processing")
             
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get dispatch metrics.
+        
+        Returns:
+            Dict[str, Any]: Messages in flight and per-channel queue metrics
+        """
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "channels": {
+                channel: dispatcher.get_metrics()
+                for channel, dispatcher in self.dispatchers.items()
+            },
+        }
+        
     async def _process_messages(self) -> None:
         """
-        Process messages from subscribed channels.
+        Read messages from subscribed channels and queue them for their
+        channel's workers.
+        
+        Reading blocks on the subscription instead of polling. When the
+        in-flight limit is reached or a channel's queue is full, reading
+        pauses until handlers catch up, and Redis buffers the backlog.
         """
         try:
             while self.running:
-                message = await self.pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                # A pubsub without subscriptions cannot be read from
+                if not self.pubsub.subscribed:
+                    self._subscribed.clear()
+                    await self._subscribed.wait()
+                    continue
+                
+                message = await self.pubsub.get_message(ignore_subscribe_messages=True, timeout=None)
+                if not message:
+                    continue
                 
-                if message:
-                    channel = message["channel"]
-                    data = message["data"]
+                channel = message["channel"]
+                if isinstance(channel, bytes):
+                    channel = channel.decode("utf-8")
+                data = message["data"]
+                
+                try:
+                    # Parse message
+                    message_data = self.serializer.loads(data)
+                except SerializationError as e:
+                    logger.error(f"Invalid message on {channel}: {str(e)}")
+                    continue
                     
-                    try:
-                        # Parse message
-                        message_data = json.loads(data)
-                        
-                        # Skip messages from self
-                        if message_data.get("sender") == self.service_name:
-                            continue
-                            
-                        # Call handlers
-                        if channel in self.handlers:
-                            for handler in self.handlers[channel]:
-                                try:
-                                    await handler(message_data)
-                                except Exception as e:
-                                    logger.error(f"Error in message handler: {str(e)}")
-                    except json.JSONDecodeError:
-                        logger.error(f"Invalid JSON message: {data}")
-                    except Exception as e:
-                        logger.error(f"Error processing message: {str(e)}")
-                        
-                # Yield to other tasks
-                await asyncio.sleep(0.01)
+                # Skip messages from self
+                if message_data.get("sender") == self.service_name and channel not in self.include_own:
+                    continue
+                    
+                if channel not in self.handlers:
+                    continue
+                
+                await self._dispatch(channel, message_data)
         except asyncio.CancelledError:
             logger.info("Message processing task cancelled")
         except Exception as e:
             logger.error(f"Error in message processing loop: {str(e)}")
             self.running = False
+            
+    async def _dispatch(self, channel: str, message_data: Dict[str, Any]) -> None:
+        """
+        Queue a message for its channel's workers, waiting for capacity.
+        
+        The channel may be unsubscribed while waiting; the message is then
+        dropped and its in-flight slot released, since the stopped
+        dispatcher's queue is no longer drained by workers.
+        
+        Args:
+            channel: Channel the message arrived on
+            message_data: Parsed message
+        """
+        dispatcher = self.dispatchers.get(channel)
+        if dispatcher is None:
+            dispatcher = ChannelDispatcher(
+                channel,
+                self.concurrency.get(channel, self.channel_concurrency),
+                self.channel_queue_size,
+            )
+            dispatcher.workers = [
+                asyncio.create_task(self._run_worker(dispatcher))
+                for _ in range(dispatcher.concurrency)
+            ]
+            self.dispatchers[channel] = dispatcher
+        
+        if self._in_flight.locked() or dispatcher.queue.full():
+            dispatcher.backpressure_waits += 1
+        
+        await self._in_flight.acquire()
+        self.in_flight += 1
+        if self.dispatchers.get(channel) is not dispatcher:
+            self._release()
+            return
+        
+        try:
+            await dispatcher.queue.put(message_data)
+        except BaseException:
+            self._release()
+            raise
+        
+        if self.dispatchers.get(channel) is not dispatcher:
+            self._drain(dispatcher)
+            return
+        dispatcher.max_depth = max(dispatcher.max_depth, dispatcher.queue.qsize())
+        
+    async def _run_worker(self, dispatcher: ChannelDispatcher) -> None:
+        """
+        Handle queued messages of a channel.
+        
+        Args:
+            dispatcher: Channel dispatcher
+        """
+        while True:
+            message_data = await dispatcher.queue.get()
+            dispatcher.active += 1
+            try:
+                for handler in list(self.handlers.get(dispatcher.channel, [])):
+                    try:
+                        await handler(message_data)
+                    except Exception as e:
+                        dispatcher.failed += 1
+                        logger.error(f"Error in message handler: {str(e)}")
+            finally:
+                dispatcher.active -= 1
+                dispatcher.processed += 1
+                dispatcher.queue.task_done()
+                self._release()
+                
+    async def _stop_dispatcher(self, dispatcher: ChannelDispatcher) -> None:
+        """
+        Cancel a channel's workers and release its queued messages.
+        
+        Args:
+            dispatcher: Channel dispatcher
+        """
+        for worker in dispatcher.workers:
+            worker.cancel()
+        await asyncio.gather(*dispatcher.workers, return_exceptions=True)
+        self._drain(dispatcher)
+        
+    def _drain(self, dispatcher: ChannelDispatcher) -> None:
+        """Drop the queued messages of a stopped dispatcher and free their slots."""
+        while not dispatcher.queue.empty():
+            dispatcher.queue.get_nowait()
+            self._release()
+            
+    def _release(self) -> None:
+        """Free the in-flight slot of a handled or dropped message."""
+        self.in_flight -= 1
+        self._in_flight.release()
 
 
 class EventBus:
@@ -284,21 +521,301 @@ class EventBus:
         logger.info(f"Unsubscribed from event: {event_type}")
 
 
+class CommandStream:
+    """
+    Durable command transport on a Redis stream.
+    
+    Commands for a service are appended to its stream and read by a consumer
+    group named after the service, so each command is delivered to one
+    replica. Entries are acknowledged after they are handled. Entries a
+    replica took but did not acknowledge (it crashed or hung) are reclaimed
+    by another replica once idle, and moved to a dead-letter stream after
+    ``max_deliveries`` attempts.
+    """
+    
+    def __init__(
+        self,
+        broker: MessageBroker,
+        service: str,
+        consumer: Optional[str] = None,
+        block_ms: int = 5000,
+        batch_size: int = 16,
+        claim_idle_ms: int = 30000,
+        max_deliveries: int = 5,
+        max_length: int = 10000,
+    ):
+        """
+        Initialize the stream.
+        
+        Args:
+            broker: Message broker whose Redis connection is used
+            service: Service the commands are for
+            consumer: Consumer name of this replica (random if not given)
+            block_ms: Milliseconds a read waits for new commands
+            batch_size: Maximum commands read and handled at once
+            claim_idle_ms: Milliseconds after which an unacknowledged
+                command is reclaimed from its consumer
+            max_deliveries: Deliveries after which a command is dead-lettered
+            max_length: Approximate maximum length of the stream
+        """
+        self.broker = broker
+        self.service = service
+        self.stream = f"command-stream:{service}"
+        self.dead_letter_stream = f"command-dead:{service}"
+        self.group = service
+        self.consumer = consumer or uuid4().hex
+        self.block_ms = block_ms
+        self.batch_size = batch_size
+        self.claim_idle_ms = claim_idle_ms
+        self.max_deliveries = max_deliveries
+        self.max_length = max_length
+        self.handler: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None
+        self.tasks: List[asyncio.Task] = []
+        self.handled = 0
+        self.failed = 0
+        self.reclaimed = 0
+        self.dead_lettered = 0
+        
+    async def add(self, message: Dict[str, Any]) -> str:
+        """
+        Append a command to the stream.
+        
+        Args:
+            message: Command message with metadata
+            
+        Returns:
+            str: Stream entry ID
+        """
+        if not self.broker.redis:
+            await self.broker.connect()
+            
+        return await self.broker.redis.xadd(
+            self.stream,
+            {"message": json.dumps(message)},
+            maxlen=self.max_length,
+            approximate=True,
+        )
+        
+    async def start(self, handler: Callable[[Dict[str, Any]], Awaitable[None]]) -> None:
+        """
+        Start consuming commands.
+        
+        Args:
+            handler: Async function to handle command messages; a command is
+                acknowledged when it returns
+        """
+        if self.tasks:
+            return
+            
+        if not self.broker.redis:
+            await self.broker.connect()
+            
+        self.handler = handler
+        
+        # Commands added before the group existed are delivered too
+        try:
+            await self.broker.redis.xgroup_create(self.stream, self.group, id="0", mkstream=True)
+        except redis.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+                
+        self.tasks = [
+            asyncio.create_task(self._consume()),
+            asyncio.create_task(self._reclaim()),
+        ]
+        logger.info(f"Consuming commands from {self.stream} as {self.consumer}")
+        
+    async def stop(self) -> None:
+        """
+        Stop consuming commands. Unacknowledged commands are reclaimed by
+        other replicas.
+        """
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+        
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get consumer metrics.
+        
+        Returns:
+            Dict[str, Any]: Handled, failed, reclaimed and dead-lettered counts
+        """
+        return {
+            "stream": self.stream,
+            "consumer": self.consumer,
+            "handled": self.handled,
+            "failed": self.failed,
+            "reclaimed": self.reclaimed,
+            "dead_lettered": self.dead_lettered,
+        }
+        
+    async def _consume(self) -> None:
+        """
+        Read new commands for this consumer and handle them.
+        """
+        while True:
+            try:
+                response = await self.broker.redis.xreadgroup(
+                    self.group,
+                    self.consumer,
+                    {self.stream: ">"},
+                    count=self.batch_size,
+                    block=self.block_ms,
+                )
+                for _, entries in response or []:
+                    await asyncio.gather(*(
+                        self._handle(entry_id, fields) for entry_id, fields in entries
+                    ))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error reading commands from {self.stream}: {str(e)}")
+                await asyncio.sleep(1.0)
+                
+    async def _reclaim(self) -> None:
+        """
+        Periodically take over idle unacknowledged commands.
+        """
+        while True:
+            await asyncio.sleep(self.claim_idle_ms / 2000)
+            try:
+                await self.reclaim()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error reclaiming commands from {self.stream}: {str(e)}")
+                
+    async def reclaim(self) -> int:
+        """
+        Take over commands that stayed unacknowledged for ``claim_idle_ms``.
+        
+        Commands delivered ``max_deliveries`` times are dead-lettered instead
+        of being handled again.
+        
+        Returns:
+            int: Number of commands reclaimed or dead-lettered
+        """
+        pending = await self.broker.redis.xpending_range(
+            self.stream,
+            self.group,
+            min="-",
+            max="+",
+            count=self.batch_size,
+            idle=self.claim_idle_ms,
+        )
+        if not pending:
+            return 0
+            
+        exhausted = {
+            entry["message_id"] for entry in pending
+            if entry["times_delivered"] >= self.max_deliveries
+        }
+        
+        # Claiming fails for entries another replica claimed meanwhile
+        claimed = await self.broker.redis.xclaim(
+            self.stream,
+            self.group,
+            self.consumer,
+            self.claim_idle_ms,
+            [entry["message_id"] for entry in pending],
+        )
+        
+        retries = []
+        for entry_id, fields in claimed:
+            if fields is None:
+                # Trimmed from the stream
+                await self.broker.redis.xack(self.stream, self.group, entry_id)
+            elif entry_id in exhausted:
+                await self._dead_letter(entry_id, fields, "max deliveries exceeded")
+            else:
+                self.reclaimed += 1
+                retries.append(self._handle(entry_id, fields))
+        await asyncio.gather(*retries)
+        
+        return len(claimed)
+        
+    async def _handle(self, entry_id: str, fields: Dict[str, str]) -> None:
+        """
+        Handle a command entry and acknowledge it.
+        
+        Args:
+            entry_id: Stream entry ID
+            fields: Entry fields
+        """
+        try:
+            message = json.loads(fields["message"])
+        except (KeyError, TypeError, json.JSONDecodeError):
+            await self._dead_letter(entry_id, fields, "invalid message")
+            return
+            
+        try:
+            await self.handler(message)
+        except Exception as e:
+            # Left unacknowledged, so it is reclaimed and retried
+            self.failed += 1
+            logger.error(f"Error handling command {entry_id} from {self.stream}: {str(e)}")
+            return
+            
+        await self.broker.redis.xack(self.stream, self.group, entry_id)
+        self.handled += 1
+        
+    async def _dead_letter(self, entry_id: str, fields: Dict[str, str], reason: str) -> None:
+        """
+        Move a command entry to the dead-letter stream.
+        
+        Args:
+            entry_id: Stream entry ID
+            fields: Entry fields
+            reason: Why the command is dead-lettered
+        """
+        await self.broker.redis.xadd(
+            self.dead_letter_stream,
+            {**(fields or {}), "entry_id": entry_id, "reason": reason},
+            maxlen=self.max_length,
+            approximate=True,
+        )
+        await self.broker.redis.xack(self.stream, self.group, entry_id)
+        self.dead_lettered += 1
+        logger.warning(f"Dead-lettered command {entry_id} from {self.stream}: {reason}")
+
+
 class CommandBus:
     """
     Command bus for sending commands to services.
     """
     
-    def __init__(self, broker: Optional[MessageBroker] = None):
+    def __init__(
+        self,
+        broker: Optional[MessageBroker] = None,
+        transport: str = COMMAND_TRANSPORT,
+        stream_options: Optional[Dict[str, Any]] = None,
+    ):
         """
         Initialize the command bus.
         
         Args:
             broker: Message broker to use
+            transport: ``pubsub`` delivers each command to every subscribed
+                replica while they are connected; ``streams`` queues
+                commands durably and delivers each to one replica
+            stream_options: Options of the command streams (see CommandStream)
         """
         self.broker = broker or MessageBroker()
+        self.transport = transport
+        self.stream_options = stream_options or {}
+        self.instance_id = uuid4().hex
         self.command_handlers = {}
         self.response_handlers = {}
+        self.command_streams: Dict[str, CommandStream] = {}
+        
+    @property
+    def response_channel(self) -> str:
+        """
+        Response channel of this replica.
+        """
+        return f"response:{self.broker.service_name}:{self.instance_id}"
         
     async def connect(self) -> None:
         """
@@ -307,13 +824,15 @@ class CommandBus:
         await self.broker.connect()
         
         # Subscribe to response channel
-        response_channel = f"response:{self.broker.service_name}"
-        await self.broker.subscribe(response_channel, self._handle_response)
+        # Replies may come from other replicas of this service
+        await self.broker.subscribe(self.response_channel, self._handle_response, include_own=True)
         
     async def disconnect(self) -> None:
         """
         Disconnect from the message broker.
         """
+        for stream in self.command_streams.values():
+            await stream.stop()
         await self.broker.disconnect()
         
     async def send_command(
@@ -345,19 +864,27 @@ class CommandBus:
             "command_id": command_id,
             "command": command,
             "data": data,
-            "response_channel": f"response:{self.broker.service_name}" if wait_for_response else None,
+            "response_channel": self.response_channel if wait_for_response else None,
         }
         
+        # Create future for response before the command can be answered
+        if wait_for_response:
+            response_future = asyncio.get_running_loop().create_future()
+            self.response_handlers[command_id] = response_future
+        
         # Send command
-        await self.broker.publish(channel, command_data)
+        try:
+            if self.transport == TRANSPORT_STREAMS:
+                await self._command_stream(service).add(self.broker.envelope(command_data))
+            else:
+                await self.broker.publish(channel, command_data)
+        except Exception:
+            self.response_handlers.pop(command_id, None)
+            raise
         logger.debug(f"Sent command {command} to {service}: {command_id}")
         
         # Wait for response if requested
         if wait_for_response:
-            # Create future for response
-            response_future = asyncio.Future()
-            self.response_handlers[command_id] = response_future
-            
             try:
                 # Wait for response with timeout
                 return await asyncio.wait_for(response_future, timeout)
@@ -388,13 +915,33 @@ class CommandBus:
         # Store handler
         self.command_handlers[command] = handler
         
-        # Subscribe to command channel if not already
-        command_channel = f"command:{self.broker.service_name}"
-        if command_channel not in self.broker.handlers:
-            await self.broker.subscribe(command_channel, self._handle_command)
+        # Consume the service's command stream, or subscribe to its command
+        # channel, if not already
+        if self.transport == TRANSPORT_STREAMS:
+            await self._command_stream(self.broker.service_name).start(self._handle_command)
+        else:
+            command_channel = f"command:{self.broker.service_name}"
+            if command_channel not in self.broker.handlers:
+                await self.broker.subscribe(command_channel, self._handle_command)
             
         logger.info(f"Registered handler for command: {command}")
         
+    def _command_stream(self, service: str) -> CommandStream:
+        """
+        Get the command stream of a service.
+        
+        Args:
+            service: Service name
+            
+        Returns:
+            CommandStream: Command stream
+        """
+        stream = self.command_streams.get(service)
+        if stream is None:
+            stream = CommandStream(self.broker, service, consumer=self.instance_id, **self.stream_options)
+            self.command_streams[service] = stream
+        return stream
+        
     async def _handle_command(self, message: Dict[str, Any]) -> None:
         """
         Handle incoming commands.
@@ -484,12 +1031,16 @@ event_bus = None
 command_bus = None
 
 
-async def init_messaging(service_name: str = SERVICE_NAME) -> None:
+async def init_messaging(
+    service_name: str = SERVICE_NAME,
+    command_transport: str = COMMAND_TRANSPORT,
+) -> None:
     """
     Initialize messaging components.
     
     Args:
         service_name: Name of the service
+        command_transport: Command transport (``pubsub`` or ``streams``)
     """
     global message_broker, event_bus, command_bus
     
@@ -501,7 +1052,7 @@ async def init_messaging(service_name: str = SERVICE_NAME) -> None:
     event_bus = EventBus(broker=message_broker)
     
     # Create command bus
-    command_bus = CommandBus(broker=message_broker)
+    command_bus = CommandBus(broker=message_broker, transport=command_transport)
     await command_bus.connect()
     
     logger.info(f"Messaging initialized for service: {service_name}")
@@ -11,18 +11,20 @@ from typing import Optional, Dict, Any, List, Tuple, Union
 logger = logging.getLogger(__name__)
 
 
-def get_redis_client(redis_url: str) -> redis.Redis:
+def get_redis_client(redis_url: str, decode_responses: bool = True) -> redis.Redis:
     """
     Get a Redis client.
     
     Args:
         redis_url: Redis URL
+        decode_responses: Whether responses are decoded to strings (binary
+            serialized values need False)
         
     Returns:
         Redis client
     """
     try:
-        redis_client = redis.from_url(redis_url, decode_responses=True)
+        redis_client = redis.from_url(redis_url, decode_responses=decode_responses)
         logger.info(f"Connected to Redis at {redis_url}")
         return redis_client
     except Exception as e:
@@ -0,0 +1,318 @@
+"""
+Wire serialization for inter-service messages.
+
+This module provides the serializer used for messages published through the
+message broker, queued in Redis priority queues and stored in the Redis cache:
+- Serializer: Encodes and decodes payloads with a configurable codec and
+  optional compression of large payloads
+- get_serializer: Returns the serializer configured through the environment
+
+Payloads are either plain JSON, which is what services wrote before
+serializers were configurable, or a frame that starts with a version byte
+followed by a codec byte and a compression byte. Every serializer decodes
+both forms whatever its own settings, so a deployment can be switched to a
+binary codec once all readers run a version that understands frames.
+"""
+
+import os
+import json
+import zlib
+import logging
+from typing import Any, Dict, Optional, Union
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    import msgpack
+    HAS_MSGPACK = True
+except ImportError:
+    HAS_MSGPACK = False
+
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+SERIALIZER_FORMAT = os.getenv("MESSAGING_SERIALIZER", "json")
+SERIALIZER_COMPRESSION = os.getenv("MESSAGING_COMPRESSION", "") or None
+COMPRESS_THRESHOLD = int(os.getenv("MESSAGING_COMPRESS_THRESHOLD", "4096"))
+
+# Codecs
+FORMAT_JSON = "json"
+FORMAT_MSGPACK = "msgpack"
+
+# Compressions
+COMPRESSION_ZLIB = "zlib"
+COMPRESSION_ZSTD = "zstd"
+
+# Frame header: version, codec, compression
+FRAME_VERSION = 1
+_CODEC_IDS = {FORMAT_JSON: 0, FORMAT_MSGPACK: 1}
+_CODECS = {codec_id: name for name, codec_id in _CODEC_IDS.items()}
+_COMPRESSION_IDS = {None: 0, COMPRESSION_ZLIB: 1, COMPRESSION_ZSTD: 2}
+_COMPRESSIONS = {compression_id: name for name, compression_id in _COMPRESSION_IDS.items()}
+_HEADER_SIZE = 3
+
+
+class SerializationError(ValueError):
+    """Raised when a payload cannot be decoded."""
+
+
+def _default(value: Any) -> str:
+    """
+    Encode a value that has no native representation in the codec.
+    
+    Args:
+        value: Value to encode
+    
+    Returns:
+        str: String form of the value (ISO format for dates and times)
+    """
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+class Serializer:
+    """
+    Serializer for message payloads.
+    
+    Encoded payloads are bytes. JSON payloads below the compression threshold
+    are written unframed, so services that only read plain JSON can still
+    read them.
+    """
+    
+    def __init__(
+        self,
+        format: str = FORMAT_JSON,
+        compression: Optional[str] = None,
+        compress_threshold: int = COMPRESS_THRESHOLD,
+        compression_level: Optional[int] = None,
+    ):
+        """
+        Initialize the serializer.
+        
+        Args:
+            format: Codec (``json`` or ``msgpack``)
+            compression: Compression of large payloads (``zlib``, ``zstd`` or
+                None to disable)
+            compress_threshold: Minimum encoded size in bytes that is compressed
+            compression_level: Compression level (1 for zlib and 3 for zstd
+                if not given, favouring speed over size)
+        
+        Raises:
+            ValueError: If the codec or compression is unknown
+        """
+        if format not in _CODEC_IDS:
+            raise ValueError(f"Unknown serializer format: {format}")
+        if compression not in _COMPRESSION_IDS:
+            raise ValueError(f"Unknown compression: {compression}")
+        
+        if format == FORMAT_MSGPACK and not HAS_MSGPACK:
+            logger.warning("msgpack not available, messages will be encoded as JSON")
+            format = FORMAT_JSON
+        if compression == COMPRESSION_ZSTD and not HAS_ZSTD:
+            logger.warning("zstandard not available, large messages will be compressed with zlib")
+            compression = COMPRESSION_ZLIB
+        
+        self.format = format
+        self.compression = compression
+        self.compress_threshold = compress_threshold
+        self.compression_level = compression_level
+        self._compressor = None
+        if compression == COMPRESSION_ZSTD:
+            self._compressor = zstandard.ZstdCompressor(level=compression_level or 3)
+    
+    @property
+    def binary(self) -> bool:
+        """
+        Whether encoded payloads may not be valid UTF-8.
+        
+        Binary payloads must be read from Redis with a client created with
+        ``decode_responses=False``.
+        """
+        return self.format != FORMAT_JSON or self.compression is not None
+    
+    def dumps(self, value: Any) -> bytes:
+        """
+        Encode a value.
+        
+        Args:
+            value: Value to encode
+        
+        Returns:
+            bytes: Encoded payload
+        """
+        if self.format == FORMAT_MSGPACK:
+            payload = msgpack.packb(value, default=_default, use_bin_type=True)
+        else:
+            payload = _json_dumps(value)
+        
+        compression = None
+        if self.compression and len(payload) >= self.compress_threshold:
+            compression = self.compression
+            payload = self._compress(payload)
+        
+        if self.format == FORMAT_JSON and compression is None:
+            return payload
+        
+        header = bytes((FRAME_VERSION, _CODEC_IDS[self.format], _COMPRESSION_IDS[compression]))
+        return header + payload
+    
+    def loads(self, data: Union[bytes, str]) -> Any:
+        """
+        Decode a payload written by any serializer.
+        
+        Args:
+            data: Encoded payload
+        
+        Returns:
+            Any: Decoded value
+        
+        Raises:
+            SerializationError: If the payload cannot be decoded
+        """
+        try:
+            if isinstance(data, str):
+                if not data.startswith(chr(FRAME_VERSION)):
+                    return _json_loads(data)
+                data = data.encode("utf-8")
+            
+            if data[:1] != bytes((FRAME_VERSION,)):
+                return _json_loads(data)
+            
+            if len(data) < _HEADER_SIZE:
+                raise SerializationError("Truncated frame header")
+            
+            codec = _CODECS.get(data[1])
+            if codec is None:
+                raise SerializationError(f"Unknown codec: {data[1]}")
+            if data[2] not in _COMPRESSIONS:
+                raise SerializationError(f"Unknown compression: {data[2]}")
+            
+            payload = _decompress(_COMPRESSIONS[data[2]], data[_HEADER_SIZE:])
+            if codec == FORMAT_MSGPACK:
+                if not HAS_MSGPACK:
+                    raise SerializationError("msgpack payload received but msgpack is not available")
+                return msgpack.unpackb(payload, raw=False, strict_map_key=False)
+            return _json_loads(payload)
+        except SerializationError:
+            raise
+        except Exception as e:
+            raise SerializationError(f"Failed to decode payload: {str(e)}") from e
+    
+    def get_info(self) -> Dict[str, Any]:
+        """
+        Get serializer settings.
+        
+        Returns:
+            Dict[str, Any]: Codec, compression and threshold
+        """
+        return {
+            "format": self.format,
+            "json_library": "orjson" if HAS_ORJSON else "json",
+            "compression": self.compression,
+            "compress_threshold": self.compress_threshold,
+        }
+    
+    def _compress(self, payload: bytes) -> bytes:
+        """
+        Compress an encoded payload.
+        
+        Args:
+            payload: Encoded payload
+        
+        Returns:
+            bytes: Compressed payload
+        """
+        if self._compressor is not None:
+            return self._compressor.compress(payload)
+        return zlib.compress(payload, self.compression_level or 1)
+
+
+def _json_dumps(value: Any) -> bytes:
+    """
+    Encode a value as JSON.
+    
+    Args:
+        value: Value to encode
+    
+    Returns:
+        bytes: UTF-8 encoded JSON
+    """
+    if HAS_ORJSON:
+        return orjson.dumps(value, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, default=_default).encode("utf-8")
+
+
+def _json_loads(data: Union[bytes, str]) -> Any:
+    """
+    Decode JSON.
+    
+    Args:
+        data: JSON text
+    
+    Returns:
+        Any: Decoded value
+    """
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _decompress(compression: Optional[str], payload: bytes) -> bytes:
+    """
+    Decompress a frame payload.
+    
+    Args:
+        compression: Compression the payload was written with
+        payload: Frame payload
+    
+    Returns:
+        bytes: Decompressed payload
+    
+    Raises:
+        SerializationError: If the compression is not available
+    """
+    if compression is None:
+        return payload
+    if compression == COMPRESSION_ZLIB:
+        return zlib.decompress(payload)
+    if not HAS_ZSTD:
+        raise SerializationError("zstd payload received but zstandard is not available")
+    return zstandard.ZstdDecompressor().decompress(payload)
+
+
+# Global serializer
+_serializer: Optional[Serializer] = None
+
+
+def get_serializer() -> Serializer:
+    """
+    Get the serializer configured through the environment.
+    
+    ``MESSAGING_SERIALIZER`` selects the codec, ``MESSAGING_COMPRESSION`` the
+    compression and ``MESSAGING_COMPRESS_THRESHOLD`` the minimum size that is
+    compressed.
+    
+    Returns:
+        Serializer: Serializer instance
+    """
+    global _serializer
+    
+    if _serializer is None:
+        _serializer = Serializer(
+            format=SERIALIZER_FORMAT,
+            compression=SERIALIZER_COMPRESSION,
+            compress_threshold=COMPRESS_THRESHOLD,
+        )
+    
+    return _serializer
@@ -0,0 +1,452 @@
+"""
+Tests for the message broker dispatcher.
+"""
+
+import asyncio
+import json
+import time
+from uuid import uuid4
+
+import pytest
+import redis.asyncio as redis
+
+from shared.utils.src.messaging import CommandBus, MessageBroker, TRANSPORT_STREAMS
+from shared.utils.src.serialization import Serializer
+
+
+class FakePubSub:
+    """
+    In-memory pubsub that blocks until a message is delivered.
+    """
+    
+    def __init__(self):
+        self.channels = set()
+        self.messages = asyncio.Queue()
+        
+    @property
+    def subscribed(self) -> bool:
+        return bool(self.channels)
+        
+    async def subscribe(self, channel: str) -> None:
+        self.channels.add(channel)
+        
+    async def unsubscribe(self, channel: str) -> None:
+        self.channels.discard(channel)
+        
+    async def get_message(self, ignore_subscribe_messages: bool = False, timeout: float = 0.0):
+        return await self.messages.get()
+        
+    def deliver(self, channel: str, data: dict, sender: str = "other-service") -> None:
+        self.messages.put_nowait({
+            "type": "message",
+            "channel": channel,
+            "data": json.dumps({"id": str(uuid4()), "sender": sender, "data": data}),
+        })
+
+
+class FakeRedis:
+    """
+    In-memory stand-in for the Redis pubsub and stream commands the
+    messaging module uses.
+    """
+    
+    def __init__(self):
+        self.pubsubs = []
+        self.streams = {}
+        self.groups = {}
+        self.counter = 0
+        self.added = asyncio.Event()
+        
+    def pubsub(self) -> FakePubSub:
+        pubsub = FakePubSub()
+        self.pubsubs.append(pubsub)
+        return pubsub
+        
+    async def close(self) -> None:
+        pass
+        
+    async def publish(self, channel: str, data: bytes) -> None:
+        # The broker's subscriber connection returns bytes
+        for pubsub in self.pubsubs:
+            if channel in pubsub.channels:
+                pubsub.messages.put_nowait({"type": "message", "channel": channel.encode("utf-8"), "data": data})
+                
+    async def xadd(self, name, fields, maxlen=None, approximate=True):
+        self.counter += 1
+        entry_id = f"{self.counter}-0"
+        self.streams.setdefault(name, []).append((entry_id, dict(fields)))
+        self.added.set()
+        self.added = asyncio.Event()
+        return entry_id
+        
+    async def xgroup_create(self, name, groupname, id="$", mkstream=False):
+        if (name, groupname) in self.groups:
+            raise redis.ResponseError("BUSYGROUP Consumer Group name already exists")
+        entries = self.streams.setdefault(name, [])
+        self.groups[(name, groupname)] = {"last": 0 if id == "0" else len(entries), "pending": {}}
+        
+    async def xreadgroup(self, groupname, consumername, streams, count=None, block=None):
+        name = next(iter(streams))
+        group = self.groups[(name, groupname)]
+        entries = self.streams[name]
+        if group["last"] >= len(entries):
+            added = asyncio.ensure_future(self.added.wait())
+            try:
+                await asyncio.wait({added}, timeout=block / 1000)
+            finally:
+                added.cancel()
+            if group["last"] >= len(entries):
+                return []
+        
+        batch = entries[group["last"]:group["last"] + count]
+        group["last"] += len(batch)
+        for entry_id, _ in batch:
+            group["pending"][entry_id] = {"consumer": consumername, "delivered_at": time.monotonic(), "times": 1}
+        return [[name, batch]]
+        
+    async def xack(self, name, groupname, *ids):
+        pending = self.groups[(name, groupname)]["pending"]
+        return sum(pending.pop(entry_id, None) is not None for entry_id in ids)
+        
+    async def xpending_range(self, name, groupname, min, max, count, idle=None):
+        now = time.monotonic()
+        return [
+            {"message_id": entry_id, "consumer": entry["consumer"], "times_delivered": entry["times"]}
+            for entry_id, entry in self.groups[(name, groupname)]["pending"].items()
+            if (now - entry["delivered_at"]) * 1000 >= (idle or 0)
+        ][:count]
+        
+    async def xclaim(self, name, groupname, consumername, min_idle_time, message_ids):
+        now = time.monotonic()
+        fields = dict(self.streams[name])
+        claimed = []
+        for entry_id in message_ids:
+            entry = self.groups[(name, groupname)]["pending"].get(entry_id)
+            if entry is None or (now - entry["delivered_at"]) * 1000 < min_idle_time:
+                continue
+            entry.update(consumer=consumername, delivered_at=now, times=entry["times"] + 1)
+            claimed.append((entry_id, fields.get(entry_id)))
+        return claimed
+
+
+def create_bus(fake_redis: FakeRedis, service_name: str, **kwargs) -> CommandBus:
+    """
+    Create a command bus on a fake Redis.
+    """
+    broker = MessageBroker(service_name=service_name)
+    broker.redis = fake_redis
+    broker.pubsub = fake_redis.pubsub()
+    return CommandBus(broker=broker, **kwargs)
+
+
+def create_broker(**kwargs) -> MessageBroker:
+    """
+    Create a broker reading from a fake pubsub.
+    """
+    broker = MessageBroker(service_name="test-service", **kwargs)
+    broker.redis = object()
+    broker.pubsub = FakePubSub()
+    return broker
+
+
+async def wait_until(condition, timeout: float = 1.0) -> None:
+    """
+    Wait until a condition holds.
+    """
+    async def poll():
+        while not condition():
+            await asyncio.sleep(0.001)
+    await asyncio.wait_for(poll(), timeout)
+
+
+@pytest.mark.asyncio
+async def test_slow_handler_does_not_block_other_channels():
+    """
+    Test that a slow handler only holds up its own channel.
+    """
+    broker = create_broker()
+    release = asyncio.Event()
+    handled = []
+    
+    async def slow_handler(message):
+        await release.wait()
+        handled.append("slow")
+        
+    async def fast_handler(message):
+        handled.append("fast")
+        
+    await broker.subscribe("slow", slow_handler)
+    await broker.subscribe("fast", fast_handler)
+    
+    broker.pubsub.deliver("slow", {})
+    broker.pubsub.deliver("fast", {})
+    await wait_until(lambda: handled == ["fast"])
+    
+    release.set()
+    await wait_until(lambda: handled == ["fast", "slow"])
+    await broker.stop()
+
+
+@pytest.mark.asyncio
+async def test_channel_concurrency_is_bounded():
+    """
+    Test that a channel handles at most its concurrency of messages at once.
+    """
+    broker = create_broker()
+    active = 0
+    max_active = 0
+    handled = 0
+    
+    async def handler(message):
+        nonlocal active, max_active, handled
+        active += 1
+        max_active = max(max_active, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        handled += 1
+        
+    await broker.subscribe("work", handler, concurrency=2)
+    for i in range(6):
+        broker.pubsub.deliver("work", {"i": i})
+        
+    await wait_until(lambda: handled == 6)
+    assert max_active == 2
+    assert broker.get_metrics()["channels"]["work"]["processed"] == 6
+    await broker.stop()
+
+
+@pytest.mark.asyncio
+async def test_single_worker_keeps_order_and_skips_own_messages():
+    """
+    Test that a channel with one worker handles messages in order.
+    """
+    broker = create_broker()
+    handled = []
+    
+    async def handler(message):
+        handled.append(message["data"]["i"])
+        
+    await broker.subscribe("ordered", handler, concurrency=1)
+    broker.pubsub.deliver("ordered", {"i": 0})
+    broker.pubsub.deliver("ordered", {"i": -1}, sender="test-service")
+    for i in range(1, 5):
+        broker.pubsub.deliver("ordered", {"i": i})
+        
+    await wait_until(lambda: len(handled) == 5)
+    assert handled == [0, 1, 2, 3, 4]
+    await broker.stop()
+
+
+@pytest.mark.asyncio
+async def test_in_flight_limit_applies_backpressure():
+    """
+    Test that reading pauses while the in-flight limit is reached.
+    """
+    broker = create_broker(max_in_flight=2)
+    release = asyncio.Event()
+    handled = 0
+    
+    async def handler(message):
+        nonlocal handled
+        await release.wait()
+        handled += 1
+        
+    await broker.subscribe("work", handler)
+    for i in range(5):
+        broker.pubsub.deliver("work", {"i": i})
+        
+    await wait_until(lambda: broker.in_flight == 2)
+    await asyncio.sleep(0.01)
+    
+    # Unread messages stay in the subscription
+    assert broker.pubsub.messages.qsize() == 2
+    assert broker.get_metrics()["channels"]["work"]["backpressure_waits"] >= 1
+    
+    release.set()
+    await wait_until(lambda: handled == 5)
+    assert broker.get_metrics()["in_flight"] == 0
+    await broker.stop()
+
+
+@pytest.mark.asyncio
+async def test_unsubscribe_releases_a_reader_blocked_on_a_full_queue():
+    """
+    Test that a message put after its channel was unsubscribed is dropped
+    and its in-flight slot released.
+    """
+    broker = create_broker(max_in_flight=10, channel_queue_size=1)
+    release = asyncio.Event()
+    handled = []
+    
+    async def blocking_handler(message):
+        await release.wait()
+        
+    async def handler(message):
+        handled.append(message["data"]["i"])
+        
+    await broker.subscribe("work", blocking_handler, concurrency=1)
+    for i in range(3):
+        broker.pubsub.deliver("work", {"i": i})
+        
+    # One message is handled, one queued and the reader waits to put the third
+    await wait_until(lambda: broker.in_flight == 3)
+    assert broker.pubsub.messages.empty()
+    
+    await broker.unsubscribe("work")
+    await wait_until(lambda: broker.in_flight == 0)
+    await asyncio.sleep(0.01)
+    assert broker.in_flight == 0
+    assert broker._in_flight._value == 10
+    
+    # The channel works again after subscribing
+    await broker.subscribe("work", handler)
+    broker.pubsub.deliver("work", {"i": 3})
+    await wait_until(lambda: handled == [3])
+    assert broker.in_flight == 0
+    await broker.stop()
+
+
+@pytest.mark.asyncio
+async def test_unsubscribe_releases_a_reader_waiting_for_capacity():
+    """
+    Test that a reader waiting for an in-flight slot drops the message of
+    an unsubscribed channel.
+    """
+    broker = create_broker(max_in_flight=1)
+    release = asyncio.Event()
+    
+    async def blocking_handler(message):
+        await release.wait()
+        
+    await broker.subscribe("work", blocking_handler)
+    broker.pubsub.deliver("work", {"i": 0})
+    broker.pubsub.deliver("work", {"i": 1})
+    await wait_until(lambda: broker.in_flight == 1 and broker.pubsub.messages.empty())
+    
+    await broker.unsubscribe("work")
+    await asyncio.sleep(0.01)
+    
+    assert broker.in_flight == 0
+    assert broker._in_flight._value == 1
+    assert "work" not in broker.dispatchers
+    await broker.stop()
+
+
+@pytest.mark.asyncio
+async def test_compressed_messages_are_read_from_binary_subscriptions():
+    """
+    Test that messages published with a compressing serializer are decoded
+    when the subscription returns bytes.
+    """
+    fake_redis = FakeRedis()
+    publisher = MessageBroker(service_name="publisher", serializer=Serializer(compression="zlib", compress_threshold=0))
+    publisher.redis = fake_redis
+    subscriber = create_broker()
+    subscriber.pubsub = fake_redis.pubsub()
+    handled = []
+    
+    async def handler(message):
+        handled.append(message["data"])
+        
+    await subscriber.subscribe("results", handler)
+    await publisher.publish("results", {"content": "text " * 100})
+    
+    await wait_until(lambda: len(handled) == 1)
+    
+    assert handled == [{"content": "text " * 100}]
+    await subscriber.stop()
+
+
+@pytest.mark.asyncio
+async def test_stream_commands_survive_late_consumers():
+    """
+    Test that commands sent before the target consumes its stream are
+    delivered, and that replies reach the sending replica.
+    """
+    fake_redis = FakeRedis()
+    caller = create_bus(fake_redis, "caller", transport=TRANSPORT_STREAMS)
+    worker = create_bus(fake_redis, "worker", transport=TRANSPORT_STREAMS)
+    await caller.broker.subscribe(caller.response_channel, caller._handle_response, include_own=True)
+    
+    # Sent while the worker is not consuming yet
+    await caller.send_command("worker", "log", {"text": "early"})
+    
+    async def echo(data):
+        return {"echo": data["text"]}
+        
+    await worker.register_command_handler("log", echo)
+    await worker.register_command_handler("echo", echo)
+    
+    result = await caller.send_command("worker", "echo", {"text": "hi"}, wait_for_response=True, timeout=1.0)
+    
+    assert result == {"echo": "hi"}
+    await wait_until(lambda: worker.command_streams["worker"].handled == 2)
+    await caller.broker.stop()
+    await worker.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_stream_commands_are_sharded_across_replicas():
+    """
+    Test that each command is handled by exactly one replica.
+    """
+    fake_redis = FakeRedis()
+    handled = {}
+    
+    def handler_for(replica):
+        async def handler(data):
+            handled.setdefault(data["i"], []).append(replica)
+            await asyncio.sleep(0.005)
+            return {}
+        return handler
+        
+    replicas = []
+    for replica in ("a", "b"):
+        bus = create_bus(fake_redis, "worker", transport=TRANSPORT_STREAMS, stream_options={"batch_size": 1})
+        await bus.register_command_handler("work", handler_for(replica))
+        replicas.append(bus)
+        
+    caller = create_bus(fake_redis, "caller", transport=TRANSPORT_STREAMS)
+    for i in range(10):
+        await caller.send_command("worker", "work", {"i": i})
+        
+    await wait_until(lambda: len(handled) == 10)
+    await asyncio.sleep(0.02)
+    
+    assert all(len(replicas_) == 1 for replicas_ in handled.values())
+    assert {replica for replicas_ in handled.values() for replica in replicas_} == {"a", "b"}
+    for bus in replicas:
+        await bus.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_unacknowledged_commands_are_reclaimed_and_dead_lettered():
+    """
+    Test that commands whose handling keeps failing are retried, then
+    dead-lettered.
+    """
+    fake_redis = FakeRedis()
+    worker = create_bus(
+        fake_redis,
+        "worker",
+        transport=TRANSPORT_STREAMS,
+        stream_options={"claim_idle_ms": 20, "max_deliveries": 2},
+    )
+    attempts = 0
+    
+    async def crash(message):
+        nonlocal attempts
+        attempts += 1
+        raise RuntimeError("consumer crashed")
+        
+    stream = worker._command_stream("worker")
+    await stream.start(crash)
+    await stream.add(worker.broker.envelope({"command": "work"}))
+    
+    await wait_until(lambda: stream.dead_lettered == 1)
+    
+    assert attempts == 2
+    assert stream.reclaimed == 1
+    assert len(fake_redis.streams["command-dead:worker"]) == 1
+    assert fake_redis.groups[("command-stream:worker", "worker")]["pending"] == {}
+    await stream.stop()
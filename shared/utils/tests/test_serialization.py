@@ -0,0 +1,132 @@
+"""
+Tests for the wire serializer.
+"""
+
+import json
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+
+from shared.utils.src.serialization import (
+    FRAME_VERSION,
+    HAS_MSGPACK,
+    HAS_ZSTD,
+    SerializationError,
+    Serializer,
+)
+
+
+def agent_message(text_size: int = 100) -> dict:
+    """
+    Create an agent message envelope.
+    """
+    return {
+        "id": str(uuid4()),
+        "timestamp": datetime.utcnow().isoformat(),
+        "sender": "agent-orchestrator",
+        "data": {
+            "type": "model.result",
+            "content": "lorem ipsum " * text_size,
+            "embedding": [0.125 * i for i in range(64)],
+            "metadata": {"tokens": 512, "cached": False},
+        },
+    }
+
+
+def test_json_payloads_stay_plain_json():
+    """
+    Test that uncompressed JSON payloads are readable by plain JSON readers.
+    """
+    message = agent_message()
+    payload = Serializer().dumps(message)
+    
+    assert json.loads(payload) == message
+
+
+def test_legacy_json_payloads_are_decoded():
+    """
+    Test that payloads written with json.dumps are decoded from text and bytes.
+    """
+    message = agent_message()
+    legacy = json.dumps(message)
+    serializer = Serializer(compression="zlib")
+    
+    assert serializer.loads(legacy) == message
+    assert serializer.loads(legacy.encode("utf-8")) == message
+
+
+def test_large_payloads_are_compressed_in_a_frame():
+    """
+    Test that only payloads above the threshold are compressed.
+    """
+    serializer = Serializer(compression="zlib", compress_threshold=1024)
+    small = agent_message(text_size=1)
+    large = agent_message(text_size=1000)
+    
+    small_payload = serializer.dumps(small)
+    large_payload = serializer.dumps(large)
+    
+    assert json.loads(small_payload) == small
+    assert large_payload[0] == FRAME_VERSION
+    assert len(large_payload) < len(json.dumps(large)) / 4
+    assert serializer.loads(large_payload) == large
+
+
+def test_frames_are_decoded_by_any_serializer():
+    """
+    Test that a reader decodes frames whatever its own settings.
+    """
+    message = agent_message(text_size=1000)
+    writer = Serializer(compression="zstd", compress_threshold=0)
+    
+    assert Serializer().loads(writer.dumps(message)) == message
+
+
+def test_zstd_falls_back_to_zlib_when_unavailable():
+    """
+    Test that zstd compression falls back to zlib without zstandard.
+    """
+    serializer = Serializer(compression="zstd")
+    
+    assert serializer.compression == ("zstd" if HAS_ZSTD else "zlib")
+
+
+@pytest.mark.skipif(not HAS_MSGPACK, reason="msgpack not installed")
+def test_msgpack_round_trip():
+    """
+    Test that msgpack payloads are framed and round-trip.
+    """
+    message = agent_message()
+    serializer = Serializer(format="msgpack")
+    payload = serializer.dumps(message)
+    
+    assert payload[:2] == bytes((FRAME_VERSION, 1))
+    assert Serializer().loads(payload) == message
+
+
+def test_values_without_json_form_are_encoded_as_strings():
+    """
+    Test that UUIDs and datetimes are encoded as strings.
+    """
+    message_id = uuid4()
+    created_at = datetime(2024, 1, 2, 3, 4, 5)
+    serializer = Serializer()
+    
+    decoded = serializer.loads(serializer.dumps({"id": message_id, "created_at": created_at}))
+    
+    assert decoded == {"id": str(message_id), "created_at": "2024-01-02T03:04:05"}
+
+
+def test_invalid_payloads_raise_serialization_error():
+    """
+    Test that undecodable payloads raise SerializationError.
+    """
+    serializer = Serializer()
+    
+    with pytest.raises(SerializationError):
+        serializer.loads(b"not json")
+    with pytest.raises(SerializationError):
+        serializer.loads(bytes((FRAME_VERSION, 9, 0)) + b"{}")
+    with pytest.raises(SerializationError):
+        serializer.loads(bytes((FRAME_VERSION, 0, 1)) + b"not zlib")